@@ -1,9 +1,16 @@
-from flask import Flask
+import atexit
+import os
+
+from flask import Flask, current_app
 from flask_wtf.csrf import CSRFProtect
 from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
 from app.logging_config import setup_logging
+from app.mariadb_storage import MariaDBStorage
+from app.photo_jobs import PhotoJobWorker
+from app.label_jobs import LabelJobWorker
 from app.error_handlers import create_error_handlers
+from app.query_stats import init_query_stats
 from app.version import __version__
 
 csrf = CSRFProtect()
@@ -47,13 +54,43 @@ def _drop_malformed_forwarded_port(wsgi_app):
     return middleware
 
 
+def _process_storage_backend(database_url):
+    """The one storage backend, and so the one connection pool, of this process.
+
+    Every route used to build its own ``MariaDBStorage()``, and every service
+    handed an unconnected one built its own engine -- so nearly every request
+    paid for a fresh pool, a TCP connect and a MariaDB handshake before running
+    a single query. Built here once instead, and shared by every service.
+
+    A failed first connect is logged and not fatal: the engine is kept, and the
+    first session opened against it connects then.
+
+    gunicorn as the Dockerfile runs it builds the app inside each worker, after
+    the fork. The at-fork hook is for a server that builds it first and forks
+    after -- ``--preload`` -- where the connection the check above left in the
+    pool would otherwise be shared by every worker.
+    """
+    storage = MariaDBStorage(database_url=database_url)
+    storage.connect()
+    os.register_at_fork(after_in_child=storage.dispose_after_fork)
+    atexit.register(storage.close)
+    return storage
+
+
+def get_storage_backend():
+    """The storage backend of the current app (see _process_storage_backend)"""
+    return current_app.config['STORAGE_BACKEND']
+
+
 def create_app(config_class=Config, storage_backend=None):
     """
     Create Flask application factory with optional storage backend injection.
     
     Args:
         config_class: Configuration class to use (defaults to Config)
-        storage_backend: Optional storage backend instance for testing
+        storage_backend: Optional storage backend instance for testing. When
+            omitted, one is built from ``SQLALCHEMY_DATABASE_URI`` and shared by
+            every request this process serves.
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
@@ -86,14 +123,36 @@ def create_app(config_class=Config, storage_backend=None):
     )
 
     # Store the storage backend in app config for access by routes
-    if storage_backend:
-        app.config['STORAGE_BACKEND'] = storage_backend
+    if storage_backend is None:
+        storage_backend = _process_storage_backend(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['STORAGE_BACKEND'] = storage_backend
+
+    # Uploaded photos' thumbnail and medium sizes are rendered on this thread
+    # rather than in the request. Woken once now for anything queued before
+    # this process started.
+    app.config['PHOTO_JOB_WORKER'] = None
+    if app.config.get('PHOTO_JOBS_IN_BACKGROUND'):
+        worker = PhotoJobWorker(storage_backend)
+        worker.wake()
+        atexit.register(worker.stop)
+        app.config['PHOTO_JOB_WORKER'] = worker
+
+    # Likewise label printing, which hands each label to CUPS
+    app.config['LABEL_JOB_WORKER'] = None
+    if app.config.get('LABEL_JOBS_IN_BACKGROUND'):
+        label_worker = LabelJobWorker(app, storage_backend)
+        label_worker.wake()
+        atexit.register(label_worker.stop)
+        app.config['LABEL_JOB_WORKER'] = label_worker
     
     # Setup CSRF protection
     csrf.init_app(app)
     
     # Setup logging
     setup_logging(app)
+
+    # Count and time each request's SQL (Server-Timing, N+1 warnings)
+    init_query_stats(app)
     
     # Setup error handlers
     create_error_handlers(app)
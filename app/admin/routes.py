@@ -5,22 +5,12 @@ Provides web interface for adding new taxonomy entries and managing status.
 """
 
 from flask import render_template, request, jsonify, flash, redirect, url_for, current_app
+from app import get_storage_backend
 from app.admin import bp
 from app.mariadb_materials_admin_service import MariaDBMaterialsAdminService, TaxonomyAddRequest
 from config import Config
 
 
-def _get_storage_backend():
-    """Get the appropriate storage backend for the current app context"""
-    # Check if test storage is injected
-    if 'STORAGE_BACKEND' in current_app.config:
-        return current_app.config['STORAGE_BACKEND']
-    
-    # Use MariaDB storage for consistency with autocomplete
-    from app.mariadb_storage import MariaDBStorage
-    return MariaDBStorage()
-
-
 def _get_admin_service(storage):
     """Get the appropriate admin service for the storage backend"""
     # All storage now uses MariaDB backend
@@ -30,7 +20,7 @@ def _get_admin_service(storage):
 @bp.route('/materials')
 def materials_overview():
     """Main materials taxonomy management page"""
-    storage = _get_storage_backend()
+    storage = get_storage_backend()
     admin_service = _get_admin_service(storage)
     
     # Get taxonomy overview
@@ -49,7 +39,7 @@ def materials_overview():
 @bp.route('/materials/add', methods=['GET', 'POST'])
 def add_material():
     """Add new taxonomy entry form and handler"""
-    storage = _get_storage_backend()
+    storage = get_storage_backend()
     admin_service = _get_admin_service(storage)
     
     if request.method == 'GET':
@@ -111,7 +101,7 @@ def add_material():
 @bp.route('/materials/status', methods=['POST'])
 def update_material_status():
     """Update the active status of a material (AJAX endpoint)"""
-    storage = _get_storage_backend()
+    storage = get_storage_backend()
     admin_service = _get_admin_service(storage)
     
     try:
@@ -136,7 +126,7 @@ def update_material_status():
 @bp.route('/api/materials/parents/<int:level>')
 def get_available_parents(level):
     """Get available parent materials for a given level (AJAX endpoint)"""
-    storage = _get_storage_backend()
+    storage = get_storage_backend()
     admin_service = _get_admin_service(storage)
     
     try:
@@ -160,7 +150,7 @@ def get_available_parents(level):
 @bp.route('/api/materials/validate', methods=['POST'])
 def validate_material():
     """Validate a taxonomy add request (AJAX endpoint)"""
-    storage = _get_storage_backend()
+    storage = get_storage_backend()
     admin_service = _get_admin_service(storage)
     
     try:
@@ -0,0 +1,150 @@
+"""
+Blob Store for Workshop Inventory Tracking
+
+Content-addressed storage for photo and attachment bytes, so the ``photos``
+table can hold metadata only. A blob is named by the SHA-256 of the original
+upload plus the variant (thumbnail, medium or original) it holds; identical
+uploads therefore share one set of files, and a file's content never changes
+once written.
+
+Only a local-filesystem store exists. The abstract base is the seam an object
+store would plug into, and it is deliberately no wider than PhotoService needs.
+"""
+
+import fcntl
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# The variants PhotoService stores for every upload
+BLOB_VARIANTS = ('thumbnail', 'medium', 'original')
+
+_SHA256_HEX = re.compile(r'^[0-9a-f]{64}$')
+
+
+class BlobStore(ABC):
+    """Where photo bytes live when they are not in the database"""
+
+    @abstractmethod
+    def put(self, sha256: str, variant: str, data: bytes, replace: bool = False) -> None:
+        """Store one variant of a blob. Storing an existing blob is a no-op.
+
+        ``replace`` overwrites instead, for a thumbnail or medium size being
+        re-rendered from its original.
+        """
+
+    @abstractmethod
+    def get(self, sha256: str, variant: str) -> Optional[bytes]:
+        """Read one variant of a blob, or None if it is not stored"""
+
+    @abstractmethod
+    def delete(self, sha256: str) -> None:
+        """Remove every variant of a blob. Removing a missing blob is a no-op."""
+
+    @abstractmethod
+    def lock(self, sha256: str) -> Iterator[None]:
+        """Context manager held, across every process, while a blob's files
+        are checked for use and deleted, or put back for a row just committed"""
+
+    def local_path(self, sha256: str, variant: str) -> Optional[str]:
+        """Filesystem path of a stored variant, for serving with sendfile
+
+        Stores that are not on the local disk return None, and callers fall
+        back to ``get``.
+        """
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store in a local directory
+
+    Files are fanned out by the first two byte pairs of the hash
+    (``ab/cd/abcd...-original``) so no directory grows past a few hundred
+    entries. Writes go to a temporary file that is renamed into place, so a
+    reader -- or a crash -- never sees half a file.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, sha256: str, variant: str) -> str:
+        """Path for one variant, refusing anything that is not a SHA-256 hex digest"""
+        if not _SHA256_HEX.match(sha256 or ''):
+            raise ValueError(f"Not a SHA-256 hex digest: {sha256!r}")
+        if variant not in BLOB_VARIANTS:
+            raise ValueError(f"Unknown blob variant: {variant!r}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}-{variant}")
+
+    def put(self, sha256: str, variant: str, data: bytes, replace: bool = False) -> None:
+        path = self._path(sha256, variant)
+        if os.path.exists(path) and not replace:
+            # Content-addressed: the file there already holds these bytes
+            return
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def get(self, sha256: str, variant: str) -> Optional[bytes]:
+        try:
+            with open(self._path(sha256, variant), 'rb') as blob_file:
+                return blob_file.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, sha256: str) -> None:
+        for variant in BLOB_VARIANTS:
+            try:
+                os.unlink(self._path(sha256, variant))
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def lock(self, sha256: str) -> Iterator[None]:
+        # One lock file per leading byte of the hash keeps the number of
+        # files fixed. flock is per open file, so it excludes threads too.
+        self._path(sha256, 'original')  # refuses anything that is not a hash
+        directory = os.path.join(self.root, '.locks')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{sha256[:2]}.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def local_path(self, sha256: str, variant: str) -> Optional[str]:
+        path = self._path(sha256, variant)
+        return path if os.path.exists(path) else None
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """The configured blob store, or None to keep photo bytes in the database
+
+    Opt-in through ``PHOTO_BLOB_DIR`` because the directory has to be a
+    persistent volume in the container; defaulting it to somewhere inside the
+    image would lose every upload at the next deploy.
+    """
+    if not Config.PHOTO_BLOB_DIR:
+        return None
+    return LocalBlobStore(Config.PHOTO_BLOB_DIR)
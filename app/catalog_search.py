@@ -0,0 +1,164 @@
+"""
+Product Catalog Full-Text Search
+
+Catalog search matches what the operator types against every field that names a
+product: description, manufacturer, part number, identifier values,
+specification names and values, and notes. Those live in three tables, and
+matching them with leading-wildcard LIKEs meant scanning all three on every
+search. Instead each product's text is flattened into one
+``product_search_documents`` row and searched by word prefix with relevance
+ranking; ``app.search_index`` has the matching rules.
+
+A document is rewritten before any commit that changed one of its sources: a
+session listener notes the products touched by each flush, and
+``refresh_search_documents`` rebuilds those before the transaction commits, so
+the index never disagrees with a committed product.
+"""
+
+import logging
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, attributes
+
+from .database import (
+    Product,
+    ProductIdentifier,
+    ProductSearchDocument,
+    ProductSpecification,
+)
+from .search_index import document_body, matching_documents
+
+logger = logging.getLogger(__name__)
+
+# Product columns that feed the document
+_PRODUCT_COLUMNS = ('description', 'manufacturer', 'manufacturer_part_number', 'notes')
+
+
+def refresh_search_documents(session, product_ids: Iterable[int]) -> None:
+    """Rewrite the documents of the given products from their current rows"""
+    ids = sorted({product_id for product_id in product_ids if product_id is not None})
+    if not ids:
+        return
+
+    products = {
+        row.id: row for row in session.query(
+            Product.id, *(getattr(Product, column) for column in _PRODUCT_COLUMNS)
+        ).filter(Product.id.in_(ids))
+    }
+    specifications: Dict[int, list] = {}
+    for product_id, name, value in session.query(
+        ProductSpecification.product_id, ProductSpecification.name, ProductSpecification.value
+    ).filter(ProductSpecification.product_id.in_(ids)).order_by(
+        ProductSpecification.product_id, ProductSpecification.display_order, ProductSpecification.id
+    ):
+        specifications.setdefault(product_id, []).append((name, value))
+    identifiers: Dict[int, list] = {}
+    for product_id, value in session.query(
+        ProductIdentifier.product_id, ProductIdentifier.value
+    ).filter(ProductIdentifier.product_id.in_(ids)).order_by(ProductIdentifier.id):
+        identifiers.setdefault(product_id, []).append(value)
+
+    documents = {
+        document.product_id: document for document in session.query(ProductSearchDocument).filter(
+            ProductSearchDocument.product_id.in_(ids)
+        )
+    }
+    for product_id in ids:
+        document = documents.get(product_id)
+        row = products.get(product_id)
+        if row is None:
+            if document is not None:
+                session.delete(document)
+            continue
+
+        body = document_body([
+            *(getattr(row, column) for column in _PRODUCT_COLUMNS),
+            *identifiers.get(product_id, ()),
+            *(part for entry in specifications.get(product_id, ()) for part in entry),
+        ])
+        if document is None:
+            session.add(ProductSearchDocument(product_id=product_id, body=body))
+        elif document.body != body:
+            document.body = body
+
+
+def rebuild_search_documents(session, batch_size: int = 500) -> int:
+    """Rewrite every product's document; returns how many products there are"""
+    ids = [product_id for (product_id,) in session.query(Product.id).order_by(Product.id)]
+    for start in range(0, len(ids), batch_size):
+        refresh_search_documents(session, ids[start:start + batch_size])
+        session.flush()
+    stale = session.query(ProductSearchDocument).filter(
+        ~ProductSearchDocument.product_id.in_(select(Product.id))
+    )
+    for document in stale:
+        session.delete(document)
+    return len(ids)
+
+
+def matching_products(session, query: str):
+    """
+    A subquery of ``(key, score)`` -- the product id and its relevance -- for
+    the products matching ``query``; None when the query has no words
+    """
+    return matching_documents(
+        session, query, ProductSearchDocument.product_id, ProductSearchDocument.body,
+        'product_search_fts'
+    )
+
+
+# -- Keeping documents current ------------------------------------------------
+
+_SESSION_KEY = 'search_documents_stale'
+
+
+def _touched_products(session) -> Set[int]:
+    touched = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Product):
+            touched.add(obj.id)
+        elif isinstance(obj, (ProductSpecification, ProductIdentifier)):
+            touched.add(obj.product_id)
+    for obj in session.dirty:
+        if isinstance(obj, Product):
+            if any(
+                attributes.get_history(obj, column, passive=attributes.PASSIVE_NO_INITIALIZE).has_changes()
+                for column in _PRODUCT_COLUMNS
+            ):
+                touched.add(obj.id)
+        elif isinstance(obj, (ProductSpecification, ProductIdentifier)):
+            touched.add(obj.product_id)
+            history = attributes.get_history(obj, 'product_id', passive=attributes.PASSIVE_NO_INITIALIZE)
+            touched.update(history.deleted)
+    touched.discard(None)
+    return touched
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_touched_products(session, flush_context):
+    touched = _touched_products(session)
+    if touched:
+        session.info.setdefault(_SESSION_KEY, set()).update(touched)
+
+
+@event.listens_for(Session, 'before_commit')
+def _refresh_touched_products(session):
+    if _SESSION_KEY not in session.info:
+        # Flushing here would be the commit's own flush, early; only do it
+        # when the pending changes might touch a product
+        if not any(
+            isinstance(obj, (Product, ProductSpecification, ProductIdentifier))
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        ):
+            return
+    session.flush()
+    stale = session.info.pop(_SESSION_KEY, None)
+    if stale:
+        refresh_search_documents(session, stale)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_touched_products(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(_SESSION_KEY, None)
@@ -28,6 +28,7 @@ from .database import (
     Purchase,
     Tag,
 )
+from . import catalog_search
 from .exceptions import (
     CaptureDecisionRequired,
     DuplicateItemError,
@@ -281,9 +282,10 @@ class CatalogService:
         """Find products by text, category subtree, tag, stock state and spec.
 
         Args:
-            query: Matched against description, specifications, manufacturer,
-                manufacturer part number, notes and every recorded identifier
-                value (FR-032, 009 FR-010).
+            query: Matched by word prefix against description,
+                specifications, manufacturer, manufacturer part number, notes
+                and every recorded identifier value (FR-032, 009 FR-010).
+                Every word must match; results are ordered by relevance.
             category: A category path; matches it *and its sub-categories*, on
                 segment boundaries, so filtering "foo" never pulls in "foo-bar".
             tag: A tag name; ignores category entirely (FR-031).
@@ -299,7 +301,8 @@ class CatalogService:
             limit: Most products to return.
 
         Returns:
-            The matching products, ordered by description.
+            The matching products, most relevant first when there is a query,
+            then by description.
         """
         with self._session() as session:
             statement = session.query(Product).options(
@@ -310,30 +313,11 @@ class CatalogService:
                 selectinload(Product.specifications),
             )
 
-            text = (query or '').strip()
-            if text:
-                pattern = f"%{text}%"
-                matching_ids = session.query(ProductIdentifier.product_id).filter(
-                    ProductIdentifier.value.like(pattern)
-                )
-                statement = statement.filter(or_(
-                    Product.description.like(pattern),
-                    # FR-017: free text still reaches everything it reached when
-                    # specifications were one column of text.
-                    Product.specifications.any(or_(
-                        ProductSpecification.name.like(pattern),
-                        ProductSpecification.value.like(pattern),
-                    )),
-                    Product.manufacturer_part_number.like(pattern),
-                    Product.manufacturer.like(pattern),
-                    # 009 FR-010: the one field the operator writes prose in was
-                    # the one field they could not search. `like`, not `ilike`,
-                    # deliberately -- matching the clauses around it is what
-                    # stops notes and description ever drifting apart, and a
-                    # NULL note is simply never true rather than an error.
-                    Product.notes.like(pattern),
-                    Product.id.in_(matching_ids),
-                ))
+            # FR-032, 009 FR-010: one full-text match over every field that
+            # names a product, rather than a LIKE per field (app/catalog_search.py)
+            matches = catalog_search.matching_products(session, query or '')
+            if matches is not None:
+                statement = statement.join(matches, matches.c.key == Product.id)
 
             category_path = category_utils.canonical(category)
             if category_path is not None:
@@ -356,6 +340,8 @@ class CatalogService:
 
             statement = self._apply_stock_filter(session, statement, stock)
 
+            if matches is not None:
+                statement = statement.order_by(matches.c.score.desc())
             return statement.order_by(Product.description).limit(limit).all()
 
     def set_quantity(self, product_id: int, quantity: Optional[int]) -> Product:
@@ -2587,8 +2573,8 @@ def _dedupe_fold_case(values: Any) -> List[str]:
     Done here rather than with ``SELECT DISTINCT`` because DISTINCT folds under
     the deployed collation and does not under SQLite, so the two backends would
     disagree about whether ``Voltage`` and ``voltage`` are one suggestion or two.
-    ``VocabularyService._rank_and_dedupe`` deduplicates in Python for the same
-    reason. The first spelling in sort order wins.
+    ``AutocompleteIndex`` deduplicates in Python for the same reason, by the
+    same rule: the first spelling in sort order wins.
     """
     kept: Dict[str, str] = {}
     for value in sorted(values, key=lambda v: (v.lower(), v)):
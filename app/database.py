@@ -6,15 +6,16 @@ The schema supports multiple rows per JA ID for maintaining shortening history,
 with proper constraints to ensure data integrity.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, UniqueConstraint, CheckConstraint, LargeBinary, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, UniqueConstraint, CheckConstraint, LargeBinary, ForeignKey, Index, DDL, event
 from sqlalchemy.sql.sqltypes import Numeric
 from sqlalchemy.dialects.mysql import MEDIUMBLOB, MEDIUMTEXT
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, deferred, relationship
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import enum
+import json
 import re
 
 # Import enums and helper classes from models module
@@ -37,8 +38,8 @@ class InventoryItem(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     
     # Item identification
-    ja_id = Column(String(10), nullable=False, index=True)  # Format: JA000001
-    active = Column(Boolean, nullable=False, default=True, index=True)
+    ja_id = Column(String(10), nullable=False)  # Format: JA000001
+    active = Column(Boolean, nullable=False, default=True)
     
     # Physical dimensions
     length = Column(Numeric(10, 4), nullable=True)  # inches, supports fractions
@@ -92,6 +93,18 @@ class InventoryItem(Base):
 
         # Ensure valid JA ID format (MariaDB/MySQL compatible)
         CheckConstraint("ja_id REGEXP '^JA[0-9]{6}$'", name='ck_valid_ja_id_format'),
+
+        # Indexes shaped to the hot queries (see b1a0c0d10018). Active rows by
+        # JA ID: lists, searches and the next-JA-ID maximum, which reads only
+        # this index.
+        Index('ix_inventory_items_active_ja_id', 'active', 'ja_id'),
+        # One JA ID's rows, canonical first: get_canonical_item, update_item
+        # and history, with the ORDER BY read off the index
+        Index('ix_inventory_items_ja_id_canonical', 'ja_id', 'active', 'date_added', 'id'),
+        # Dimension ranges in the advanced search
+        Index('ix_inventory_items_active_material_length', 'active', 'material', 'length'),
+        Index('ix_inventory_items_active_width', 'active', 'width'),
+        Index('ix_inventory_items_active_thickness', 'active', 'thickness'),
     )
     
     # Enum properties for automatic conversion between database strings and enum objects
@@ -690,6 +703,11 @@ class Photo(Base):
 
     Stores photo BLOB data once, referenced by multiple items via item_photo_associations.
     Each photo is stored in three sizes: thumbnail (~150px), medium (~800px), and original.
+
+    When a blob store is configured (``PHOTO_BLOB_DIR``) the three data columns
+    are NULL and the bytes live in the store under ``sha256_hash``; see
+    ``app.blob_store``. A row with its data columns set predates the store, or
+    was written without one, and is read from here as it always was.
     """
     __tablename__ = 'photos'
 
@@ -701,13 +719,18 @@ class Photo(Base):
     content_type = Column(String(100), nullable=False)  # MIME type
     file_size = Column(Integer, nullable=False)  # Original file size in bytes
 
-    # Photo data in three sizes
+    # Photo data in three sizes, NULL when the bytes are in the blob store
     # Use MEDIUMBLOB for MySQL/MariaDB, fall back to LargeBinary for SQLite tests
-    thumbnail_data = Column(LargeBinary, nullable=False)  # ~150px compressed (BLOB, up to 64KB)
-    medium_data = Column(LargeBinary().with_variant(MEDIUMBLOB, 'mysql'), nullable=False)  # ~800px compressed (MEDIUMBLOB on MySQL, up to 16MB)
-    original_data = Column(LargeBinary().with_variant(MEDIUMBLOB, 'mysql'), nullable=False)  # Original up to 20MB (MEDIUMBLOB on MySQL, up to 16MB)
-
-    # Optional hash for deduplication
+    #
+    # Deferred: loading a Photo -- directly, or through an association to list
+    # an item's photos -- fetches metadata only. A column is read when it is
+    # first touched, or up front with undefer_group('photo_data') when a caller
+    # genuinely needs every size.
+    thumbnail_data = deferred(Column(LargeBinary, nullable=True), group='photo_data')  # ~150px compressed (BLOB, up to 64KB)
+    medium_data = deferred(Column(LargeBinary().with_variant(MEDIUMBLOB, 'mysql'), nullable=True), group='photo_data')  # ~800px compressed (MEDIUMBLOB on MySQL, up to 16MB)
+    original_data = deferred(Column(LargeBinary().with_variant(MEDIUMBLOB, 'mysql'), nullable=True), group='photo_data')  # Original up to 20MB (MEDIUMBLOB on MySQL, up to 16MB)
+
+    # Hash of the original data: the deduplication key, and the blob store key
     sha256_hash = Column(String(64), nullable=True, index=True)  # SHA256 hash of original data
 
     # Timestamps
@@ -775,8 +798,9 @@ class ItemPhotoAssociation(Base):
     # Timestamp
     created_at = Column(DateTime, nullable=False, default=func.now())
 
-    # Relationship to Photo
-    photo = relationship('Photo', backref='associations')
+    # Relationship to Photo. Joined, so listing an item's photos is one query
+    # rather than one per photo; cheap now that the BLOB columns are deferred.
+    photo = relationship('Photo', backref='associations', lazy='joined')
 
     # Constraints
     __table_args__ = (
@@ -808,6 +832,176 @@ class ItemPhotoAssociation(Base):
             result['photo'] = self.photo.to_dict()
         return result
 
+class PhotoJob(Base):
+    """
+    A queued rendering of a photo's thumbnail and medium sizes.
+
+    Uploads store the original and add a row here instead of running Pillow or
+    PyMuPDF in the request; a worker thread (app/photo_jobs.py) renders the
+    sizes afterwards. The table is the queue, so queued work survives a restart,
+    and a job is claimed by a conditional UPDATE of its status, so several
+    gunicorn workers can share it without running a job twice.
+    """
+    __tablename__ = 'photo_jobs'
+
+    STATUSES = ('pending', 'running', 'done', 'failed')
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    photo_id = Column(
+        Integer,
+        ForeignKey('photos.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)  # Last failure, for the operator
+
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    photo = relationship('Photo')
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'failed')",
+            name='ck_photo_job_valid_status'
+        ),
+        # The worker's "next pending job" lookup
+        Index('ix_photo_jobs_status_id', 'status', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<PhotoJob(id={self.id}, photo_id={self.photo_id}, status='{self.status}', attempts={self.attempts})>"
+
+
+class LabelPrintJob(Base):
+    """
+    A queued print of one or more labels.
+
+    Rendering a label and handing it to CUPS takes long enough that printing
+    in the request held a gunicorn worker per label, and a bulk print from
+    the list held one for the whole run. Print requests add a row here and
+    return; a worker thread (app/label_jobs.py) prints it and records its
+    progress, which the client polls. As with PhotoJob the table is the queue
+    and a job is claimed by a conditional UPDATE of its status.
+
+    ``items`` is a JSON list: the JA IDs of an inventory job, or a product
+    job's one ``{description, code, provenance}``. ``failures`` lists the
+    items that did not print, with why. ``updated_at`` is the running job's
+    heartbeat, set as each item prints.
+    """
+    __tablename__ = 'label_print_jobs'
+
+    STATUSES = ('pending', 'running', 'done', 'failed')
+    KINDS = ('inventory', 'product')
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    kind = Column(String(20), nullable=False)
+    label_type = Column(String(50), nullable=False)
+    label_count = Column(Integer, nullable=False, default=1)  # Copies of each item
+    items = Column(Text, nullable=False)
+
+    status = Column(String(20), nullable=False, default='pending')
+    total = Column(Integer, nullable=False, default=0)
+    printed = Column(Integer, nullable=False, default=0)
+    failures = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'failed')",
+            name='ck_label_print_job_valid_status'
+        ),
+        CheckConstraint(
+            "kind IN ('inventory', 'product')",
+            name='ck_label_print_job_valid_kind'
+        ),
+        # The worker's "next pending job" lookup
+        Index('ix_label_print_jobs_status_id', 'status', 'id'),
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The job's state as the status API reports it"""
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'label_type': self.label_type,
+            'label_count': self.label_count,
+            'status': self.status,
+            'total': self.total,
+            'printed': self.printed,
+            'failures': json.loads(self.failures) if self.failures else [],
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<LabelPrintJob(id={self.id}, kind='{self.kind}', status='{self.status}', printed={self.printed}/{self.total})>"
+
+
+class SheetSyncManifest(Base):
+    """
+    What the last Google Sheets upload left in one sheet, row by row.
+
+    ``manifest`` is a JSON list of ``[key, hash]`` pairs in sheet order -- the
+    row's key (see GoogleSheetsExportService.row_keys) and a digest of its
+    cells -- so the next sync can send only the rows that changed, arrived or
+    went away instead of rewriting the sheet. Losing it costs nothing but one
+    full rewrite.
+    """
+    __tablename__ = 'sheet_sync_manifests'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    spreadsheet_id = Column(String(100), nullable=False)
+    sheet_name = Column(String(100), nullable=False)
+
+    # Digest of the header row; a different one means a different layout
+    headers_hash = Column(String(64), nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    # A few tens of bytes per row: MEDIUMTEXT on MySQL, as for specifications
+    manifest = Column(Text().with_variant(MEDIUMTEXT, 'mysql'), nullable=False)
+
+    synced_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('spreadsheet_id', 'sheet_name', name='uq_sheet_sync_manifest_sheet'),
+    )
+
+    def __repr__(self):
+        return f"<SheetSyncManifest(sheet_name='{self.sheet_name}', row_count={self.row_count})>"
+
+
+class CacheVersion(Base):
+    """
+    A counter per in-process cache, bumped in the same transaction as any
+    write that makes the cache stale.
+
+    Each gunicorn worker keeps its own copy of slowly-changing data (see
+    app/taxonomy_cache.py) and compares the version it loaded against this
+    row, so an edit made through one worker reaches the others without any
+    message passing between them.
+    """
+    __tablename__ = 'cache_versions'
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
+
+
 # ===========================================================================
 # Product catalog
 #
@@ -1357,3 +1551,156 @@ class ProductAttachment(Base):
         if self.photo:
             result['photo'] = self.photo.to_dict()
         return result
+
+
+class ProductSearchDocument(Base):
+    """
+    A product's searchable text, flattened into one full-text indexed column.
+
+    Catalog search used to OR leading-wildcard LIKEs across products, their
+    specifications and their identifiers, none of which an index can serve.
+    ``body`` holds the same text -- description, manufacturer, part number,
+    identifier values, specification names and values, notes -- lowercased and
+    reduced to space-separated words (see app/search_index.py), so the
+    MariaDB FULLTEXT index and SQLite's FTS5 tokenizer split it identically.
+
+    Derived, never edited: rewritten whenever any of its sources is, and
+    rebuilt in full by ``catalog_search.rebuild_search_documents``.
+    """
+    __tablename__ = 'product_search_documents'
+
+    product_id = Column(
+        Integer,
+        ForeignKey('products.id', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    # Specification values are MEDIUMTEXT, so their concatenation is too
+    body = Column(Text().with_variant(MEDIUMTEXT, 'mysql'), nullable=False)
+
+    __table_args__ = (
+        # InnoDB FULLTEXT; SQLite gets the FTS5 table below instead
+        Index('ft_product_search_documents_body', 'body', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    def __repr__(self):
+        return f"<ProductSearchDocument(product_id={self.product_id})>"
+
+
+def _shadow_with_fts5(table, key_column: str, fts_table: str) -> None:
+    """
+    Give a search document table an FTS5 twin under SQLite
+
+    SQLite has no FULLTEXT index. The unit suite's stand-in is an FTS5 table
+    over the same rows, kept in step by triggers -- the external-content pattern
+    from the FTS5 documentation -- so services write only the document table on
+    either backend.
+    """
+    name = table.name
+    for statement in (
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+        f"body, content='{name}', content_rowid='{key_column}')",
+        f"CREATE TRIGGER {fts_table}_insert AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, body) VALUES (new.{key_column}, new.body); END",
+        f"CREATE TRIGGER {fts_table}_delete AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, body) "
+        f"VALUES ('delete', old.{key_column}, old.body); END",
+        f"CREATE TRIGGER {fts_table}_update AFTER UPDATE ON {name} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, body) "
+        f"VALUES ('delete', old.{key_column}, old.body); "
+        f"INSERT INTO {fts_table}(rowid, body) VALUES (new.{key_column}, new.body); END",
+    ):
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(
+        table, 'before_drop',
+        DDL(f"DROP TABLE IF EXISTS {fts_table}").execute_if(dialect='sqlite')
+    )
+
+
+_shadow_with_fts5(ProductSearchDocument.__table__, 'product_id', 'product_search_fts')
+
+
+class InventorySearchDocument(Base):
+    """
+    An inventory row's searchable text, flattened into one full-text indexed column.
+
+    The metal stock counterpart of ProductSearchDocument: JA ID, material, type,
+    shape, location, sub-location, thread size, vendor, vendor part, purchase
+    location and notes, as words. One per ``inventory_items`` row, history rows
+    included, so a search over inactive items is served by the same index; the
+    active filter is applied by the join, not by the index.
+    """
+    __tablename__ = 'inventory_search_documents'
+
+    item_id = Column(
+        Integer,
+        ForeignKey('inventory_items.id', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    body = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index('ft_inventory_search_documents_body', 'body', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    def __repr__(self):
+        return f"<InventorySearchDocument(item_id={self.item_id})>"
+
+
+_shadow_with_fts5(InventorySearchDocument.__table__, 'item_id', 'inventory_search_fts')
+
+
+class InventoryCurrent(Base):
+    """
+    The current row of each JA ID: one per JA ID that has an active row.
+
+    ``inventory_items`` keeps every row an item has had -- each shortening
+    leaves the old length behind, inactive -- so it grows with the item's
+    history while the stock on the shelf does not. This table projects the
+    current state out of it, keyed by JA ID and pointing at the active row, so
+    the reads that only want current stock walk a table the size of the stock
+    and reach ``inventory_items`` by primary key. ``inventory_items`` remains
+    the record and the only table written; ``app.inventory_current`` keeps
+    this one following it.
+
+    Clustered on the JA ID under both backends (InnoDB always clusters on the
+    primary key; SQLite does for a table without rowids), so the list order is
+    the table order.
+    """
+    __tablename__ = 'inventory_current'
+
+    ja_id = Column(String(10), primary_key=True)
+    item_id = Column(
+        Integer,
+        ForeignKey('inventory_items.id', ondelete='CASCADE'),
+        nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint('item_id', name='uq_inventory_current_item_id'),
+        {'sqlite_with_rowid': False},
+    )
+
+    def __repr__(self):
+        return f"<InventoryCurrent(ja_id='{self.ja_id}', item_id={self.item_id})>"
+
+
+class IdSequence(Base):
+    """
+    The last number handed out by a named sequence; ``ja_id`` is the only one.
+
+    New JA IDs used to be the largest existing one plus one, read with an
+    aggregate at the moment of asking, so two clients asking together were told
+    the same number and the slower of them failed on save. A number is now
+    allocated by incrementing this row, which locks it until the allocating
+    transaction ends, so each number is handed out once (see
+    app/ja_id_sequence.py).
+    """
+    __tablename__ = 'id_sequences'
+
+    name = Column(String(50), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<IdSequence(name='{self.name}', last_value={self.last_value})>"
@@ -180,4 +180,23 @@ class DataIntegrityError(WorkshopInventoryError):
             "check_type": check_type,
             "affected_items": affected_items,
             "type": "data_integrity_error"
-        }
\ No newline at end of file
+        }
+
+
+class PhotoProcessingPending(WorkshopInventoryError):
+    """Raised when a photo size has been queued for rendering but is not ready
+
+    Uploads store the original at once and render the thumbnail and medium
+    sizes in the background, so a browser can ask for a size that does not
+    exist yet. Not a failure: the photo route answers with a placeholder.
+    """
+
+    def __init__(self, message: str, photo_id: int = None, size: str = None):
+        super().__init__(message, code="PHOTO_PROCESSING_PENDING")
+        self.photo_id = photo_id
+        self.size = size
+        self.details = {
+            "photo_id": photo_id,
+            "size": size,
+            "type": "photo_processing_pending"
+        }
@@ -182,6 +182,163 @@ class MaterialsExportSchema:
         return MaterialsExportSchema.HEADERS.copy()
 
 
+class ProductExportSchema:
+    """Schema definition for catalog products export"""
+    
+    HEADERS = [
+        "Product ID",          # 1
+        "Description",         # 2
+        "Manufacturer",        # 3
+        "MPN",                 # 4
+        "Category",            # 5
+        "Location",            # 6
+        "Sub-Location",        # 7
+        "Quantity",            # 8
+        "Quantity Updated",    # 9
+        "Reorder Threshold",   # 10
+        "Stock Status",        # 11
+        "Stock Status Updated", # 12
+        "Notes",               # 13
+        "Date Added",          # 14
+        "Last Modified"        # 15
+    ]
+    
+    @staticmethod
+    def format_row(product: Any) -> List[str]:
+        """
+        Convert a database Product to an export row
+        
+        Only the product's own columns: identifiers, purchases and tags are
+        exports of their own, keyed back by Product ID.
+        
+        Args:
+            product: Product database object or dict-like object
+            
+        Returns:
+            List of formatted strings for export
+        """
+        formatter = ExportFormatter()
+        
+        return [
+            formatter.format_integer(product.id),                           # 1. Product ID
+            formatter.format_string(product.description),                  # 2. Description
+            formatter.format_string(product.manufacturer),                 # 3. Manufacturer
+            formatter.format_string(product.manufacturer_part_number),     # 4. MPN
+            formatter.format_string(product.category_path),                # 5. Category
+            formatter.format_string(product.location),                     # 6. Location
+            formatter.format_string(product.sub_location),                 # 7. Sub-Location
+            formatter.format_integer(product.quantity),                    # 8. Quantity
+            formatter.format_datetime(product.quantity_updated_at),        # 9. Quantity Updated
+            formatter.format_integer(product.reorder_threshold),           # 10. Reorder Threshold
+            formatter.format_string(product.stock_status),                 # 11. Stock Status
+            formatter.format_datetime(product.stock_status_updated_at),    # 12. Stock Status Updated
+            formatter.format_string(product.notes),                        # 13. Notes
+            formatter.format_datetime(product.date_added),                 # 14. Date Added
+            formatter.format_datetime(product.last_modified)               # 15. Last Modified
+        ]
+    
+    @staticmethod
+    def get_headers() -> List[str]:
+        """Get the column headers for the export"""
+        return ProductExportSchema.HEADERS.copy()
+
+
+class PurchaseExportSchema:
+    """Schema definition for catalog purchases export"""
+    
+    HEADERS = [
+        "Purchase ID",      # 1
+        "Product ID",       # 2
+        "Vendor",           # 3
+        "Vendor Item ID",   # 4
+        "Listing Title",    # 5
+        "Listing URL",      # 6
+        "Order Date",       # 7
+        "Received Date",    # 8
+        "Quantity",         # 9
+        "Unit Price",       # 10
+        "Order Reference",  # 11
+        "Notes",            # 12
+        "Date Added",       # 13
+        "Last Modified"     # 14
+    ]
+    
+    @staticmethod
+    def format_row(purchase: Any) -> List[str]:
+        """
+        Convert a database Purchase to an export row
+        
+        Args:
+            purchase: Purchase database object or dict-like object
+            
+        Returns:
+            List of formatted strings for export
+        """
+        formatter = ExportFormatter()
+        
+        return [
+            formatter.format_integer(purchase.id),                # 1. Purchase ID
+            formatter.format_integer(purchase.product_id),        # 2. Product ID
+            formatter.format_string(purchase.vendor),             # 3. Vendor
+            formatter.format_string(purchase.vendor_item_id),     # 4. Vendor Item ID
+            formatter.format_string(purchase.listing_title),      # 5. Listing Title
+            formatter.format_string(purchase.listing_url),        # 6. Listing URL
+            formatter.format_date(purchase.order_date),           # 7. Order Date
+            formatter.format_date(purchase.received_date),        # 8. Received Date
+            formatter.format_integer(purchase.quantity),          # 9. Quantity
+            formatter.format_decimal(purchase.unit_price, 2),     # 10. Unit Price
+            formatter.format_string(purchase.order_reference),    # 11. Order Reference
+            formatter.format_string(purchase.notes),              # 12. Notes
+            formatter.format_datetime(purchase.date_added),       # 13. Date Added
+            formatter.format_datetime(purchase.last_modified)     # 14. Last Modified
+        ]
+    
+    @staticmethod
+    def get_headers() -> List[str]:
+        """Get the column headers for the export"""
+        return PurchaseExportSchema.HEADERS.copy()
+
+
+class ProductIdentifierExportSchema:
+    """Schema definition for catalog product identifiers export"""
+    
+    HEADERS = [
+        "Product ID",             # 1
+        "Type",                   # 2
+        "Value",                  # 3
+        "Vendor",                 # 4
+        "Validation Overridden",  # 5
+        "Date Added"              # 6
+    ]
+    
+    @staticmethod
+    def format_row(identifier: Any) -> List[str]:
+        """
+        Convert a database ProductIdentifier to an export row
+        
+        Args:
+            identifier: ProductIdentifier database object or dict-like object
+            
+        Returns:
+            List of formatted strings for export
+        """
+        formatter = ExportFormatter()
+        
+        return [
+            formatter.format_integer(identifier.product_id),              # 1. Product ID
+            formatter.format_string(identifier.id_type),                  # 2. Type
+            formatter.format_string(identifier.value),                    # 3. Value
+            formatter.format_string(identifier.vendor),                   # 4. Vendor
+            formatter.format_boolean(identifier.validation_overridden),   # 5. Validation Overridden
+            formatter.format_datetime(identifier.date_added)              # 6. Date Added
+        ]
+    
+    @staticmethod
+    def get_headers() -> List[str]:
+        """Get the column headers for the export"""
+        return ProductIdentifierExportSchema.HEADERS.copy()
+
+
 class ExportOptions:
     """Configuration options for exports"""
     
@@ -4,18 +4,31 @@ Export Service Classes
 Provides services for querying MariaDB data and formatting it for Google Sheets export.
 Handles both inventory items and materials taxonomy with proper data formatting,
 batch processing, and error handling.
+
+Each export is one query in one session, read through ``yield_per`` -- a
+server-side cursor on MariaDB -- and formatted a row at a time as the consumer
+asks for it. One statement is one consistent snapshot, so rows inserted while
+an export runs can neither be skipped nor repeated, the database does the work
+once rather than re-scanning past an OFFSET for every batch, and memory holds
+one batch of rows rather than the whole table.
 """
 
 from typing import List, Dict, Any, Optional, Tuple, Iterator
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, Session, Query
 from sqlalchemy import create_engine, desc, asc
+import csv
+import io
+import json
 import logging
 from datetime import datetime
 
-from .database import InventoryItem, MaterialTaxonomy
+from .database import InventoryItem, MaterialTaxonomy, Product, Purchase, ProductIdentifier
 from .export_schemas import (
     InventoryExportSchema, 
     MaterialsExportSchema, 
+    ProductExportSchema,
+    PurchaseExportSchema,
+    ProductIdentifierExportSchema,
     ExportOptions, 
     ExportMetadata,
     ExportFormatter
@@ -25,24 +38,39 @@ from config import Config
 logger = logging.getLogger(__name__)
 
 
+def _counted(rows: Iterator[List[str]], metadata: ExportMetadata) -> Iterator[List[str]]:
+    """Pass rows through, counting them into metadata.records_exported"""
+    for row in rows:
+        metadata.records_exported += 1
+        yield row
+
+
 class BaseExportService:
     """Base class for export services with common functionality"""
     
-    def __init__(self, database_uri: Optional[str] = None):
+    def __init__(self, database_uri: Optional[str] = None, storage_backend=None):
         """
         Initialize export service with database connection
         
         Args:
             database_uri: Database connection string, uses Config if not provided
+            storage_backend: Storage backend whose engine to share; routes pass
+                the process's own, so an export does not build a second pool
         """
-        self.database_uri = database_uri or Config.SQLALCHEMY_DATABASE_URI
-        if not self.database_uri:
-            raise ValueError("Database URI is required. Set SQLALCHEMY_DATABASE_URI environment variable.")
-        
-        self.engine = create_engine(
-            self.database_uri,
-            **Config.SQLALCHEMY_ENGINE_OPTIONS
-        )
+        if storage_backend is not None and hasattr(storage_backend, 'engine'):
+            if not storage_backend._connected:
+                storage_backend.connect()
+            self.database_uri = None
+            self.engine = storage_backend.engine
+        else:
+            self.database_uri = database_uri or Config.SQLALCHEMY_DATABASE_URI
+            if not self.database_uri:
+                raise ValueError("Database URI is required. Set SQLALCHEMY_DATABASE_URI environment variable.")
+
+            self.engine = create_engine(
+                self.database_uri,
+                **Config.SQLALCHEMY_ENGINE_OPTIONS
+            )
         self.SessionLocal = sessionmaker(bind=self.engine)
     
     def get_session(self) -> Session:
@@ -56,12 +84,51 @@ class BaseExportService:
         except Exception as e:
             logger.warning(f"Error closing session: {e}")
 
+    def _stream_rows(self, build_query, format_row, describe, options: ExportOptions) -> Iterator[List[str]]:
+        """
+        Run one export query and yield each record formatted as a row
+
+        Args:
+            build_query: Builds the ordered query from a session
+            format_row: Formats one record as a row
+            describe: Names a record in a log line
+            options: Export configuration options; batch_size is how many
+                records are fetched from the cursor at a time
+
+        Yields:
+            Formatted rows, in query order. A record that fails to format is
+            logged and left out rather than failing the export.
+        """
+        session = self.get_session()
+        try:
+            query = build_query(session).yield_per(options.batch_size)
+            for record in query:
+                try:
+                    yield format_row(record)
+                except Exception as e:
+                    logger.error(f"Error formatting {describe(record)}: {e}")
+                    continue
+        finally:
+            self.close_session(session)
+
+    @staticmethod
+    def _batched(rows: Iterator[List[str]], batch_size: int) -> Iterator[List[List[str]]]:
+        """Group a stream of rows into lists of at most batch_size"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
 
 class InventoryExportService(BaseExportService):
     """Service for exporting inventory items data to Google Sheets format"""
     
-    def __init__(self, database_uri: Optional[str] = None):
-        super().__init__(database_uri)
+    def __init__(self, database_uri: Optional[str] = None, storage_backend=None):
+        super().__init__(database_uri, storage_backend)
         self.schema = InventoryExportSchema()
         self.formatter = ExportFormatter()
     
@@ -98,71 +165,42 @@ class InventoryExportService(BaseExportService):
         finally:
             self.close_session(session)
     
-    def export_items_batch(
-        self, 
-        options: ExportOptions, 
-        offset: int = 0, 
-        limit: Optional[int] = None
-    ) -> List[List[str]]:
+    def _items_query(self, session: Session, options: ExportOptions) -> Query:
+        """The inventory export query, filtered and ordered per the options"""
+        query = session.query(InventoryItem)
+        
+        # Apply filters
+        if not options.inventory_include_inactive:
+            query = query.filter(InventoryItem.active == True)
+        
+        # Apply sorting
+        sort_order = options.inventory_sort_order
+        if "ja_id" in sort_order:
+            query = query.order_by(asc(InventoryItem.ja_id))
+        if "active DESC" in sort_order:
+            query = query.order_by(desc(InventoryItem.active))
+        if "date_added" in sort_order:
+            query = query.order_by(asc(InventoryItem.date_added))
+        
+        # The primary key last, so ties come out in the same order every time
+        return query.order_by(asc(InventoryItem.id))
+    
+    def iter_item_rows(self, options: ExportOptions) -> Iterator[List[str]]:
         """
-        Export a batch of inventory items as formatted rows
+        Stream every inventory item as a formatted row, from one snapshot
         
         Args:
             options: Export configuration options
-            offset: Number of records to skip
-            limit: Maximum number of records to return (uses options.batch_size if None)
             
-        Returns:
-            List of formatted rows ready for Google Sheets
+        Yields:
+            Formatted rows ready for Google Sheets
         """
-        if limit is None:
-            limit = options.batch_size
-        
-        session = self.get_session()
-        try:
-            # Build query
-            query = session.query(InventoryItem)
-            
-            # Apply filters
-            if not options.inventory_include_inactive:
-                query = query.filter(InventoryItem.active == True)
-            
-            # Apply sorting
-            sort_order = options.inventory_sort_order
-            if "ja_id" in sort_order:
-                query = query.order_by(asc(InventoryItem.ja_id))
-            if "active DESC" in sort_order:
-                query = query.order_by(desc(InventoryItem.active))
-            if "date_added" in sort_order:
-                query = query.order_by(asc(InventoryItem.date_added))
-            
-            # Apply pagination
-            query = query.offset(offset).limit(limit)
-            
-            # Execute query
-            items = query.all()
-            
-            if options.enable_progress_logging:
-                logger.info(f"Retrieved {len(items)} inventory items (offset={offset}, limit={limit})")
-            
-            # Format items as rows
-            formatted_rows = []
-            for item in items:
-                try:
-                    row = self.schema.format_row(item)
-                    formatted_rows.append(row)
-                except Exception as e:
-                    logger.error(f"Error formatting item {item.ja_id}: {e}")
-                    # Continue with other items, don't fail entire batch
-                    continue
-            
-            return formatted_rows
-            
-        except Exception as e:
-            logger.error(f"Error exporting inventory items batch: {e}")
-            raise
-        finally:
-            self.close_session(session)
+        return self._stream_rows(
+            lambda session: self._items_query(session, options),
+            self.schema.format_row,
+            lambda item: f"item {item.ja_id}",
+            options
+        )
     
     def export_all_items(self, options: ExportOptions) -> Iterator[List[List[str]]]:
         """
@@ -174,47 +212,31 @@ class InventoryExportService(BaseExportService):
         Yields:
             Batches of formatted rows ready for Google Sheets
         """
-        total_count, active_count = self.count_items(options)
-        
         if options.enable_progress_logging:
-            logger.info(f"Starting inventory export: {total_count} total items, {active_count} active items")
+            logger.info("Starting inventory export")
         
-        offset = 0
         exported_count = 0
-        
-        while offset < total_count:
-            try:
-                batch = self.export_items_batch(options, offset, options.batch_size)
-                
-                if not batch:
-                    break
-                
-                exported_count += len(batch)
-                offset += options.batch_size
-                
-                if options.enable_progress_logging:
-                    logger.info(f"Exported batch: {len(batch)} items (total: {exported_count}/{total_count})")
-                
-                yield batch
-                
-            except Exception as e:
-                logger.error(f"Error exporting batch at offset {offset}: {e}")
-                # Skip this batch and continue
-                offset += options.batch_size
-                continue
+        for batch in self._batched(self.iter_item_rows(options), options.batch_size):
+            exported_count += len(batch)
+            if options.enable_progress_logging:
+                logger.info(f"Exported batch: {len(batch)} items (total: {exported_count})")
+            yield batch
         
         if options.enable_progress_logging:
             logger.info(f"Inventory export complete: {exported_count} items exported")
     
-    def export_complete_dataset(self, options: ExportOptions) -> Tuple[List[str], List[List[str]], ExportMetadata]:
+    def stream_dataset(self, options: ExportOptions) -> Tuple[List[str], Iterator[List[str]], ExportMetadata]:
         """
-        Export complete inventory dataset with headers and metadata
+        Export the inventory dataset as headers, a stream of rows, and metadata
+        
+        Nothing is read until the rows are iterated, and metadata's
+        records_exported counts them as they go.
         
         Args:
             options: Export configuration options
             
         Returns:
-            Tuple of (headers, all_rows, metadata)
+            Tuple of (headers, row iterator, metadata)
         """
         metadata = ExportMetadata("inventory")
         metadata.options_used = {
@@ -222,15 +244,21 @@ class InventoryExportService(BaseExportService):
             'sort_order': options.inventory_sort_order,
             'batch_size': options.batch_size
         }
+        return self.get_export_headers(), _counted(self.iter_item_rows(options), metadata), metadata
+    
+    def export_complete_dataset(self, options: ExportOptions) -> Tuple[List[str], List[List[str]], ExportMetadata]:
+        """
+        Export complete inventory dataset with headers and metadata
         
-        try:
-            headers = self.get_export_headers()
-            all_rows = []
+        Args:
+            options: Export configuration options
             
-            # Export all data in batches
-            for batch in self.export_all_items(options):
-                all_rows.extend(batch)
-                metadata.records_exported += len(batch)
+        Returns:
+            Tuple of (headers, all_rows, metadata)
+        """
+        headers, rows, metadata = self.stream_dataset(options)
+        try:
+            all_rows = list(rows)
             
             if options.enable_progress_logging:
                 logger.info(f"Inventory export complete: {len(all_rows)} total rows")
@@ -246,8 +274,8 @@ class InventoryExportService(BaseExportService):
 class MaterialsExportService(BaseExportService):
     """Service for exporting materials taxonomy data to Google Sheets format"""
     
-    def __init__(self, database_uri: Optional[str] = None):
-        super().__init__(database_uri)
+    def __init__(self, database_uri: Optional[str] = None, storage_backend=None):
+        super().__init__(database_uri, storage_backend)
         self.schema = MaterialsExportSchema()
         self.formatter = ExportFormatter()
     
@@ -284,69 +312,38 @@ class MaterialsExportService(BaseExportService):
         finally:
             self.close_session(session)
     
-    def export_materials_batch(
-        self, 
-        options: ExportOptions, 
-        offset: int = 0, 
-        limit: Optional[int] = None
-    ) -> List[List[str]]:
+    def _materials_query(self, session: Session, options: ExportOptions) -> Query:
+        """The materials export query, filtered and ordered per the options"""
+        query = session.query(MaterialTaxonomy)
+        
+        # Apply filters
+        if options.materials_active_only:
+            query = query.filter(MaterialTaxonomy.active == True)
+        
+        # Apply sorting - level, sort_order, name, then the primary key for ties
+        return query.order_by(
+            asc(MaterialTaxonomy.level),
+            asc(MaterialTaxonomy.sort_order),
+            asc(MaterialTaxonomy.name),
+            asc(MaterialTaxonomy.id)
+        )
+    
+    def iter_material_rows(self, options: ExportOptions) -> Iterator[List[str]]:
         """
-        Export a batch of materials as formatted rows
+        Stream every material as a formatted row, from one snapshot
         
         Args:
             options: Export configuration options
-            offset: Number of records to skip
-            limit: Maximum number of records to return (uses options.batch_size if None)
             
-        Returns:
-            List of formatted rows ready for Google Sheets
+        Yields:
+            Formatted rows ready for Google Sheets
         """
-        if limit is None:
-            limit = options.batch_size
-        
-        session = self.get_session()
-        try:
-            # Build query
-            query = session.query(MaterialTaxonomy)
-            
-            # Apply filters
-            if options.materials_active_only:
-                query = query.filter(MaterialTaxonomy.active == True)
-            
-            # Apply sorting - level, sort_order, name
-            query = query.order_by(
-                asc(MaterialTaxonomy.level),
-                asc(MaterialTaxonomy.sort_order),
-                asc(MaterialTaxonomy.name)
-            )
-            
-            # Apply pagination
-            query = query.offset(offset).limit(limit)
-            
-            # Execute query
-            materials = query.all()
-            
-            if options.enable_progress_logging:
-                logger.info(f"Retrieved {len(materials)} materials (offset={offset}, limit={limit})")
-            
-            # Format materials as rows
-            formatted_rows = []
-            for material in materials:
-                try:
-                    row = self.schema.format_row(material)
-                    formatted_rows.append(row)
-                except Exception as e:
-                    logger.error(f"Error formatting material {material.name}: {e}")
-                    # Continue with other materials, don't fail entire batch
-                    continue
-            
-            return formatted_rows
-            
-        except Exception as e:
-            logger.error(f"Error exporting materials batch: {e}")
-            raise
-        finally:
-            self.close_session(session)
+        return self._stream_rows(
+            lambda session: self._materials_query(session, options),
+            self.schema.format_row,
+            lambda material: f"material {material.name}",
+            options
+        )
     
     def export_all_materials(self, options: ExportOptions) -> Iterator[List[List[str]]]:
         """
@@ -358,47 +355,31 @@ class MaterialsExportService(BaseExportService):
         Yields:
             Batches of formatted rows ready for Google Sheets
         """
-        total_count, active_count = self.count_materials(options)
-        
         if options.enable_progress_logging:
-            logger.info(f"Starting materials export: {total_count} total materials, {active_count} active materials")
+            logger.info("Starting materials export")
         
-        offset = 0
         exported_count = 0
-        
-        while offset < total_count:
-            try:
-                batch = self.export_materials_batch(options, offset, options.batch_size)
-                
-                if not batch:
-                    break
-                
-                exported_count += len(batch)
-                offset += options.batch_size
-                
-                if options.enable_progress_logging:
-                    logger.info(f"Exported batch: {len(batch)} materials (total: {exported_count}/{total_count})")
-                
-                yield batch
-                
-            except Exception as e:
-                logger.error(f"Error exporting batch at offset {offset}: {e}")
-                # Skip this batch and continue
-                offset += options.batch_size
-                continue
+        for batch in self._batched(self.iter_material_rows(options), options.batch_size):
+            exported_count += len(batch)
+            if options.enable_progress_logging:
+                logger.info(f"Exported batch: {len(batch)} materials (total: {exported_count})")
+            yield batch
         
         if options.enable_progress_logging:
             logger.info(f"Materials export complete: {exported_count} materials exported")
     
-    def export_complete_dataset(self, options: ExportOptions) -> Tuple[List[str], List[List[str]], ExportMetadata]:
+    def stream_dataset(self, options: ExportOptions) -> Tuple[List[str], Iterator[List[str]], ExportMetadata]:
         """
-        Export complete materials dataset with headers and metadata
+        Export the materials dataset as headers, a stream of rows, and metadata
+        
+        Nothing is read until the rows are iterated, and metadata's
+        records_exported counts them as they go.
         
         Args:
             options: Export configuration options
             
         Returns:
-            Tuple of (headers, all_rows, metadata)
+            Tuple of (headers, row iterator, metadata)
         """
         metadata = ExportMetadata("materials")
         metadata.options_used = {
@@ -406,15 +387,21 @@ class MaterialsExportService(BaseExportService):
             'sort_order': options.materials_sort_order,
             'batch_size': options.batch_size
         }
+        return self.get_export_headers(), _counted(self.iter_material_rows(options), metadata), metadata
+    
+    def export_complete_dataset(self, options: ExportOptions) -> Tuple[List[str], List[List[str]], ExportMetadata]:
+        """
+        Export complete materials dataset with headers and metadata
         
-        try:
-            headers = self.get_export_headers()
-            all_rows = []
+        Args:
+            options: Export configuration options
             
-            # Export all data in batches
-            for batch in self.export_all_materials(options):
-                all_rows.extend(batch)
-                metadata.records_exported += len(batch)
+        Returns:
+            Tuple of (headers, all_rows, metadata)
+        """
+        headers, rows, metadata = self.stream_dataset(options)
+        try:
+            all_rows = list(rows)
             
             if options.enable_progress_logging:
                 logger.info(f"Materials export complete: {len(all_rows)} total rows")
@@ -427,12 +414,84 @@ class MaterialsExportService(BaseExportService):
             raise
 
 
+class CatalogExportService(BaseExportService):
+    """Service for exporting the product catalog: products, purchases and identifiers"""
+    
+    def __init__(self, database_uri: Optional[str] = None, storage_backend=None):
+        super().__init__(database_uri, storage_backend)
+    
+    def _stream(self, export_type: str, headers: List[str], build_query, format_row,
+                options: ExportOptions) -> Tuple[List[str], Iterator[List[str]], ExportMetadata]:
+        metadata = ExportMetadata(export_type)
+        metadata.options_used = {'batch_size': options.batch_size}
+        rows = self._stream_rows(
+            build_query, format_row, lambda record: f"{export_type} row {record.id}", options
+        )
+        return headers, _counted(rows, metadata), metadata
+    
+    def stream_products(self, options: ExportOptions) -> Tuple[List[str], Iterator[List[str]], ExportMetadata]:
+        """
+        Export every product, in id order
+        
+        Args:
+            options: Export configuration options
+            
+        Returns:
+            Tuple of (headers, row iterator, metadata)
+        """
+        return self._stream(
+            "products",
+            ProductExportSchema.get_headers(),
+            lambda session: session.query(Product).order_by(asc(Product.id)),
+            ProductExportSchema.format_row,
+            options
+        )
+    
+    def stream_purchases(self, options: ExportOptions) -> Tuple[List[str], Iterator[List[str]], ExportMetadata]:
+        """
+        Export every purchase, in id order
+        
+        Args:
+            options: Export configuration options
+            
+        Returns:
+            Tuple of (headers, row iterator, metadata)
+        """
+        return self._stream(
+            "purchases",
+            PurchaseExportSchema.get_headers(),
+            lambda session: session.query(Purchase).order_by(asc(Purchase.id)),
+            PurchaseExportSchema.format_row,
+            options
+        )
+    
+    def stream_identifiers(self, options: ExportOptions) -> Tuple[List[str], Iterator[List[str]], ExportMetadata]:
+        """
+        Export every product identifier, grouped by product
+        
+        Args:
+            options: Export configuration options
+            
+        Returns:
+            Tuple of (headers, row iterator, metadata)
+        """
+        return self._stream(
+            "identifiers",
+            ProductIdentifierExportSchema.get_headers(),
+            lambda session: session.query(ProductIdentifier).order_by(
+                asc(ProductIdentifier.product_id), asc(ProductIdentifier.id)
+            ),
+            ProductIdentifierExportSchema.format_row,
+            options
+        )
+
+
 class CombinedExportService:
     """Service for managing combined exports of both inventory and materials data"""
     
-    def __init__(self, database_uri: Optional[str] = None):
-        self.inventory_service = InventoryExportService(database_uri)
-        self.materials_service = MaterialsExportService(database_uri)
+    def __init__(self, database_uri: Optional[str] = None, storage_backend=None):
+        self.inventory_service = InventoryExportService(database_uri, storage_backend)
+        self.materials_service = MaterialsExportService(database_uri, storage_backend)
     
     def export_all_data(self, options: ExportOptions) -> Dict[str, Any]:
         """
@@ -535,4 +594,43 @@ class CombinedExportService:
                 'total_issues': len(issues),
                 'total_warnings': len(warnings)
             }
-        }
\ No newline at end of file
+        }
+
+
+def csv_chunks(headers: List[str], rows: Iterator[List[str]], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    Encode a row stream as CSV text, a chunk of rows at a time
+
+    Suitable as the body of a streamed response: what is held at once is one
+    chunk of text, however many rows the stream has.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(headers: List[str], rows: Iterator[List[str]], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    Encode a row stream as newline-delimited JSON, one object per row keyed by header
+
+    Suitable as the body of a streamed response, like csv_chunks.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(headers, row))))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
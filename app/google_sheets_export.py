@@ -3,11 +3,28 @@ Google Sheets Export Service
 
 Handles uploading export data to Google Sheets, including clearing existing data
 and replacing it with fresh export data from MariaDB.
+
+Given a storage backend, uploads are incremental by default: each sheet's last
+upload is recorded as a manifest of row keys and digests (SheetSyncManifest),
+and the next upload diffs against it, inserting and deleting rows with one
+``spreadsheets.batchUpdate`` and writing the changed cells with one
+``values.batchUpdate``. An unchanged inventory costs two reads of the database,
+one read of the sheet's key column and no writes to Sheets at all. A sheet with
+no manifest, different headers, or a different number of rows than its manifest
+records (someone edited it by hand) is rewritten in full, which records one.
+
+The manifest is deleted before a sheet is changed and saved again once every
+write has landed. A sync that fails part way leaves the sheet's rows where the
+manifest no longer says they are, and with no manifest the next sync rewrites
+it rather than diffing against positions that have moved.
 """
 
 from typing import List, Dict, Any, Optional, Tuple
+from difflib import SequenceMatcher
 from flask import current_app
 from googleapiclient.errors import HttpError
+import hashlib
+import json
 import logging
 import time
 
@@ -18,16 +35,22 @@ from .error_handlers import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
+# Rows per values.batchUpdate call; each contiguous run of changed rows is one
+# range within it
+_VALUES_BATCH_ROWS = 5000
+
 
 class GoogleSheetsExportService:
     """Service for uploading export data to Google Sheets"""
     
-    def __init__(self, spreadsheet_id: Optional[str] = None):
+    def __init__(self, spreadsheet_id: Optional[str] = None, storage_backend=None):
         """
         Initialize Google Sheets export service
         
         Args:
             spreadsheet_id: Google Sheets spreadsheet ID, uses config if not provided
+            storage_backend: Where sync manifests are kept; without one, every
+                upload is a full rewrite
         """
         from config import Config
         
@@ -35,6 +58,7 @@ class GoogleSheetsExportService:
         if not self.spreadsheet_id:
             raise ValueError("Google Sheets spreadsheet ID is required. Set GOOGLE_SHEET_ID environment variable.")
         
+        self.storage_backend = storage_backend
         self.auth = GoogleAuth()
         self.service = None
     
@@ -44,6 +68,17 @@ class GoogleSheetsExportService:
             self.service = self.auth.get_service()
         return self.service
     
+    def _get_sheet_properties(self, sheet_name: str) -> Optional[Dict[str, Any]]:
+        """The named sheet's properties (sheetId, gridProperties), or None if there is no such sheet"""
+        sheet_metadata = self._get_service().spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id
+        ).execute()
+        
+        for sheet in sheet_metadata.get('sheets', []):
+            if sheet['properties']['title'] == sheet_name:
+                return sheet['properties']
+        return None
+    
     @retry_with_backoff(max_retries=3, base_delay=1.0)
     def clear_sheet_contents(self, sheet_name: str) -> StorageResult:
         """
@@ -60,16 +95,7 @@ class GoogleSheetsExportService:
             
             # Get sheet info to determine range to clear
             try:
-                sheet_metadata = service.spreadsheets().get(
-                    spreadsheetId=self.spreadsheet_id
-                ).execute()
-                
-                # Find the sheet by name
-                sheet_properties = None
-                for sheet in sheet_metadata.get('sheets', []):
-                    if sheet['properties']['title'] == sheet_name:
-                        sheet_properties = sheet['properties']
-                        break
+                sheet_properties = self._get_sheet_properties(sheet_name)
                 
                 if not sheet_properties:
                     return StorageResult(success=False, error=f'Sheet {sheet_name} not found')
@@ -83,16 +109,7 @@ class GoogleSheetsExportService:
                 logger.error(error_msg)
                 return StorageResult(success=False, error=error_msg)
             
-            # Convert column count to letter (A, B, C, ..., Z, AA, AB, etc.)
-            def num_to_col_letter(n):
-                result = ""
-                while n > 0:
-                    n -= 1  # Adjust for 0-indexing
-                    result = chr(ord('A') + (n % 26)) + result
-                    n //= 26
-                return result
-            
-            end_col = num_to_col_letter(columns)
+            end_col = self._get_end_column(columns)
             range_name = f"{sheet_name}!A1:{end_col}{rows}"
             
             logger.info(f"Clearing range {range_name} in sheet {sheet_name}")
@@ -207,6 +224,278 @@ class GoogleSheetsExportService:
             logger.error(error_msg)
             return StorageResult(success=False, error=error_msg)
     
+    @staticmethod
+    def row_keys(rows: List[List[str]], key_column: int) -> List[str]:
+        """
+        A key for each row that stays with it from one export to the next
+        
+        The value in key_column -- the JA ID, or the material name -- plus its
+        occurrence so far, since an inventory JA ID has one row per piece in
+        its history. Exports are ordered within a JA ID, so "JA000123#1" is
+        the same row every time.
+        """
+        seen = {}
+        keys = []
+        for row in rows:
+            value = row[key_column] if key_column < len(row) else ''
+            occurrence = seen.get(value, 0)
+            seen[value] = occurrence + 1
+            keys.append(f"{value}#{occurrence}")
+        return keys
+    
+    @staticmethod
+    def _row_hash(row: List[str]) -> str:
+        """Digest of a row's cells; 64 bits is plenty to notice an edit"""
+        return hashlib.sha256(json.dumps(row).encode('utf-8')).hexdigest()[:16]
+    
+    def _load_manifest(self, sheet_name: str):
+        """The manifest of the last upload to this sheet, or None"""
+        from .database import SheetSyncManifest
+        
+        session = self.storage_backend.Session()
+        try:
+            return session.query(SheetSyncManifest).filter_by(
+                spreadsheet_id=self.spreadsheet_id, sheet_name=sheet_name
+            ).first()
+        finally:
+            session.close()
+    
+    def _save_manifest(self, sheet_name: str, headers: List[str], keys: List[str], hashes: List[str]) -> None:
+        """Record what the sheet now holds, for the next sync to diff against"""
+        from .database import SheetSyncManifest
+        
+        session = self.storage_backend.Session()
+        try:
+            manifest = session.query(SheetSyncManifest).filter_by(
+                spreadsheet_id=self.spreadsheet_id, sheet_name=sheet_name
+            ).first()
+            if manifest is None:
+                manifest = SheetSyncManifest(spreadsheet_id=self.spreadsheet_id, sheet_name=sheet_name)
+                session.add(manifest)
+            manifest.headers_hash = self._row_hash(headers)
+            manifest.row_count = len(keys)
+            manifest.manifest = json.dumps([[key, digest] for key, digest in zip(keys, hashes)])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _discard_manifest(self, sheet_name: str) -> None:
+        """Forget what the sheet holds, before changing it"""
+        from .database import SheetSyncManifest
+        
+        session = self.storage_backend.Session()
+        try:
+            session.query(SheetSyncManifest).filter_by(
+                spreadsheet_id=self.spreadsheet_id, sheet_name=sheet_name
+            ).delete(synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _sheet_row_count(self, sheet_name: str, key_column: int) -> int:
+        """Data rows the sheet holds now: filled cells of its key column, less the header"""
+        column = self._get_end_column(key_column + 1)
+        result = self._get_service().spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"{sheet_name}!{column}:{column}",
+            majorDimension='COLUMNS'
+        ).execute()
+        values = result.get('values') or [[]]
+        return max(len(values[0]) - 1, 0)
+    
+    def _replace_sheet(self, sheet_name: str, headers: List[str], rows: List[List[str]], key_column: int) -> StorageResult:
+        """Clear and rewrite the sheet, and record a manifest if there is somewhere to keep one"""
+        if self.storage_backend is not None:
+            self._discard_manifest(sheet_name)
+        result = self.upload_data_to_sheet(sheet_name, headers, rows, clear_existing=True)
+        if result.success:
+            result.data['sync_mode'] = 'full'
+            if self.storage_backend is not None:
+                keys = self.row_keys(rows, key_column)
+                self._save_manifest(sheet_name, headers, keys, [self._row_hash(row) for row in rows])
+        return result
+    
+    def sync_data_to_sheet(
+        self,
+        sheet_name: str,
+        headers: List[str],
+        rows: List[List[str]],
+        key_column: int
+    ) -> StorageResult:
+        """
+        Bring a sheet up to date by sending only what changed since the last upload
+        
+        Rows that went away are deleted and rows that arrived are inserted, in
+        place, by one spreadsheets.batchUpdate; then every inserted or edited
+        row's cells are written by values.batchUpdate, contiguous rows as one
+        range. Falls back to a full rewrite when there is no manifest to diff
+        against, the headers changed, or the sheet no longer has the number of
+        rows the manifest records.
+        
+        Args:
+            sheet_name: Name of the sheet to sync
+            headers: Column headers
+            rows: Data rows, in export order
+            key_column: Index of the column that identifies a row (see row_keys)
+            
+        Returns:
+            StorageResult; data counts rows updated, inserted, deleted and unchanged
+        """
+        if self.storage_backend is None:
+            return self._replace_sheet(sheet_name, headers, rows, key_column)
+        
+        try:
+            manifest = self._load_manifest(sheet_name)
+            if manifest is None or manifest.headers_hash != self._row_hash(headers):
+                logger.info(f"No usable sync manifest for {sheet_name}; rewriting it in full")
+                return self._replace_sheet(sheet_name, headers, rows, key_column)
+            
+            sheet_properties = self._get_sheet_properties(sheet_name)
+            if not sheet_properties:
+                return StorageResult(success=False, error=f'Sheet {sheet_name} not found')
+            sheet_id = sheet_properties['sheetId']
+            
+            sheet_rows = self._sheet_row_count(sheet_name, key_column)
+            if sheet_rows != manifest.row_count:
+                logger.info(
+                    f"{sheet_name} has {sheet_rows} rows but its sync manifest records "
+                    f"{manifest.row_count}; rewriting it in full"
+                )
+                return self._replace_sheet(sheet_name, headers, rows, key_column)
+            
+            old = json.loads(manifest.manifest)
+            old_keys = [key for key, _ in old]
+            old_hashes = [digest for _, digest in old]
+            new_keys = self.row_keys(rows, key_column)
+            new_hashes = [self._row_hash(row) for row in rows]
+            
+            # Row index k lives at sheet index k + 1, under the header. Structural
+            # changes are collected bottom-up so that each one's index is still
+            # where the manifest says it is when it is applied.
+            structural = []
+            to_write = []
+            updated = inserted = deleted = 0
+            opcodes = SequenceMatcher(None, old_keys, new_keys, autojunk=False).get_opcodes()
+            for tag, i1, i2, j1, j2 in reversed(opcodes):
+                if tag == 'equal':
+                    for offset in range(i2 - i1):
+                        if old_hashes[i1 + offset] != new_hashes[j1 + offset]:
+                            to_write.append(j1 + offset)
+                            updated += 1
+                    continue
+                
+                # A replace is rows rewritten in place, then the difference
+                # inserted or deleted after them
+                common = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+                to_write.extend(range(j1, j1 + common))
+                updated += common
+                if i2 - i1 > common:
+                    structural.append({'deleteDimension': {'range': {
+                        'sheetId': sheet_id, 'dimension': 'ROWS',
+                        'startIndex': i1 + common + 1, 'endIndex': i2 + 1
+                    }}})
+                    deleted += i2 - i1 - common
+                if j2 - j1 > common:
+                    start = i1 + common + 1
+                    structural.append({'insertDimension': {
+                        'range': {
+                            'sheetId': sheet_id, 'dimension': 'ROWS',
+                            'startIndex': start, 'endIndex': start + j2 - j1 - common
+                        },
+                        # Not from the header row, which may be styled
+                        'inheritFromBefore': start > 1
+                    }})
+                    to_write.extend(range(j1 + common, j2))
+                    inserted += j2 - j1 - common
+            
+            # Until the new manifest is saved, the sheet matches neither
+            if structural or to_write:
+                self._discard_manifest(sheet_name)
+            
+            service = self._get_service()
+            if structural:
+                service.spreadsheets().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={'requests': structural}
+                ).execute()
+            
+            end_column = self._get_end_column(len(headers))
+            ranges = []
+            for start, end in self._runs(sorted(to_write)):
+                ranges.append({
+                    'range': f"{sheet_name}!A{start + 2}:{end_column}{end + 2}",
+                    'values': rows[start:end + 1]
+                })
+            batch, batch_rows = [], 0
+            for value_range in ranges:
+                batch.append(value_range)
+                batch_rows += len(value_range['values'])
+                if batch_rows >= _VALUES_BATCH_ROWS:
+                    self._write_ranges(batch)
+                    batch, batch_rows = [], 0
+            if batch:
+                self._write_ranges(batch)
+            
+            self._save_manifest(sheet_name, headers, new_keys, new_hashes)
+            
+            unchanged = len(rows) - updated - inserted
+            logger.info(
+                f"Synced {sheet_name}: {updated} updated, {inserted} inserted, "
+                f"{deleted} deleted, {unchanged} unchanged"
+            )
+            return StorageResult(
+                success=True,
+                affected_rows=updated + inserted + deleted,
+                data={
+                    'sheet_name': sheet_name,
+                    'sync_mode': 'delta',
+                    'updated': updated,
+                    'inserted': inserted,
+                    'deleted': deleted,
+                    'unchanged': unchanged,
+                    'headers_count': len(headers),
+                    'data_rows': len(rows)
+                }
+            )
+            
+        except HttpError as e:
+            error_msg = f'Failed to sync sheet {sheet_name}: {e}'
+            logger.error(error_msg)
+            return StorageResult(success=False, error=error_msg)
+        except Exception as e:
+            error_msg = f'Unexpected error syncing sheet {sheet_name}: {e}'
+            logger.error(error_msg)
+            return StorageResult(success=False, error=error_msg)
+    
+    def _write_ranges(self, value_ranges: List[Dict[str, Any]]) -> None:
+        self._get_service().spreadsheets().values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={'valueInputOption': 'USER_ENTERED', 'data': value_ranges}
+        ).execute()
+    
+    @staticmethod
+    def _runs(indexes: List[int]) -> List[Tuple[int, int]]:
+        """Sorted indexes as (first, last) runs of consecutive values"""
+        runs = []
+        for index in indexes:
+            if runs and runs[-1][1] == index - 1:
+                runs[-1] = (runs[-1][0], index)
+            else:
+                runs.append((index, index))
+        return runs
+    
+    def _upload(self, sheet_name: str, headers: List[str], rows: List[List[str]],
+                key_column: int, mode: str) -> StorageResult:
+        if mode == 'full':
+            return self._replace_sheet(sheet_name, headers, rows, key_column)
+        return self.sync_data_to_sheet(sheet_name, headers, rows, key_column)
+    
     def _get_end_column(self, column_count: int) -> str:
         """Convert column count to end column letter (A, B, ..., Z, AA, AB, etc.)"""
         if column_count <= 0:
@@ -224,7 +513,8 @@ class GoogleSheetsExportService:
         self,
         headers: List[str],
         rows: List[List[str]],
-        sheet_name: str = "Metal_Export"
+        sheet_name: str = "Metal_Export",
+        mode: str = "delta"
     ) -> StorageResult:
         """
         Upload inventory export data to Google Sheets
@@ -233,6 +523,7 @@ class GoogleSheetsExportService:
             headers: Inventory column headers (should be 27 columns)
             rows: Inventory data rows
             sheet_name: Target sheet name (defaults to Metal_Export)
+            mode: 'delta' to send only changes, 'full' to clear and rewrite
 
         Returns:
             StorageResult with upload details
@@ -246,13 +537,15 @@ class GoogleSheetsExportService:
                 error=f"Invalid inventory headers count: expected 27, got {len(headers)}"
             )
         
-        return self.upload_data_to_sheet(sheet_name, headers, rows, clear_existing=True)
+        # Rows are keyed by JA ID
+        return self._upload(sheet_name, headers, rows, 1, mode)
     
     def upload_materials_export(
         self, 
         headers: List[str], 
         rows: List[List[str]], 
-        sheet_name: str = "Materials_Export"
+        sheet_name: str = "Materials_Export",
+        mode: str = "delta"
     ) -> StorageResult:
         """
         Upload materials taxonomy export data to Google Sheets
@@ -261,6 +554,7 @@ class GoogleSheetsExportService:
             headers: Materials column headers (should be 3 columns)
             rows: Materials data rows
             sheet_name: Target sheet name (defaults to Materials_Export)
+            mode: 'delta' to send only changes, 'full' to clear and rewrite
             
         Returns:
             StorageResult with upload details
@@ -274,14 +568,16 @@ class GoogleSheetsExportService:
                 error=f"Invalid materials headers count: expected 3, got {len(headers)}"
             )
         
-        return self.upload_data_to_sheet(sheet_name, headers, rows, clear_existing=True)
+        # Rows are keyed by material name
+        return self._upload(sheet_name, headers, rows, 0, mode)
     
-    def upload_combined_export(self, export_data: Dict[str, Any]) -> Dict[str, Any]:
+    def upload_combined_export(self, export_data: Dict[str, Any], mode: str = "delta") -> Dict[str, Any]:
         """
         Upload combined inventory and materials export data
         
         Args:
             export_data: Combined export data with inventory and materials sections
+            mode: 'delta' to send only changes, 'full' to clear and rewrite
             
         Returns:
             Dictionary with upload results for both datasets
@@ -295,7 +591,7 @@ class GoogleSheetsExportService:
             inv_rows = inv_data.get('rows', [])
             
             logger.info(f"Uploading inventory data: {len(inv_headers)} headers, {len(inv_rows)} rows")
-            inv_result = self.upload_inventory_export(inv_headers, inv_rows)
+            inv_result = self.upload_inventory_export(inv_headers, inv_rows, mode=mode)
             results['inventory'] = {
                 'success': inv_result.success,
                 'error': inv_result.error,
@@ -310,7 +606,7 @@ class GoogleSheetsExportService:
             mat_rows = mat_data.get('rows', [])
             
             logger.info(f"Uploading materials data: {len(mat_headers)} headers, {len(mat_rows)} rows")
-            mat_result = self.upload_materials_export(mat_headers, mat_rows)
+            mat_result = self.upload_materials_export(mat_headers, mat_rows, mode=mode)
             results['materials'] = {
                 'success': mat_result.success,
                 'error': mat_result.error,
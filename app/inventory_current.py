@@ -0,0 +1,152 @@
+"""
+Current Inventory Projection
+
+``inventory_items`` holds every row a piece of stock has had: shortening an
+item deactivates its row and adds a new one, so the table grows with history
+while the stock it describes does not. ``inventory_current`` holds one row per
+JA ID that has an active row, pointing at it, and the reads that only want
+what is on the shelf -- the list, its searches and counts, the next JA ID --
+walk that instead of skipping history rows in ``inventory_items``.
+
+The projection follows its rows the way the search documents do
+(app/inventory_search.py): a session listener notes the JA IDs whose rows each
+flush adds, removes, activates, deactivates or renames, and their entries are
+recomputed before the transaction commits. ``inventory_items`` stays the record
+and its ``active`` column stays authoritative, so every other reader -- routes,
+exports, the storage backend -- keeps working against it unchanged, and the
+projection can always be rebuilt from it.
+
+Should a JA ID ever have more than one active row, the most recently added is
+current, the same row ``get_canonical_item`` picks.
+"""
+
+import logging
+from typing import Iterable, Set
+
+from sqlalchemy import desc, event, select
+from sqlalchemy.orm import Session, attributes
+
+from .database import InventoryCurrent, InventoryItem
+
+logger = logging.getLogger(__name__)
+
+# Row columns that decide which row, if any, is current for a JA ID
+_TRACKED_COLUMNS = ('ja_id', 'active')
+
+
+def current_items(query):
+    """Narrow an InventoryItem query to the current row of each JA ID"""
+    # The active test is implied by the join; stating it lets the planner
+    # still range over the (active, ...) indexes when a filter is narrower
+    # than the whole of current stock
+    return query.join(
+        InventoryCurrent, InventoryCurrent.item_id == InventoryItem.id
+    ).filter(InventoryItem.active == True)
+
+
+def refresh_current_rows(session, ja_ids: Iterable[str]) -> None:
+    """Recompute the current row of the given JA IDs from ``inventory_items``"""
+    ja_ids = sorted({ja_id for ja_id in ja_ids if ja_id})
+    if not ja_ids:
+        return
+
+    current = {}
+    rows = session.query(InventoryItem.ja_id, InventoryItem.id).filter(
+        InventoryItem.ja_id.in_(ja_ids), InventoryItem.active == True
+    ).order_by(InventoryItem.ja_id, desc(InventoryItem.date_added), desc(InventoryItem.id))
+    for ja_id, item_id in rows:
+        current.setdefault(ja_id, item_id)
+
+    entries = {
+        entry.ja_id: entry for entry in session.query(InventoryCurrent).filter(
+            InventoryCurrent.ja_id.in_(ja_ids)
+        )
+    }
+    gone = [entries.pop(ja_id) for ja_id in ja_ids if ja_id in entries and ja_id not in current]
+    if gone:
+        for entry in gone:
+            session.delete(entry)
+        # A renamed row moves to a new entry: its old one must go first, or
+        # the new one collides with it on item_id
+        session.flush()
+    for ja_id in ja_ids:
+        entry = entries.get(ja_id)
+        item_id = current.get(ja_id)
+        if item_id is None:
+            continue
+        elif entry is None:
+            session.add(InventoryCurrent(ja_id=ja_id, item_id=item_id))
+        elif entry.item_id != item_id:
+            entry.item_id = item_id
+
+
+def rebuild_current_rows(session, batch_size: int = 1000) -> int:
+    """Recompute every JA ID's entry; returns how many JA IDs are current"""
+    ja_ids = [ja_id for (ja_id,) in session.query(InventoryItem.ja_id).filter(
+        InventoryItem.active == True
+    ).distinct().order_by(InventoryItem.ja_id)]
+    for start in range(0, len(ja_ids), batch_size):
+        refresh_current_rows(session, ja_ids[start:start + batch_size])
+        session.flush()
+    stale = session.query(InventoryCurrent).filter(
+        ~InventoryCurrent.ja_id.in_(
+            select(InventoryItem.ja_id).where(InventoryItem.active == True)
+        )
+    )
+    for entry in stale:
+        session.delete(entry)
+    return len(ja_ids)
+
+
+# -- Keeping the projection current -------------------------------------------
+
+_SESSION_KEY = 'inventory_current_stale'
+
+
+def _touched_ja_ids(session) -> Set[str]:
+    touched = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, InventoryItem):
+            touched.add(obj.ja_id)
+    for obj in session.dirty:
+        if not isinstance(obj, InventoryItem):
+            continue
+        histories = [
+            attributes.get_history(obj, column, passive=attributes.PASSIVE_NO_INITIALIZE)
+            for column in _TRACKED_COLUMNS
+        ]
+        if any(history.has_changes() for history in histories):
+            touched.add(obj.ja_id)
+            # A renamed row leaves its old JA ID, which may need a new current row
+            touched.update(histories[0].deleted or ())
+    touched.discard(None)
+    return touched
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_touched_ja_ids(session, flush_context):
+    touched = _touched_ja_ids(session)
+    if touched:
+        session.info.setdefault(_SESSION_KEY, set()).update(touched)
+
+
+@event.listens_for(Session, 'before_commit')
+def _refresh_touched_ja_ids(session):
+    if _SESSION_KEY not in session.info:
+        # As in app.inventory_search: only flush early when the pending
+        # changes might touch an item
+        if not any(
+            isinstance(obj, InventoryItem)
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        ):
+            return
+    session.flush()
+    stale = session.info.pop(_SESSION_KEY, None)
+    if stale:
+        refresh_current_rows(session, stale)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_touched_ja_ids(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,140 @@
+"""
+Inventory Full-Text Search
+
+The advanced search's ``q`` matches what the operator types against every text
+field of a metal stock item -- JA ID, material, type, shape, where it lives,
+thread size, who sold it and its notes -- by word prefix, ranked. Each
+``inventory_items`` row has one ``inventory_search_documents`` row holding those
+words, under the full-text index ``app.search_index`` describes, so a search for
+"drop from job 42" looks words up in the index instead of running a LIKE over
+every row, history rows included.
+
+Documents follow their rows the way catalog documents follow products: a
+session listener notes the rows each flush adds, edits or removes, and their
+documents are rewritten before the transaction commits. Adding, editing and
+shortening an item all write rows and so all reach the index; deactivating
+changes no indexed text -- the active filter is applied when the documents are
+joined back to their rows.
+"""
+
+import logging
+from typing import Iterable, Set
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, attributes
+
+from .database import InventoryItem, InventorySearchDocument
+from .search_index import document_body, matching_documents
+
+logger = logging.getLogger(__name__)
+
+# Row columns that feed the document, in the order their words are stored
+_ITEM_COLUMNS = (
+    'ja_id', 'material', 'item_type', 'shape', 'location', 'sub_location',
+    'thread_size', 'vendor', 'vendor_part', 'purchase_location', 'notes',
+)
+
+
+def refresh_search_documents(session, item_ids: Iterable[int]) -> None:
+    """Rewrite the documents of the given inventory rows from their current values"""
+    ids = sorted({item_id for item_id in item_ids if item_id is not None})
+    if not ids:
+        return
+
+    rows = {
+        row.id: row for row in session.query(
+            InventoryItem.id, *(getattr(InventoryItem, column) for column in _ITEM_COLUMNS)
+        ).filter(InventoryItem.id.in_(ids))
+    }
+    documents = {
+        document.item_id: document for document in session.query(InventorySearchDocument).filter(
+            InventorySearchDocument.item_id.in_(ids)
+        )
+    }
+    for item_id in ids:
+        document = documents.get(item_id)
+        row = rows.get(item_id)
+        if row is None:
+            if document is not None:
+                session.delete(document)
+            continue
+
+        body = document_body(getattr(row, column) for column in _ITEM_COLUMNS)
+        if document is None:
+            session.add(InventorySearchDocument(item_id=item_id, body=body))
+        elif document.body != body:
+            document.body = body
+
+
+def rebuild_search_documents(session, batch_size: int = 1000) -> int:
+    """Rewrite every row's document; returns how many rows there are"""
+    ids = [item_id for (item_id,) in session.query(InventoryItem.id).order_by(InventoryItem.id)]
+    for start in range(0, len(ids), batch_size):
+        refresh_search_documents(session, ids[start:start + batch_size])
+        session.flush()
+    stale = session.query(InventorySearchDocument).filter(
+        ~InventorySearchDocument.item_id.in_(select(InventoryItem.id))
+    )
+    for document in stale:
+        session.delete(document)
+    return len(ids)
+
+
+def matching_items(session, query: str):
+    """
+    A subquery of ``(key, score)`` -- the inventory row id and its relevance --
+    for the rows matching ``query``; None when the query has no words
+    """
+    return matching_documents(
+        session, query, InventorySearchDocument.item_id, InventorySearchDocument.body,
+        'inventory_search_fts'
+    )
+
+
+# -- Keeping documents current ------------------------------------------------
+
+_SESSION_KEY = 'inventory_search_documents_stale'
+
+
+def _touched_items(session) -> Set[int]:
+    touched = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, InventoryItem):
+            touched.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, InventoryItem) and any(
+            attributes.get_history(obj, column, passive=attributes.PASSIVE_NO_INITIALIZE).has_changes()
+            for column in _ITEM_COLUMNS
+        ):
+            touched.add(obj.id)
+    touched.discard(None)
+    return touched
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_touched_items(session, flush_context):
+    touched = _touched_items(session)
+    if touched:
+        session.info.setdefault(_SESSION_KEY, set()).update(touched)
+
+
+@event.listens_for(Session, 'before_commit')
+def _refresh_touched_items(session):
+    if _SESSION_KEY not in session.info:
+        # Flushing here would be the commit's own flush, early; only do it
+        # when the pending changes might touch an item
+        if not any(
+            isinstance(obj, InventoryItem)
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        ):
+            return
+    session.flush()
+    stale = session.info.pop(_SESSION_KEY, None)
+    if stale:
+        refresh_search_documents(session, stale)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_touched_items(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(_SESSION_KEY, None)
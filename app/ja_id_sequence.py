@@ -0,0 +1,176 @@
+"""
+JA ID Sequence
+
+New JA IDs were the largest canonical one on the shelf plus one, worked out
+with an aggregate each time a form opened or a batch was created. Two people
+opening the add form together were told the same number and the slower save
+failed, and the aggregate grew with the inventory. Numbers now come from the
+``ja_id`` row of ``id_sequences``: allocating increments it, which holds the
+row's lock until the allocating transaction ends, so no number is handed out
+twice and asking costs one row regardless of the inventory's size.
+
+Numbers can also be chosen by hand -- typed into the add form, or scanned from
+an existing label -- so the sequence is kept above every JA ID written: a
+session listener notes the highest canonical number each flush adds or renames
+an item to, and advances the sequence before the transaction commits. Writers
+that bypass the ORM's unit of work (``insert()``, raw SQL) reserve their
+numbers here or call ``advance_ja_sequence`` themselves.
+
+Allocation leaves gaps: a number handed to a form that is then abandoned is
+never offered again. JA IDs only need to be unique, not dense.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import Integer, and_, cast, event, func, text
+from sqlalchemy.orm import Session, attributes
+
+from .database import IdSequence, InventoryItem
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_NAME = 'ja_id'
+
+
+def format_ja_id(number: int) -> str:
+    """The canonical JA ID for a sequence number"""
+    return f"JA{number:06d}"
+
+
+def canonical_ja_number(ja_id) -> Optional[int]:
+    """The number of a canonical ``JA`` + 6-digit ID, or None for any other"""
+    if ja_id and len(ja_id) == 8 and ja_id.startswith('JA') and ja_id[2:].isdigit() and ja_id[2:].isascii():
+        return int(ja_id[2:])
+    return None
+
+
+def max_canonical_ja_number(session, ja_id_column) -> int:
+    """
+    Largest number among the canonical JA IDs in a column, or 0 if none
+
+    Non-canonical IDs are excluded rather than cast: casting a suffix like
+    ``12ABCD`` to an integer gives dialect-dependent results. To stay portable
+    across SQLite and MariaDB without ``REGEXP``, each of the six suffix
+    positions must be a digit by a per-position ``BETWEEN '0' AND '9'``.
+    """
+    digit_filters = [
+        func.substr(ja_id_column, 2 + pos, 1).between('0', '9')
+        for pos in range(1, 7)
+    ]
+    result = session.query(
+        func.max(cast(func.substr(ja_id_column, 3), Integer))
+    ).filter(
+        ja_id_column.like('JA______'),
+        and_(*digit_filters),
+    ).scalar()
+    return int(result) if result is not None else 0
+
+
+def reserve_ja_numbers(session, count: int = 1, floor: int = 1, held: Optional[int] = None) -> int:
+    """
+    Take the next ``count`` numbers, none lower than ``floor``, within the
+    session's transaction; returns the first
+
+    The increment locks the sequence row until the transaction commits or
+    rolls back, so a concurrent reservation waits and then continues after
+    this block -- or, if this transaction rolls back, takes the same numbers,
+    which were never used.
+
+    ``held`` is a number the caller was allocated earlier: while it is still
+    the last allocated, nobody else has been given a number since, and the
+    block starts at it instead of after it.
+    """
+    if held is not None and held >= floor:
+        extended = session.execute(
+            text(
+                "UPDATE id_sequences SET last_value = last_value + :extra "
+                "WHERE name = :name AND last_value = :held"
+            ),
+            {'name': SEQUENCE_NAME, 'extra': count - 1, 'held': held}
+        ).rowcount
+        if extended:
+            return held
+
+    params = {'name': SEQUENCE_NAME, 'count': count, 'floor': floor - 1}
+    updated = session.execute(
+        text(
+            "UPDATE id_sequences SET last_value = "
+            "CASE WHEN last_value < :floor THEN :floor ELSE last_value END + :count "
+            "WHERE name = :name"
+        ),
+        params
+    ).rowcount
+    if not updated:
+        # Seeded by the migration; a schema made with create_all starts from
+        # the items already there
+        last_value = max(max_canonical_ja_number(session, InventoryItem.ja_id), floor - 1) + count
+        session.add(IdSequence(name=SEQUENCE_NAME, last_value=last_value))
+        session.flush()
+        return last_value - count + 1
+    last_value = session.query(IdSequence.last_value).filter(
+        IdSequence.name == SEQUENCE_NAME
+    ).scalar()
+    return last_value - count + 1
+
+
+def read_ja_sequence(session) -> Optional[int]:
+    """The last number handed out, or None before the first"""
+    return session.query(IdSequence.last_value).filter(
+        IdSequence.name == SEQUENCE_NAME
+    ).scalar()
+
+
+def advance_ja_sequence(session, number: int) -> None:
+    """Make sure ``number`` is never allocated, as part of the session's transaction"""
+    session.execute(
+        text("UPDATE id_sequences SET last_value = :number WHERE name = :name AND last_value < :number"),
+        {'name': SEQUENCE_NAME, 'number': number}
+    )
+
+
+# -- Keeping the sequence above hand-chosen JA IDs ----------------------------
+
+_SESSION_KEY = 'ja_id_sequence_floor'
+
+
+def _highest_written_number(session) -> Optional[int]:
+    numbers = []
+    for obj in session.new:
+        if isinstance(obj, InventoryItem):
+            numbers.append(canonical_ja_number(obj.ja_id))
+    for obj in session.dirty:
+        if not isinstance(obj, InventoryItem):
+            continue
+        history = attributes.get_history(obj, 'ja_id', passive=attributes.PASSIVE_NO_INITIALIZE)
+        numbers.extend(canonical_ja_number(ja_id) for ja_id in history.added or ())
+    return max((number for number in numbers if number is not None), default=None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_written_numbers(session, flush_context):
+    highest = _highest_written_number(session)
+    if highest is not None:
+        session.info[_SESSION_KEY] = max(session.info.get(_SESSION_KEY, 0), highest)
+
+
+@event.listens_for(Session, 'before_commit')
+def _advance_past_written_numbers(session):
+    if _SESSION_KEY not in session.info:
+        # As in app.inventory_search: only flush early when the pending
+        # changes might touch an item
+        if not any(
+            isinstance(obj, InventoryItem)
+            for obj in list(session.new) + list(session.dirty)
+        ):
+            return
+    session.flush()
+    highest = session.info.pop(_SESSION_KEY, None)
+    if highest is not None:
+        advance_ja_sequence(session, highest)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_written_numbers(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,300 @@
+"""
+Label Print Spooler for Workshop Inventory Tracking
+
+Printing a label renders it and hands it to CUPS through ``lp``, which held a
+gunicorn worker for as long as that took -- and a bulk print from the list
+made one such request per item, holding one worker for the whole run. Print
+requests now add a LabelPrintJob and return its id; a thread in each web
+process prints queued jobs and records each item as it goes, and the client
+polls ``/api/labels/jobs/<id>`` for progress.
+
+The thread follows the photo job worker (app/photo_jobs.py): it sleeps until
+a submission wakes it and polls now and then for jobs queued by the other
+process or left over from before a restart. Unlike a photo job, a print is
+not safe to run twice -- half a batch may already be on the printer -- so a
+job found abandoned mid-run is failed for the operator, not requeued.
+
+A running job's ``updated_at`` is its heartbeat, set with each item's
+progress, so a long batch is never mistaken for an abandoned one. Every write
+a run makes is conditional on the job still being 'running': a job another
+process has failed as abandoned is neither printed further nor marked done.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from .database import LabelPrintJob
+
+logger = logging.getLogger(__name__)
+
+
+class LabelJobQueue:
+    """Submits, runs and reports label print jobs"""
+
+    # A running job whose heartbeat is this old belonged to a process that died
+    JOB_STALE_AFTER = timedelta(minutes=10)
+
+    def __init__(self, storage_backend, worker: Optional['LabelJobWorker'] = None):
+        """
+        With a ``worker``, submitted jobs are left for its thread to print;
+        without one, each is printed in the submitting call.
+        """
+        if not storage_backend._connected:
+            storage_backend.connect()
+        self.Session = sessionmaker(bind=storage_backend.engine)
+        self.worker = worker
+
+    def submit_ja_ids(self, ja_ids: List[str], label_type: str, label_count: int = 1) -> Dict[str, Any]:
+        """Queue ``label_count`` labels for each JA ID, in order; returns the job"""
+        return self._submit('inventory', label_type, label_count, list(ja_ids))
+
+    def submit_product(self, description: str, code: str, provenance: Optional[str],
+                       label_type: str, label_count: int = 1) -> Dict[str, Any]:
+        """Queue ``label_count`` copies of a product label; returns the job"""
+        item = {'description': description, 'code': code, 'provenance': provenance}
+        return self._submit('product', label_type, label_count, [item])
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """A job's state, or None if there is no such job"""
+        session = self.Session()
+        try:
+            job = session.get(LabelPrintJob, job_id)
+            return job.to_dict() if job is not None else None
+        finally:
+            session.close()
+
+    def _submit(self, kind: str, label_type: str, label_count: int, items: List[Any]) -> Dict[str, Any]:
+        session = self.Session()
+        try:
+            job = LabelPrintJob(
+                kind=kind, label_type=label_type, label_count=label_count,
+                items=json.dumps(items), total=len(items), printed=0, status='pending'
+            )
+            session.add(job)
+            session.commit()
+            job_id = job.id
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        logger.info(f"Queued label job {job_id}: {len(items)} {kind} item(s), {label_count} x {label_type}")
+        if self.worker is not None:
+            self.worker.wake()
+        else:
+            self.run_pending_jobs()
+        return self.get_job(job_id)
+
+    def run_pending_jobs(self, limit: Optional[int] = None) -> int:
+        """
+        Print queued jobs, oldest first, until none are left
+
+        Safe to call from any number of processes at once: each job is claimed
+        by one of them before it runs. Printing reads the app's config, so this
+        runs inside an app context.
+
+        Returns:
+            int: Number of jobs run, successfully or not
+        """
+        self._fail_stale_jobs()
+
+        run = 0
+        while limit is None or run < limit:
+            job_id = self._claim_next_job()
+            if job_id is None:
+                break
+            self._run_job(job_id)
+            run += 1
+        return run
+
+    def _fail_stale_jobs(self) -> None:
+        """Fail jobs left 'running' by a process that died; never reprint them"""
+        session = self.Session()
+        try:
+            heartbeat = func.coalesce(LabelPrintJob.updated_at, LabelPrintJob.started_at)
+            stale = session.query(LabelPrintJob).filter(
+                LabelPrintJob.status == 'running',
+                heartbeat < datetime.utcnow() - self.JOB_STALE_AFTER
+            ).update({
+                'status': 'failed',
+                'error': 'Abandoned while printing; some labels may have printed',
+                'finished_at': datetime.utcnow(),
+            }, synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        if stale:
+            logger.warning(f"Failed {stale} label jobs abandoned while printing")
+
+    def _claim_next_job(self) -> Optional[int]:
+        """Claim the oldest pending job for this process, as PhotoService does"""
+        session = self.Session()
+        try:
+            while True:
+                candidate = session.query(LabelPrintJob.id).filter(
+                    LabelPrintJob.status == 'pending'
+                ).order_by(LabelPrintJob.id).first()
+                if candidate is None:
+                    session.commit()
+                    return None
+
+                claimed = session.query(LabelPrintJob).filter(
+                    LabelPrintJob.id == candidate.id, LabelPrintJob.status == 'pending'
+                ).update({
+                    'status': 'running',
+                    'started_at': datetime.utcnow(),
+                    'updated_at': datetime.utcnow(),
+                }, synchronize_session=False)
+                session.commit()
+                if claimed:
+                    return candidate.id
+        finally:
+            session.close()
+
+    def _run_job(self, job_id: int) -> None:
+        """Print a claimed job item by item, recording progress after each
+
+        One item failing does not stop the rest; the job fails only when
+        nothing printed. Printing stops if the job is failed as abandoned
+        meanwhile.
+        """
+        session = self.Session()
+        try:
+            job = session.get(LabelPrintJob, job_id)
+            # Detached, so reading it after each commit does not reload it
+            session.expunge(job)
+            printed = 0
+            failures = []
+            for item in json.loads(job.items):
+                try:
+                    self._print_item(job, item)
+                    printed += 1
+                except Exception as e:
+                    name = item if job.kind == 'inventory' else item.get('code')
+                    logger.error(f"Label job {job_id}: failed to print {name}: {str(e)}")
+                    # A ValueError is the request's fault (an unknown JA ID
+                    # or label type), which the API reports as such
+                    failures.append({
+                        'item': name, 'error': str(e), 'invalid': isinstance(e, ValueError)
+                    })
+                progress = {'printed': printed, 'updated_at': datetime.utcnow()}
+                if failures:
+                    progress['failures'] = json.dumps(failures)
+                if not self._update_running(session, job_id, progress):
+                    logger.warning(
+                        f"Label job {job_id} was failed as abandoned after "
+                        f"{printed} of {job.total}; not printing the rest"
+                    )
+                    return
+
+            outcome = {
+                'status': 'failed' if failures and not printed else 'done',
+                'finished_at': datetime.utcnow(),
+                'updated_at': datetime.utcnow(),
+            }
+            if failures:
+                outcome['error'] = f"{len(failures)} of {job.total} label(s) failed to print"
+            if self._update_running(session, job_id, outcome):
+                logger.info(f"Label job {job_id}: printed {printed} of {job.total}")
+
+        except Exception as e:
+            session.rollback()
+            self._update_running(session, job_id, {
+                'status': 'failed',
+                'error': str(e),
+                'finished_at': datetime.utcnow(),
+            })
+            logger.error(f"Label job {job_id} failed: {str(e)}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def _update_running(session, job_id: int, values: Dict[str, Any]) -> bool:
+        """Write to a job that is still running; False if it no longer is"""
+        updated = session.query(LabelPrintJob).filter(
+            LabelPrintJob.id == job_id, LabelPrintJob.status == 'running'
+        ).update(values, synchronize_session=False)
+        session.commit()
+        return bool(updated)
+
+    @staticmethod
+    def _print_item(job: LabelPrintJob, item) -> None:
+        # Looked up at call time, so the printing functions can be patched
+        from app.services import label_printer
+
+        if job.kind == 'inventory':
+            label_printer.print_label_for_ja_id(item, job.label_type, job.label_count)
+        else:
+            from app.services import product_label
+
+            label_config = label_printer.get_label_type_config(job.label_type)
+            if label_config is None:
+                raise ValueError(f"Invalid label type '{job.label_type}'")
+            product_label.print_product_label(
+                description=item['description'],
+                code=item['code'],
+                provenance=item.get('provenance'),
+                label_config=label_config,
+                num_copies=job.label_count,
+            )
+
+
+class LabelJobWorker:
+    """Background thread that prints queued label jobs for one process"""
+
+    def __init__(self, app, storage_backend, poll_interval: float = 30.0):
+        self.app = app
+        self.storage_backend = storage_backend
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def wake(self) -> None:
+        """Run the queue now, starting the thread first if this process has none
+
+        As with PhotoJobWorker, a thread does not survive a fork, so one built
+        before it starts afresh in each child on first use.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._stopping = False
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name='label-jobs', daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread once the job it is printing, if any, finishes"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                with self.app.app_context():
+                    LabelJobQueue(self.storage_backend).run_pending_jobs()
+            except Exception as e:
+                # The next wake or poll tries again; the thread must not die
+                logger.error(f"Label job worker error: {str(e)}")
@@ -1,7 +1,10 @@
+import atexit
+import copy
 import logging
 import logging.handlers
 import os
 import json
+import queue
 from datetime import datetime
 from flask import request, session, g
 
@@ -62,6 +65,10 @@ class JSONFormatter(logging.Formatter):
             log_entry['item_id'] = record.item_id
         if hasattr(record, 'duration'):
             log_entry['duration_ms'] = record.duration
+        if hasattr(record, 'db_queries'):
+            log_entry['db_queries'] = record.db_queries
+        if hasattr(record, 'db_ms'):
+            log_entry['db_ms'] = record.db_ms
         
         # Add audit-specific fields for comprehensive audit logging
         if hasattr(record, 'audit_operation'):
@@ -79,8 +86,105 @@ class JSONFormatter(logging.Formatter):
         
         return json.dumps(log_entry, default=str)
 
+class QueuedHandler(logging.handlers.QueueHandler):
+    """Hands records to a listener thread that runs the real handler
+
+    Formatting a record -- a JSON dump of an item before and after, for an
+    audit line -- and writing it to a slow stdout consumer both happened on
+    the request thread. In front of each real handler sits one of these: the
+    request thread runs its filters (AuditLogFilter reads the request, so it
+    must) and queues the record, and a QueueListener formats and writes it.
+
+    The stdlib's ``prepare`` flattens a record for pickling -- formats it and
+    drops ``exc_info`` -- which would move a traceback out of JSONFormatter's
+    ``exception`` field and into ``message``. A queue.Queue never pickles, so
+    only the message is merged with its arguments, fixing its text before the
+    caller can change them.
+
+    Once its listener is stopped, records are handled on the calling thread
+    again, so lines logged during shutdown are not lost.
+    """
+
+    def __init__(self, target: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self.setLevel(target.level)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, target, respect_handler_level=True
+        )
+        self.running = False
+
+    def start(self):
+        self.listener.start()
+        self.running = True
+
+    def restart_after_fork(self):
+        """Give a forked child its own listener; threads do not survive a fork"""
+        if self.running:
+            self.listener = logging.handlers.QueueListener(
+                self.queue, self.target, respect_handler_level=True
+            )
+            self.listener.start()
+
+    def stop(self):
+        """Write out everything already queued, then stop the listener thread"""
+        if self.running:
+            self.running = False
+            self.listener.stop()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        if self.running:
+            super().emit(record)
+        else:
+            self.target.handle(self.prepare(record))
+
+
+# The QueuedHandlers setup_logging installed, drained at exit
+_queued_handlers = []
+
+
+def _queued(handler: logging.Handler, *filters: logging.Filter) -> QueuedHandler:
+    front = QueuedHandler(handler)
+    for log_filter in filters:
+        front.addFilter(log_filter)
+    front.start()
+    _queued_handlers.append(front)
+    return front
+
+
+def stop_logging():
+    """Drain the log queues and stop their threads
+
+    Registered with atexit; setup_logging also calls it before replacing the
+    handlers of an earlier call.
+    """
+    while _queued_handlers:
+        _queued_handlers.pop().stop()
+
+
+def _restart_after_fork():
+    for handler in _queued_handlers:
+        handler.restart_after_fork()
+
+
+atexit.register(stop_logging)
+# An app built before gunicorn forks (``--preload``) keeps logging in each worker
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
 def setup_logging(app):
-    """Configure comprehensive logging for the application using STDOUT/STDERR"""
+    """Configure comprehensive logging for the application using STDOUT/STDERR
+
+    Records are written by listener threads (see QueuedHandler), so a request
+    never waits on formatting or on stdout.
+    """
+    stop_logging()
     
     # Configure root logger
     log_level = getattr(logging, app.config.get('LOG_LEVEL', 'INFO').upper())
@@ -95,7 +199,7 @@ def setup_logging(app):
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(JSONFormatter())
     console_handler.setLevel(log_level)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(_queued(console_handler))
 
     # Create audit filter
     audit_filter = AuditLogFilter()
@@ -103,7 +207,6 @@ def setup_logging(app):
     # STDOUT handler for general logs
     stdout_handler = logging.StreamHandler()
     stdout_handler.setFormatter(JSONFormatter())
-    stdout_handler.addFilter(audit_filter)
     stdout_handler.setLevel(log_level)
     
     # STDERR handler for errors
@@ -111,8 +214,12 @@ def setup_logging(app):
     stderr_handler.setFormatter(logging.Formatter(
         '%(asctime)s ERROR [%(user_id)s@%(remote_addr)s] %(message)s\nURL: %(url)s\nMethod: %(method)s\nUser-Agent: %(user_agent)s\n%(pathname)s:%(lineno)d\n'
     ))
-    stderr_handler.addFilter(audit_filter)
     stderr_handler.setLevel(logging.ERROR)
+
+    # The audit filter reads the request, so it runs before the queue, on the
+    # request thread
+    stdout_handler = _queued(stdout_handler, audit_filter)
+    stderr_handler = _queued(stderr_handler, audit_filter)
     
     # Configure Flask app logger
     app.logger.handlers.clear()  # Clear default handlers
@@ -125,22 +232,22 @@ def setup_logging(app):
     
     # Performance logger
     perf_logger = logging.getLogger('performance')
-    perf_logger.addHandler(stdout_handler)
+    _replace_queued_handlers(perf_logger, stdout_handler)
     perf_logger.setLevel(logging.INFO)
     
     # API access logger
     api_logger = logging.getLogger('api_access')
-    api_logger.addHandler(stdout_handler)
+    _replace_queued_handlers(api_logger, stdout_handler)
     api_logger.setLevel(logging.INFO)
     
     # Google Sheets API logger
     sheets_logger = logging.getLogger('google_sheets')
-    sheets_logger.addHandler(stdout_handler)
+    _replace_queued_handlers(sheets_logger, stdout_handler)
     sheets_logger.setLevel(log_level)
     
     # Inventory operations logger
     inventory_logger = logging.getLogger('inventory')
-    inventory_logger.addHandler(stdout_handler)
+    _replace_queued_handlers(inventory_logger, stdout_handler)
     inventory_logger.setLevel(log_level)
     
     # Log startup information
@@ -155,6 +262,13 @@ def setup_logging(app):
     
     return app.logger
 
+def _replace_queued_handlers(logger: logging.Logger, handler: logging.Handler):
+    """Attach ``handler``, dropping any an earlier setup_logging attached"""
+    for existing in logger.handlers[:]:
+        if isinstance(existing, QueuedHandler):
+            logger.removeHandler(existing)
+    logger.addHandler(handler)
+
 def log_operation(operation_name: str, duration_ms: int = None, item_id: str = None, 
                  details: dict = None, logger_name: str = 'inventory'):
     """
@@ -247,6 +361,10 @@ def log_performance(operation: str, start_time: float, end_time: float,
     
     logger.info(message, extra=extra_data)
 
+def _build_payload(payload):
+    """An audit payload, building it first if it was passed as a function"""
+    return payload() if callable(payload) else payload
+
 def log_audit_operation(operation_name: str, phase: str, item_id: str = None, 
                        form_data: dict = None, item_before: dict = None, 
                        item_after: dict = None, changes: dict = None, 
@@ -264,8 +382,19 @@ def log_audit_operation(operation_name: str, phase: str, item_id: str = None,
         changes: Dictionary of changed fields (for edits)
         error_details: Error information if operation failed
         logger_name: Logger to use (defaults to 'inventory')
+
+    Any of the payloads may be passed as a function of no arguments that
+    returns it, called only when the audit logger is enabled -- so a caller
+    building an item's full dict pays for that only when it will be logged.
     """
     logger = logging.getLogger(logger_name)
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    form_data, item_before, item_after, changes = (
+        _build_payload(form_data), _build_payload(item_before),
+        _build_payload(item_after), _build_payload(changes)
+    )
     
     # Build audit data structure
     audit_data = {
@@ -327,8 +456,15 @@ def log_audit_batch_operation(operation_name: str, phase: str, batch_data: dict
         batch_data: Complete batch input data
         results: Batch operation results
         error_details: Error information if operation failed
+
+    As with log_audit_operation, ``batch_data`` and ``results`` may be
+    functions that build them, called only when the audit logger is enabled.
     """
     logger = logging.getLogger('inventory')
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    batch_data, results = _build_payload(batch_data), _build_payload(results)
     
     audit_data = {
         'audit_operation': operation_name,
@@ -1,8 +1,8 @@
-from flask import render_template, current_app, jsonify, abort, request, flash, redirect, url_for, send_file
+from flask import render_template, current_app, jsonify, abort, request, flash, redirect, url_for, send_file, session
 from datetime import datetime
 from typing import Any
 from app.main import bp
-from app import csrf, __version__
+from app import csrf, get_storage_backend, __version__
 from app.mariadb_storage import MariaDBStorage
 # Using unified InventoryService (MariaDB-based implementation)
 from app.mariadb_inventory_service import InventoryService
@@ -11,21 +11,20 @@ from app.taxonomy import type_shape_validator
 from app.models import ItemType, ItemShape, Dimensions, Thread, ThreadSeries, ThreadHandedness
 from app.database import InventoryItem
 from app.error_handlers import with_error_handling, ErrorHandler
-from app.exceptions import ValidationError, StorageError, ItemNotFoundError
+from app.exceptions import ValidationError, StorageError, ItemNotFoundError, PhotoProcessingPending
 from app.logging_config import log_audit_operation, log_audit_batch_operation
 from decimal import Decimal, InvalidOperation
 import traceback
 from config import Config
 
-def _get_storage_backend():
-    """Get the appropriate storage backend for the current app context"""
-    # Check if test storage is injected
-    if 'STORAGE_BACKEND' in current_app.config:
-        return current_app.config['STORAGE_BACKEND']
-    
-    # Use MariaDB storage (switched from Google Sheets in Milestone 2)
-    from app.mariadb_storage import MariaDBStorage
-    return MariaDBStorage()
+def _get_photo_job_queue():
+    """The process's photo job worker, or None to render photo sizes in the request"""
+    return current_app.config.get('PHOTO_JOB_WORKER')
+
+def _get_label_job_queue():
+    """The label print queue, printing on the process's worker thread if it has one"""
+    from app.label_jobs import LabelJobQueue
+    return LabelJobQueue(get_storage_backend(), worker=current_app.config.get('LABEL_JOB_WORKER'))
 
 def _item_to_audit_dict(item):
     """Convert InventoryItem object to dictionary for audit logging"""
@@ -72,7 +71,7 @@ def _detect_item_changes(item_before, item_after):
 
 def _get_inventory_service():
     """Get the MariaDB inventory service (only supported backend)"""
-    storage = _get_storage_backend()
+    storage = get_storage_backend()
     
     # All storage now uses MariaDB backend
     return InventoryService(storage)
@@ -81,7 +80,7 @@ def _get_photo_info(ja_id):
     """Get photo information for an item"""
     try:
         from app.photo_service import PhotoService
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             photos = photo_service.get_photos(ja_id)
             
             return {
@@ -112,10 +111,15 @@ def inventory_list():
     """Inventory list view"""
     return render_template('inventory/list.html', title='Inventory', ItemType=ItemType)
 
+def _get_taxonomy_snapshot():
+    """This process's material taxonomy snapshot (see app/taxonomy_cache.py)"""
+    from app.taxonomy_cache import get_taxonomy_snapshot
+    return get_taxonomy_snapshot(get_storage_backend().engine)
+
 def _get_valid_materials():
     """Get list of valid materials from the appropriate storage backend"""
     try:
-        storage = _get_storage_backend()
+        storage = get_storage_backend()
 
         # All storage now uses MariaDB backend
 
@@ -138,7 +142,7 @@ def _add_item_with_logging(service, item, operation='add_item', context=None):
         service: InventoryService instance
         item: InventoryItem object to add
         operation: Operation name for audit logging (default: 'add_item')
-        context: Optional dict with logging context (e.g., bulk_context, duplicate_context)
+        context: Optional dict with logging context (e.g., duplicate_context)
 
     Returns:
         Tuple of (success: bool, ja_id: str, error_message: str or None)
@@ -150,7 +154,7 @@ def _add_item_with_logging(service, item, operation='add_item', context=None):
             # AUDIT: Log successful operation
             log_audit_operation(operation, 'success',
                               item_id=item.ja_id,
-                              item_after=_item_to_audit_dict(item),
+                              item_after=lambda: _item_to_audit_dict(item),
                               form_data=context if context else None)
 
             return (True, item.ja_id, None)
@@ -199,7 +203,6 @@ def _missing_dimensions_error(input_data: dict) -> str | None:
 def _create_single_item(
     service,
     form_data: dict,
-    bulk_context: dict | None = None,
 ) -> tuple[bool, str | None, str | None, str | None]:
     """Parse, persist, and log a single add-item submission.
 
@@ -223,16 +226,8 @@ def _create_single_item(
         current_app.logger.error(f'Unexpected error parsing item: {error_msg}')
         return (False, form_data.get('ja_id'), error_msg, 'error')
 
-    context = None
-    if bulk_context:
-        context = {
-            'bulk_creation': True,
-            'bulk_index': bulk_context['index'],
-            'bulk_total': bulk_context['total'],
-        }
-
     try:
-        success, ja_id, error_msg = _add_item_with_logging(service, item, 'add_item', context)
+        success, ja_id, error_msg = _add_item_with_logging(service, item, 'add_item')
     except Exception as e:
         error_msg = str(e)
         current_app.logger.error(f'Error persisting item: {error_msg}')
@@ -241,7 +236,7 @@ def _create_single_item(
     return (success, ja_id, error_msg, None if success else 'error')
 
 
-def _process_item_creation(input_data: dict) -> dict[str, Any]:
+def _process_item_creation(input_data: dict, held_ja_id: str | None = None) -> dict[str, Any]:
     """Run validation, parsing, and persistence for an add-item
     submission, including bulk creation when ``quantity_to_create > 1``.
     Audit logging is performed inside.
@@ -250,11 +245,15 @@ def _process_item_creation(input_data: dict) -> dict[str, Any]:
         input_data: form-style dict (string keys/values) such as
             ``request.form.to_dict()``. JSON callers should normalize
             their payload via ``_normalize_json_item_payload`` first.
+        held_ja_id: the JA ID the caller was allocated, if any. A bulk
+            creation starting at it begins its block there rather than
+            after it.
 
     Returns:
         dict with keys:
-            ``status`` - one of ``'ok'``, ``'partial'``,
-                ``'validation_error'``, ``'error'``.
+            ``status`` - one of ``'ok'``, ``'validation_error'``,
+                ``'error'``. (``'partial'`` is no longer produced: a
+                bulk creation is one transaction, all or nothing.)
             ``created_ja_ids`` - list of successfully-created JA IDs.
             ``errors`` - list of ``{'index', 'ja_id', 'message'}``
                 dicts. Indices are 1-based, matching the natural
@@ -291,7 +290,7 @@ def _process_item_creation(input_data: dict) -> dict[str, Any]:
 
     material = input_data.get('material', '').strip()
     valid_materials = _get_valid_materials()
-    valid_materials_lower = [m.lower() for m in (valid_materials or []) if m]
+    valid_materials_lower = {m.lower() for m in (valid_materials or []) if m}
     if material and valid_materials_lower and material.lower() not in valid_materials_lower:
         return _validation_error(
             f'Material "{material}" is not valid. Please select from materials taxonomy.'
@@ -337,89 +336,60 @@ def _process_item_creation(input_data: dict) -> dict[str, Any]:
         f'Bulk creation: Creating {quantity_to_create} items starting from {input_data.get("ja_id")}'
     )
 
-    next_number = service.get_max_ja_id_number() + 1
-
+    # The block comes from the JA ID sequence; the starting JA ID is its floor
+    next_number = 1
     starting_ja_id = input_data.get('ja_id', '').strip()
     if starting_ja_id and starting_ja_id.startswith('JA'):
         try:
             next_number = max(next_number, int(starting_ja_id[2:]))
         except ValueError:
             pass
+    held = starting_ja_id if held_ja_id and starting_ja_id == held_ja_id else None
 
-    created_ja_ids: list[str] = []
-    errors: list[dict[str, Any]] = []
-    error_kinds: list[str] = []
-
-    for i in range(quantity_to_create):
-        ja_id = f"JA{next_number:06d}"
-        next_number += 1
-        position = i + 1
-
-        item_input = dict(input_data)
-        item_input['ja_id'] = ja_id
-
-        bulk_context = {'index': position, 'total': quantity_to_create}
-        success, created_ja_id, error_msg, error_kind = _create_single_item(
-            service, item_input, bulk_context
-        )
-
-        if success:
-            created_ja_ids.append(created_ja_id)
-        else:
-            current_app.logger.error(
-                f'Failed to create item {position}/{quantity_to_create}: {ja_id} - {error_msg}'
-            )
-            errors.append({'index': position, 'ja_id': ja_id, 'message': error_msg or 'Unknown error'})
-            error_kinds.append(error_kind or 'error')
+    # Every copy shares the input, so it is parsed once: a parse failure is a
+    # request-level validation problem
+    try:
+        item = _parse_item_from_form(input_data)
+    except (ValueError, InvalidOperation) as e:
+        current_app.logger.error(f'Validation error parsing item: {e}')
+        return _validation_error(str(e), requested_quantity=quantity_to_create)
 
-    if len(created_ja_ids) == quantity_to_create:
-        first_ja_id = created_ja_ids[0]
-        last_ja_id = created_ja_ids[-1]
-        current_app.logger.info(
-            f'Bulk creation complete: Created {len(created_ja_ids)} items ({first_ja_id} - {last_ja_id})'
-        )
+    def batch_data():
         return {
-            'status': 'ok',
-            'created_ja_ids': created_ja_ids,
-            'errors': [],
-            'message': f'Successfully created {len(created_ja_ids)} items: {first_ja_id} - {last_ja_id}',
-            'requested_quantity': quantity_to_create,
+            'bulk_creation': True,
+            'bulk_total': quantity_to_create,
+            'item': _item_to_audit_dict(item),
         }
 
-    if created_ja_ids:
-        msg = f'Created {len(created_ja_ids)} of {quantity_to_create} items. Some items failed.'
-        log_audit_operation('add_item', 'error',
-                            error_details=msg,
-                            form_data={
-                                'bulk_creation': True,
-                                'bulk_total': quantity_to_create,
-                                'bulk_succeeded': len(created_ja_ids),
-                            })
+    try:
+        # One transaction: every item is created, or none is
+        created_ja_ids = service.add_items(item, quantity_to_create, first_number=next_number,
+                                           held=held)
+    except Exception as e:
+        msg = f'Failed to create any items: {e}'
+        current_app.logger.error(msg)
+        log_audit_batch_operation('add_items', 'error', batch_data=batch_data, error_details=str(e))
         return {
-            'status': 'partial',
-            'created_ja_ids': created_ja_ids,
-            'errors': errors,
+            'status': 'error',
+            'created_ja_ids': [],
+            'errors': [{'index': 0, 'ja_id': None, 'message': msg}],
             'message': msg,
             'requested_quantity': quantity_to_create,
         }
 
-    msg = 'Failed to create any items'
-    log_audit_operation('add_item', 'error',
-                        error_details=msg,
-                        form_data={
-                            'bulk_creation': True,
-                            'bulk_total': quantity_to_create,
-                        })
-    # If every failure was a parse-time validation problem, surface the
-    # whole request as a 400 rather than 500 — bulk requests share input
-    # data, so a parse failure on the first item is a request-level
-    # validation problem.
-    status = 'validation_error' if error_kinds and all(k == 'validation_error' for k in error_kinds) else 'error'
+    first_ja_id = created_ja_ids[0]
+    last_ja_id = created_ja_ids[-1]
+    log_audit_batch_operation('add_items', 'success', batch_data=batch_data,
+                              results={'successful_count': len(created_ja_ids),
+                                       'created_ja_ids': created_ja_ids})
+    current_app.logger.info(
+        f'Bulk creation complete: Created {len(created_ja_ids)} items ({first_ja_id} - {last_ja_id})'
+    )
     return {
-        'status': status,
-        'created_ja_ids': [],
-        'errors': errors or [{'index': 0, 'ja_id': None, 'message': msg}],
-        'message': msg,
+        'status': 'ok',
+        'created_ja_ids': created_ja_ids,
+        'errors': [],
+        'message': f'Successfully created {len(created_ja_ids)} items: {first_ja_id} - {last_ja_id}',
         'requested_quantity': quantity_to_create,
     }
 
@@ -520,14 +490,12 @@ def api_create_items() -> Any:
     # The server always allocates JA IDs for JSON callers. The shared
     # helper expects ja_id to be present in input_data (it's required
     # by the form path and used by _parse_item_from_form), so we
-    # allocate the next free ID and inject it before delegating. For
-    # bulk requests, the helper's own loop allocates each per-item ID;
-    # the value we set here becomes the floor for that loop, which
-    # equals what the loop would have computed itself.
+    # allocate one from the JA ID sequence and inject it before
+    # delegating. For bulk requests it is held for the caller, so the
+    # block starts at it.
     try:
         service = _get_inventory_service()
-        next_number = service.get_max_ja_id_number() + 1
-        normalized['ja_id'] = f'JA{next_number:06d}'
+        normalized['ja_id'] = service.allocate_ja_ids(1)[0]
     except Exception as e:
         current_app.logger.error(
             f'Failed to allocate JA ID for API request: {e}\n{traceback.format_exc()}'
@@ -540,7 +508,7 @@ def api_create_items() -> Any:
         }), 500
 
     try:
-        result = _process_item_creation(normalized)
+        result = _process_item_creation(normalized, held_ja_id=normalized['ja_id'])
     except Exception as e:
         current_app.logger.error(
             f'Unexpected error in API item creation: {e}\n{traceback.format_exc()}'
@@ -591,7 +559,7 @@ def inventory_add():
     try:
         form_data = request.form.to_dict()
 
-        result = _process_item_creation(form_data)
+        result = _process_item_creation(form_data, held_ja_id=session.get('reserved_ja_id'))
 
         if result['status'] == 'validation_error':
             return jsonify({
@@ -682,7 +650,7 @@ def inventory_edit(ja_id):
         log_audit_operation('edit_item', 'input', 
                           item_id=ja_id, 
                           form_data=form_data,
-                          item_before=_item_to_audit_dict(item))
+                          item_before=lambda: _item_to_audit_dict(item))
         
         # Validate required fields
         required_fields = ['ja_id', 'item_type', 'shape', 'material', 'location']
@@ -743,12 +711,11 @@ def inventory_edit(ja_id):
         
         if result:
             # AUDIT: Log successful edit operation with changes
-            changes = _detect_item_changes(item, updated_item)
             log_audit_operation('edit_item', 'success', 
                               item_id=ja_id,
-                              item_before=_item_to_audit_dict(item),
-                              item_after=_item_to_audit_dict(updated_item),
-                              changes=changes)
+                              item_before=lambda: _item_to_audit_dict(item),
+                              item_after=lambda: _item_to_audit_dict(updated_item),
+                              changes=lambda: _detect_item_changes(item, updated_item))
             flash('Item updated successfully!', 'success')
             return redirect(url_for('main.inventory_list'))
         else:
@@ -811,16 +778,14 @@ def duplicate_item(ja_id):
             # Reload the item to get fresh data
             source_item = service.get_item(ja_id)
 
-        # Get next available JA ID via a single SQL aggregate
-        next_number = service.get_max_ja_id_number() + 1
+        # Take the duplicates' JA IDs from the JA ID sequence in one step
+        new_ja_ids = service.allocate_ja_ids(quantity)
 
         created_ja_ids = []
         photos_copied_per_item = 0  # Track photo count for success message
 
         # Create N duplicates with sequential JA IDs
-        for i in range(quantity):
-            new_ja_id = f"JA{next_number:06d}"
-            next_number += 1
+        for i, new_ja_id in enumerate(new_ja_ids):
 
             # Create duplicate item (copy all fields except JA ID, photos, history)
             from app.database import InventoryItem
@@ -888,7 +853,7 @@ def duplicate_item(ja_id):
                 # Copy photos from source item to duplicate
                 try:
                     from app.photo_service import PhotoService
-                    with PhotoService(_get_storage_backend()) as photo_service:
+                    with PhotoService(get_storage_backend()) as photo_service:
                         photo_count = photo_service.copy_photos(ja_id, created_ja_id)
                         if i == 0:  # Store count from first duplicate (all should be same)
                             photos_copied_per_item = photo_count
@@ -1087,17 +1052,17 @@ def api_stats():
             from app.database import InventoryItem
             from sqlalchemy import func
             
-            session = service.Session()
+            db_session = service.Session()
             try:
                 # Get total count (active + inactive)
-                total_items = session.query(func.count(InventoryItem.id)).scalar()
+                total_items = db_session.query(func.count(InventoryItem.id)).scalar()
                 
                 # Get active count only
-                active_items = session.query(func.count(InventoryItem.id)).filter(
+                active_items = db_session.query(func.count(InventoryItem.id)).filter(
                     InventoryItem.active == True
                 ).scalar()
             finally:
-                session.close()
+                db_session.close()
         else:
             # Fallback for other service types (e.g., tests)
             items = service.get_all_items()
@@ -1155,37 +1120,8 @@ def material_suggestions():
         limit = 10
     
     try:
-        # Get all valid materials using the appropriate storage backend
-        all_materials = _get_valid_materials()
-        
-        if not query:
-            # Return first N materials if no query
-            return jsonify(all_materials[:limit])
-        
-        # Filter materials based on query (case insensitive)
-        query_lower = query.lower()
-        suggestions = []
-        
-        # Exact matches first
-        for material in all_materials:
-            if material.lower() == query_lower:
-                suggestions.insert(0, material)
-                break
-        
-        # Starts with matches
-        for material in all_materials:
-            if (material.lower().startswith(query_lower) and 
-                material not in suggestions):
-                suggestions.append(material)
-        
-        # Contains matches
-        for material in all_materials:
-            if (query_lower in material.lower() and 
-                material not in suggestions):
-                suggestions.append(material)
-        
-        # Return limited results
-        return jsonify(suggestions[:limit])
+        # Exact match, then prefix, then substring, from the taxonomy snapshot
+        return jsonify(_get_taxonomy_snapshot().suggest(query, limit))
         
     except Exception as e:
         current_app.logger.error(f'Error getting material suggestions for "{query}": {e}')
@@ -1221,7 +1157,7 @@ def inventory_field_suggestions(field):
     try:
         from app.services.vocabulary import VocabularyService
 
-        service = VocabularyService(_get_storage_backend())
+        service = VocabularyService(get_storage_backend())
         suggestions = service.suggest(
             field,
             query=query or None,
@@ -1287,7 +1223,7 @@ def api_taxonomy():
 
         include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
 
-        admin_service = MariaDBMaterialsAdminService(_get_storage_backend())
+        admin_service = MariaDBMaterialsAdminService(get_storage_backend())
         taxonomy = admin_service.get_taxonomy_overview(include_inactive=include_inactive)
 
         # Normalize `aliases` into a proper list. The admin service
@@ -1321,68 +1257,10 @@ def materials_hierarchy():
     general-purpose ``GET /api/taxonomy`` endpoint instead.
     """
     try:
-        from app.database import MaterialTaxonomy
-        from app.mariadb_storage import MariaDBStorage
-        from sqlalchemy.orm import sessionmaker
-        
-        # Use injected storage backend if available (for testing), otherwise create new one
-        if current_app.config.get('STORAGE_BACKEND'):
-            storage = current_app.config['STORAGE_BACKEND']
-            engine = storage.engine
-        else:
-            # Create MariaDB storage and session directly
-            storage = MariaDBStorage()
-            storage.connect()
-            engine = storage.engine
-            
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        
-        # Get all active materials ordered by level and sort order
-        all_materials = session.query(MaterialTaxonomy).filter(
-            MaterialTaxonomy.active == True
-        ).order_by(MaterialTaxonomy.level, MaterialTaxonomy.sort_order, MaterialTaxonomy.name).all()
-        
-        # Group materials by level
-        categories = [m for m in all_materials if m.level == 1]
-        families = [m for m in all_materials if m.level == 2]  
-        materials = [m for m in all_materials if m.level == 3]
-        
-        # Build hierarchical structure
-        hierarchy = []
-        
-        for category in categories:
-            category_families = [f for f in families if f.parent == category.name]
-            category_data = {
-                'name': category.name,
-                'level': category.level,
-                'notes': category.notes,
-                'families': []
-            }
-            
-            for family in category_families:
-                family_materials = [m for m in materials if m.parent == family.name]
-                family_data = {
-                    'name': family.name,
-                    'level': family.level,
-                    'parent': family.parent,
-                    'notes': family.notes,
-                    'materials': [{'name': m.name, 'level': m.level, 'parent': m.parent, 'aliases': m.aliases, 'notes': m.notes} for m in family_materials]
-                }
-                category_data['families'].append(family_data)
-            
-            hierarchy.append(category_data)
-        
-        session.close()
-        
+        # Rendered once per taxonomy version
         return jsonify({
             'success': True,
-            'hierarchy': hierarchy,
-            'summary': {
-                'categories': len(categories),
-                'total_families': sum(len(cat['families']) for cat in hierarchy),
-                'total_materials': sum(sum(len(fam['materials']) for fam in cat['families']) for cat in hierarchy)
-            }
+            **_get_taxonomy_snapshot().hierarchy
         })
         
     except Exception as e:
@@ -1563,18 +1441,8 @@ def batch_move_items():
                 'error': error_msg
             }), 400
         
-        # AUDIT: Log batch move input phase
-        log_audit_batch_operation('batch_move_items', 'input', 
-                                batch_data={
-                                    'move_count': len(moves),
-                                    'moves': moves
-                                })
-        
-        service = _get_inventory_service()
-        
-        successful_moves = 0
         failed_moves = []
-        
+        destinations = {}
         for move in moves:
             ja_id = move.get('ja_id')
             new_location = move.get('new_location')
@@ -1587,91 +1455,32 @@ def batch_move_items():
                 })
                 continue
 
-            try:
-                # Get the current item
-                item = service.get_item(ja_id)
-                if not item:
-                    failed_moves.append({
-                        'ja_id': ja_id,
-                        'error': 'Item not found'
-                    })
-                    continue
-
-                # Store old values for audit logging
-                old_location = item.location
-                old_sub_location = item.sub_location
-
-                # Update location
-                item.location = new_location.strip()
-
-                # Update sub-location with clearing logic:
-                # - If new_sub_location is provided and non-empty, set it (stripped)
-                # - If new_sub_location is not provided or empty, clear it (set to None)
-                if new_sub_location and new_sub_location.strip():
-                    item.sub_location = new_sub_location.strip()
-                else:
-                    item.sub_location = None
-
-                # AUDIT: Log individual move operation input
-                log_audit_operation('move_item', 'input',
-                                  item_id=ja_id,
-                                  form_data={
-                                      'ja_id': ja_id,
-                                      'new_location': new_location,
-                                      'new_sub_location': new_sub_location,
-                                      'old_location': old_location,
-                                      'old_sub_location': old_sub_location
-                                  },
-                                  item_before=_item_to_audit_dict(item))
-
-                # Save the updated item
-                if service.update_item(item):
-                    successful_moves += 1
-                    # AUDIT: Log successful individual move with location and sub-location changes
-                    changes = {
-                        'location': {'before': old_location, 'after': new_location}
-                    }
-                    # Only log sub_location change if it actually changed
-                    if old_sub_location != item.sub_location:
-                        changes['sub_location'] = {'before': old_sub_location, 'after': item.sub_location}
-
-                    log_audit_operation('move_item', 'success',
-                                      item_id=ja_id,
-                                      changes=changes)
-
-                    # Build log message
-                    log_msg = f'Moved {ja_id} from "{old_location}" to "{new_location}"'
-                    if old_sub_location != item.sub_location:
-                        log_msg += f' (sub-location: "{old_sub_location}" -> "{item.sub_location}")'
-                    current_app.logger.info(log_msg)
-                else:
-                    # AUDIT: Log failed individual move
-                    log_audit_operation('move_item', 'error',
-                                      item_id=ja_id,
-                                      error_details='Service update_item returned False')
-                    failed_moves.append({
-                        'ja_id': ja_id,
-                        'error': 'Failed to update item'
-                    })
-                    
-            except Exception as e:
-                # AUDIT: Log individual move exception
-                import traceback
-                tb_str = traceback.format_exc()
-                exc_info = traceback.extract_tb(e.__traceback__)[-1] if e.__traceback__ else None
-                if exc_info:
-                    error_details = f'Exception during move: {type(e).__name__}: {str(e)} at {exc_info.filename}:{exc_info.lineno} in {exc_info.name}(). Traceback: {tb_str}'
-                else:
-                    error_details = f'Exception during move: {type(e).__name__}: {str(e)}. Traceback: {tb_str}'
-                log_audit_operation('move_item', 'error',
-                                  item_id=ja_id,
-                                  error_details=error_details)
-                current_app.logger.error(f'Error moving item {ja_id}: {error_details}')
-                failed_moves.append({
-                    'ja_id': ja_id,
-                    'error': str(e)
-                })
-        
+            # Sub-location clearing logic: a non-empty value is set (stripped);
+            # a missing or blank one clears it
+            destinations[ja_id] = {
+                'location': new_location.strip(),
+                'sub_location': new_sub_location.strip() if new_sub_location and new_sub_location.strip() else None,
+            }
+
+        # Every move is applied in one transaction, as an UPDATE per destination
+        service = _get_inventory_service()
+        before, missing = service.move_items(destinations) if destinations else ({}, [])
+        for ja_id in missing:
+            failed_moves.append({
+                'ja_id': ja_id,
+                'error': 'Item not found'
+            })
+
+        changes = {}
+        for ja_id, old in before.items():
+            new = destinations[ja_id]
+            item_changes = {'location': {'before': old['location'], 'after': new['location']}}
+            # Only record sub_location when it actually changed
+            if old['sub_location'] != new['sub_location']:
+                item_changes['sub_location'] = {'before': old['sub_location'], 'after': new['sub_location']}
+            changes[ja_id] = item_changes
+        successful_moves = len(changes)
+
         # Prepare response
         response_data = {
             'success': len(failed_moves) == 0,
@@ -1683,16 +1492,19 @@ def batch_move_items():
         if len(failed_moves) > 0:
             response_data['error'] = f'{len(failed_moves)} items failed to move'
         
-        # AUDIT: Log batch move completion with results
+        # AUDIT: One event for the whole batch, with each item's changes
         batch_results = {
             'successful_count': successful_moves,
             'failed_count': len(failed_moves),
             'total_count': len(moves),
             'failed_items': [fm['ja_id'] for fm in failed_moves],
+            'changes': changes,
             'overall_success': len(failed_moves) == 0
         }
-        log_audit_batch_operation('batch_move_items', 'success', 
+        log_audit_batch_operation('batch_move_items', 'success',
+                                batch_data={'move_count': len(moves), 'moves': moves},
                                 results=batch_results)
+        current_app.logger.info(f'Batch move: moved {successful_moves} of {len(moves)} items')
         
         return jsonify(response_data)
         
@@ -1705,7 +1517,6 @@ def batch_move_items():
             error_details = f'Exception during move: {type(e).__name__}: {str(e)} at {exc_info.filename}:{exc_info.lineno} in {exc_info.name}(). Traceback: {tb_str}'
         else:
             error_details = f'Exception during move: {type(e).__name__}: {str(e)}. Traceback: {tb_str}'
-        current_app.logger.error(f'Error moving item {ja_id}: {error_details}')
         log_audit_batch_operation('batch_move_items', 'error',
                                 error_details=f'Batch move exception: {error_details}')
         current_app.logger.error(f'Batch move error: {error_details}\n{traceback.format_exc()}')
@@ -1716,11 +1527,16 @@ def batch_move_items():
 
 @bp.route('/api/inventory/next-ja-id')
 def get_next_ja_id():
-    """Get the next available JA ID"""
+    """Allocate a JA ID to this client from the JA ID sequence
+
+    The ID is remembered in the client's session and offered again on the
+    next call while it is still unused and nobody has been allocated one
+    since, so reloading the add form does not use up numbers.
+    """
     try:
         service = _get_inventory_service()
-        next_number = service.get_max_ja_id_number() + 1
-        next_id = f"JA{next_number:06d}"
+        next_id = service.reserve_ja_id(session.get('reserved_ja_id'))
+        session['reserved_ja_id'] = next_id
 
         return jsonify({
             'success': True,
@@ -1771,61 +1587,104 @@ def thread_series_lookup():
             'error': 'Failed to lookup thread series'
         }), 500
 
+def _read_label_request(data):
+    """Validate the label type and count of a print request
+
+    Returns:
+        (label_type, label_count, None), or (None, None, error response)
+    """
+    from app.services.label_printer import get_available_label_types
+
+    label_type = str(data.get('label_type', '')).strip()
+    if not label_type:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'label_type is required'
+        }), 400)
+
+    available_types = get_available_label_types()
+    if label_type not in available_types:
+        return None, None, (jsonify({
+            'success': False,
+            'error': f'Invalid label type. Available types: {available_types}'
+        }), 400)
+
+    # Validate label count. Absent means 1, which is what lets callers that
+    # do not send a count keep working unchanged.
+    label_count = data.get('label_count', 1)
+    # bool is a subclass of int, so True would otherwise pass as 1.
+    if isinstance(label_count, bool) or not isinstance(label_count, int):
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'label_count must be a whole number'
+        }), 400)
+    if label_count < 1 or label_count > 99:
+        return None, None, (jsonify({
+            'success': False,
+            'error': 'label_count must be between 1 and 99'
+        }), 400)
+
+    return label_type, label_count, None
+
+
+def _is_ja_id(ja_id):
+    return ja_id.startswith('JA') and len(ja_id) == 8 and ja_id[2:].isdigit()
+
+
 @bp.route('/api/labels/print', methods=['POST'])
 @csrf.exempt
 def print_label():
-    """Print a barcode label for a JA ID"""
+    """Print a barcode label for a JA ID
+
+    The label is queued as a one-item print job. When labels print in the
+    background this answers 202 with the job to poll; otherwise the job has
+    already run and this answers with its outcome, as it always has.
+    """
     try:
-        from app.services.label_printer import print_label_for_ja_id, get_available_label_types
-        
         data = request.get_json() or {}
         ja_id = data.get('ja_id', '').strip()
-        label_type = data.get('label_type', '').strip()
         
         if not ja_id:
             return jsonify({
                 'success': False,
                 'error': 'ja_id is required'
             }), 400
-            
-        if not label_type:
+
+        if not str(data.get('label_type', '')).strip():
             return jsonify({
                 'success': False,
                 'error': 'label_type is required'
             }), 400
-        
-        # Validate JA ID format
-        if not (ja_id.startswith('JA') and len(ja_id) == 8 and ja_id[2:].isdigit()):
+
+        # Validate JA ID format before the label type and count, as always
+        if not _is_ja_id(ja_id):
             return jsonify({
                 'success': False,
                 'error': 'Invalid JA ID format. Expected format: JA######'
             }), 400
-        
-        # Validate label type
-        available_types = get_available_label_types()
-        if label_type not in available_types:
-            return jsonify({
-                'success': False,
-                'error': f'Invalid label type. Available types: {available_types}'
-            }), 400
 
-        # Validate label count. Absent means 1, which is what lets callers that
-        # do not send a count keep working unchanged.
-        label_count = data.get('label_count', 1)
-        # bool is a subclass of int, so True would otherwise pass as 1.
-        if isinstance(label_count, bool) or not isinstance(label_count, int):
-            return jsonify({
-                'success': False,
-                'error': 'label_count must be a whole number'
-            }), 400
-        if label_count < 1 or label_count > 99:
-            return jsonify({
-                'success': False,
-                'error': 'label_count must be between 1 and 99'
-            }), 400
+        label_type, label_count, error = _read_label_request(data)
+        if error:
+            return error
 
-        # Print the label
-        print_label_for_ja_id(ja_id, label_type, label_count)
+        job = _get_label_job_queue().submit_ja_ids([ja_id], label_type, label_count)
+
+        result = {
+            'ja_id': ja_id,
+            'label_type': label_type,
+            'label_count': label_count,
+            'job': job
+        }
+
+        if job['status'] in ('pending', 'running'):
+            return jsonify(dict(result, success=True, message=f'Label queued for {ja_id}')), 202
+
+        if job['status'] == 'failed':
+            failure = job['failures'][0] if job['failures'] else {}
+            if failure.get('invalid'):
+                current_app.logger.warning(f'Validation error printing label: {failure["error"]}')
+                return jsonify(dict(result, success=False, error=failure['error'])), 400
+            return jsonify(dict(result, success=False, error='Failed to print label')), 500
 
         current_app.logger.info(
             f'Successfully printed {label_count} {label_type} label(s) for {ja_id}'
@@ -1836,26 +1695,71 @@ def print_label():
         else:
             message = f'{label_count} labels printed successfully for {ja_id}'
 
+        return jsonify(dict(result, success=True, message=message))
+
+    except Exception as e:
+        current_app.logger.error(f'Error printing label: {e}')
         return jsonify({
-            'success': True,
-            'message': message,
-            'ja_id': ja_id,
-            'label_type': label_type,
-            'label_count': label_count
-        })
+            'success': False,
+            'error': 'Failed to print label'
+        }), 500
 
-    except ValueError as e:
-        current_app.logger.warning(f'Validation error printing label: {e}')
+@bp.route('/api/labels/jobs', methods=['POST'])
+def submit_label_job():
+    """Queue labels for several JA IDs as one print job
+
+    Expects JSON: {"ja_ids": [...], "label_type": "...", "label_count": 1}.
+    Answers 202 with the job; ``GET /api/labels/jobs/<id>`` follows it.
+    """
+    try:
+        data = request.get_json() or {}
+        ja_ids = data.get('ja_ids')
+
+        if not isinstance(ja_ids, list) or not ja_ids:
+            return jsonify({
+                'success': False,
+                'error': 'ja_ids must be a non-empty list'
+            }), 400
+
+        ja_ids = [str(ja_id).strip() for ja_id in ja_ids]
+        invalid = [ja_id for ja_id in ja_ids if not _is_ja_id(ja_id)]
+        if invalid:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid JA ID format. Expected format: JA######: {", ".join(invalid)}'
+            }), 400
+
+        label_type, label_count, error = _read_label_request(data)
+        if error:
+            return error
+
+        job = _get_label_job_queue().submit_ja_ids(ja_ids, label_type, label_count)
+        return jsonify({'success': True, 'job': job}), 202
+
+    except Exception as e:
+        current_app.logger.error(f'Error queueing label job: {e}')
         return jsonify({
             'success': False,
-            'error': str(e)
-        }), 400
-        
+            'error': 'Failed to queue labels'
+        }), 500
+
+@bp.route('/api/labels/jobs/<int:job_id>')
+def get_label_job(job_id):
+    """A label print job's progress: printed of total, and what failed"""
+    try:
+        job = _get_label_job_queue().get_job(job_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': f'Label job {job_id} not found'
+            }), 404
+        return jsonify({'success': True, 'job': job})
+
     except Exception as e:
-        current_app.logger.error(f'Error printing label: {e}')
+        current_app.logger.error(f'Error reading label job {job_id}: {e}')
         return jsonify({
             'success': False,
-            'error': 'Failed to print label'
+            'error': 'Failed to read label job'
         }), 500
 
 @bp.route('/api/labels/types')
@@ -1878,14 +1782,100 @@ def get_label_types():
             'error': 'Failed to get label types'
         }), 500
 
+# A preview changes only when the label renderer does, so an hour is safe
+_LABEL_PREVIEW_MAX_AGE = 60 * 60
+
+
+@bp.route('/api/labels/preview')
+def preview_label():
+    """The PNG a JA ID's label would print as, on the given stock
+
+    Query parameters ``ja_id`` and ``label_type``. Served from the rendered
+    label cache, so previewing and then printing a label renders it once.
+    """
+    try:
+        from app.services.label_printer import get_available_label_types, render_label_for_ja_id
+        import hashlib
+        import io
+
+        ja_id = request.args.get('ja_id', '').strip()
+        label_type = request.args.get('label_type', '').strip()
+
+        if not _is_ja_id(ja_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid JA ID format. Expected format: JA######'
+            }), 400
+
+        available_types = get_available_label_types()
+        if label_type not in available_types:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid label type. Available types: {available_types}'
+            }), 400
+
+        png = render_label_for_ja_id(ja_id, label_type)
+        return send_file(
+            io.BytesIO(png),
+            mimetype='image/png',
+            etag=hashlib.sha256(png).hexdigest(),
+            max_age=_LABEL_PREVIEW_MAX_AGE,
+            conditional=True
+        )
+
+    except Exception as e:
+        current_app.logger.error(f'Error rendering label preview: {e}')
+        return jsonify({
+            'success': False,
+            'error': 'Failed to render label preview'
+        }), 500
+
+# Default and ceiling for ``page_size`` on the paged inventory endpoints. The
+# ceiling is what keeps a response bounded however large the inventory grows.
+_DEFAULT_INVENTORY_PAGE_SIZE = 100
+_MAX_INVENTORY_PAGE_SIZE = 500
+
+
+def _read_page_request(params) -> dict[str, Any] | None:
+    """Read keyset paging parameters from query args or a JSON body.
+
+    Paging is opt-in: a request with neither ``page_size`` nor ``cursor``
+    returns every match, as these endpoints always have. Otherwise the
+    result is the keyword arguments for ``InventoryService.search_items_page``.
+
+    Raises:
+        ValueError: If ``page_size`` is not a positive integer
+    """
+    if params.get('page_size') in (None, '') and not params.get('cursor'):
+        return None
+
+    try:
+        page_size = int(params.get('page_size') or _DEFAULT_INVENTORY_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise ValueError('page_size must be an integer')
+    if page_size < 1:
+        raise ValueError('page_size must be positive')
+
+    return {
+        'page_size': min(page_size, _MAX_INVENTORY_PAGE_SIZE),
+        'sort': params.get('sort') or 'ja_id',
+        'descending': str(params.get('order') or 'asc').lower() == 'desc',
+        'cursor': params.get('cursor') or None,
+    }
+
+
 @bp.route('/api/inventory/list')
 def api_inventory_list():
-    """Get inventory list data for the frontend"""
+    """Get inventory list data for the frontend
+
+    With ``page_size`` (and then ``cursor``, ``sort`` and ``order``) this
+    returns one keyset page plus ``next_cursor``; ``item_type``, ``material``
+    and ``search`` narrow the list on the server.
+    """
     try:
         service = _get_inventory_service()
 
         # Get status filter from query parameter (default: all)
-        # The frontend will handle filtering based on the dropdown selection
         status = request.args.get('status', 'all')
 
         # Build filter dict based on status
@@ -1900,12 +1890,34 @@ def api_inventory_list():
             # Invalid status value, default to all items
             filters['active'] = ''
 
-        # Get items using search_active_items which handles the active filter
-        items = service.search_active_items(filters)
+        if request.args.get('item_type'):
+            filters['item_type'] = request.args['item_type']
+        if request.args.get('material'):
+            filters['material'] = request.args['material']
+        if request.args.get('search'):
+            filters['text'] = request.args['search']
+
+        try:
+            page_request = _read_page_request(request.args)
+            if page_request is None:
+                # Get items using search_active_items which handles the active filter
+                items = service.search_active_items(filters)
+                total_count = len(items)
+                next_cursor = None
+            else:
+                page = service.search_items_page(filters, **page_request)
+                items, total_count, next_cursor = page.items, page.total_count, page.next_cursor
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'items': [],
+                'total_count': 0
+            }), 400
         
         # Get photo counts for all items efficiently
         from app.photo_service import PhotoService
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             ja_ids = [item.ja_id for item in items]
             photo_counts = photo_service.get_photo_counts_bulk(ja_ids)
         
@@ -1941,7 +1953,8 @@ def api_inventory_list():
         return jsonify({
             'success': True,
             'items': items_data,
-            'total_count': len(items_data)
+            'total_count': total_count,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -2033,6 +2046,10 @@ def api_advanced_search():
         
         if data.get('notes'):
             search_filter.add_text_search('notes', data['notes'])
+
+        # Free-text keywords across every text field, ranked
+        if data.get('q'):
+            search_filter.keywords(data['q'])
         
         # Type and shape filters
         if data.get('item_type'):
@@ -2078,12 +2095,10 @@ def api_advanced_search():
             elif isinstance(data['precision'], str):
                 search_filter.add_exact_match('precision', data['precision'].lower() == 'true')
         
-        # Material filter with hierarchical support
+        # Material filter with hierarchical support: the material and all of
+        # its descendants, expanded inside the search query itself
         if data.get('material'):
-            # Get all descendant materials in the hierarchy for hierarchical search
-            material_descendants = service.get_material_descendants(data['material'])
-            # Add the material list directly to the filter for hierarchical matching
-            search_filter.add_exact_match('material', material_descendants)
+            search_filter.material_subtree(data['material'])
         
         # Dimension range filters
         dimension_fields = ['length', 'width', 'thickness', 'wall_thickness']
@@ -2121,12 +2136,27 @@ def api_advanced_search():
                 }), 400
         
         
-        # Execute search
-        items = service.search_items(search_filter)
+        # Execute search, one keyset page at a time if the caller asked to page
+        try:
+            page_request = _read_page_request(data)
+            if page_request is None:
+                items = service.search_items(search_filter)
+                total_count = len(items)
+                next_cursor = None
+            else:
+                page = service.search_items_page(search_filter.to_dict(), **page_request)
+                items, total_count, next_cursor = page.items, page.total_count, page.next_cursor
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e),
+                'items': [],
+                'total_count': 0
+            }), 400
 
         # Get photo counts for all items efficiently
         from app.photo_service import PhotoService
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             ja_ids = [item.ja_id for item in items]
             photo_counts = photo_service.get_photo_counts_bulk(ja_ids)
 
@@ -2160,7 +2190,8 @@ def api_advanced_search():
         return jsonify({
             'success': True,
             'items': items_data,
-            'total_count': len(items_data),
+            'total_count': total_count,
+            'next_cursor': next_cursor,
             'search_criteria': data
         })
 
@@ -2420,6 +2451,7 @@ def api_admin_export():
         # Parse export options
         export_type = data.get('type', 'combined')  # 'inventory', 'materials', or 'combined'
         destination = data.get('destination', 'json')  # 'json' or 'sheets'
+        sync_mode = data.get('sync_mode', 'delta')  # 'delta' or 'full', for sheets
         options_data = data.get('options', {})
         
         # Validate export type
@@ -2436,6 +2468,13 @@ def api_admin_export():
                 'error': 'Invalid destination. Must be json or sheets.'
             }), 400
         
+        # Validate sync mode
+        if sync_mode not in ['delta', 'full']:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid sync_mode. Must be delta or full.'
+            }), 400
+        
         # Import export services
         from app.export_service import InventoryExportService, MaterialsExportService, CombinedExportService
         from app.export_schemas import ExportOptions
@@ -2460,7 +2499,7 @@ def api_admin_export():
         
         # Execute export based on type
         if export_type == 'inventory':
-            service = InventoryExportService()
+            service = InventoryExportService(storage_backend=get_storage_backend())
             headers, rows, metadata = service.export_complete_dataset(options)
             
             result = {
@@ -2477,7 +2516,7 @@ def api_admin_export():
             }
             
         elif export_type == 'materials':
-            service = MaterialsExportService()
+            service = MaterialsExportService(storage_backend=get_storage_backend())
             headers, rows, metadata = service.export_complete_dataset(options)
             
             result = {
@@ -2494,7 +2533,7 @@ def api_admin_export():
             }
             
         else:  # combined
-            service = CombinedExportService()
+            service = CombinedExportService(storage_backend=get_storage_backend())
             result = service.export_all_data(options)
         
         # Handle destination
@@ -2523,7 +2562,7 @@ def api_admin_export():
             
         elif destination == 'sheets':
             # Upload to Google Sheets
-            upload_result = _upload_to_google_sheets(result, export_type)
+            upload_result = _upload_to_google_sheets(result, export_type, sync_mode)
             
             # Debug logging to understand the upload_result structure
             current_app.logger.info(f'Upload result: {upload_result}')
@@ -2610,7 +2649,7 @@ def api_export_validate():
             }), 400
         
         from app.export_service import CombinedExportService
-        service = CombinedExportService()
+        service = CombinedExportService(storage_backend=get_storage_backend())
         
         validation_result = service.validate_export_data(export_data)
         
@@ -2626,15 +2665,70 @@ def api_export_validate():
             'error': f'Validation failed: {str(e)}'
         }), 500
 
-def _upload_to_google_sheets(export_data, export_type):
-    """Upload export data to Google Sheets"""
+_EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+@bp.route('/api/export/<dataset>.<any(csv, ndjson):fmt>')
+def api_export_download(dataset, fmt):
+    """Download one dataset as CSV or newline-delimited JSON
+
+    Streamed: rows are read from one query and written out a chunk at a time,
+    so the size of the export does not decide the worker's memory, and nothing
+    leaves the machine. Datasets are inventory, materials, products,
+    purchases and identifiers.
+
+    Query Parameters:
+        include_inactive: inventory only, include inactive items (default true)
+    """
+    from flask import Response, stream_with_context
+    from app.export_service import (
+        InventoryExportService, MaterialsExportService, CatalogExportService,
+        csv_chunks, ndjson_chunks
+    )
+    from app.export_schemas import ExportOptions
+
+    options = ExportOptions()
+    options.enable_progress_logging = False
+    options.inventory_include_inactive = request.args.get('include_inactive', 'true').lower() != 'false'
+
+    storage_backend = get_storage_backend()
+    if dataset == 'inventory':
+        headers, rows, metadata = InventoryExportService(storage_backend=storage_backend).stream_dataset(options)
+    elif dataset == 'materials':
+        headers, rows, metadata = MaterialsExportService(storage_backend=storage_backend).stream_dataset(options)
+    elif dataset in ('products', 'purchases', 'identifiers'):
+        catalog = CatalogExportService(storage_backend=storage_backend)
+        headers, rows, metadata = getattr(catalog, f'stream_{dataset}')(options)
+    else:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid dataset. Must be inventory, materials, products, purchases, or identifiers.'
+        }), 404
+
+    encode = csv_chunks if fmt == 'csv' else ndjson_chunks
+
+    def body():
+        yield from encode(headers, rows)
+        current_app.logger.info(f'Streamed {dataset} export as {fmt}: {metadata.records_exported} rows')
+
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    response = Response(stream_with_context(body()), mimetype=_EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # A proxy that buffers the response would hold the whole export again
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def _upload_to_google_sheets(export_data, export_type, sync_mode='delta'):
+    """Upload export data to Google Sheets, sending only changes unless sync_mode is 'full'"""
     try:
         from app.google_sheets_export import GoogleSheetsExportService
         
         current_app.logger.info(f'Starting Google Sheets upload for {export_type} export')
         
         # Initialize export service
-        export_service = GoogleSheetsExportService()
+        export_service = GoogleSheetsExportService(storage_backend=get_storage_backend())
         
         # Test connection first
         connection_test = export_service.test_connection()
@@ -2647,7 +2741,7 @@ def _upload_to_google_sheets(export_data, export_type):
         # Upload data based on export type
         if export_type == 'combined':
             # Upload both inventory and materials data
-            result = export_service.upload_combined_export(export_data)
+            result = export_service.upload_combined_export(export_data, mode=sync_mode)
             
             return {
                 'success': result['success'],
@@ -2664,7 +2758,7 @@ def _upload_to_google_sheets(export_data, export_type):
             headers = export_data.get('headers', [])
             rows = export_data.get('rows', [])
             
-            result = export_service.upload_inventory_export(headers, rows)
+            result = export_service.upload_inventory_export(headers, rows, mode=sync_mode)
             
             return {
                 'success': result.success,
@@ -2681,7 +2775,7 @@ def _upload_to_google_sheets(export_data, export_type):
             headers = export_data.get('headers', [])
             rows = export_data.get('rows', [])
             
-            result = export_service.upload_materials_export(headers, rows)
+            result = export_service.upload_materials_export(headers, rows, mode=sync_mode)
             
             return {
                 'success': result.success,
@@ -2733,7 +2827,7 @@ def upload_photo(ja_id):
         content_type = file.content_type
         
         # Validate content type
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend(), job_queue=_get_photo_job_queue()) as photo_service:
             photo = photo_service.upload_photo(ja_id, file_data, filename, content_type)
             
             return jsonify({
@@ -2766,7 +2860,7 @@ def get_item_photos(ja_id):
     try:
         from app.photo_service import PhotoService
         
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             photos = photo_service.get_photos(ja_id)
             
             return jsonify({
@@ -2782,6 +2876,70 @@ def get_item_photos(ja_id):
             'error': f'Failed to retrieve photos: {str(e)}'
         }), 500
 
+# An original's bytes never change once uploaded, so a response with an ETag
+# can be cached by the browser for a year without revalidating. Thumbnail and
+# medium sizes can be rendered again, so the browser keeps them but asks first;
+# their ETags change when they do, and otherwise the answer is a bodiless 304.
+_PHOTO_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _cache_photo(response, size):
+    """Cache headers for a photo response that has an ETag"""
+    response.cache_control.public = True
+    if size == 'original':
+        response.cache_control.max_age = _PHOTO_CACHE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def _photo_not_modified(etag, size):
+    """The 304 for a conditional photo request whose ETag still matches"""
+    from flask import Response
+    response = Response(status=304)
+    response.set_etag(etag)
+    return _cache_photo(response, size)
+
+
+# Stands in for a thumbnail or medium size still queued for rendering
+_PHOTO_PENDING_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="150" height="150" viewBox="0 0 150 150">'
+    '<rect width="150" height="150" fill="#e9ecef"/>'
+    '<text x="75" y="80" text-anchor="middle" fill="#6c757d" font-family="Arial" '
+    'font-size="14">Processing...</text></svg>'
+)
+
+
+def _photo_pending_placeholder():
+    """The 202 for a photo size that is still being rendered
+
+    Never cached, so the next request for the size gets the real thing.
+    """
+    from flask import Response
+    response = Response(_PHOTO_PENDING_SVG, status=202, mimetype='image/svg+xml')
+    response.cache_control.no_store = True
+    return response
+
+
+def _send_photo(path_or_file, content_type, etag, size, **kwargs):
+    """send_file for a photo, with Range support and, given an ETag, caching
+
+    Photos that predate hashing have no ETag and are sent uncached as before.
+    """
+    response = send_file(
+        path_or_file,
+        mimetype=content_type,
+        etag=etag or False,
+        max_age=None,
+        conditional=True,
+        **kwargs
+    )
+    if etag:
+        _cache_photo(response, size)
+    return response
+
+
 @bp.route('/api/photos/<int:photo_id>', methods=['GET'])
 def get_photo_data(photo_id):
     """Get photo data with specified size"""
@@ -2796,7 +2954,19 @@ def get_photo_data(photo_id):
                 'error': 'Invalid size parameter. Use: thumbnail, medium, or original'
             }), 400
         
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
+            # A browser revalidating a copy it already has gets a 304 without
+            # the bytes being read at all
+            etag = photo_service.get_photo_etag(photo_id, size)
+            if etag and request.if_none_match.contains_weak(etag):
+                return _photo_not_modified(etag, size)
+
+            # A photo in the local blob store is streamed from disk
+            stored_file = photo_service.get_photo_file(photo_id, size)
+            if stored_file:
+                path, content_type = stored_file
+                return _send_photo(path, content_type, etag, size, as_attachment=False)
+
             result = photo_service.get_photo_data(photo_id, size)
             
             if not result:
@@ -2808,12 +2978,10 @@ def get_photo_data(photo_id):
             data, content_type = result
         
         # Return the image data
-        return send_file(
-            io.BytesIO(data),
-            mimetype=content_type,
-            as_attachment=False
-        )
+        return _send_photo(io.BytesIO(data), content_type, etag, size, as_attachment=False)
         
+    except PhotoProcessingPending:
+        return _photo_pending_placeholder()
     except Exception as e:
         current_app.logger.error(f'Get photo data error: {e}')
         return jsonify({
@@ -2828,8 +2996,9 @@ def download_photo(photo_id):
         from app.photo_service import PhotoService
         import io
         
-        with PhotoService(_get_storage_backend()) as photo_service:
-            photo = photo_service.get_photo(photo_id)
+        with PhotoService(get_storage_backend()) as photo_service:
+            # photo_id is a Photo ID, as for GET /api/photos/<id>
+            photo = photo_service.get_photo_record(photo_id)
             
             if not photo:
                 return jsonify({
@@ -2837,6 +3006,16 @@ def download_photo(photo_id):
                     'error': 'Photo not found'
                 }), 404
             
+            etag = photo_service.get_photo_etag(photo_id, 'original')
+            if etag and request.if_none_match.contains_weak(etag):
+                return _photo_not_modified(etag, 'original')
+
+            stored_file = photo_service.get_photo_file(photo_id, 'original')
+            if stored_file:
+                path, content_type = stored_file
+                return _send_photo(path, content_type, etag, 'original', as_attachment=True,
+                                   download_name=photo.filename)
+
             result = photo_service.get_photo_data(photo_id, 'original')
             if not result:
                 return jsonify({
@@ -2847,12 +3026,8 @@ def download_photo(photo_id):
             data, content_type = result
         
         # Return the image data as attachment
-        return send_file(
-            io.BytesIO(data),
-            mimetype=content_type,
-            as_attachment=True,
-            download_name=photo.filename
-        )
+        return _send_photo(io.BytesIO(data), content_type, etag, 'original', as_attachment=True,
+                           download_name=photo.filename)
         
     except Exception as e:
         current_app.logger.error(f'Download photo error: {e}')
@@ -2868,7 +3043,7 @@ def delete_photo(photo_id):
     try:
         from app.photo_service import PhotoService
         
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             success = photo_service.delete_photo(photo_id)
             
             if success:
@@ -2896,7 +3071,7 @@ def cleanup_orphaned_photos():
     try:
         from app.photo_service import PhotoService
         
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             cleaned_count = photo_service.cleanup_orphaned_photos()
             
             return jsonify({
@@ -2919,12 +3094,12 @@ def regenerate_pdf_thumbnails():
     try:
         from app.photo_service import PhotoService
         
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend(), job_queue=_get_photo_job_queue()) as photo_service:
             updated_count = photo_service.regenerate_pdf_thumbnails()
             
             return jsonify({
                 'success': True,
-                'message': f'Regenerated thumbnails for {updated_count} PDF photos',
+                'message': f'Queued thumbnail regeneration for {updated_count} PDF photos',
                 'photos_updated': updated_count
             })
         
@@ -2993,7 +3168,7 @@ def copy_photos():
         # Copy photos to each target item
         from app.photo_service import PhotoService
 
-        with PhotoService(_get_storage_backend()) as photo_service:
+        with PhotoService(get_storage_backend()) as photo_service:
             # Check if source item exists and has photos
             source_photos = photo_service.get_photos(source_ja_id)
 
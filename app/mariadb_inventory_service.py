@@ -5,19 +5,28 @@ Provides inventory management functionality specifically designed for MariaDB ba
 Handles multi-row JA ID scenarios with proper active/inactive item logic.
 """
 
+import base64
+import json
 import logging
 import warnings
 # Suppress SQLAlchemy warnings about Decimal support in SQLite (used in tests)
 warnings.filterwarnings("ignore", message=".*does.*not.*support Decimal objects natively.*")
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 from decimal import Decimal
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, and_, desc, asc, func
+from sqlalchemy.orm import sessionmaker, aliased
+from sqlalchemy import create_engine, and_, or_, desc, asc, func, insert, select, update
 
 from .mariadb_storage import MariaDBStorage
-from .database import InventoryItem
+from .database import InventoryCurrent, InventoryItem, MaterialTaxonomy
+from . import inventory_search
+from .inventory_current import current_items, refresh_current_rows
+from .ja_id_sequence import (
+    canonical_ja_number, format_ja_id, max_canonical_ja_number, read_ja_sequence, reserve_ja_numbers
+)
 from .models import ItemType, ItemShape
+from .vocabulary_cache import bump_vocabulary_version, invalidate_vocabulary_index
 # Using enhanced InventoryItem directly instead of separate Item dataclass
 from .storage import StorageResult
 from config import Config
@@ -25,6 +34,28 @@ from config import Config
 logger = logging.getLogger(__name__)
 
 
+def material_subtree_names(material_name: str):
+    """
+    A SELECT of the named material and every active material beneath it
+
+    One recursive CTE, so a hierarchical search is a single statement at any
+    depth: the base row is found case-insensitively, and each step down joins
+    on material_taxonomy.parent, which is indexed.
+    """
+    subtree = select(MaterialTaxonomy.name).where(
+        func.lower(MaterialTaxonomy.name) == func.lower(material_name),
+        MaterialTaxonomy.active == True
+    ).cte('material_subtree', recursive=True)
+    child = aliased(MaterialTaxonomy)
+    subtree = subtree.union(
+        select(child.name).where(
+            child.parent == subtree.c.name,
+            child.active == True
+        )
+    )
+    return select(subtree.c.name)
+
+
 class SearchFilter:
     """Search filter specification"""
     
@@ -57,6 +88,14 @@ class SearchFilter:
         """Filter by material (exact match)"""
         return self.add_text_search('material', material, exact=True)
     
+    def material_subtree(self, material: str) -> 'SearchFilter':
+        """Filter by a material or anything beneath it in the taxonomy"""
+        return self.add_exact_match('material_subtree', material)
+
+    def keywords(self, text: str) -> 'SearchFilter':
+        """Filter by words from any text field, ranked by relevance"""
+        return self.add_exact_match('q', text)
+    
     def item_type(self, item_type) -> 'SearchFilter':
         """Filter by item type"""
         if hasattr(item_type, 'value'):
@@ -124,8 +163,108 @@ class SearchFilter:
         return self.add_text_search('notes', text, exact=False)
 
 
+@dataclass
+class ItemPage:
+    """One keyset page of inventory search results"""
+    items: List[InventoryItem]
+    total_count: int
+    next_cursor: Optional[str] = None
+
+
+# Sortable columns for paged searches, keyed by the names the inventory table
+# headers use. Nullable columns sort as '' or 0 -- the same order the table
+# used when it sorted in the browser -- and, more importantly, a keyset
+# comparison against NULL is never true, so a NULL sort key would end paging.
+SORT_COLUMNS = {
+    'ja_id': InventoryItem.ja_id,
+    'item_type': InventoryItem.item_type,
+    'shape': func.coalesce(InventoryItem.shape, ''),
+    'material': InventoryItem.material,
+    'dimensions': func.coalesce(InventoryItem.length, 0),
+    'length': func.coalesce(InventoryItem.length, 0),
+    'location': func.coalesce(InventoryItem.location, ''),
+    'sub_location': func.coalesce(InventoryItem.sub_location, ''),
+    'active': InventoryItem.active,
+    'date_added': InventoryItem.date_added,
+    'last_modified': InventoryItem.last_modified,
+}
+
+
+def _chunks(values: List[Any], size: int):
+    """Consecutive slices of at most ``size`` values"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _sort_value(item: InventoryItem, sort: str):
+    """The value of an item's sort key, as SORT_COLUMNS computes it in SQL"""
+    if sort in ('dimensions', 'length'):
+        return item.length if item.length is not None else Decimal('0')
+    value = getattr(item, sort)
+    return '' if value is None else value
+
+
+def _encode_cursor(sort: str, descending: bool, position: List[Any]) -> str:
+    """Pack a page position into an opaque, URL-safe cursor string"""
+    sort_value = position[0]
+    if isinstance(sort_value, Decimal):
+        sort_value = str(sort_value)
+    elif isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = [sort, descending, sort_value, position[1], position[2]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str, descending: bool) -> List[Any]:
+    """
+    Unpack a cursor into its ``[sort value, ja_id, id]`` position
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        cursor_sort, cursor_descending, sort_value, ja_id, item_id = payload
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or cursor_descending != descending:
+        raise ValueError("Cursor does not match the requested sort")
+
+    try:
+        if sort in ('dimensions', 'length'):
+            sort_value = Decimal(sort_value)
+        elif sort in ('date_added', 'last_modified'):
+            sort_value = datetime.fromisoformat(sort_value)
+        item_id = int(item_id)
+    except (ArithmeticError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    return [sort_value, ja_id, item_id]
+
+
+def _after_position(keys: List[Any], position: List[Any], descending: bool):
+    """
+    SQL condition for rows strictly after a position in ``keys`` order
+
+    Spelled out as ``a > x OR (a = x AND (b > y OR ...))`` rather than a
+    row-value comparison, which MariaDB does not always resolve with an index
+    range scan.
+    """
+    key, value = keys[0], position[0]
+    beyond = key < value if descending else key > value
+    if len(keys) == 1:
+        return beyond
+    return or_(beyond, and_(key == value,
+                            _after_position(keys[1:], position[1:], descending)))
+
+
 class InventoryService:
     """MariaDB inventory service with multi-row JA ID support"""
+
+    # JA IDs per IN list in the batch statements
+    BATCH_CHUNK_SIZE = 500
+
+    # Columns a batch move may set
+    MOVE_COLUMNS = ('location', 'sub_location', 'notes')
     
     def __init__(self, storage: MariaDBStorage = None):
         """Initialize with MariaDB storage backend"""
@@ -268,7 +407,9 @@ class InventoryService:
         Get all currently active items (one per JA ID)
         
         This returns only the active items, which represent the current
-        state of all inventory items.
+        state of all inventory items. Read through ``inventory_current``
+        (app/inventory_current.py), whose JA ID order is the list order, so
+        history rows are never scanned.
         
         Returns:
             List of active InventoryItem objects
@@ -276,10 +417,10 @@ class InventoryService:
         try:
             session = self.Session()
             
-            # Query for all active items
-            db_items = session.query(InventoryItem).filter(
-                InventoryItem.active == True
-            ).order_by(asc(InventoryItem.ja_id)).all()
+            # Query for all current items
+            db_items = current_items(session.query(InventoryItem)).order_by(
+                asc(InventoryCurrent.ja_id)
+            ).all()
             
             # Return enhanced InventoryItems directly (no conversion needed)
             logger.info(f"Retrieved {len(db_items)} active inventory items")
@@ -292,6 +433,145 @@ class InventoryService:
             if 'session' in locals():
                 session.close()
     
+    def _apply_search_filters(self, query, filters: Dict[str, Any], rank: bool = False):
+        """
+        Apply the search filter dictionary to an InventoryItem query
+
+        Shared by ``search_active_items``, ``search_items_page`` and
+        ``count_items`` so a page, its total and the unpaginated search can
+        never disagree about which rows match.
+
+        Args:
+            query: Query over InventoryItem (or a column of it)
+            filters: Dictionary of search filters, as for ``search_active_items``
+            rank: Order ``q`` matches most relevant first, ahead of any
+                ordering the caller adds
+
+        Returns:
+            The filtered query
+        """
+        # Active/Inactive filter - apply if specified, otherwise default to active only
+        # Note: filters['active'] can be True, False, or not present
+        # Empty string from form means show all items
+        if 'active' in filters:
+            if filters['active'] is not None and filters['active'] != '':
+                if filters['active']:
+                    query = current_items(query)
+                else:
+                    query = query.filter(InventoryItem.active == False)
+            # If filters['active'] is '' or None, don't filter by active (show all)
+        else:
+            # Default to active items only if not specified at all, read
+            # through the current-state projection rather than past history rows
+            query = current_items(query)
+
+        # Apply filters using enum properties where applicable
+        if 'ja_id' in filters and filters['ja_id']:
+            query = query.filter(InventoryItem.ja_id.ilike(f"%{filters['ja_id']}%"))
+
+        # Hierarchical material filter, resolved in the same statement. A name
+        # that is not in the taxonomy still matches itself.
+        if filters.get('material_subtree'):
+            material_name = filters['material_subtree']
+            query = query.filter(or_(
+                InventoryItem.material.in_(material_subtree_names(material_name)),
+                InventoryItem.material == material_name
+            ))
+
+        # Material filter with hierarchical support
+        if 'material' in filters and filters['material']:
+            # Check if this is a hierarchical search with multiple materials
+            if isinstance(filters['material'], list):
+                # Hierarchical search: match any material in the list
+                query = query.filter(InventoryItem.material.in_(filters['material']))
+            else:
+                # Legacy support: single material search
+                # Check if exact match is requested (stored in text_searches by SearchFilter)
+                material_exact = filters.get('material_exact', False)
+                if material_exact:
+                    query = query.filter(InventoryItem.material == filters['material'])
+                else:
+                    query = query.filter(InventoryItem.material.ilike(f"%{filters['material']}%"))
+        
+        if 'item_type' in filters and filters['item_type']:
+            # Use enum property for better type matching
+            query = query.filter(InventoryItem.item_type == filters['item_type'])
+        
+        if 'shape' in filters and filters['shape']:
+            # Use enum property for better shape matching
+            query = query.filter(InventoryItem.shape == filters['shape'])
+
+        if 'precision' in filters and filters['precision'] is not None:
+            query = query.filter(InventoryItem.precision == filters['precision'])
+
+        if 'location' in filters and filters['location']:
+            query = query.filter(InventoryItem.location.ilike(f"%{filters['location']}%"))
+        
+        # Length range filters
+        if 'min_length' in filters and filters['min_length']:
+            query = query.filter(InventoryItem.length >= filters['min_length'])
+        
+        if 'max_length' in filters and filters['max_length']:
+            query = query.filter(InventoryItem.length <= filters['max_length'])
+        
+        # Width range filters
+        if 'min_width' in filters and filters['min_width']:
+            query = query.filter(InventoryItem.width >= filters['min_width'])
+
+        if 'max_width' in filters and filters['max_width']:
+            query = query.filter(InventoryItem.width <= filters['max_width'])
+
+        # Thickness range filters
+        if 'min_thickness' in filters and filters['min_thickness']:
+            query = query.filter(InventoryItem.thickness >= filters['min_thickness'])
+
+        if 'max_thickness' in filters and filters['max_thickness']:
+            query = query.filter(InventoryItem.thickness <= filters['max_thickness'])
+
+        # Wall thickness range filters
+        if 'min_wall_thickness' in filters and filters['min_wall_thickness']:
+            query = query.filter(InventoryItem.wall_thickness >= filters['min_wall_thickness'])
+
+        if 'max_wall_thickness' in filters and filters['max_wall_thickness']:
+            query = query.filter(InventoryItem.wall_thickness <= filters['max_wall_thickness'])
+
+        # Thread filters
+        if 'thread_size' in filters and filters['thread_size']:
+            query = query.filter(InventoryItem.thread_size.ilike(f"%{filters['thread_size']}%"))
+
+        if 'thread_series' in filters and filters['thread_series']:
+            query = query.filter(InventoryItem.thread_series == filters['thread_series'])
+
+        # Notes filtering
+        if 'notes' in filters and filters['notes']:
+            query = query.filter(InventoryItem.notes.ilike(f"%{filters['notes']}%"))
+
+        # Free-text filter for the inventory list's search box. It covers the
+        # fields the list page used to match in the browser: the JA ID, where
+        # the item lives, its notes, and the words of its display name.
+        if 'text' in filters and filters['text']:
+            pattern = f"%{filters['text']}%"
+            query = query.filter(or_(
+                InventoryItem.ja_id.ilike(pattern),
+                InventoryItem.location.ilike(pattern),
+                InventoryItem.sub_location.ilike(pattern),
+                InventoryItem.notes.ilike(pattern),
+                InventoryItem.material.ilike(pattern),
+                InventoryItem.item_type.ilike(pattern),
+                InventoryItem.shape.ilike(pattern),
+            ))
+
+        # Keywords, answered by the full-text index rather than a LIKE per
+        # field (app/inventory_search.py)
+        if filters.get('q'):
+            matches = inventory_search.matching_items(query.session, filters['q'])
+            if matches is not None:
+                query = query.join(matches, matches.c.key == InventoryItem.id)
+                if rank:
+                    query = query.order_by(matches.c.score.desc())
+
+        return query
+
     def search_active_items(self, filters: Dict[str, Any]) -> List[InventoryItem]:
         """
         Search for active items using filters
@@ -304,111 +584,117 @@ class InventoryService:
             filters: Dictionary of search filters
             
         Returns:
-            List of matching active InventoryItem objects
+            List of matching active InventoryItem objects, by JA ID -- or with
+            ``q``, most relevant first
         """
         try:
             session = self.Session()
 
-            # Start with all items, then apply active filter if specified
-            query = session.query(InventoryItem)
-
-            # Active/Inactive filter - apply if specified, otherwise default to active only
-            # Note: filters['active'] can be True, False, or not present
-            # Empty string from form means show all items
-            if 'active' in filters:
-                if filters['active'] is not None and filters['active'] != '':
-                    query = query.filter(InventoryItem.active == filters['active'])
-                # If filters['active'] is '' or None, don't filter by active (show all)
-            else:
-                # Default to active items only if not specified at all
-                query = query.filter(InventoryItem.active == True)
-
-            # Apply filters using enum properties where applicable
-            if 'ja_id' in filters and filters['ja_id']:
-                query = query.filter(InventoryItem.ja_id.ilike(f"%{filters['ja_id']}%"))
+            query = self._apply_search_filters(session.query(InventoryItem), filters, rank=True)
 
-            # Material filter with hierarchical support
-            if 'material' in filters and filters['material']:
-                # Check if this is a hierarchical search with multiple materials
-                if isinstance(filters['material'], list):
-                    # Hierarchical search: match any material in the list
-                    query = query.filter(InventoryItem.material.in_(filters['material']))
-                else:
-                    # Legacy support: single material search
-                    # Check if exact match is requested (stored in text_searches by SearchFilter)
-                    material_exact = filters.get('material_exact', False)
-                    if material_exact:
-                        query = query.filter(InventoryItem.material == filters['material'])
-                    else:
-                        query = query.filter(InventoryItem.material.ilike(f"%{filters['material']}%"))
+            # Execute query
+            db_items = query.order_by(asc(InventoryItem.ja_id)).all()
             
-            if 'item_type' in filters and filters['item_type']:
-                # Use enum property for better type matching
-                query = query.filter(InventoryItem.item_type == filters['item_type'])
+            # Return enhanced InventoryItems directly (no conversion needed)
+            logger.debug(f"Search found {len(db_items)} active items")
+            return db_items
             
-            if 'shape' in filters and filters['shape']:
-                # Use enum property for better shape matching
-                query = query.filter(InventoryItem.shape == filters['shape'])
+        except Exception as e:
+            logger.error(f"Error searching active items: {e}")
+            return []
+        finally:
+            if 'session' in locals():
+                session.close()
 
-            if 'precision' in filters and filters['precision'] is not None:
-                query = query.filter(InventoryItem.precision == filters['precision'])
+    def search_items_page(self, filters: Dict[str, Any], page_size: int,
+                          sort: str = 'ja_id', descending: bool = False,
+                          cursor: Optional[str] = None) -> ItemPage:
+        """
+        Return one page of matching items, using a keyset cursor
 
-            if 'location' in filters and filters['location']:
-                query = query.filter(InventoryItem.location.ilike(f"%{filters['location']}%"))
-            
-            # Length range filters
-            if 'min_length' in filters and filters['min_length']:
-                query = query.filter(InventoryItem.length >= filters['min_length'])
-            
-            if 'max_length' in filters and filters['max_length']:
-                query = query.filter(InventoryItem.length <= filters['max_length'])
-            
-            # Width range filters
-            if 'min_width' in filters and filters['min_width']:
-                query = query.filter(InventoryItem.width >= filters['min_width'])
+        The page is ordered by the sort column, then ``(ja_id, id)`` so that
+        every row has a unique position. The cursor records that position for
+        the last row of the previous page, and the next page starts strictly
+        after it. Unlike OFFSET, this costs the same for page 500 as for page
+        1, and rows added or removed while a client pages through do not shift
+        later pages.
 
-            if 'max_width' in filters and filters['max_width']:
-                query = query.filter(InventoryItem.width <= filters['max_width'])
+        Args:
+            filters: Dictionary of search filters, as for ``search_active_items``
+            page_size: Maximum number of items to return
+            sort: Sort column name, one of ``SORT_COLUMNS``
+            descending: Sort direction
+            cursor: ``next_cursor`` from the previous page, or None for the first
 
-            # Thickness range filters
-            if 'min_thickness' in filters and filters['min_thickness']:
-                query = query.filter(InventoryItem.thickness >= filters['min_thickness'])
+        Returns:
+            ItemPage with the items, the total match count and the next cursor
 
-            if 'max_thickness' in filters and filters['max_thickness']:
-                query = query.filter(InventoryItem.thickness <= filters['max_thickness'])
+        Raises:
+            ValueError: If the sort column is unknown or the cursor is invalid
+                or was issued for a different sort
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort}")
+        sort_key = SORT_COLUMNS[sort]
+        keys = [sort_key, InventoryItem.ja_id, InventoryItem.id]
+        position = _decode_cursor(cursor, sort, descending) if cursor else None
 
-            # Wall thickness range filters
-            if 'min_wall_thickness' in filters and filters['min_wall_thickness']:
-                query = query.filter(InventoryItem.wall_thickness >= filters['min_wall_thickness'])
+        try:
+            session = self.Session()
 
-            if 'max_wall_thickness' in filters and filters['max_wall_thickness']:
-                query = query.filter(InventoryItem.wall_thickness <= filters['max_wall_thickness'])
+            query = self._apply_search_filters(session.query(InventoryItem), filters)
+            if position is not None:
+                query = query.filter(_after_position(keys, position, descending))
 
-            # Thread filters
-            if 'thread_size' in filters and filters['thread_size']:
-                query = query.filter(InventoryItem.thread_size.ilike(f"%{filters['thread_size']}%"))
+            order = desc if descending else asc
+            # One extra row tells us whether a next page exists without
+            # a second query.
+            rows = (query.order_by(*[order(key) for key in keys])
+                    .limit(page_size + 1).all())
 
-            if 'thread_series' in filters and filters['thread_series']:
-                query = query.filter(InventoryItem.thread_series == filters['thread_series'])
+            next_cursor = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                last = rows[-1]
+                next_cursor = _encode_cursor(
+                    sort, descending,
+                    [_sort_value(last, sort), last.ja_id, last.id])
+
+            return ItemPage(items=rows, total_count=self.count_items(filters),
+                            next_cursor=next_cursor)
 
-            # Notes filtering
-            if 'notes' in filters and filters['notes']:
-                query = query.filter(InventoryItem.notes.ilike(f"%{filters['notes']}%"))
-            
-            # Execute query
-            db_items = query.order_by(asc(InventoryItem.ja_id)).all()
-            
-            # Return enhanced InventoryItems directly (no conversion needed)
-            logger.debug(f"Search found {len(db_items)} active items")
-            return db_items
-            
         except Exception as e:
-            logger.error(f"Error searching active items: {e}")
-            return []
+            logger.error(f"Error reading inventory page: {e}")
+            return ItemPage(items=[], total_count=0, next_cursor=None)
         finally:
             if 'session' in locals():
                 session.close()
-    
+
+    def count_items(self, filters: Dict[str, Any]) -> int:
+        """
+        Count the items matching a filter dictionary
+
+        A separate COUNT query rather than ``len()`` of a result, so a page's
+        total costs one index scan and no row transfer.
+
+        Args:
+            filters: Dictionary of search filters, as for ``search_active_items``
+
+        Returns:
+            Number of matching rows, or 0 on error
+        """
+        try:
+            session = self.Session()
+            query = self._apply_search_filters(
+                session.query(func.count(InventoryItem.id)), filters)
+            return query.scalar() or 0
+        except Exception as e:
+            logger.error(f"Error counting inventory items: {e}")
+            return 0
+        finally:
+            if 'session' in locals():
+                session.close()
+
     def ja_id_exists(self, ja_id: str, only_active: bool = True) -> bool:
         """
         Check if a JA ID exists in the database
@@ -616,104 +902,103 @@ class InventoryService:
         """Largest numeric suffix among active JA IDs of the canonical
         ``JA`` + 6-digit form, or 0 if there are none.
 
-        Used to allocate the next sequential JA ID without loading every
-        item into memory. Scoped to active rows to match the historical
-        behavior of the per-route scanning loops it replaces.
-
-        Non-canonical IDs (anything that doesn't strictly match
-        ``JA[0-9]{6}``, including mixed alpha/numeric suffixes like
-        ``JA12ABCD``) are excluded from the aggregate. Casting such
-        suffixes to ``INTEGER`` would yield dialect-dependent values and
-        could change the computed max compared to the prior Python
-        ``int(...)`` + ``ValueError`` behavior. To stay portable across
-        SQLite (test) and MariaDB (production) without depending on
-        ``REGEXP``, we require each of the six suffix positions to be a
-        digit using a per-position ``BETWEEN '0' AND '9'`` predicate.
+        An aggregate over ``inventory_current``. New JA IDs no longer come
+        from it -- see ``allocate_ja_ids`` -- since two callers reading the
+        same maximum would both take the number after it.
         """
-        from sqlalchemy import cast, Integer, and_
+        session = self.Session()
+        try:
+            return self._max_ja_id_number(session)
+        finally:
+            session.close()
+
+    @staticmethod
+    def _max_ja_id_number(session) -> int:
+        """``get_max_ja_id_number`` within the caller's transaction"""
+        return max_canonical_ja_number(session, InventoryCurrent.ja_id)
+
+    def allocate_ja_ids(self, count: int = 1, first_number: int = 1) -> List[str]:
+        """
+        Take ``count`` new JA IDs from the JA ID sequence, none numbered below
+        ``first_number``
+
+        Each is handed out once, whichever client asks, and is the caller's to
+        use; one that is never used is simply skipped.
+
+        Raises:
+            StorageError: If the sequence could not be advanced
+        """
+        from .exceptions import StorageError
 
         session = self.Session()
         try:
-            ja_id_col = InventoryItem.ja_id
-            suffix_expr = func.substr(ja_id_col, 3)
-            digit_filters = [
-                func.substr(ja_id_col, 2 + pos, 1).between('0', '9')
-                for pos in range(1, 7)
-            ]
-            result = session.query(
-                func.max(cast(suffix_expr, Integer))
-            ).filter(
-                InventoryItem.active == True,
-                ja_id_col.like('JA______'),
-                and_(*digit_filters),
-            ).scalar()
-            return int(result) if result is not None else 0
+            first = reserve_ja_numbers(session, count, floor=first_number)
+            session.commit()
+            return [format_ja_id(number) for number in range(first, first + count)]
+        except Exception as e:
+            session.rollback()
+            raise StorageError(f'Failed to allocate {count} JA IDs: {e}', operation='allocate_ja_ids',
+                               original_error=e) from e
         finally:
             session.close()
-    
+
+    def reserve_ja_id(self, held: Optional[str] = None) -> str:
+        """
+        A JA ID for one client to fill in, reusing the one it already holds
+        while that is still the newest allocated and no item has taken it
+
+        Opening the add form offers a new JA ID; reloading it should not skip
+        another. A held ID is safe to offer again while the sequence has not
+        moved past it: nobody else can have been given it.
+        """
+        number = canonical_ja_number(held)
+        if number is not None:
+            session = self.Session()
+            try:
+                if read_ja_sequence(session) == number and not session.query(
+                    session.query(InventoryItem.id).filter(InventoryItem.ja_id == held).exists()
+                ).scalar():
+                    return held
+            finally:
+                session.close()
+        return self.allocate_ja_ids(1)[0]
+
     def get_valid_materials(self) -> List[str]:
         """
         Get list of all valid material names from the materials taxonomy.
         Returns both primary names and aliases.
         
+        Answered from the process's taxonomy snapshot (app/taxonomy_cache.py),
+        so this does not query the database unless the taxonomy has changed.
+        
         Returns:
             List of valid material names sorted alphabetically
         """
         try:
-            from .database import MaterialTaxonomy
-            
-            session = self.Session()
+            from .taxonomy_cache import get_taxonomy_snapshot
             
-            # Get all active materials from taxonomy
-            materials = session.query(MaterialTaxonomy).filter(
-                MaterialTaxonomy.active == True
-            ).all()
-            
-            # Collect all valid names (primary names + aliases)
-            valid_names = set()
-            
-            for material in materials:
-                if material.name:
-                    valid_names.add(material.name.strip())
-                
-                # Add aliases if they exist
-                if material.aliases:
-                    # Handle both string and list formats for aliases
-                    if isinstance(material.aliases, str):
-                        aliases = [a.strip() for a in material.aliases.split(',') if a.strip()]
-                    else:
-                        aliases = material.aliases
-                    
-                    for alias in aliases:
-                        if alias and alias.strip():
-                            valid_names.add(alias.strip())
-            
-            # Convert to sorted list, removing empty strings
-            result = sorted([name for name in valid_names if name])
-            
-            logger.info(f"Retrieved {len(result)} valid materials from taxonomy")
-            return result
+            return list(get_taxonomy_snapshot(self.engine).valid_materials)
             
         except Exception as e:
             logger.error(f"Error getting valid materials from MariaDB: {e}")
             # Return fallback materials if database query fails
             return ['Steel', 'Carbon Steel', 'Stainless Steel', 'Aluminum', 'Brass', 'Copper']
-        finally:
-            if 'session' in locals():
-                session.close()
 
     def get_material_descendants(self, material_name: str) -> List[str]:
         """
         Get all descendant materials in the hierarchy for a given material.
 
-        Returns the material itself plus all children and grandchildren in the
-        taxonomy hierarchy. This supports hierarchical material searching where
-        searching for a parent material also returns items made of child materials.
+        Returns the material itself plus everything beneath it in the taxonomy
+        hierarchy, at any depth. This supports hierarchical material searching
+        where searching for a parent material also returns items made of child
+        materials.
 
         For example, if searching for "Aluminum" which has children "6000 Series Aluminum"
         and "7000 Series Aluminum", and "6000 Series Aluminum" has child "6061-T6",
         this will return: ["Aluminum", "6000 Series Aluminum", "7000 Series Aluminum", "6061-T6"]
 
+        Walks the process's taxonomy snapshot rather than querying level by level.
+
         Args:
             material_name: The material name to get descendants for
 
@@ -722,46 +1007,9 @@ class InventoryService:
             only including active materials
         """
         try:
-            from .database import MaterialTaxonomy
+            from .taxonomy_cache import get_taxonomy_snapshot
 
-            session = self.Session()
-
-            # Start with the material itself
-            descendants = set()
-
-            # Find the material in the taxonomy (case-insensitive search)
-            base_material = session.query(MaterialTaxonomy).filter(
-                func.lower(MaterialTaxonomy.name) == func.lower(material_name),
-                MaterialTaxonomy.active == True
-            ).first()
-
-            if not base_material:
-                # Material not found in taxonomy, return just the material name
-                logger.debug(f"Material '{material_name}' not found in taxonomy, returning as-is")
-                return [material_name]
-
-            # Add the base material
-            descendants.add(base_material.name)
-
-            # Get all direct children (materials with this as parent)
-            children = session.query(MaterialTaxonomy).filter(
-                func.lower(MaterialTaxonomy.parent) == func.lower(base_material.name),
-                MaterialTaxonomy.active == True
-            ).all()
-
-            for child in children:
-                descendants.add(child.name)
-
-                # Get all grandchildren (materials with this child as parent)
-                grandchildren = session.query(MaterialTaxonomy).filter(
-                    func.lower(MaterialTaxonomy.parent) == func.lower(child.name),
-                    MaterialTaxonomy.active == True
-                ).all()
-
-                for grandchild in grandchildren:
-                    descendants.add(grandchild.name)
-
-            result = sorted(list(descendants))
+            result = get_taxonomy_snapshot(self.engine).descendants(material_name)
             logger.debug(f"Material '{material_name}' has {len(result)} descendants: {result}")
             return result
 
@@ -769,9 +1017,6 @@ class InventoryService:
             logger.error(f"Error getting material descendants for '{material_name}': {e}")
             # Return just the material name if query fails
             return [material_name]
-        finally:
-            if 'session' in locals():
-                session.close()
 
     def update_item(self, item: 'InventoryItem') -> bool:
         """
@@ -1029,6 +1274,80 @@ class InventoryService:
             if 'session' in locals():
                 session.close()
     
+    def add_items(self, item: 'InventoryItem', count: int, first_number: int = 1,
+                  held: Optional[str] = None) -> List[str]:
+        """
+        Add ``count`` copies of an item under a contiguous block of new JA IDs
+
+        The bulk counterpart of ``add_item``: the block is chosen, every row
+        inserted and the transaction committed once, with the rows sent as a
+        single batched INSERT rather than one statement and commit per item.
+
+        The block is reserved from the JA ID sequence in the same
+        transaction, starting no lower than ``first_number``, so it is never
+        shared with another add or handed to a form; the sequence row stays
+        locked until the rows are committed. A block may start at ``held``, a
+        JA ID the caller was given by ``reserve_ja_id``, while nobody has been
+        given one since.
+
+        Args:
+            item: InventoryItem holding the values every copy shares; its
+                ``ja_id`` is ignored
+            count: Number of items to create
+            first_number: Lowest JA ID number the block may start at
+            held: JA ID previously allocated to the caller, if any
+
+        Returns:
+            The JA IDs created, in order
+
+        Raises:
+            StorageError: If the items could not be added; none were
+        """
+        from .exceptions import StorageError
+
+        # Everything a copy shares: the columns the item has a value for,
+        # apart from its identity
+        shared = {
+            column.key: getattr(item, column.key)
+            for column in InventoryItem.__table__.columns
+            if column.key not in ('id', 'ja_id') and getattr(item, column.key) is not None
+        }
+        if shared.get('purchase_price') is not None:
+            shared['purchase_price'] = float(shared['purchase_price'])
+
+        session = self.Session()
+        try:
+            start = reserve_ja_numbers(session, count, floor=first_number,
+                                       held=canonical_ja_number(held))
+            ja_ids = [format_ja_id(number) for number in range(start, start + count)]
+            # One executemany, beneath the unit of work, which would
+            # otherwise send a statement per row to learn each new id
+            session.execute(insert(InventoryItem), [dict(shared, ja_id=ja_id) for ja_id in ja_ids])
+            # Ours are the newest rows under each of the block's JA IDs
+            item_ids = dict(session.query(InventoryItem.ja_id, func.max(InventoryItem.id)).filter(
+                InventoryItem.ja_id.in_(ja_ids)
+            ).group_by(InventoryItem.ja_id).all())
+            if shared.get('active', True):
+                # Written directly, not by the listener, which never saw the
+                # rows: a JA ID already current elsewhere fails on its key
+                session.add_all([
+                    InventoryCurrent(ja_id=ja_id, item_id=item_ids[ja_id]) for ja_id in ja_ids
+                ])
+                session.flush()
+            inventory_search.refresh_search_documents(session, item_ids.values())
+            bump_vocabulary_version(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise StorageError(f'Failed to add {count} items: {e}', operation='add_items',
+                               original_error=e) from e
+        finally:
+            session.close()
+
+        invalidate_vocabulary_index(self.engine)
+        logger.info(f'Added {count} items {ja_ids[0]} - {ja_ids[-1]} in one transaction')
+        return ja_ids
+
     def deactivate_item(self, ja_id: str) -> bool:
         """Deactivate an item (set active = False) - override to work with database directly"""
         try:
@@ -1102,52 +1421,115 @@ class InventoryService:
         """
         return self.search_active_items(search_filter.to_dict())
     
+    def move_items(self, moves: Dict[str, Dict[str, Optional[str]]]) -> tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Move items in one transaction, with an UPDATE per destination and
+        chunk of JA IDs rather than a read and write per item
+
+        Args:
+            moves: JA ID -> the columns to set on its active row, any of
+                ``location``, ``sub_location`` and ``notes``
+
+        Returns:
+            ``(before, missing)``: the previous values of those columns for
+            each JA ID moved, and the JA IDs that have no active item
+
+        Raises:
+            StorageError: If the move failed; nothing was moved
+        """
+        from .exceptions import StorageError
+
+        for columns in moves.values():
+            unknown = set(columns) - set(self.MOVE_COLUMNS)
+            if unknown:
+                raise ValueError(f'Cannot set {", ".join(sorted(unknown))} in a move')
+
+        session = self.Session()
+        try:
+            before = {}
+            item_ids = []
+            ja_ids = list(moves)
+            for chunk in _chunks(ja_ids, self.BATCH_CHUNK_SIZE):
+                for row in session.query(InventoryItem.id, InventoryItem.ja_id, *(
+                    getattr(InventoryItem, column) for column in self.MOVE_COLUMNS
+                )).filter(InventoryItem.ja_id.in_(chunk), InventoryItem.active == True):
+                    item_ids.append(row.id)
+                    before[row.ja_id] = {column: getattr(row, column) for column in moves[row.ja_id]}
+            missing = [ja_id for ja_id in ja_ids if ja_id not in before]
+
+            destinations: Dict[tuple, List[str]] = {}
+            for ja_id in before:
+                destinations.setdefault(tuple(sorted(moves[ja_id].items())), []).append(ja_id)
+            now = datetime.now(timezone.utc)
+            for destination, group in destinations.items():
+                for chunk in _chunks(group, self.BATCH_CHUNK_SIZE):
+                    session.execute(
+                        update(InventoryItem).where(
+                            InventoryItem.ja_id.in_(chunk), InventoryItem.active == True
+                        ).values(dict(destination, last_modified=now)),
+                        execution_options={'synchronize_session': False}
+                    )
+
+            # Locations are indexed and suggested; the listeners that keep
+            # both current never saw these rows
+            inventory_search.refresh_search_documents(session, item_ids)
+            bump_vocabulary_version(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise StorageError(f'Failed to move {len(moves)} items: {e}', operation='move_items',
+                               original_error=e) from e
+        finally:
+            session.close()
+
+        invalidate_vocabulary_index(self.engine)
+        logger.info(f'Moved {len(before)} items in one transaction ({len(missing)} not found)')
+        return before, missing
+
     def batch_move_items(self, item_ids: List[str], location_id: str, notes: str = None) -> tuple[int, List[str]]:
         """
         Move multiple items to a new location.
         Returns (count_moved, failed_ids)
         """
-        moved_count = 0
-        failed_ids = []
-        
-        for item_id in item_ids:
-            try:
-                # Get current item
-                item = self.get_item(item_id)
-                if not item:
-                    failed_ids.append(item_id)
-                    continue
-                
-                # Update location and optionally notes directly on InventoryItem
-                item.location = location_id
-                if notes:
-                    item.notes = notes
-                
-                if self.update_item(item):
-                    moved_count += 1
-                else:
-                    failed_ids.append(item_id)
-                    
-            except Exception:
-                failed_ids.append(item_id)
-                
-        return moved_count, failed_ids
-    
+        columns = {'location': location_id}
+        if notes:
+            columns['notes'] = notes
+        try:
+            moved, missing = self.move_items({item_id: columns for item_id in item_ids})
+        except Exception as e:
+            logger.error(f'Error moving items: {e}')
+            return 0, list(item_ids)
+        return len(moved), missing
+
     def batch_deactivate_items(self, item_ids: List[str]) -> tuple[int, List[str]]:
         """
-        Deactivate multiple items.
+        Deactivate multiple items, with an UPDATE per chunk of JA IDs in one
+        transaction.
         Returns (count_deactivated, failed_ids)
         """
-        deactivated_count = 0
-        failed_ids = []
-        
-        for item_id in item_ids:
-            try:
-                if self.deactivate_item(item_id):
-                    deactivated_count += 1
-                else:
-                    failed_ids.append(item_id)
-            except Exception:
-                failed_ids.append(item_id)
-                
-        return deactivated_count, failed_ids
\ No newline at end of file
+        session = self.Session()
+        try:
+            found = set()
+            now = datetime.now(timezone.utc)
+            for chunk in _chunks(list(item_ids), self.BATCH_CHUNK_SIZE):
+                found.update(ja_id for (ja_id,) in session.query(InventoryItem.ja_id).filter(
+                    InventoryItem.ja_id.in_(chunk), InventoryItem.active == True
+                ))
+                session.execute(
+                    update(InventoryItem).where(
+                        InventoryItem.ja_id.in_(chunk), InventoryItem.active == True
+                    ).values(active=False, last_modified=now),
+                    execution_options={'synchronize_session': False}
+                )
+            # The listener keeping the projection never saw these rows
+            refresh_current_rows(session, found)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f'Error deactivating items: {e}')
+            return 0, list(item_ids)
+        finally:
+            session.close()
+
+        logger.info(f'Deactivated {len(found)} items in one transaction')
+        return len(found), [item_id for item_id in item_ids if item_id not in found]
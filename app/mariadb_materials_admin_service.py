@@ -14,6 +14,7 @@ from sqlalchemy import create_engine
 from .database import MaterialTaxonomy
 from .mariadb_storage import MariaDBStorage
 from .exceptions import ValidationError
+from .taxonomy_cache import bump_taxonomy_version, get_taxonomy_snapshot, invalidate_taxonomy_snapshot
 from config import Config
 
 
@@ -53,82 +54,14 @@ class MariaDBMaterialsAdminService:
         """
         Get complete taxonomy overview for admin interface
         Returns hierarchical structure with usage statistics
+        
+        Rendered once per taxonomy version (see app/taxonomy_cache.py); each
+        call gets its own copy.
         """
         try:
-            session = self.Session()
-            
-            # Get all materials from database
-            query = session.query(MaterialTaxonomy)
-            if not include_inactive:
-                query = query.filter(MaterialTaxonomy.active == True)
-            
-            all_materials = query.order_by(
-                MaterialTaxonomy.level,
-                MaterialTaxonomy.sort_order,
-                MaterialTaxonomy.name
-            ).all()
-            
-            # Group by level for easier processing
-            categories = [m for m in all_materials if m.level == 1]
-            families = [m for m in all_materials if m.level == 2]
-            materials = [m for m in all_materials if m.level == 3]
-            
-            # Build hierarchical structure
-            overview = []
-            
-            for category in sorted(categories, key=lambda x: (x.sort_order or 0, x.name)):
-                category_data = {
-                    'id': category.id,
-                    'name': category.name,
-                    'level': category.level,
-                    'active': category.active,
-                    'notes': category.notes or '',
-                    'sort_order': category.sort_order or 0,
-                    'children': []
-                }
-                
-                # Find families under this category
-                category_families = [f for f in families if f.parent == category.name]
-                
-                for family in sorted(category_families, key=lambda x: (x.sort_order or 0, x.name)):
-                    family_data = {
-                        'id': family.id,
-                        'name': family.name,
-                        'level': family.level,
-                        'parent': family.parent,
-                        'active': family.active,
-                        'notes': family.notes or '',
-                        'sort_order': family.sort_order or 0,
-                        'children': []
-                    }
-                    
-                    # Find materials under this family
-                    family_materials = [m for m in materials if m.parent == family.name]
-                    
-                    for material in sorted(family_materials, key=lambda x: (x.sort_order or 0, x.name)):
-                        material_data = {
-                            'id': material.id,
-                            'name': material.name,
-                            'level': material.level,
-                            'parent': material.parent,
-                            'active': material.active,
-                            'aliases': material.aliases or [],
-                            'notes': material.notes or '',
-                            'sort_order': material.sort_order or 0
-                        }
-                        family_data['children'].append(material_data)
-                    
-                    category_data['children'].append(family_data)
-                
-                overview.append(category_data)
-            
-            return overview
-            
+            return get_taxonomy_snapshot(self.engine).taxonomy_overview(include_inactive)
         except Exception as e:
             raise ValidationError(f'Failed to get taxonomy overview: {e}')
-        finally:
-            if 'session' in locals():
-                session.close()
     
     def get_usage_statistics(self) -> Dict[str, int]:
         """Get usage statistics for materials"""
@@ -182,7 +115,9 @@ class MariaDBMaterialsAdminService:
             )
             
             session.add(new_material)
+            bump_taxonomy_version(session)
             session.commit()
+            invalidate_taxonomy_snapshot(self.engine)
             
             return True, f"Successfully added '{new_material.name}' to taxonomy"
             
@@ -249,7 +184,9 @@ class MariaDBMaterialsAdminService:
             material.active = not material.active
             material.last_modified = datetime.now()
             
+            bump_taxonomy_version(session)
             session.commit()
+            invalidate_taxonomy_snapshot(self.engine)
             
             return {
                 'success': True,
@@ -353,7 +290,9 @@ class MariaDBMaterialsAdminService:
             material.active = active
             material.last_modified = datetime.now()
             
+            bump_taxonomy_version(session)
             session.commit()
+            invalidate_taxonomy_snapshot(self.engine)
             
             status_word = "activated" if active else "deactivated"
             return True, f"Successfully {status_word} '{name}'"
@@ -15,6 +15,12 @@ from datetime import datetime, timezone
 
 from .storage import Storage, StorageResult
 from .database import Base, InventoryItem, MaterialTaxonomy
+from .taxonomy_cache import bump_taxonomy_version, invalidate_taxonomy_snapshot
+# Imported for their session listeners: every writer comes through this module,
+# so every writing process keeps the shared vocabulary index, the inventory
+# search documents, the current-inventory projection and the JA ID sequence
+# current
+from . import inventory_current, inventory_search, ja_id_sequence, vocabulary_cache  # noqa: F401
 from config import Config
 
 
@@ -32,29 +38,39 @@ class MariaDBStorage(Storage):
         self._connected = False
         
     def connect(self) -> StorageResult:
-        """Establish connection to MariaDB database"""
+        """Establish connection to MariaDB database
+
+        Idempotent. The engine is built once and kept, so calling this again --
+        after a failed first attempt, or from every service that borrows this
+        backend -- retries the connection without building a second pool.
+        """
+        if self._connected:
+            return StorageResult(success=True, data="Connected")
+
         try:
-            # Use different engine options for SQLite vs MariaDB
-            if self.database_url.startswith('sqlite://'):
-                # SQLite-specific options
-                engine_options = {
-                    'connect_args': {'check_same_thread': False}
-                }
-            else:
-                # MariaDB-specific options from config
-                engine_options = Config.SQLALCHEMY_ENGINE_OPTIONS
-                
-            self.engine = create_engine(
-                self.database_url,
-                **engine_options
-            )
-            
+            if self.engine is None:
+                # Use different engine options for SQLite vs MariaDB
+                if self.database_url.startswith('sqlite://'):
+                    # SQLite-specific options
+                    engine_options = {
+                        'connect_args': {'check_same_thread': False}
+                    }
+                else:
+                    # MariaDB-specific options from config
+                    engine_options = Config.SQLALCHEMY_ENGINE_OPTIONS
+
+                self.engine = create_engine(
+                    self.database_url,
+                    **engine_options
+                )
+
+                # Create session factory
+                self.Session = scoped_session(sessionmaker(bind=self.engine))
+
             # Test connection
             with self.engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
-            
-            # Create session factory
-            self.Session = scoped_session(sessionmaker(bind=self.engine))
+
             self._connected = True
             
             logger.info("Connected to MariaDB database successfully")
@@ -71,6 +87,18 @@ class MariaDBStorage(Storage):
         if self.engine:
             self.engine.dispose()
         self._connected = False
+
+    def dispose_after_fork(self):
+        """Forget the pooled connections a forked child inherited.
+
+        A socket opened by the parent is shared by every child forked from it,
+        and two processes talking over one MariaDB connection corrupt each
+        other's results. ``close=False`` drops the child's references without
+        closing the sockets, which still belong to the parent. The child then
+        opens its own connections on first use.
+        """
+        if self.engine:
+            self.engine.dispose(close=False)
     
     def _get_session(self):
         """Get database session, ensuring connection exists"""
@@ -148,7 +176,9 @@ class MariaDBStorage(Storage):
                 # Convert row data to MaterialTaxonomy
                 material = self._row_to_material_taxonomy(data)
                 session.add(material)
+                bump_taxonomy_version(session)
                 session.commit()
+                invalidate_taxonomy_snapshot(self.engine)
                 
                 return StorageResult(success=True, data=material.id, affected_rows=1)
             
@@ -183,10 +213,13 @@ class MariaDBStorage(Storage):
                         material = self._row_to_material_taxonomy(row_data)
                         session.add(material)
                         affected_rows += 1
+                bump_taxonomy_version(session)
             else:
                 return StorageResult(success=False, error=f"Unknown sheet: {sheet_name}")
             
             session.commit()
+            if sheet_name == "Materials":
+                invalidate_taxonomy_snapshot(self.engine)
             return StorageResult(success=True, affected_rows=affected_rows)
             
         except Exception as e:
@@ -221,7 +254,9 @@ class MariaDBStorage(Storage):
                     return StorageResult(success=False, error=f"Material with ID {row_index} not found")
                 
                 self._update_material_taxonomy_from_row(material, data)
+                bump_taxonomy_version(session)
                 session.commit()
+                invalidate_taxonomy_snapshot(self.engine)
                 
                 return StorageResult(success=True, affected_rows=1)
             
@@ -257,7 +292,9 @@ class MariaDBStorage(Storage):
                     return StorageResult(success=False, error=f"Material with ID {row_index} not found")
                 
                 session.delete(material)
+                bump_taxonomy_version(session)
                 session.commit()
+                invalidate_taxonomy_snapshot(self.engine)
                 return StorageResult(success=True, affected_rows=1)
             
             else:
@@ -0,0 +1,72 @@
+"""
+Photo Job Worker for Workshop Inventory Tracking
+
+Renders queued thumbnail and medium sizes (see PhotoJob) on a background
+thread, so an upload request stores the original and returns instead of
+holding one of the two gunicorn workers for the seconds a large photo or PDF
+takes.
+
+One thread per web process. It sleeps until an upload wakes it, and polls the
+queue now and then regardless, which picks up work queued by the other process
+or left over from before a restart. The table is the queue and PhotoService
+claims each job before running it, so nothing here needs to coordinate with
+the other worker process.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PhotoJobWorker:
+    """Background thread that runs queued photo jobs for one process"""
+
+    def __init__(self, storage_backend, poll_interval: float = 30.0):
+        self.storage_backend = storage_backend
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def wake(self) -> None:
+        """Run the queue now, starting the thread first if this process has none
+
+        A thread does not survive a fork, so a worker built before one (gunicorn
+        ``--preload``) starts its thread afresh in each child on first use.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._stopping = False
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name='photo-jobs', daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread once the job it is running, if any, finishes"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        from app.photo_service import PhotoService
+
+        while not self._stopping:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                with PhotoService(self.storage_backend) as photo_service:
+                    photo_service.run_pending_jobs()
+            except Exception as e:
+                # The next wake or poll tries again; the thread must not die
+                logger.error(f"Photo job worker error: {str(e)}")
@@ -7,14 +7,17 @@ Supports JPEG, PNG, WebP, and PDF formats with automatic image compression.
 
 import hashlib
 import io
+import os
 import logging
 from typing import List, Optional, Dict, Any, Tuple
 from PIL import Image, ImageOps
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, and_
-from datetime import datetime
+from sqlalchemy.orm import sessionmaker, undefer, undefer_group
+from sqlalchemy import create_engine, and_, func
+from datetime import datetime, timedelta
 
-from .database import Photo, ItemPhotoAssociation, InventoryItem, Product, ProductAttachment, Purchase
+from .blob_store import BLOB_VARIANTS, BlobStore, get_blob_store
+from .database import Photo, PhotoJob, ItemPhotoAssociation, InventoryItem, Product, ProductAttachment, Purchase
+from .exceptions import PhotoProcessingPending
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -58,20 +61,39 @@ class PhotoService:
     # FR-012: raised from 25 because one listing capture can contribute more
     # than a dozen gallery images on its own.
     MAX_ATTACHMENTS_PER_PRODUCT = 100
+
+    # Background rendering of thumbnail and medium sizes (see PhotoJob). A job
+    # that fails this many times is left 'failed' for the operator; one left
+    # 'running' this long belonged to a process that died, and is retried.
+    JOB_MAX_ATTEMPTS = 3
+    JOB_STALE_AFTER = timedelta(minutes=10)
     
-    def __init__(self, storage_backend=None):
-        """Initialize photo service with database connection"""
+    def __init__(self, storage_backend=None, blob_store: Optional[BlobStore] = None, job_queue=None):
+        """Initialize photo service with database connection
+
+        Photo bytes go to ``blob_store`` when one is given, otherwise to the
+        store configured by ``PHOTO_BLOB_DIR``, otherwise to the database.
+
+        With a ``job_queue`` (a PhotoJobWorker), uploads store the original and
+        queue the thumbnail and medium sizes for it to render; without one,
+        they are rendered in the upload call as they always were.
+        """
         if storage_backend and hasattr(storage_backend, 'engine'):
             # Ensure the storage backend is connected
             if not storage_backend._connected:
                 storage_backend.connect()
             self.engine = storage_backend.engine
+            # Borrowed: the pool is the whole process's, not this service's
+            self._owns_engine = False
         else:
             # Create MariaDB connection using the same config as the app
             self.engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+            self._owns_engine = True
         
         self.Session = sessionmaker(bind=self.engine)
         self.session = self.Session()
+        self.blob_store = blob_store if blob_store is not None else get_blob_store()
+        self.job_queue = job_queue
     
     def upload_photo(self, ja_id: str, file_data: bytes, filename: str, content_type: str) -> ItemPhotoAssociation:
         """
@@ -103,21 +125,16 @@ class PhotoService:
             raise ValueError(f"Item with JA ID {ja_id} not found")
 
         try:
-            # Process the photo
-            thumbnail_data, medium_data, original_data = self._process_photo(file_data, content_type)
+            # Process the photo, or leave it to the job queue
+            thumbnail_data, medium_data, original_data = self._render_or_defer(file_data, content_type)
 
             # Create photo record (stores BLOB data once)
-            photo = Photo(
-                filename=filename,
-                content_type=content_type,
-                file_size=len(file_data),
-                thumbnail_data=thumbnail_data,
-                medium_data=medium_data,
-                original_data=original_data,
-                sha256_hash=None,  # Optional: can add hash calculation later
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+            photo = self._new_photo(
+                filename, content_type, file_data,
+                thumbnail_data, medium_data, original_data
             )
+            photo.created_at = datetime.utcnow()
+            photo.updated_at = datetime.utcnow()
 
             self.session.add(photo)
             self.session.flush()  # Get photo.id
@@ -135,6 +152,8 @@ class PhotoService:
 
             self.session.add(association)
             self.session.commit()
+            self._keep_blobs(photo, thumbnail_data, medium_data, original_data)
+            self._wake_job_queue()
 
             # Refresh to load the photo relationship
             self.session.refresh(association)
@@ -148,7 +167,7 @@ class PhotoService:
             raise RuntimeError(f"Photo upload failed: {str(e)}")
     
     def get_photos(self, ja_id: str) -> List[ItemPhotoAssociation]:
-        """Get all photo associations for an inventory item (includes photo data via relationship)"""
+        """Get all photo associations for an inventory item (includes photo metadata via relationship; image bytes stay unloaded)"""
         try:
             associations = self.session.query(ItemPhotoAssociation).filter(
                 ItemPhotoAssociation.ja_id == ja_id
@@ -171,6 +190,15 @@ class PhotoService:
             logger.error(f"Failed to get photo association {photo_id}: {str(e)}")
             raise RuntimeError(f"Failed to retrieve photo: {str(e)}")
     
+    def get_photo_record(self, photo_id: int) -> Optional[Photo]:
+        """Get a Photo by photo ID (not association ID); image bytes stay unloaded"""
+        try:
+            return self.session.query(Photo).filter(Photo.id == photo_id).first()
+
+        except Exception as e:
+            logger.error(f"Failed to get photo {photo_id}: {str(e)}")
+            raise RuntimeError(f"Failed to retrieve photo: {str(e)}")
+
     def get_photo_data(self, photo_id: int, size: str = 'original') -> Optional[Tuple[bytes, str]]:
         """
         Get photo data in specified size
@@ -182,26 +210,239 @@ class PhotoService:
         Returns:
             Tuple of (data, content_type) or None if not found
         """
-        # Query by Photo.id directly (not association ID)
+        # Query by Photo.id directly (not association ID), selecting only the
+        # one size asked for; the other two can be megabytes each
+        variant = size if size in BLOB_VARIANTS else 'original'
         try:
-            photo = self.session.query(Photo).filter(Photo.id == photo_id).first()
+            photo = self.session.query(
+                Photo.id, Photo.content_type, Photo.sha256_hash,
+                getattr(Photo, f'{variant}_data').label('data')
+            ).filter(Photo.id == photo_id).first()
             if not photo:
                 return None
 
-            if size == 'thumbnail':
-                # For PDF thumbnails, return as JPEG since we converted them
-                content_type = 'image/jpeg' if photo.content_type == 'application/pdf' else photo.content_type
-                return photo.thumbnail_data, content_type
-            elif size == 'medium':
-                # For PDF medium size, return as JPEG since we converted them
-                content_type = 'image/jpeg' if photo.content_type == 'application/pdf' else photo.content_type
-                return photo.medium_data, content_type
-            else:  # original
-                return photo.original_data, photo.content_type
+            data = photo.data
+            if data is None and self.blob_store is not None:
+                data = self.blob_store.get(photo.sha256_hash, variant)
+            if data is None:
+                if variant != 'original' and self._has_unfinished_job(photo_id):
+                    raise PhotoProcessingPending(
+                        f"The {variant} size of photo {photo_id} is still being rendered",
+                        photo_id=photo_id, size=variant
+                    )
+                self._require_blob_store(photo)
+                raise RuntimeError(f"{variant} of photo {photo_id} is missing from the blob store")
+            return data, self._served_content_type(photo, variant)
+        except PhotoProcessingPending:
+            raise
         except Exception as e:
             logger.error(f"Failed to get photo data for photo ID {photo_id}: {str(e)}")
             raise RuntimeError(f"Failed to retrieve photo data: {str(e)}")
-    
+
+    def get_photo_file(self, photo_id: int, size: str = 'original') -> Optional[Tuple[str, str]]:
+        """
+        Get the local file holding a photo, if it is in a local blob store
+
+        Lets a route hand the file to ``send_file`` -- and so to sendfile --
+        instead of reading it into Python first.
+
+        Args:
+            photo_id: Photo ID (photos.id) - NOT association ID
+            size: 'thumbnail', 'medium', or 'original'
+
+        Returns:
+            Tuple of (path, content_type), or None when the photo does not
+            exist or its bytes are not in a local file; use get_photo_data then
+        """
+        if self.blob_store is None:
+            return None
+        try:
+            row = self.session.query(
+                Photo.sha256_hash, Photo.content_type, Photo.original_data.is_(None)
+            ).filter(Photo.id == photo_id).first()
+            if not row:
+                return None
+
+            sha256_hash, content_type, in_store = row
+            if not in_store:
+                return None
+
+            variant = size if size in BLOB_VARIANTS else 'original'
+            path = self.blob_store.local_path(sha256_hash, variant)
+            if path is None:
+                return None
+            served_type = 'image/jpeg' if content_type == 'application/pdf' and variant != 'original' else content_type
+            return path, served_type
+        except Exception as e:
+            logger.error(f"Failed to locate photo file for photo ID {photo_id}: {str(e)}")
+            raise RuntimeError(f"Failed to retrieve photo data: {str(e)}")
+
+    def get_photo_etag(self, photo_id: int, size: str = 'original') -> Optional[str]:
+        """
+        Get a strong ETag for one size of a photo, without reading its bytes
+
+        An original never changes after upload, so the hash of its bytes plus
+        the size name identifies it for good. A thumbnail or medium size can
+        be rendered again -- a PDF first stored without PyMuPDF, say -- so
+        theirs also carry when they were last written: the file's mtime in
+        the blob store, which photos sharing the file see alike, or the row's
+        updated_at when they are in the row.
+
+        Args:
+            photo_id: Photo ID (photos.id) - NOT association ID
+            size: 'thumbnail', 'medium', or 'original'
+
+        Returns:
+            The ETag value (unquoted), or None when the photo does not exist
+            or predates hashing
+        """
+        variant = size if size in BLOB_VARIANTS else 'original'
+        try:
+            row = self.session.query(
+                Photo.sha256_hash, Photo.updated_at, Photo.original_data.is_(None)
+            ).filter(Photo.id == photo_id).first()
+        except Exception as e:
+            logger.error(f"Failed to get ETag for photo ID {photo_id}: {str(e)}")
+            raise RuntimeError(f"Failed to retrieve photo data: {str(e)}")
+        if not row or not row.sha256_hash:
+            return None
+        sha256_hash, updated_at, in_store = row
+        if variant == 'original':
+            return f"{sha256_hash}-original"
+
+        path = self.blob_store.local_path(sha256_hash, variant) if in_store and self.blob_store else None
+        if path is not None:
+            try:
+                return f"{sha256_hash}-{variant}-{os.stat(path).st_mtime_ns}"
+            except FileNotFoundError:
+                return None
+        return f"{sha256_hash}-{variant}-{updated_at:%Y%m%d%H%M%S%f}"
+
+    @staticmethod
+    def _served_content_type(photo, variant: str) -> str:
+        """Content type of a stored variant
+
+        PDF thumbnail and medium sizes are JPEG renders of the first page.
+        """
+        if variant != 'original' and photo.content_type == 'application/pdf':
+            return 'image/jpeg'
+        return photo.content_type
+
+    def _require_blob_store(self, photo) -> BlobStore:
+        """The blob store, for a photo whose bytes are not in its row"""
+        if self.blob_store is None:
+            raise RuntimeError(
+                f"Photo {photo.id} is in the blob store but PHOTO_BLOB_DIR is not set"
+            )
+        return self.blob_store
+
+    def _new_photo(self, filename: str, content_type: str, file_data: bytes,
+                   thumbnail_data: Optional[bytes], medium_data: Optional[bytes],
+                   original_data: bytes) -> Photo:
+        """Build a Photo row, writing its bytes to the blob store if there is one
+
+        No thumbnail and medium data means they were deferred: a PhotoJob is
+        added to the session alongside the row, to be committed with it.
+
+        The hash is over the bytes as received, which is exactly what
+        _process_photo returns unchanged as original_data. Hashing a Pillow
+        output instead would not be stable across Pillow versions, and a key
+        that moves under you is worse than none -- it is both the dedupe key
+        and the blob store address.
+
+        Blobs are written before the row is committed. If the commit then
+        fails, the files are left behind unreferenced, which is harmless: the
+        next upload of the same bytes finds them already in place. Once it
+        succeeds, the caller hands the same bytes to _keep_blobs.
+        """
+        digest = hashlib.sha256(file_data).hexdigest()
+        photo = Photo(
+            filename=filename,
+            content_type=content_type,
+            file_size=len(file_data),
+            sha256_hash=digest,
+        )
+
+        if self.blob_store is None:
+            photo.thumbnail_data = thumbnail_data
+            photo.medium_data = medium_data
+            photo.original_data = original_data
+        else:
+            self.blob_store.put(digest, 'original', original_data)
+            if thumbnail_data is not None:
+                self.blob_store.put(digest, 'thumbnail', thumbnail_data)
+                self.blob_store.put(digest, 'medium', medium_data)
+
+        if thumbnail_data is None:
+            self.session.add(PhotoJob(photo=photo))
+        return photo
+
+    def _render_or_defer(self, file_data: bytes, content_type: str) -> Tuple[Optional[bytes], Optional[bytes], bytes]:
+        """The three sizes, or None for the two a job queue will render later
+
+        A deferred image still has its header read, so a file that is not the
+        image it claims to be is refused at upload as before rather than
+        failing later in the worker.
+        """
+        if self.job_queue is None:
+            return self._process_photo(file_data, content_type)
+
+        if content_type in self.SUPPORTED_IMAGE_TYPES:
+            try:
+                with Image.open(io.BytesIO(file_data)) as img:
+                    img.verify()
+            except Exception as e:
+                logger.error(f"Failed to process image: {str(e)}")
+                raise RuntimeError(f"Image processing failed: {str(e)}")
+        return None, None, file_data
+
+    def _wake_job_queue(self) -> None:
+        """Tell the job queue, if there is one, that there may be work"""
+        if self.job_queue is not None:
+            self.job_queue.wake()
+
+    def _prune_blobs(self, session, hashes) -> None:
+        """Delete blob store files no remaining Photo row refers to
+
+        Called after the rows are committed. Identical uploads share one set
+        of files, so a file goes only when the last row with its hash has.
+
+        Each check and delete holds the blob's lock, and _keep_blobs puts the
+        files of a newly committed row back under the same lock. So an upload
+        of the same bytes that commits its row between the check and the
+        delete still ends up with its files.
+        """
+        if self.blob_store is None:
+            return
+        for digest in {h for h in hashes if h}:
+            with self.blob_store.lock(digest):
+                in_use = session.query(Photo.id).filter(Photo.sha256_hash == digest).first() is not None
+                # End the read, so the next check sees rows committed since
+                session.commit()
+                if in_use:
+                    continue
+                try:
+                    self.blob_store.delete(digest)
+                except OSError as e:
+                    # The row is already gone; a stray file only costs disk
+                    logger.error(f"Failed to delete blob {digest}: {e}")
+
+    def _keep_blobs(self, photo, thumbnail_data: Optional[bytes], medium_data: Optional[bytes],
+                    original_data: bytes) -> None:
+        """Put back any of a just-committed photo's files that a prune removed
+
+        _new_photo writes them before the commit, so they are there for anyone
+        who finds the row; this, after it, is what makes them stay there.
+        Files already in place are left alone.
+        """
+        if self.blob_store is None:
+            return
+        with self.blob_store.lock(photo.sha256_hash):
+            self.blob_store.put(photo.sha256_hash, 'original', original_data)
+            if thumbnail_data is not None:
+                self.blob_store.put(photo.sha256_hash, 'thumbnail', thumbnail_data)
+                self.blob_store.put(photo.sha256_hash, 'medium', medium_data)
+
     def delete_photo(self, photo_id: int) -> bool:
         """
         Delete a photo association and the photo itself if no other associations exist
@@ -226,6 +467,7 @@ class PhotoService:
             self.session.flush()
 
             # Check if this photo has any other associations
+            pruned = []
             if photo:
                 remaining_associations = self.session.query(ItemPhotoAssociation).filter(
                     ItemPhotoAssociation.photo_id == photo.id
@@ -234,9 +476,11 @@ class PhotoService:
                 # If no other associations exist, delete the photo data
                 if remaining_associations == 0:
                     logger.info(f"No other associations for photo {photo.id}, deleting photo data")
+                    pruned.append(photo.sha256_hash)
                     self.session.delete(photo)
 
             self.session.commit()
+            self._prune_blobs(self.session, pruned)
 
             logger.info(f"Photo association deleted: {filename} (ID: {photo_id}) for item {ja_id}")
             return True
@@ -336,6 +580,7 @@ class PhotoService:
                     session.delete(photo)
 
             session.commit()
+            self._prune_blobs(session, [photo.sha256_hash for photo in orphaned_photos])
 
             total_cleaned = assoc_count + photo_count
             if total_cleaned > 0:
@@ -564,9 +809,8 @@ class PhotoService:
     # Product catalog attachments (FR-034)
     #
     # Datasheets, wiring diagrams, saved listings and photographs, stored the
-    # same way item photos already are. Datasheets are PDFs, and PDFs already
-    # work here -- building a second blob store beside a working one would be
-    # the opposite of simple.
+    # same way item photos already are -- in the same Photo rows and the same
+    # blob store. Datasheets are PDFs, and PDFs already work here.
     # -----------------------------------------------------------------
 
     def upload_product_attachment(
@@ -691,24 +935,13 @@ class PhotoService:
             )
 
         try:
-            thumbnail_data, medium_data, original_data = self._process_photo(
+            thumbnail_data, medium_data, original_data = self._render_or_defer(
                 file_data, content_type
             )
 
-            photo = Photo(
-                filename=filename,
-                content_type=content_type,
-                file_size=len(file_data),
-                thumbnail_data=thumbnail_data,
-                medium_data=medium_data,
-                original_data=original_data,
-                # Over the bytes as received, which is exactly what
-                # _process_photo returns unchanged as original_data. Hashing a
-                # Pillow output instead would not be stable across Pillow
-                # versions, and a dedupe key that moves under you is worse than
-                # none. Closes the note this column has carried since
-                # 8213852b0b94: "will be populated on future uploads".
-                sha256_hash=hashlib.sha256(file_data).hexdigest(),
+            photo = self._new_photo(
+                filename, content_type, file_data,
+                thumbnail_data, medium_data, original_data
             )
             self.session.add(photo)
             self.session.flush()
@@ -720,6 +953,8 @@ class PhotoService:
             )
             self.session.add(attachment)
             self.session.commit()
+            self._keep_blobs(photo, thumbnail_data, medium_data, original_data)
+            self._wake_job_queue()
             self.session.refresh(attachment)
 
             logger.info(
@@ -771,12 +1006,15 @@ class PhotoService:
                 ItemPhotoAssociation.photo_id == photo_id
             ).count()
 
+            pruned = []
             if not still_referenced:
                 photo = self.session.query(Photo).filter(Photo.id == photo_id).first()
                 if photo is not None:
+                    pruned.append(photo.sha256_hash)
                     self.session.delete(photo)
 
             self.session.commit()
+            self._prune_blobs(self.session, pruned)
             return True
 
         except Exception as e:
@@ -803,69 +1041,333 @@ class PhotoService:
                 f"Unsupported content type: {content_type}. Supported: {supported_list}"
             )
 
+    # -----------------------------------------------------------------
+    # Moving existing bytes between the database and the blob store
+    #
+    # Batched and keyed on photos.id, so memory stays bounded by one batch,
+    # each batch is its own transaction, and an interrupted run picks up where
+    # it stopped -- the rows already moved no longer match the filter.
+    # -----------------------------------------------------------------
+
+    def count_photos_in_database(self) -> int:
+        """Number of photos whose bytes are still in the photos table"""
+        return self.session.query(Photo.id).filter(Photo.original_data.isnot(None)).count()
+
+    def count_photos_in_store(self) -> int:
+        """Number of photos whose bytes are in the blob store"""
+        return self.session.query(Photo.id).filter(Photo.original_data.is_(None)).count()
+
+    def move_blobs_to_store(self, batch_size: int = 50) -> int:
+        """Move every photo's bytes from its row into the blob store
+
+        Each row's hash is recomputed from its original bytes on the way out,
+        because it becomes the address the bytes are read back from; item
+        photos uploaded before hashing was added have none at all.
+
+        Args:
+            batch_size: Rows read, written out and committed at a time
+
+        Returns:
+            int: Number of photos moved
+        """
+        if self.blob_store is None:
+            raise RuntimeError("PHOTO_BLOB_DIR is not set; there is no blob store to move photos to")
+
+        moved = 0
+        last_id = 0
+        while True:
+            session = self.Session()
+            try:
+                photos = session.query(Photo).options(
+                    undefer_group('photo_data')
+                ).filter(
+                    Photo.original_data.isnot(None), Photo.id > last_id
+                ).order_by(Photo.id).limit(batch_size).all()
+                if not photos:
+                    return moved
+
+                for photo in photos:
+                    digest = hashlib.sha256(photo.original_data).hexdigest()
+                    for variant in BLOB_VARIANTS:
+                        self.blob_store.put(digest, variant, getattr(photo, f'{variant}_data'))
+                    photo.sha256_hash = digest
+                    photo.thumbnail_data = None
+                    photo.medium_data = None
+                    photo.original_data = None
+                last_id = photos[-1].id
+
+                session.commit()
+                moved += len(photos)
+                logger.info(f"Moved {moved} photos to the blob store (through photo ID {last_id})")
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+    def move_blobs_to_database(self, batch_size: int = 50) -> int:
+        """Move every photo's bytes from the blob store back into its row
+
+        The reverse of move_blobs_to_store, and what a downgrade past the
+        nullable-columns migration needs first. Files are left in the store;
+        they are harmless there and deleting them is the operator's call.
+
+        Args:
+            batch_size: Rows read, filled and committed at a time
+
+        Returns:
+            int: Number of photos moved
+
+        Raises:
+            RuntimeError: If a photo's bytes are missing from the store. The
+                batches before it stay committed.
+        """
+        if self.blob_store is None:
+            raise RuntimeError("PHOTO_BLOB_DIR is not set; there is no blob store to move photos from")
+
+        moved = 0
+        last_id = 0
+        while True:
+            session = self.Session()
+            try:
+                photos = session.query(Photo).filter(
+                    Photo.original_data.is_(None), Photo.id > last_id
+                ).order_by(Photo.id).limit(batch_size).all()
+                if not photos:
+                    return moved
+
+                for photo in photos:
+                    for variant in BLOB_VARIANTS:
+                        data = self.blob_store.get(photo.sha256_hash, variant)
+                        if data is None:
+                            raise RuntimeError(
+                                f"{variant} of photo {photo.id} is missing from the blob store"
+                            )
+                        setattr(photo, f'{variant}_data', data)
+                last_id = photos[-1].id
+
+                session.commit()
+                moved += len(photos)
+                logger.info(f"Moved {moved} photos to the database (through photo ID {last_id})")
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
     def close(self):
-        """Explicitly close database session and dispose engine"""
+        """Explicitly close database session, and dispose the engine if it is ours
+
+        An engine borrowed from the storage backend is left alone: disposing it
+        would empty the connection pool every other service is sharing.
+        """
         if hasattr(self, 'session') and self.session:
             self.session.close()
             self.session = None
         if hasattr(self, 'engine') and self.engine:
-            self.engine.dispose()
+            if getattr(self, '_owns_engine', True):
+                self.engine.dispose()
             self.engine = None
     
     def __enter__(self):
         """Context manager entry"""
         return self
     
+    def find_pdfs_needing_thumbnails(self) -> List[Photo]:
+        """PDFs whose thumbnail is still the PDF itself
+
+        What _process_pdf stores when PyMuPDF is missing or fails. Only the
+        first bytes of each thumbnail are read to tell.
+        """
+        rows = self.session.query(
+            Photo, func.substr(Photo.thumbnail_data, 1, 4)
+        ).filter(Photo.content_type == 'application/pdf').order_by(Photo.id).all()
+
+        needing = []
+        for photo, head in rows:
+            if head is None and photo.sha256_hash and self.blob_store is not None:
+                head = (self.blob_store.get(photo.sha256_hash, 'thumbnail') or b'')[:4]
+            if head is not None and bytes(head) == b'%PDF':
+                needing.append(photo)
+        return needing
+
     def regenerate_pdf_thumbnails(self) -> int:
         """
-        Regenerate thumbnails for existing PDF photos that only have original PDF data
-        
+        Queue thumbnail regeneration for existing PDF photos that only have original PDF data
+
+        The work goes through the same job queue as uploads. With no queue to
+        hand it to, it is run here before returning.
+
         Returns:
-            int: Number of PDFs that were processed
+            int: Number of PDFs that were queued
         """
         if not PDF_SUPPORT:
             logger.warning("PyMuPDF not available - cannot regenerate PDF thumbnails")
             return 0
             
         try:
-            # Find PDFs where thumbnail_data is still PDF data (starts with %PDF)
-            pdf_photos = self.session.query(ItemPhoto).filter(
-                ItemPhoto.content_type == 'application/pdf'
-            ).all()
-            
-            updated_count = 0
-            
-            for photo in pdf_photos:
-                # Check if thumbnail_data is still PDF data (not JPEG)
-                if photo.thumbnail_data and photo.thumbnail_data.startswith(b'%PDF'):
-                    try:
-                        # Regenerate thumbnails using original PDF data
-                        thumbnail_data, medium_data, original_data = self._process_pdf(photo.original_data)
-                        
-                        # Update the photo record with new thumbnail data
-                        photo.thumbnail_data = thumbnail_data
-                        photo.medium_data = medium_data
-                        photo.updated_at = datetime.utcnow()
-                        
-                        updated_count += 1
-                        logger.info(f"Regenerated thumbnails for PDF {photo.filename} (ID: {photo.id})")
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to regenerate thumbnails for PDF {photo.filename} (ID: {photo.id}): {str(e)}")
-                        continue
-            
-            if updated_count > 0:
-                self.session.commit()
-                logger.info(f"Successfully regenerated thumbnails for {updated_count} PDF photos")
-            else:
-                logger.info("No PDF photos needed thumbnail regeneration")
-                
-            return updated_count
-            
+            queued = 0
+            for photo in self.find_pdfs_needing_thumbnails():
+                if not self._has_unfinished_job(photo.id):
+                    self.session.add(PhotoJob(photo_id=photo.id))
+                    queued += 1
+            self.session.commit()
         except Exception as e:
             self.session.rollback()
             logger.error(f"Failed to regenerate PDF thumbnails: {str(e)}")
             raise RuntimeError(f"PDF thumbnail regeneration failed: {str(e)}")
+
+        if queued:
+            logger.info(f"Queued thumbnail regeneration for {queued} PDF photos")
+        else:
+            logger.info("No PDF photos needed thumbnail regeneration")
+
+        if self.job_queue is not None:
+            self.job_queue.wake()
+        else:
+            self.run_pending_jobs()
+        return queued
+
+    def _has_unfinished_job(self, photo_id: int) -> bool:
+        """Whether a photo's sizes are queued or being rendered"""
+        return self.session.query(PhotoJob.id).filter(
+            PhotoJob.photo_id == photo_id,
+            PhotoJob.status.in_(('pending', 'running'))
+        ).first() is not None
+
+    def run_pending_jobs(self, limit: Optional[int] = None) -> int:
+        """
+        Run queued photo jobs, oldest first, until none are left
+
+        Safe to call from any number of processes at once: each job is claimed
+        by one of them before it runs.
+
+        Args:
+            limit: Stop after this many jobs; None runs them all
+
+        Returns:
+            int: Number of jobs run, successfully or not
+        """
+        self._requeue_stale_jobs()
+
+        run = 0
+        while limit is None or run < limit:
+            job_id = self._claim_next_job()
+            if job_id is None:
+                break
+            self._run_job(job_id)
+            run += 1
+        return run
+
+    def retry_failed_jobs(self) -> int:
+        """Put every failed job back in the queue with its attempts reset
+
+        Returns:
+            int: Number of jobs requeued
+        """
+        try:
+            count = self.session.query(PhotoJob).filter(PhotoJob.status == 'failed').update(
+                {'status': 'pending', 'attempts': 0, 'error': None},
+                synchronize_session=False
+            )
+            self.session.commit()
+            return count
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to requeue photo jobs: {str(e)}")
+            raise RuntimeError(f"Failed to requeue photo jobs: {str(e)}")
+
+    def count_jobs(self) -> Dict[str, int]:
+        """Number of photo jobs in each status"""
+        counts = dict(self.session.query(PhotoJob.status, func.count(PhotoJob.id)).group_by(PhotoJob.status).all())
+        return {status: counts.get(status, 0) for status in PhotoJob.STATUSES}
+
+    def _requeue_stale_jobs(self) -> None:
+        """Return jobs left 'running' by a process that died to the queue"""
+        cutoff = datetime.utcnow() - self.JOB_STALE_AFTER
+        try:
+            stale = self.session.query(PhotoJob).filter(
+                PhotoJob.status == 'running', PhotoJob.started_at < cutoff
+            ).update({'status': 'pending'}, synchronize_session=False)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        if stale:
+            logger.warning(f"Requeued {stale} photo jobs abandoned while running")
+
+    def _claim_next_job(self) -> Optional[int]:
+        """Claim the oldest pending job for this process
+
+        The UPDATE only matches while the job is still pending, so when two
+        workers pick the same job, exactly one of them gets a row count of 1;
+        the other moves on to the next.
+        """
+        while True:
+            candidate = self.session.query(PhotoJob.id).filter(
+                PhotoJob.status == 'pending'
+            ).order_by(PhotoJob.id).first()
+            if candidate is None:
+                self.session.commit()
+                return None
+
+            claimed = self.session.query(PhotoJob).filter(
+                PhotoJob.id == candidate.id, PhotoJob.status == 'pending'
+            ).update({
+                'status': 'running',
+                'attempts': PhotoJob.attempts + 1,
+                'started_at': datetime.utcnow(),
+            }, synchronize_session=False)
+            self.session.commit()
+            if claimed:
+                return candidate.id
+
+    def _run_job(self, job_id: int) -> None:
+        """Render a claimed job's thumbnail and medium sizes and store them
+
+        The sizes go wherever the original is: into the row when it is in the
+        row, into the blob store otherwise. A failure puts the job back in the
+        queue until it has used up its attempts.
+        """
+        job = self.session.get(PhotoJob, job_id)
+        try:
+            photo = self.session.query(Photo).options(undefer(Photo.original_data)).filter(
+                Photo.id == job.photo_id
+            ).first()
+            if photo is not None:
+                original = photo.original_data
+                if original is None:
+                    original = self._require_blob_store(photo).get(photo.sha256_hash, 'original')
+                    if original is None:
+                        raise RuntimeError(f"original of photo {photo.id} is missing from the blob store")
+
+                thumbnail_data, medium_data, _ = self._process_photo(original, photo.content_type)
+
+                if photo.original_data is not None:
+                    photo.thumbnail_data = thumbnail_data
+                    photo.medium_data = medium_data
+                else:
+                    self.blob_store.put(photo.sha256_hash, 'thumbnail', thumbnail_data, replace=True)
+                    self.blob_store.put(photo.sha256_hash, 'medium', medium_data, replace=True)
+                photo.updated_at = datetime.utcnow()
+
+            job.status = 'done'
+            job.error = None
+            job.finished_at = datetime.utcnow()
+            self.session.commit()
+            logger.info(f"Rendered sizes for photo {job.photo_id} (job {job_id})")
+
+        except Exception as e:
+            self.session.rollback()
+            job = self.session.get(PhotoJob, job_id)
+            job.status = 'failed' if job.attempts >= self.JOB_MAX_ATTEMPTS else 'pending'
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            self.session.commit()
+            logger.error(
+                f"Photo job {job_id} for photo {job.photo_id} failed "
+                f"(attempt {job.attempts} of {self.JOB_MAX_ATTEMPTS}): {str(e)}"
+            )
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager cleanup"""
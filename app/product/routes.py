@@ -13,7 +13,7 @@ from urllib.parse import urlparse
 
 from flask import current_app, flash, jsonify, redirect, render_template, request, url_for
 
-from app import csrf
+from app import csrf, get_storage_backend
 from app.catalog_service import CatalogService
 from app.exceptions import (
     CaptureDecisionRequired, DuplicateItemError, ItemNotFoundError, ValidationError
@@ -25,18 +25,20 @@ from app.services.listing_images import store_listing_images
 from app.utils import internal_id
 
 
-def _get_storage_backend():
-    """Get the storage backend for the current app context"""
-    if 'STORAGE_BACKEND' in current_app.config:
-        return current_app.config['STORAGE_BACKEND']
+def _get_photo_job_queue():
+    """The process's photo job worker, or None to render photo sizes in the request"""
+    return current_app.config.get('PHOTO_JOB_WORKER')
 
-    from app.mariadb_storage import MariaDBStorage
-    return MariaDBStorage()
+
+def _get_label_job_queue():
+    """The label print queue, printing on the process's worker thread if it has one"""
+    from app.label_jobs import LabelJobQueue
+    return LabelJobQueue(get_storage_backend(), worker=current_app.config.get('LABEL_JOB_WORKER'))
 
 
 def _get_catalog_service() -> CatalogService:
     """Get the catalog service bound to this app's storage backend"""
-    return CatalogService(_get_storage_backend())
+    return CatalogService(get_storage_backend())
 
 
 def _product_or_404(service: CatalogService, product_id: int):
@@ -250,7 +252,7 @@ def product_detail(product_id):
 
     purchases = service.get_purchase_history(product_id)
 
-    with PhotoService(_get_storage_backend()) as photos:
+    with PhotoService(get_storage_backend()) as photos:
         attachments = [a.to_dict() for a in photos.get_product_attachments(product_id)]
         purchase_attachments = {
             purchase.id: [a.to_dict() for a in photos.get_purchase_attachments(purchase.id)]
@@ -488,15 +490,17 @@ def product_capture():
 
         # After capture_order returns, and before the redirect. The ordering is
         # the contract: the operator lands on a finished capture rather than on
-        # one still filling in behind them. It is also what makes this POST take
-        # eight to fifteen seconds for a full gallery, which is expected rather
-        # than a defect -- see research.md, "Why image retrieval is synchronous".
+        # one still filling in behind them -- see research.md, "Why image
+        # retrieval is synchronous". The images are fetched side by side and
+        # their thumbnails rendered by the photo job queue, so the wait is
+        # about as long as the slowest image.
         if listing is not None and listing.images:
             images = store_listing_images(
                 purchase.product_id,
                 listing.images,
-                _get_storage_backend(),
+                get_storage_backend(),
                 vendor_item_id=vendor_item_id,
+                job_queue=_get_photo_job_queue(),
             )
             flash(_image_tally(images), 'success' if images.stored else 'warning')
 
@@ -1202,9 +1206,12 @@ def api_print_product_label(product_id):
     Composes from the stored record every time -- there is no cached image, so a
     reprint after an edited description reflects the edit. What "no re-entry"
     means is that the operator types nothing, which holds unconditionally.
+
+    Printing is queued like any other label: with a background worker this
+    answers 202 with the job to poll.
     """
     from app.services.label_printer import LABEL_TYPES, get_available_label_types
-    from app.services.product_label import format_provenance, print_product_label
+    from app.services.product_label import format_provenance
 
     service = _get_catalog_service()
     product = _product_or_404(service, product_id)
@@ -1222,26 +1229,33 @@ def api_print_product_label(product_id):
     provenance = format_provenance(service.get_latest_purchase(product_id))
 
     try:
-        print_product_label(
+        job = _get_label_job_queue().submit_product(
             description=product.description,
             code=product.internal_code,
             provenance=provenance,
-            label_config=LABEL_TYPES[label_type],
+            label_type=label_type,
         )
     except Exception as e:
-        current_app.logger.error(f'Error printing product label for {product_id}: {e}')
+        current_app.logger.error(f'Error queueing product label for {product_id}: {e}')
         return jsonify({'success': False, 'error': 'Failed to print label'}), 500
 
-    current_app.logger.info(
-        f'Printed {label_type} label for product {product_id} ({product.internal_code})'
-    )
-    return jsonify({
-        'success': True,
-        'message': f'Label printed for {product.description}',
+    result = {
         'product_id': product_id,
         'code': product.internal_code,
         'label_type': label_type,
-    })
+        'job': job,
+    }
+    if job['status'] in ('pending', 'running'):
+        return jsonify(dict(
+            result, success=True, message=f'Label queued for {product.description}'
+        )), 202
+    if job['status'] == 'failed':
+        return jsonify(dict(result, success=False, error='Failed to print label')), 500
+
+    current_app.logger.info(
+        f'Printed {label_type} label for product {product_id} ({product.internal_code})'
+    )
+    return jsonify(dict(result, success=True, message=f'Label printed for {product.description}'))
 
 
 @bp.route('/api/products/<int:product_id>/attachments', methods=['POST'])
@@ -1261,7 +1275,7 @@ def api_delete_attachment(attachment_id):
     """Remove an attachment, and its bytes if nothing else references them."""
     from app.photo_service import PhotoService
 
-    with PhotoService(_get_storage_backend()) as photos:
+    with PhotoService(get_storage_backend()) as photos:
         if not photos.delete_attachment(attachment_id):
             raise ItemNotFoundError(
                 f"Attachment {attachment_id} not found", item_id=str(attachment_id)
@@ -1286,7 +1300,7 @@ def _upload_attachment(owner: str, owner_id: int):
     data = uploaded.read()
 
     try:
-        with PhotoService(_get_storage_backend()) as photos:
+        with PhotoService(get_storage_backend(), job_queue=_get_photo_job_queue()) as photos:
             if owner == 'product':
                 attachment = photos.upload_product_attachment(
                     owner_id, data, uploaded.filename, uploaded.mimetype
@@ -0,0 +1,158 @@
+"""
+Per-request SQL instrumentation.
+
+Nothing said how many queries a page ran. A loop that loads one row per item
+looks fine on a development database of twenty items and costs seconds on the
+real one, and the only way to find it was to read the code or the MariaDB
+general log. Every request now counts and times the statements it sends:
+
+- The response carries a ``Server-Timing`` header (``db`` and ``total``),
+  which the browser's developer tools show next to the request.
+- The ``performance`` logger gets one line per request with the count and
+  the time spent in the database.
+- A statement sent many times in one request -- the same SQL, different
+  parameters, the shape of an N+1 -- is logged as a warning, with its text.
+
+Statements are counted by listening on every Engine, so an engine a service
+builds for itself is counted too. Only statements run inside a request are
+recorded; the photo and label workers run outside one and are not.
+``record_request_queries`` hands tests the same numbers, for query budgets.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from flask import Flask, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('performance')
+
+# Longest statement text quoted in an N+1 warning
+_STATEMENT_PREVIEW = 300
+
+_listening = False
+
+
+class QueryStats:
+    """The statements one request sent and the time they took"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+
+    @property
+    def db_ms(self) -> float:
+        return self.db_seconds * 1000
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements sent at least ``threshold`` times, most repeated first"""
+        if threshold <= 0:
+            return []
+        return [(statement, count)
+                for statement, count in self.statements.most_common()
+                if count >= threshold]
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        noun = 'query' if self.count == 1 else 'queries'
+        return (f'db;dur={self.db_ms:.1f};desc="{self.count} {noun}", '
+                f'total;dur={total_ms:.1f}')
+
+
+def _current_stats() -> Optional[QueryStats]:
+    if not has_request_context():
+        return None
+    return g.get('query_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats() is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_stats_started', None)
+    if started is None:
+        return
+    stats = _current_stats()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _listen_to_engines() -> None:
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+
+def _start_request() -> None:
+    g.query_stats = QueryStats()
+
+
+def _finish_request(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+
+    response.headers.add('Server-Timing', stats.server_timing())
+
+    endpoint = request.endpoint or request.path
+    logger.info(
+        f"{request.method} {endpoint}: {stats.count} queries in {stats.db_ms:.1f}ms",
+        extra={
+            'operation': 'request_queries',
+            'endpoint': endpoint,
+            'db_queries': stats.count,
+            'db_ms': round(stats.db_ms, 1),
+        }
+    )
+
+    for statement, count in stats.repeated(current_app.config.get('SQL_REPEAT_WARNING', 0)):
+        preview = ' '.join(statement.split())[:_STATEMENT_PREVIEW]
+        logger.warning(
+            f"Probable N+1 in {request.method} {endpoint}: "
+            f"same statement sent {count} times: {preview}",
+            extra={
+                'operation': 'repeated_query',
+                'endpoint': endpoint,
+                'db_queries': count,
+            }
+        )
+
+    for recorded in current_app.extensions.get('query_stats_recorders', []):
+        recorded.append(stats)
+    return response
+
+
+def init_query_stats(app: Flask) -> None:
+    """Count and time each request's SQL, if ``SQL_INSTRUMENTATION`` is set"""
+    if not app.config.get('SQL_INSTRUMENTATION'):
+        return
+    _listen_to_engines()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+@contextmanager
+def record_request_queries(app: Flask) -> Iterator[List[QueryStats]]:
+    """Collect the QueryStats of every request ``app`` finishes inside the block"""
+    recorded: List[QueryStats] = []
+    recorders = app.extensions.setdefault('query_stats_recorders', [])
+    recorders.append(recorded)
+    try:
+        yield recorded
+    finally:
+        recorders.remove(recorded)
@@ -0,0 +1,105 @@
+"""
+Full-Text Search Documents
+
+The catalog and the metal stock inventory both answer free-text searches from a
+table of derived documents -- one row per searchable thing, its words flattened
+into a single ``body`` column -- under a MariaDB FULLTEXT index, or an FTS5
+table under SQLite. This module is the part the two share: what a word is,
+which words the index holds, and how a query becomes a ranked match.
+
+Matching is by word prefix: every word typed must begin some word of the
+document, in any order, so ``capacit`` finds "Ceramic capacitor" and ``lathe
+stand`` finds a note reading "left over from the lathe stand rebuild". Words are
+runs of letters and digits; everything else separates them, in the document and
+the query alike, so both backends' tokenizers see the same words.
+
+InnoDB leaves out of its index words shorter than ``innodb_ft_min_token_size``
+(3 by default) and its default stopwords, and a required term it never indexed
+matches nothing. Such words are matched with a LIKE on a word start instead --
+narrowed by the other words when there are any, a scan of one table when there
+are none. The rule is applied on SQLite too, which needs no such help, so the
+two backends return the same rows.
+"""
+
+import re
+from typing import Iterable, List
+
+from sqlalchemy import Float, Integer, literal, select, text
+from sqlalchemy.dialects.mysql import match
+
+# Shorter words are matched by LIKE rather than by the index (see above)
+MIN_INDEXED_WORD = 3
+
+# InnoDB's default full-text stopwords, which its index leaves out
+INNODB_STOPWORDS = frozenset({
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en',
+    'for', 'from', 'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or',
+    'that', 'the', 'this', 'to', 'was', 'what', 'when', 'where', 'who',
+    'will', 'with', 'und', 'www',
+})
+
+# Letters and digits; underscores separate words, as they do for FTS5
+_WORD = re.compile(r'[^\W_]+')
+
+
+def words(value) -> List[str]:
+    """The lowercased words of a piece of text, in order"""
+    return _WORD.findall(str(value).lower()) if value else []
+
+
+def document_body(values: Iterable) -> str:
+    """Searchable text as stored: every word of every value, in order, separated by single spaces"""
+    parts = []
+    for value in values:
+        parts.extend(words(value))
+    return ' '.join(parts)
+
+
+def _indexed(word: str) -> bool:
+    return len(word) >= MIN_INDEXED_WORD and word not in INNODB_STOPWORDS
+
+
+def matching_documents(session, query: str, key, body, fts_table: str):
+    """
+    A subquery of ``(key, score)`` for the documents matching ``query``,
+    higher scores more relevant; None when the query has no words
+
+    Args:
+        session: Session whose bind decides the dialect
+        query: The text as typed
+        key: The document table's key column, which is also the FTS5 rowid
+        body: The document table's body column
+        fts_table: Name of the SQLite FTS5 table shadowing the documents
+    """
+    terms = words(query)
+    if not terms:
+        return None
+
+    dialect = session.get_bind().dialect.name
+    indexed = list(dict.fromkeys(term for term in terms if _indexed(term)))
+    unindexed = list(dict.fromkeys(term for term in terms if not _indexed(term)))
+
+    if indexed and dialect == 'mysql':
+        against = match(body, against=' '.join(f'+{term}*' for term in indexed)).in_boolean_mode()
+        statement = select(key.label('key'), against.label('score')).where(against)
+    elif indexed and dialect == 'sqlite':
+        fts = text(
+            f"SELECT rowid AS key, -bm25({fts_table}) AS score "
+            f"FROM {fts_table} WHERE {fts_table} MATCH :terms"
+        ).bindparams(terms=' '.join(f'"{term}"*' for term in indexed)).columns(
+            key=Integer, score=Float
+        ).subquery('fts')
+        statement = select(fts.c.key, fts.c.score)
+        if unindexed:
+            statement = statement.join(body.class_, key == fts.c.key)
+    else:
+        # No word the index holds, or a backend without one: every word is a LIKE
+        statement = select(key.label('key'), literal(0.0, Float).label('score'))
+        unindexed = list(dict.fromkeys(terms))
+
+    for term in unindexed:
+        # A word prefix, like the index's matches: the word follows a space.
+        # Words are letters and digits only, so there is nothing to escape.
+        statement = statement.where((literal(' ') + body).like(f'% {term}%'))
+
+    return statement.subquery('matches')
@@ -0,0 +1,229 @@
+"""
+Rendered label image cache.
+
+Every print rebuilt its image from scratch -- a barcode generator run for a JA
+ID label, a font fit and Code128 layout for a product label -- even when the
+same label had been printed a minute before. A label's pixels depend only on
+what it says, the stock's geometry and the code that draws it, so rendered
+PNGs are kept and a reprint or a preview is a copy of bytes already made.
+
+Two tiers: an LRU of recently used images in each process, in front of a
+directory shared by every process (``LABEL_CACHE_DIR``). Files are written to a
+temporary name and renamed into place, as the blob store does, so a reader in
+another process never sees half an image. Everything here can be rebuilt, so
+the directory needs no backup and the cache may be emptied at any time.
+
+Entries are keyed on the label's content, the geometry of its stock and
+RENDERER_VERSION. Label types that share a geometry share entries; an image
+drawn by an older renderer is simply never asked for again. Bump
+RENDERER_VERSION whenever a change here or in product_label.py alters the
+pixels, and the stale files age out of the directory as new ones are written.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# This app's own drawing code; the label maker's version is added to it below
+RENDERER_VERSION = '1'
+
+# The LABEL_TYPES keys that decide what a label's pixels look like
+_GEOMETRY_KEYS = ('maxlen_inches', 'lp_width_px', 'fixed_len_px', 'lp_dpi', 'flag_mode')
+
+# How often, in writes, the directory is trimmed back to its limit
+_PRUNE_EVERY = 100
+
+
+def _label_maker_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('pt-p710bt-label-maker')
+    except Exception:
+        return 'unknown'
+
+
+def label_cache_key(kind: str, content: Dict[str, Any], geometry: Dict[str, Any]) -> str:
+    """The cache key of one label: a hex digest of everything that draws it
+
+    Args:
+        kind: 'barcode' or 'product' -- which renderer draws it.
+        content: What the label says.
+        geometry: A LABEL_TYPES entry, or any dict holding its geometry keys;
+            other keys (``lp_options``, ``label_count``) are ignored.
+    """
+    identity = {
+        'kind': kind,
+        'content': content,
+        'geometry': {key: geometry.get(key) for key in _GEOMETRY_KEYS},
+        'renderer': [RENDERER_VERSION, _label_maker_version()],
+    }
+    encoded = json.dumps(identity, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LabelImageCache:
+    """LRU of rendered label PNGs, backed by a shared directory
+
+    Thread-safe. Two callers missing on the same key at once may both render
+    it; the images are identical, so whichever is stored last is as good as
+    the other.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None,
+                 max_files: int = 10000):
+        """
+        Args:
+            max_entries: Images held in this process's memory.
+            directory: Where images are shared between processes, or None to
+                keep them in memory only.
+            max_files: Images kept in the directory; the least recently used
+                beyond this are removed.
+        """
+        self.max_entries = max_entries
+        self.directory = os.path.abspath(directory) if directory else None
+        self.max_files = max_files
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """The PNG stored under ``key``, rendering and storing it on a miss"""
+        png = self.get(key)
+        if png is None:
+            png = render()
+            self.put(key, png)
+        return png
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                return png
+
+        png = self._read_file(key)
+        if png is not None:
+            self._remember(key, png)
+        return png
+
+    def put(self, key: str, png: bytes) -> None:
+        self._remember(key, png)
+        self._write_file(key, png)
+
+    def clear(self) -> None:
+        """Forget this process's images; the directory is left alone"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, png: bytes) -> None:
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as image_file:
+                png = image_file.read()
+            # Recently read files are the last to be pruned
+            os.utime(path)
+            return png
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read cached label {key}: {str(e)}")
+            return None
+
+    def _write_file(self, key: str, png: bytes) -> None:
+        # A cache that cannot be written is a slower cache, not a failed print
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    temp_file.write(png)
+                os.replace(temp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.warning(f"Could not cache label {key}: {str(e)}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % _PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Trim the directory to ``max_files``, least recently used first
+
+        Returns:
+            int: Number of files removed
+        """
+        if self.directory is None:
+            return 0
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.png'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    files.append((os.stat(path).st_mtime, path))
+                except FileNotFoundError:
+                    pass
+        excess = len(files) - self.max_files
+        if excess <= 0:
+            return 0
+        files.sort()
+        removed = 0
+        for _, path in files[:excess]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        logger.info(f"Pruned {removed} cached label images")
+        return removed
+
+
+_cache: Optional[LabelImageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_label_cache() -> LabelImageCache:
+    """This process's label cache, configured from ``LABEL_CACHE_SIZE`` and
+    ``LABEL_CACHE_DIR``"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LabelImageCache(
+                max_entries=Config.LABEL_CACHE_SIZE,
+                directory=Config.LABEL_CACHE_DIR or None,
+            )
+        return _cache
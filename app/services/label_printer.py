@@ -12,6 +12,7 @@ from pt_p710bt_label_maker.barcode_label import BarcodeLabelGenerator, FlagModeG
 from pt_p710bt_label_maker.lp_printer import LpPrinter
 from typing import Union, List
 from io import BytesIO
+from app.services.label_cache import get_label_cache, label_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +103,68 @@ def generate_and_print_label(
     logger.info(f"Printing label for barcode: {barcode_value}")
     
     try:
+        png = render_barcode_label(
+            barcode_value=barcode_value,
+            maxlen_inches=maxlen_inches,
+            lp_width_px=lp_width_px,
+            fixed_len_px=fixed_len_px,
+            flag_mode=flag_mode,
+            lp_dpi=lp_dpi
+        )
+        
+        # Print using lp
+        try:
+            printer: LpPrinter = LpPrinter(lp_options)
+            image = BytesIO(png)
+            images: List[BytesIO] = [image] * label_count if label_count > 1 else [image]
+            printer.print_images(images)
+        except Exception as print_error:
+            import traceback
+            
+            # If we can't fix it, provide helpful error info
+            logger.error('Label printing failed: ' + str(print_error))
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+            raise print_error
+
+        logger.info(f"Successfully printed {label_count} label(s) for {barcode_value}")
+
+    except Exception as e:
+        logger.error(f"Error printing label for {barcode_value}: {str(e)}")
+        raise
+
+
+def render_barcode_label(
+    barcode_value: str,
+    maxlen_inches: float,
+    lp_width_px: int,
+    fixed_len_px: int,
+    flag_mode: bool = False,
+    lp_dpi: int = 305,
+    **_ignored: Any
+) -> bytes:
+    """
+    The PNG of a barcode label, from the label cache when it was drawn before.
+    
+    Args:
+        barcode_value: The text/value for the barcode
+        maxlen_inches: Maximum label length in inches
+        lp_width_px: Width in pixels for LP printing (height of the label)
+        fixed_len_px: Fixed length in pixels for the final image
+        flag_mode: Whether to use flag mode (rotated barcodes at ends)
+        lp_dpi: DPI for LP printing (default: 305)
+        **_ignored: Other LABEL_TYPES keys (``lp_options``), so a config entry
+            can be splatted in whole
+    """
+    geometry = {
+        'maxlen_inches': maxlen_inches,
+        'lp_width_px': lp_width_px,
+        'fixed_len_px': fixed_len_px,
+        'flag_mode': flag_mode,
+        'lp_dpi': lp_dpi
+    }
+    key = label_cache_key('barcode', {'value': barcode_value}, geometry)
+
+    def render() -> bytes:
         # Calculate maxlen_px from inches
         maxlen_px: int = int(maxlen_inches * lp_dpi)
         
@@ -123,25 +186,22 @@ def generate_and_print_label(
                 fixed_len_px=fixed_len_px,
                 show_text=True
             )
-        
-        # Print using lp
-        try:
-            printer: LpPrinter = LpPrinter(lp_options)
-            images: List[BytesIO] = [generator.file_obj] * label_count if label_count > 1 else [generator.file_obj]
-            printer.print_images(images)
-        except Exception as print_error:
-            import traceback
-            
-            # If we can't fix it, provide helpful error info
-            logger.error('Label printing failed: ' + str(print_error))
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            raise print_error
+        return generator.file_obj.getvalue()
 
-        logger.info(f"Successfully printed {label_count} label(s) for {barcode_value}")
+    return get_label_cache().get_or_render(key, render)
 
-    except Exception as e:
-        logger.error(f"Error printing label for {barcode_value}: {str(e)}")
-        raise
+
+def render_label_for_ja_id(ja_id: str, label_type: str) -> bytes:
+    """
+    The PNG of a JA ID's label on the given stock, as it would print.
+
+    Raises:
+        ValueError: If label_type is not valid
+    """
+    if label_type not in LABEL_TYPES:
+        valid_types = list(LABEL_TYPES.keys())
+        raise ValueError(f"Invalid label type '{label_type}'. Valid types: {valid_types}")
+    return render_barcode_label(ja_id, **LABEL_TYPES[label_type])
 
 
 def print_label_for_ja_id(
@@ -15,8 +15,14 @@ description are the point too, and an unreachable CDN must not cost the operator
 the purchase they just made.
 
 Not a class -- there is no state to hold. Not a retry loop -- a failed image is
-reported, and the operator can add it by hand or capture again. Not concurrent;
-see research.md, "Why image retrieval is synchronous".
+reported, and the operator can add it by hand or capture again.
+
+Still synchronous in the sense research.md, "Why image retrieval is synchronous"
+means -- the POST does not return until every image is stored or accounted for
+-- but the fetches run side by side, so a gallery costs about as long as its
+slowest image rather than the sum of them. Storing stays one at a time and in
+the order the addresses were given: filenames, dedupe and the attachment cap all
+depend on that order, and none of them is where the time went.
 
 **No URL allow-list, no host validation, no SSRF mitigation.** The addresses come
 from a page the operator is looking at, submitted by the operator, on a machine
@@ -28,10 +34,12 @@ breaks the inventory, which is the constitution's stated reason to validate.
 
 import logging
 import os
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from urllib.parse import unquote, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.models import ImageCaptureResult
 from app.photo_service import PhotoService
@@ -44,6 +52,14 @@ logger = logging.getLogger(__name__)
 _DEFAULT_EXTENSION = '.jpg'
 _KNOWN_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.pdf'}
 
+# Fetches in flight at once, and connections open to any one host. A gallery is
+# one CDN host, so the second is the one that binds: polite to the CDN, and
+# still a several-fold cut in wall time over one at a time.
+_MAX_CONCURRENT_FETCHES = 8
+_CONNECTIONS_PER_HOST = 4
+
+_CHUNK_SIZE = 64 * 1024
+
 
 def _extension_of(url: str) -> str:
     """The address's file extension, when it has a plausible one."""
@@ -52,12 +68,59 @@ def _extension_of(url: str) -> str:
     return extension if extension in _KNOWN_EXTENSIONS else _DEFAULT_EXTENSION
 
 
+def _session() -> requests.Session:
+    """A session whose pool allows _CONNECTIONS_PER_HOST connections to a host
+
+    ``pool_block`` makes that a limit rather than a hint: a fetch past it waits
+    for a connection to come back instead of opening another. One session is
+    shared by every fetch thread, so they share -- and reuse -- that pool.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=_CONNECTIONS_PER_HOST, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _fetch(session: requests.Session, url: str, timeout: float) -> Tuple[str, Optional[bytes], str]:
+    """Retrieve one address, never raising.
+
+    Returns:
+        ('ok', bytes, content type), or ('failed' or 'skipped', None, reason).
+        The body is read in chunks and abandoned as soon as it passes
+        MAX_FILE_SIZE, so an oversized file is never held whole.
+    """
+    try:
+        with session.get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return 'failed', None, f"HTTP {response.status_code}"
+
+            content_type = (response.headers.get('Content-Type') or '').split(';')[0].strip()
+            if content_type not in PhotoService.SUPPORTED_TYPES:
+                return 'skipped', None, f"content type {content_type!r} is not supported"
+
+            limit = PhotoService.MAX_FILE_SIZE
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > limit:
+                return 'skipped', None, f"{declared} bytes is over the file size limit"
+
+            body = bytearray()
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                body.extend(chunk)
+                if len(body) > limit:
+                    return 'skipped', None, f"more than {limit} bytes is over the file size limit"
+            return 'ok', bytes(body), content_type
+    except requests.RequestException as e:
+        return 'failed', None, str(e)
+
+
 def store_listing_images(
     product_id: int,
     urls: List[str],
     storage_backend,
     timeout: float = 10.0,
     vendor_item_id: Optional[str] = None,
+    job_queue=None,
 ) -> ImageCaptureResult:
     """Retrieve captured image addresses and attach them to a product.
 
@@ -70,8 +133,10 @@ def store_listing_images(
             confirmation POST open indefinitely. A parameter with a default
             rather than a configuration setting -- a knob for a value nobody
             will change is speculative generality. It is a parameter at all so
-            the tests can assert it reaches requests.get.
+            the tests can assert it reaches the request.
         vendor_item_id: Used to name the stored files.
+        job_queue: Passed to PhotoService, so the thumbnail and medium sizes
+            are rendered after the POST rather than during it.
 
     Returns:
         Counts of what happened. See data-model.md, "Image storage path".
@@ -88,7 +153,19 @@ def store_listing_images(
     # is a second failure, not a duplicate of anything.
     outcomes = {}
 
-    photo_service = PhotoService(storage_backend)
+    # Every distinct address is fetched at once, each exactly once; the results
+    # are then consumed below in the order the addresses were given.
+    session = _session()
+    executor = ThreadPoolExecutor(
+        max_workers=min(_MAX_CONCURRENT_FETCHES, len(set(urls))),
+        thread_name_prefix='listing-image',
+    )
+    fetches = {}
+    for url in urls:
+        if url not in fetches:
+            fetches[url] = executor.submit(_fetch, session, url, timeout)
+
+    photo_service = PhotoService(storage_backend, job_queue=job_queue)
     try:
         for index, url in enumerate(urls):
             previous = outcomes.get(url)
@@ -99,33 +176,18 @@ def store_listing_images(
                 setattr(result, repeat, getattr(result, repeat) + 1)
                 continue
 
-            try:
-                response = requests.get(url, timeout=timeout)
-            except requests.RequestException as e:
-                logger.info(f"Could not retrieve {url}: {e}")
+            outcome, data, detail = fetches[url].result()
+            if outcome == 'failed':
+                logger.info(f"Could not retrieve {url}: {detail}")
                 result.failed += 1
                 outcomes[url] = 'failed'
                 continue
-
-            if response.status_code != 200:
-                logger.info(f"Could not retrieve {url}: HTTP {response.status_code}")
-                result.failed += 1
-                outcomes[url] = 'failed'
-                continue
-
-            content_type = (response.headers.get('Content-Type') or '').split(';')[0].strip()
-            if content_type not in PhotoService.SUPPORTED_TYPES:
-                logger.info(f"Skipping {url}: content type {content_type!r} is not supported")
-                result.skipped += 1
-                outcomes[url] = 'skipped'
-                continue
-
-            data = response.content
-            if len(data) > PhotoService.MAX_FILE_SIZE:
-                logger.info(f"Skipping {url}: {len(data)} bytes is over the file size limit")
+            if outcome == 'skipped':
+                logger.info(f"Skipping {url}: {detail}")
                 result.skipped += 1
                 outcomes[url] = 'skipped'
                 continue
+            content_type = detail
 
             filename = f"{stem}-{index:02d}{_extension_of(url)}"
             try:
@@ -159,6 +221,9 @@ def store_listing_images(
                 result.stored += 1
     finally:
         photo_service.close()
+        # After the cap, whatever has not started is not wanted
+        executor.shutdown(wait=True, cancel_futures=True)
+        session.close()
 
     logger.info(
         f"Listing images for product {product_id}: stored {result.stored}, "
@@ -19,6 +19,7 @@ description truncates first.
 """
 
 import logging
+from functools import lru_cache
 from io import BytesIO
 from typing import Any, Dict, Optional
 
@@ -138,6 +139,26 @@ def _compose_panel(
     return canvas
 
 
+# Sizes _fit_font considers: every even size from its minimum up to this
+MAX_FONT_PX = 200
+
+
+@lru_cache(maxsize=None)
+def _font(size: int) -> ImageFont.FreeTypeFont:
+    """The label font at a size, loaded from disk once per process.
+
+    Fitting text tries many sizes, and each ``truetype`` call re-reads and
+    re-parses the font file. A loaded font is immutable, so one per size is
+    shared by every label.
+    """
+    return ImageFont.truetype(FONT_FILENAME, size=size)
+
+
+def _text_width(font: ImageFont.FreeTypeFont, text: str) -> int:
+    box = font.getbbox(text)
+    return box[2] - box[0]
+
+
 def _fit_font(text: str, max_width: int, max_height: int, min_size: int) -> ImageFont.FreeTypeFont:
     """Largest font at which `text` fits the box, never below `min_size`.
 
@@ -145,51 +166,81 @@ def _fit_font(text: str, max_width: int, max_height: int, min_size: int) -> Imag
     drawn from the ascender origin, so the descender's extent below that origin
     is what actually has to fit, and measuring the tight glyph box instead leaves
     the tail of a 'g' hanging off the label.
+
+    Text only grows with its size, so the even sizes are binary searched
+    rather than tried one by one.
     """
-    chosen = ImageFont.truetype(FONT_FILENAME, size=min_size)
-    for size in range(min_size, 200, 2):
+    chosen = _font(min_size)
+    sizes = range(min_size, MAX_FONT_PX, 2)
+
+    def fits(size: int) -> bool:
         try:
-            candidate = ImageFont.truetype(FONT_FILENAME, size=size)
+            candidate = _font(size)
         except OSError:
-            break
+            return False
         box = candidate.getbbox(text)
-        if (box[2] - box[0]) <= max_width and box[3] <= max_height:
-            chosen = candidate
+        return (box[2] - box[0]) <= max_width and box[3] <= max_height
+
+    # Invariant: sizes[:low] fit, sizes[high:] do not
+    low, high = 0, len(sizes)
+    while low < high:
+        middle = (low + high) // 2
+        if fits(sizes[middle]):
+            low = middle + 1
         else:
-            break
+            high = middle
+    if low:
+        chosen = _font(sizes[low - 1])
     return chosen
 
 
-def _wrap(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list:
-    """Greedy word wrap at the given font and width."""
+def _wrap(text: str, font: ImageFont.FreeTypeFont, max_width: int,
+          max_lines: Optional[int] = None) -> list:
+    """Greedy word wrap at the given font and width.
+
+    Stops once it has ``max_lines`` lines, the last possibly incomplete: a
+    caller that can show fewer only needs to know the text overflows, and
+    measuring the rest of a long description is most of the cost of fitting it.
+    """
     lines = []
     current = ''
     for word in text.split():
         candidate = f"{current} {word}".strip()
-        box = font.getbbox(candidate)
-        if (box[2] - box[0]) <= max_width or not current:
+        if _text_width(font, candidate) <= max_width or not current:
             current = candidate
         else:
             lines.append(current)
             current = word
+            if max_lines is not None and len(lines) + 1 >= max_lines:
+                break
     if current:
         lines.append(current)
     return lines
 
 
 def _truncate(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> str:
-    """Shorten a single line to fit, marking that it was shortened."""
-    if (font.getbbox(text)[2] - font.getbbox(text)[0]) <= max_width:
+    """Shorten a single line to fit, marking that it was shortened.
+
+    A longer prefix is never narrower, so the longest one that fits with its
+    ellipsis is binary searched: a few measurements however long the text.
+    """
+    if _text_width(font, text) <= max_width:
         return text
 
-    shortened = text
-    while shortened:
-        shortened = shortened[:-1]
-        candidate = shortened.rstrip() + ELLIPSIS
-        box = font.getbbox(candidate)
-        if (box[2] - box[0]) <= max_width:
-            return candidate
-    return ELLIPSIS
+    def fits(length: int) -> bool:
+        return _text_width(font, text[:length].rstrip() + ELLIPSIS) <= max_width
+
+    # Invariant: prefixes up to `low` fit, from `high` on they do not
+    low, high = 0, len(text)
+    while low < high - 1:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    if low == 0:
+        return ELLIPSIS
+    return text[:low].rstrip() + ELLIPSIS
 
 
 def _draw_description(draw, description: str, margin: int, band_height: int,
@@ -198,23 +249,40 @@ def _draw_description(draw, description: str, margin: int, band_height: int,
     if not description.strip():
         return band_height
 
-    # Try progressively smaller fonts until the wrapped text fits the band; the
-    # description is what gives up space, never the code.
-    for size in range(60, MIN_DESCRIPTION_FONT_PX - 1, -2):
+    layouts = {}
+
+    def layout(size: int):
+        if size in layouts:
+            return layouts[size]
+        font = _font(size)
+        line_height = int(size * 1.2)
+        max_lines = max(1, band_height // line_height)
+        # One line past what fits is enough to know the text overflows
+        lines = _wrap(description, font, usable_width, max_lines + 1)
+        layouts[size] = (font, lines, line_height, max_lines)
+        return layouts[size]
+
+    def fits(size: int) -> bool:
         try:
-            font = ImageFont.truetype(FONT_FILENAME, size=size)
+            _, lines, line_height, _ = layout(size)
         except OSError:
-            continue
-        lines = _wrap(description, font, usable_width)
-        line_height = int(size * 1.2)
-        if len(lines) * line_height <= band_height:
-            break
-    else:
-        font = ImageFont.truetype(FONT_FILENAME, size=MIN_DESCRIPTION_FONT_PX)
-        lines = _wrap(description, font, usable_width)
-        line_height = int(MIN_DESCRIPTION_FONT_PX * 1.2)
+            return False
+        return len(lines) * line_height <= band_height
+
+    # The largest font at which the wrapped text fits the band, binary searched
+    # as in _fit_font; the description is what gives up space, never the code.
+    sizes = range(MIN_DESCRIPTION_FONT_PX, 61, 2)
+    low, high = 0, len(sizes)
+    while low < high:
+        middle = (low + high) // 2
+        if fits(sizes[middle]):
+            low = middle + 1
+        else:
+            high = middle
+    font, lines, line_height, max_lines = layout(
+        sizes[low - 1] if low else MIN_DESCRIPTION_FONT_PX
+    )
 
-    max_lines = max(1, band_height // line_height)
     if len(lines) > max_lines:
         lines = lines[:max_lines]
         lines[-1] = _truncate(lines[-1] + ELLIPSIS, font, usable_width)
@@ -320,6 +388,52 @@ def format_provenance(purchase) -> Optional[str]:
     return '  '.join(str(part) for part in parts if part)
 
 
+def render_product_label(
+    description: str,
+    code: str,
+    provenance: Optional[str],
+    label_config: Dict[str, Any],
+) -> bytes:
+    """The PNG of a product label, from the label cache when it was composed before.
+
+    A reprint is the common case -- nothing on the label changes until the
+    description is edited or the product is bought again, and either of those
+    changes the key.
+
+    Args:
+        description: The product's description.
+        code: The internal product code.
+        provenance: The provenance line, or None.
+        label_config: One LABEL_TYPES entry.
+    """
+    from app.services.label_cache import get_label_cache, label_cache_key
+
+    geometry = dict(
+        label_config,
+        lp_dpi=label_config.get('lp_dpi', 305),
+        flag_mode=label_config.get('flag_mode', False),
+    )
+    key = label_cache_key(
+        'product',
+        {'description': description, 'code': code, 'provenance': provenance},
+        geometry,
+    )
+
+    def render() -> bytes:
+        return compose_product_label(
+            description=description,
+            code=code,
+            provenance=provenance,
+            lp_width_px=label_config['lp_width_px'],
+            fixed_len_px=label_config['fixed_len_px'],
+            maxlen_inches=label_config['maxlen_inches'],
+            lp_dpi=geometry['lp_dpi'],
+            flag_mode=geometry['flag_mode'],
+        ).getvalue()
+
+    return get_label_cache().get_or_render(key, render)
+
+
 def print_product_label(
     description: str,
     code: str,
@@ -355,16 +469,7 @@ def print_product_label(
         )
         return
 
-    image = compose_product_label(
-        description=description,
-        code=code,
-        provenance=provenance,
-        lp_width_px=label_config['lp_width_px'],
-        fixed_len_px=label_config['fixed_len_px'],
-        maxlen_inches=label_config['maxlen_inches'],
-        lp_dpi=label_config.get('lp_dpi', 305),
-        flag_mode=label_config.get('flag_mode', False),
-    )
+    image = BytesIO(render_product_label(description, code, provenance, label_config))
 
     printer = LpPrinter(label_config['lp_options'])
     printer.print_images([image] * num_copies)
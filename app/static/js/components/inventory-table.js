@@ -27,6 +27,10 @@ export class InventoryTable {
      * @param {Function} config.onSelectionChange - Callback when selection changes
      * @param {Function} config.onActionClick - Callback when action button clicked
      * @param {Array<string>} config.actions - Available actions for items
+     * @param {Function} config.onSortChange - If set, sorting is done by the caller
+     *     (e.g. on the server) instead of in the browser: called with (field, direction)
+     * @param {Function} config.onPageRequest - If set, called with a page number whose
+     *     items are not loaded yet; returns a Promise that resolves once they are
      */
     constructor(config) {
         this.config = {
@@ -37,10 +41,15 @@ export class InventoryTable {
             itemsPerPage: config.itemsPerPage || 25,
             onSelectionChange: config.onSelectionChange || (() => {}),
             onActionClick: config.onActionClick || (() => {}),
-            actions: config.actions || ['view-history', 'edit', 'shorten', 'move', 'duplicate', 'print-label']
+            actions: config.actions || ['view-history', 'edit', 'shorten', 'move', 'duplicate', 'print-label'],
+            onSortChange: config.onSortChange || null,
+            onPageRequest: config.onPageRequest || null
         };
 
         this.items = [];
+        // Total number of matching items, which may be more than are loaded
+        // when the caller fetches pages on demand
+        this.totalCount = 0;
         this.currentPage = 1;
         this.sortField = 'ja_id';
         this.sortDirection = 'asc';
@@ -79,23 +88,40 @@ export class InventoryTable {
      * Set items to display in the table
      *
      * @param {Array<Object>} items - Array of inventory item objects
+     * @param {number} totalCount - Total matching items, if more than are loaded (optional)
      */
-    setItems(items) {
+    setItems(items, totalCount) {
         this.items = items || [];
+        this.totalCount = totalCount !== undefined ? totalCount : this.items.length;
         this.currentPage = 1;
         this.selectedItems.clear();
         this.render();
     }
 
+    /**
+     * Append a further loaded page of items, keeping the current page and selection
+     *
+     * @param {Array<Object>} items - Array of inventory item objects
+     */
+    appendItems(items) {
+        this.items = this.items.concat(items || []);
+        this.totalCount = Math.max(this.totalCount, this.items.length);
+        this.render();
+    }
+
     /**
      * Render the current page
      *
      * @param {number} pageNumber - Page number to render (optional, defaults to current page)
      */
-    renderPage(pageNumber) {
+    async renderPage(pageNumber) {
         if (pageNumber !== undefined) {
             this.currentPage = pageNumber;
         }
+        const needed = Math.min(this.currentPage * this.config.itemsPerPage, this.totalCount);
+        if (this.config.onPageRequest && needed > this.items.length) {
+            await this.config.onPageRequest(this.currentPage);
+        }
         this.render();
     }
 
@@ -114,6 +140,13 @@ export class InventoryTable {
             this.sortDirection = direction || 'asc';
         }
 
+        if (this.config.onSortChange) {
+            // The caller re-fetches in the new order and calls setItems()
+            this.updateSortIndicators();
+            this.config.onSortChange(this.sortField, this.sortDirection);
+            return;
+        }
+
         // Sort items array
         this.items.sort((a, b) => {
             let aVal = this.getSortValue(a, this.sortField);
@@ -268,7 +301,7 @@ export class InventoryTable {
         const paginationContainer = document.getElementById('pagination-container');
         if (!paginationContainer) return;
 
-        const totalPages = Math.ceil(this.items.length / this.config.itemsPerPage);
+        const totalPages = Math.ceil(this.totalCount / this.config.itemsPerPage);
 
         // Show pagination if more than one page
         if (totalPages > 1) {
@@ -346,7 +379,7 @@ export class InventoryTable {
 
         itemsStart.textContent = startIdx;
         itemsEnd.textContent = endIdx;
-        itemsTotal.textContent = this.items.length;
+        itemsTotal.textContent = this.totalCount;
     }
 
     /**
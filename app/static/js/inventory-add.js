@@ -965,44 +965,31 @@ class InventoryAddForm {
         let failureCount = 0;
         const errors = [];
 
-        for (let i = 0; i < this.createdJaIds.length; i++) {
-            const jaId = this.createdJaIds[i];
-            const progress = Math.round(((i + 1) / this.createdJaIds.length) * 100);
-
-            // The count suffix appears only above 1, so a run at the default
-            // reads exactly as the list page's does.
-            const countSuffix = labelCount > 1 ? ` (${labelCount} labels)` : '';
+        // All the new items' labels are one print job on the server; the bar
+        // follows its progress. The count suffix appears only above 1, so a run
+        // at the default reads exactly as the list page's does.
+        const countSuffix = labelCount > 1 ? ` (${labelCount} labels)` : '';
+        const showProgress = (job) => {
+            const done = job.printed + job.failures.length;
+            const next = Math.min(done, job.total - 1);
+            const progress = Math.round((done / job.total) * 100);
             statusSpan.textContent =
-                `Printing ${i + 1} of ${this.createdJaIds.length}: ${jaId}${countSuffix}`;
+                `Printing ${next + 1} of ${job.total}: ${this.createdJaIds[next]}${countSuffix}`;
             progressBar.style.width = `${progress}%`;
             progressBar.textContent = `${progress}%`;
+        };
 
-            try {
-                const response = await fetch('/api/labels/print', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        ja_id: jaId,
-                        label_type: labelType,
-                        label_count: labelCount
-                    })
-                });
-
-                if (response.ok) {
-                    successCount++;
-                } else {
-                    // Report the endpoint's own message, not just the status
-                    // text -- the status text says nothing about what was wrong.
-                    const data = await response.json();
-                    failureCount++;
-                    errors.push(`${jaId}: ${data.error || response.statusText}`);
-                }
-            } catch (error) {
-                failureCount++;
-                errors.push(`${jaId}: ${error.message}`);
+        try {
+            const job = await window.printLabelJob(this.createdJaIds, labelType, labelCount, showProgress);
+            successCount = job.printed;
+            failureCount = job.total - job.printed;
+            job.failures.forEach(failure => errors.push(`${failure.item}: ${failure.error}`));
+            if (failureCount > job.failures.length && job.error) {
+                errors.push(job.error);
             }
+        } catch (error) {
+            failureCount = this.createdJaIds.length;
+            errors.push(error.message);
         }
 
         // Show results
@@ -3,15 +3,30 @@
  *
  * Handles inventory display, filtering, sorting, and pagination
  * with advanced search capabilities and bulk operations.
+ *
+ * Filtering and sorting happen on the server. Items are fetched one keyset
+ * page at a time as the table's pagination reaches them, so the browser never
+ * holds more of the inventory than the user has paged through.
  */
 
 import { InventoryTable } from './components/inventory-table.js';
 import { toggleItemStatus } from './components/item-actions.js';
 
+// Items fetched per /api/inventory/list request
+const SERVER_PAGE_SIZE = 100;
+
+// Delay before re-querying while the user is still typing in a filter box
+const FILTER_DEBOUNCE_MS = 300;
+
 class InventoryListManager {
     constructor() {
         this.items = [];
-        this.filteredItems = [];
+        this.totalCount = 0;
+        this.nextCursor = null;
+        this.sort = { field: 'ja_id', direction: 'asc' };
+        // Bumped on every fresh load so a slow response for stale filters is dropped
+        this.loadGeneration = 0;
+        this.filterTimer = null;
         this.filters = {
             status: 'active',
             type: 'all',
@@ -27,7 +42,7 @@ class InventoryListManager {
         this.bindEvents();
         this.initializeBulkPrintModal();
         this.loadFiltersFromURL();  // Load filters from URL params if present
-        this.loadInventory();
+        this.onFilterChange();  // Read the filter controls and load the first page
         this.updatePhotoClipboardUI();  // Update UI based on clipboard state
 
         console.log('InventoryListManager initialized');
@@ -42,7 +57,9 @@ class InventoryListManager {
             showSubLocation: true,
             itemsPerPage: 25,
             onSelectionChange: (selectedIds) => this.onSelectionChange(selectedIds),
-            onActionClick: (action, jaId) => this.onActionClick(action, jaId)
+            onActionClick: (action, jaId) => this.onActionClick(action, jaId),
+            onSortChange: (field, direction) => this.onSortChange(field, direction),
+            onPageRequest: (page) => this.loadThroughPage(page)
         });
     }
     
@@ -100,8 +117,8 @@ class InventoryListManager {
         // Filter events
         this.statusFilter.addEventListener('change', () => this.onFilterChange());
         this.typeFilter.addEventListener('change', () => this.onFilterChange());
-        this.materialFilter.addEventListener('input', () => this.onFilterChange());
-        this.searchFilter.addEventListener('input', () => this.onFilterChange());
+        this.materialFilter.addEventListener('input', () => this.onFilterInput());
+        this.searchFilter.addEventListener('input', () => this.onFilterInput());
         this.clearFiltersBtn.addEventListener('click', () => this.clearFilters());
         if (this.clearAllFiltersBtn) {
             this.clearAllFiltersBtn.addEventListener('click', () => this.clearAllFilters());
@@ -218,43 +235,31 @@ class InventoryListManager {
         let failureCount = 0;
         const errors = [];
 
-        // Iterate through all selected items and print labels
-        for (let i = 0; i < selectedJaIds.length; i++) {
-            const jaId = selectedJaIds[i];
-            const progress = Math.round(((i + 1) / selectedJaIds.length) * 100);
-
-            // Update progress display. The count suffix appears only above 1,
-            // so a run at the default reads exactly as it does today.
-            const countSuffix = labelCount > 1 ? ` (${labelCount} labels)` : '';
+        // The whole selection is one print job on the server; the bar follows
+        // its progress. The count suffix appears only above 1, so a run at the
+        // default reads exactly as it always has.
+        const countSuffix = labelCount > 1 ? ` (${labelCount} labels)` : '';
+        const showProgress = (job) => {
+            const done = job.printed + job.failures.length;
+            const next = Math.min(done, job.total - 1);
+            const progress = Math.round((done / job.total) * 100);
             statusSpan.textContent =
-                `Printing ${i + 1} of ${selectedJaIds.length}: ${jaId}${countSuffix}`;
+                `Printing ${next + 1} of ${job.total}: ${selectedJaIds[next]}${countSuffix}`;
             progressBar.style.width = `${progress}%`;
             progressBar.textContent = `${progress}%`;
+        };
 
-            try {
-                const response = await fetch('/api/labels/print', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        ja_id: jaId,
-                        label_type: labelType,
-                        label_count: labelCount
-                    })
-                });
-
-                if (response.ok) {
-                    successCount++;
-                } else {
-                    const data = await response.json();
-                    failureCount++;
-                    errors.push(`${jaId}: ${data.error || response.statusText}`);
-                }
-            } catch (error) {
-                failureCount++;
-                errors.push(`${jaId}: ${error.message}`);
+        try {
+            const job = await window.printLabelJob(selectedJaIds, labelType, labelCount, showProgress);
+            successCount = job.printed;
+            failureCount = job.total - job.printed;
+            job.failures.forEach(failure => errors.push(`${failure.item}: ${failure.error}`));
+            if (failureCount > job.failures.length && job.error) {
+                errors.push(job.error);
             }
+        } catch (error) {
+            failureCount = selectedJaIds.length;
+            errors.push(error.message);
         }
 
         // Display error messages if any failures occurred
@@ -306,23 +311,16 @@ class InventoryListManager {
 
     async loadInventory() {
         this.showLoading();
+        const generation = ++this.loadGeneration;
         
         try {
-            const response = await fetch('/api/inventory/list');
-            
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}`);
-            }
-            
-            const data = await response.json();
-            
-            if (!data.success) {
-                throw new Error(data.error || 'Failed to load inventory');
-            }
+            const data = await this.fetchPage(null);
+            if (generation !== this.loadGeneration) return;
             
             this.items = data.items || [];
-            this.applyFilters();
-            this.table.setItems(this.filteredItems);
+            this.totalCount = data.total_count;
+            this.nextCursor = data.next_cursor;
+            this.table.setItems(this.items, this.totalCount);
             this.updateItemCount();
             this.showInventoryTable();
             
@@ -331,19 +329,86 @@ class InventoryListManager {
             this.showError();
         }
     }
+
+    /**
+     * Fetch one page of the inventory list for the current filters and sort.
+     *
+     * @param {string|null} cursor - next_cursor from the previous page, or null for the first
+     * @returns {Promise<Object>} The API response body
+     */
+    async fetchPage(cursor) {
+        const params = new URLSearchParams({
+            status: this.filters.status,
+            sort: this.sort.field,
+            order: this.sort.direction,
+            page_size: SERVER_PAGE_SIZE
+        });
+        if (this.filters.type !== 'all') params.set('item_type', this.filters.type);
+        if (this.filters.material) params.set('material', this.filters.material);
+        if (this.filters.search) params.set('search', this.filters.search);
+        if (cursor) params.set('cursor', cursor);
+
+        const response = await fetch(`/api/inventory/list?${params}`);
+        
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        
+        const data = await response.json();
+        
+        if (!data.success) {
+            throw new Error(data.error || 'Failed to load inventory');
+        }
+        return data;
+    }
+
+    /**
+     * Fetch further pages until the given table page is loaded (or there are no more).
+     *
+     * @param {number} page - Table page number about to be shown
+     */
+    async loadThroughPage(page) {
+        const generation = this.loadGeneration;
+        const needed = page * this.table.config.itemsPerPage;
+
+        try {
+            while (this.items.length < needed && this.nextCursor) {
+                const data = await this.fetchPage(this.nextCursor);
+                if (generation !== this.loadGeneration) return;
+
+                this.items = this.items.concat(data.items || []);
+                this.totalCount = data.total_count;
+                this.nextCursor = data.next_cursor;
+                this.table.appendItems(data.items || []);
+            }
+        } catch (error) {
+            console.error('Error loading more inventory:', error);
+            this.showToast('Failed to load more items. Please try again.', 'error');
+        }
+    }
+
+    onSortChange(field, direction) {
+        this.sort = { field, direction };
+        this.loadInventory();
+    }
+
+    onFilterInput() {
+        // Typing in a text filter re-queries once the user pauses, not per keystroke
+        clearTimeout(this.filterTimer);
+        this.filterTimer = setTimeout(() => this.onFilterChange(), FILTER_DEBOUNCE_MS);
+    }
     
     onFilterChange() {
+        clearTimeout(this.filterTimer);
+
         // Update filter state
         this.filters.status = this.statusFilter.value;
         this.filters.type = this.typeFilter.value;
         this.filters.material = this.materialFilter.value.toLowerCase();
         this.filters.search = this.searchFilter.value.toLowerCase();
 
-        // Apply filters and update table
-        this.applyFilters();
-        this.table.setItems(this.filteredItems);
-        this.updateItemCount();
-        this.showInventoryTable();
+        // Filters are applied by the server, so start again from the first page
+        this.loadInventory();
     }
     
     clearFilters() {
@@ -410,41 +475,6 @@ class InventoryListManager {
         this.table.refresh();
     }
 
-    applyFilters() {
-        // Apply filters
-        this.filteredItems = this.items.filter(item => {
-            // Status filter
-            if (this.filters.status === 'active' && !item.active) return false;
-            if (this.filters.status === 'inactive' && item.active) return false;
-            
-            // Type filter
-            if (this.filters.type !== 'all' && item.item_type !== this.filters.type) return false;
-            
-            // Material filter
-            if (this.filters.material && !item.material.toLowerCase().includes(this.filters.material)) return false;
-            
-            // Search filter (searches JA ID, location, notes)
-            if (this.filters.search) {
-                const searchText = this.filters.search;
-                const searchFields = [
-                    item.ja_id.toLowerCase(),
-                    (item.location || '').toLowerCase(),
-                    (item.sub_location || '').toLowerCase(),
-                    (item.notes || '').toLowerCase(),
-                    item.display_name.toLowerCase()
-                ];
-                
-                if (!searchFields.some(field => field.includes(searchText))) {
-                    return false;
-                }
-            }
-            
-            return true;
-        });
-
-        // Note: Sorting is now handled by InventoryTable component
-    }
-
     onSelectionChange(selectedIds) {
         // Update bulk action buttons
         this.updateBulkActions();
@@ -481,7 +511,7 @@ class InventoryListManager {
 
     updateSelectAllCheckbox() {
         const selectedCount = this.table.getSelectedItems().length;
-        const totalCount = this.filteredItems.length;
+        const totalCount = this.items.length;
         if (this.selectAllCheckbox) {
             this.selectAllCheckbox.checked = selectedCount > 0 && selectedCount === totalCount;
             this.selectAllCheckbox.indeterminate = selectedCount > 0 && selectedCount < totalCount;
@@ -651,7 +681,7 @@ class InventoryListManager {
         this.loadingState.classList.add('d-none');
         this.errorState.classList.add('d-none');
         
-        if (this.filteredItems.length === 0) {
+        if (this.items.length === 0) {
             this.emptyState.classList.remove('d-none');
             this.inventoryTableContainer.classList.add('d-none');
         } else {
@@ -662,15 +692,7 @@ class InventoryListManager {
     }
     
     updateItemCount() {
-        const total = this.items.length;
-        const filtered = this.filteredItems.length;
-        const active = this.items.filter(item => item.active).length;
-
-        if (filtered !== total) {
-            this.itemCount.innerHTML = `${filtered} of ${total} items shown (${active} active)`;
-        } else {
-            this.itemCount.innerHTML = `${total} items (${active} active)`;
-        }
+        this.itemCount.textContent = `${this.totalCount} ${this.totalCount === 1 ? 'item' : 'items'}`;
     }
 
     // ========== Photo Clipboard Methods ==========
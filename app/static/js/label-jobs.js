@@ -0,0 +1,77 @@
+/**
+ * Shared label print job helpers for the print dialogs.
+ *
+ * Labels are printed by a job on the server. A print request answers 202 with
+ * the job while a worker thread prints it, and these follow the job to its end
+ * through GET /api/labels/jobs/<id>. A server printing in the request answers
+ * with the job already finished, which these return at once.
+ *
+ * Plain globals, like label-count.js, so module and plain scripts can share them.
+ */
+
+const LABEL_JOB_POLL_MS = 500;
+
+/**
+ * Whether a job is still waiting for or being printed.
+ *
+ * @param {object} job - a job as the label job API reports it
+ * @returns {boolean}
+ */
+window.labelJobUnfinished = function(job) {
+    return job.status === 'pending' || job.status === 'running';
+};
+
+/**
+ * Poll a label job until it is done or failed.
+ *
+ * @param {object} job - the job a print request answered with
+ * @param {function(object)} [onProgress] - called with the job after each poll
+ * @returns {Promise<object>} the finished job
+ */
+window.waitForLabelJob = async function(job, onProgress) {
+    while (window.labelJobUnfinished(job)) {
+        if (onProgress) {
+            onProgress(job);
+        }
+        await new Promise(resolve => setTimeout(resolve, LABEL_JOB_POLL_MS));
+
+        const response = await fetch(`/api/labels/jobs/${job.job_id}`);
+        const data = await response.json();
+        if (!response.ok || !data.success) {
+            throw new Error(data.error || 'Failed to read label job');
+        }
+        job = data.job;
+    }
+    if (onProgress) {
+        onProgress(job);
+    }
+    return job;
+};
+
+/**
+ * Print labels for several JA IDs as one job and wait for it to finish.
+ *
+ * @param {string[]} jaIds
+ * @param {string} labelType
+ * @param {number} labelCount - copies of each item's label
+ * @param {function(object)} [onProgress] - called with the job as it prints
+ * @returns {Promise<object>} the finished job
+ */
+window.printLabelJob = async function(jaIds, labelType, labelCount, onProgress) {
+    const response = await csrfFetch('/api/labels/jobs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            ja_ids: jaIds,
+            label_type: labelType,
+            label_count: labelCount
+        })
+    });
+    const data = await response.json();
+    if (!response.ok || !data.success) {
+        throw new Error(data.error || 'Failed to queue labels');
+    }
+    return window.waitForLabelJob(data.job, onProgress);
+};
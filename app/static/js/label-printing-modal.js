@@ -201,6 +201,15 @@ class LabelPrintingModal {
                 throw new Error(data.error || 'Failed to print label');
             }
 
+            // 202: queued, so follow the job until it has printed
+            if (response.status === 202) {
+                const job = await window.waitForLabelJob(data.job);
+                if (job.printed === 0) {
+                    const failure = job.failures[0];
+                    throw new Error((failure && failure.error) || job.error || 'Failed to print label');
+                }
+            }
+
             // A count of 1 keeps today's exact wording.
             this.showSuccess(labelCount === 1
                 ? `Label printed successfully for ${jaId}`
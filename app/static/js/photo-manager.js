@@ -369,10 +369,14 @@ const PhotoManager = {
                     photo.uploaded = true;
                     
                     // For PDFs, update preview to use server-generated thumbnail
+                    // once the server has rendered it (in the background)
                     if (photo.type === 'application/pdf') {
-                        photo.preview = `/api/photos/${photo.id}?size=thumbnail`;
-                        // Update the preview in gallery
-                        this.updatePhotoInGallery(photo);
+                        this.whenSizeReady(photo.id, 'thumbnail').then((ready) => {
+                            if (!ready) return;
+                            photo.preview = `/api/photos/${photo.id}?size=thumbnail`;
+                            // Update the preview in gallery
+                            this.updatePhotoInGallery(photo);
+                        });
                     }
                     
                 } catch (error) {
@@ -381,6 +385,25 @@ const PhotoManager = {
                 }
             },
             
+            // Resolve to true once a photo size has been rendered. The server
+            // answers 202 with a placeholder while it is still queued; after
+            // about half a minute resolve to false and leave the preview be.
+            whenSizeReady: async function(photoId, size) {
+                for (let delay = 500; delay <= 8000; delay *= 2) {
+                    try {
+                        const response = await fetch(`/api/photos/${photoId}?size=${size}`, {
+                            method: 'HEAD',
+                            cache: 'no-store'
+                        });
+                        if (response.status !== 202) return true;
+                    } catch (error) {
+                        console.warn('Photo status check failed:', error);
+                    }
+                    await new Promise(resolve => setTimeout(resolve, delay));
+                }
+                return false;
+            },
+
             // Load existing photos for item
             loadExistingPhotos: async function() {
                 if (!this.currentItemId) return;
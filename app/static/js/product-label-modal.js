@@ -84,6 +84,18 @@
                 body: JSON.stringify({ label_type: labelType })
             })
                 .then((response) => response.json())
+                .then((data) => {
+                    // Queued: follow the job until it has printed
+                    if (data.success && window.labelJobUnfinished(data.job)) {
+                        this.showAlert('info', data.message);
+                        return window.waitForLabelJob(data.job).then((job) => (
+                            job.status === 'done'
+                                ? { success: true, message: 'Label printed' }
+                                : { success: false, error: job.error || 'Printing failed' }
+                        ));
+                    }
+                    return data;
+                })
                 .then((data) => {
                     this.confirm.disabled = false;
                     if (data.success) {
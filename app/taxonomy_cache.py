@@ -0,0 +1,304 @@
+"""
+Material Taxonomy Snapshot Cache
+
+The material taxonomy is read on nearly every inventory request -- validating a
+material, suggesting one, expanding a search to a material's descendants,
+drawing the selector -- and edited perhaps once a month. So each process holds
+one immutable snapshot of it: the valid names, a lowercase lookup, the
+parent/child adjacency, and the rendered hierarchies. Reads are dictionary
+lookups.
+
+Staleness is tracked with the ``material_taxonomy`` row in cache_versions,
+which every taxonomy write bumps in its own transaction (see
+``bump_taxonomy_version``). A process compares its snapshot's version with the
+row at most every VERSION_CHECK_INTERVAL seconds and reloads when they differ;
+the process that made the edit drops its snapshot at once.
+"""
+
+import copy
+import logging
+import threading
+import time
+import weakref
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from .database import CacheVersion, MaterialTaxonomy
+from .utils.autocomplete import AutocompleteIndex
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = 'material_taxonomy'
+
+# How stale another process's edit may be before this one notices it
+VERSION_CHECK_INTERVAL = 2.0
+
+_TaxonomyRow = namedtuple(
+    '_TaxonomyRow', 'id name level parent aliases active notes sort_order'
+)
+
+
+def read_cache_version(session, name: str) -> int:
+    """The current version of a named cache; 0 if it has never been bumped"""
+    version = session.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_cache_version(session, name: str) -> None:
+    """Mark a named cache stale, as part of the session's current transaction"""
+    updated = session.execute(
+        text("UPDATE cache_versions SET version = version + 1 WHERE name = :name"),
+        {'name': name}
+    ).rowcount
+    if not updated:
+        session.add(CacheVersion(name=name, version=1))
+
+
+def bump_taxonomy_version(session) -> None:
+    """Call before committing any write to material_taxonomy"""
+    bump_cache_version(session, CACHE_NAME)
+
+
+def _split_aliases(aliases) -> List[str]:
+    """Aliases as a list, from the comma-separated column (or a list)"""
+    if not aliases:
+        return []
+    if isinstance(aliases, str):
+        return [a.strip() for a in aliases.split(',') if a.strip()]
+    return [a.strip() for a in aliases if a and a.strip()]
+
+
+class TaxonomySnapshot:
+    """One consistent, read-only view of the material taxonomy"""
+
+    def __init__(self, rows: List[_TaxonomyRow], version: Optional[int]):
+        self.version = version
+        self._rows = rows
+        active = [row for row in rows if row.active]
+
+        # Primary names and aliases of active entries, as get_valid_materials
+        # has always returned them
+        valid = set()
+        for row in active:
+            if row.name and row.name.strip():
+                valid.add(row.name.strip())
+            valid.update(_split_aliases(row.aliases))
+        self.valid_materials = tuple(sorted(valid))
+        self._valid_lower = {}
+        for name in self.valid_materials:
+            self._valid_lower.setdefault(name.lower(), name)
+        self._suggestions = AutocompleteIndex(self.valid_materials)
+
+        # Case-insensitive, active only, like the queries this replaces
+        self._active_by_lower = {row.name.lower(): row.name for row in active if row.name}
+        self._children: Dict[str, List[str]] = {}
+        for row in active:
+            if row.parent and row.name:
+                self._children.setdefault(row.parent.lower(), []).append(row.name)
+
+        self.hierarchy = self._build_hierarchy(active)
+        self._overviews: Dict[bool, List[Dict[str, Any]]] = {}
+        self._overview_lock = threading.Lock()
+
+    def is_valid_material(self, material: str) -> bool:
+        """Whether a name or alias is in the taxonomy, ignoring case"""
+        return bool(material) and material.strip().lower() in self._valid_lower
+
+    def descendants(self, material_name: str) -> List[str]:
+        """
+        The material and everything beneath it, sorted
+
+        Any depth. A name not in the taxonomy comes back on its own.
+        """
+        base = self._active_by_lower.get(material_name.lower())
+        if base is None:
+            return [material_name]
+
+        found = {base}
+        pending = [base]
+        while pending:
+            for child in self._children.get(pending.pop().lower(), ()):
+                if child not in found:
+                    found.add(child)
+                    pending.append(child)
+        return sorted(found)
+
+    def suggest(self, query: str, limit: int) -> List[str]:
+        """
+        Valid materials matching a query: the exact match, then names starting
+        with it, then names containing it, each in name order
+        """
+        return self._suggestions.suggest(query, limit)
+
+    def taxonomy_overview(self, include_inactive: bool = False) -> List[Dict[str, Any]]:
+        """
+        The admin interface's nested categories, families and materials
+
+        A copy, so callers may alter it.
+        """
+        with self._overview_lock:
+            if include_inactive not in self._overviews:
+                rows = self._rows if include_inactive else [row for row in self._rows if row.active]
+                self._overviews[include_inactive] = self._build_overview(rows)
+        return copy.deepcopy(self._overviews[include_inactive])
+
+    @staticmethod
+    def _build_hierarchy(active: List[_TaxonomyRow]) -> Dict[str, Any]:
+        """The material selector's hierarchy and summary"""
+        categories = [m for m in active if m.level == 1]
+        families = [m for m in active if m.level == 2]
+        materials = [m for m in active if m.level == 3]
+
+        hierarchy = []
+        for category in categories:
+            category_families = [f for f in families if f.parent == category.name]
+            category_data = {
+                'name': category.name,
+                'level': category.level,
+                'notes': category.notes,
+                'families': []
+            }
+
+            for family in category_families:
+                family_materials = [m for m in materials if m.parent == family.name]
+                family_data = {
+                    'name': family.name,
+                    'level': family.level,
+                    'parent': family.parent,
+                    'notes': family.notes,
+                    'materials': [{'name': m.name, 'level': m.level, 'parent': m.parent, 'aliases': m.aliases, 'notes': m.notes} for m in family_materials]
+                }
+                category_data['families'].append(family_data)
+
+            hierarchy.append(category_data)
+
+        return {
+            'hierarchy': hierarchy,
+            'summary': {
+                'categories': len(categories),
+                'total_families': sum(len(cat['families']) for cat in hierarchy),
+                'total_materials': sum(sum(len(fam['materials']) for fam in cat['families']) for cat in hierarchy)
+            }
+        }
+
+    @staticmethod
+    def _build_overview(all_materials: List[_TaxonomyRow]) -> List[Dict[str, Any]]:
+        categories = [m for m in all_materials if m.level == 1]
+        families = [m for m in all_materials if m.level == 2]
+        materials = [m for m in all_materials if m.level == 3]
+
+        overview = []
+        for category in sorted(categories, key=lambda x: (x.sort_order or 0, x.name)):
+            category_data = {
+                'id': category.id,
+                'name': category.name,
+                'level': category.level,
+                'active': category.active,
+                'notes': category.notes or '',
+                'sort_order': category.sort_order or 0,
+                'children': []
+            }
+
+            category_families = [f for f in families if f.parent == category.name]
+            for family in sorted(category_families, key=lambda x: (x.sort_order or 0, x.name)):
+                family_data = {
+                    'id': family.id,
+                    'name': family.name,
+                    'level': family.level,
+                    'parent': family.parent,
+                    'active': family.active,
+                    'notes': family.notes or '',
+                    'sort_order': family.sort_order or 0,
+                    'children': []
+                }
+
+                family_materials = [m for m in materials if m.parent == family.name]
+                for material in sorted(family_materials, key=lambda x: (x.sort_order or 0, x.name)):
+                    family_data['children'].append({
+                        'id': material.id,
+                        'name': material.name,
+                        'level': material.level,
+                        'parent': material.parent,
+                        'active': material.active,
+                        'aliases': material.aliases or [],
+                        'notes': material.notes or '',
+                        'sort_order': material.sort_order or 0
+                    })
+
+                category_data['children'].append(family_data)
+
+            overview.append(category_data)
+
+        return overview
+
+
+class _TaxonomyCache:
+    """The current snapshot for one database, and when it was last checked"""
+
+    def __init__(self, engine):
+        self.Session = sessionmaker(bind=engine)
+        self.snapshot: Optional[TaxonomySnapshot] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self) -> TaxonomySnapshot:
+        now = time.monotonic()
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version is not None and now - self.checked_at < VERSION_CHECK_INTERVAL:
+            return snapshot
+
+        with self.lock:
+            session = self.Session()
+            try:
+                try:
+                    version = read_cache_version(session, CACHE_NAME)
+                except Exception as e:
+                    # No cache_versions table: still correct, just uncached
+                    logger.warning(f"Taxonomy cache version unavailable, not caching: {e}")
+                    session.rollback()
+                    version = None
+
+                if self.snapshot is None or version is None or self.snapshot.version != version:
+                    rows = [
+                        _TaxonomyRow(m.id, m.name, m.level, m.parent, m.aliases,
+                                     m.active, m.notes, m.sort_order)
+                        for m in session.query(MaterialTaxonomy).order_by(
+                            MaterialTaxonomy.level, MaterialTaxonomy.sort_order, MaterialTaxonomy.name
+                        )
+                    ]
+                    self.snapshot = TaxonomySnapshot(rows, version)
+                    logger.info(f"Loaded material taxonomy snapshot v{version}: {len(rows)} entries")
+                self.checked_at = time.monotonic()
+                return self.snapshot
+            finally:
+                session.close()
+
+    def invalidate(self) -> None:
+        self.snapshot = None
+
+
+# One cache per engine, so separate databases -- each test's, say -- never
+# share a snapshot
+_caches: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _cache_for(engine) -> _TaxonomyCache:
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = _TaxonomyCache(engine)
+        return cache
+
+
+def get_taxonomy_snapshot(engine) -> TaxonomySnapshot:
+    """This process's snapshot of the taxonomy in engine's database, current to within VERSION_CHECK_INTERVAL"""
+    return _cache_for(engine).get()
+
+
+def invalidate_taxonomy_snapshot(engine) -> None:
+    """Drop this process's snapshot; call after committing a taxonomy write"""
+    _cache_for(engine).invalidate()
@@ -0,0 +1,144 @@
+"""An in-memory index for ranked autocomplete.
+
+Every autocomplete in the application ranks the same way -- the exact value
+first, then values starting with what was typed, then values containing it,
+each tier alphabetized without regard to case -- and every one of them used to
+answer that by scanning: a LIKE against each source table per keystroke, or a
+Python pass over every material per tier. This answers it from two structures
+built once: the case-folded values in sorted order, where the prefix tier is a
+bisect and a walk, and an n-gram map from every short substring to the values
+containing it, where the substring tier is a set lookup (or an intersection,
+for queries longer than ``GRAM``).
+
+Values are deduplicated by case-folded spelling. The spelling kept is the first
+in sort order, the same rule the catalog's vocabulary readers use, so the
+choice does not depend on which spelling happened to be recorded first.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterable, List, Set
+
+# Longest substring indexed; longer queries intersect their GRAM-length pieces
+GRAM = 3
+
+
+def _grams(key: str) -> Set[str]:
+    """Every substring of ``key`` up to ``GRAM`` characters long"""
+    return {
+        key[start:start + size]
+        for size in range(1, GRAM + 1)
+        for start in range(len(key) - size + 1)
+    }
+
+
+class AutocompleteIndex:
+    """Ranked exact, prefix and substring suggestions over a set of strings.
+
+    Not thread-safe: ``add`` mutates structures ``suggest`` iterates, so a
+    shared index needs its owner's lock around both.
+    """
+
+    def __init__(self, values: Iterable[str] = ()):
+        # Case-folded value -> spelling kept for it
+        self._spellings: Dict[str, str] = {}
+        for value in values:
+            self._remember(value)
+        self._keys: List[str] = sorted(self._spellings)
+        self._postings: Dict[str, Set[str]] = {}
+        for key in self._keys:
+            self._post(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, value: str) -> bool:
+        return bool(value) and value.strip().lower() in self._spellings
+
+    def add(self, value: str) -> None:
+        """Index one more value; a new spelling of a known one is kept only if it sorts first"""
+        key = self._remember(value)
+        if key is not None:
+            insort(self._keys, key)
+            self._post(key)
+
+    def values(self) -> List[str]:
+        """Every value, alphabetized without regard to case"""
+        return [self._spellings[key] for key in self._keys]
+
+    def suggest(self, query: str, limit: int) -> List[str]:
+        """
+        Up to ``limit`` values for ``query``: the exact match, then values
+        starting with it, then values containing it, each tier alphabetized
+        without regard to case. An empty query returns the first values
+        alphabetically.
+        """
+        query = (query or '').strip().lower()
+        if limit <= 0:
+            return []
+        if not query:
+            return [self._spellings[key] for key in self._keys[:limit]]
+
+        keys = []
+        if query in self._spellings:
+            keys.append(query)
+
+        position = bisect_left(self._keys, query)
+        while len(keys) < limit and position < len(self._keys):
+            key = self._keys[position]
+            if not key.startswith(query):
+                break
+            if key != query:
+                keys.append(key)
+            position += 1
+
+        wanted = limit - len(keys)
+        if wanted > 0:
+            keys.extend(self._containing(query, wanted))
+
+        return [self._spellings[key] for key in keys]
+
+    def _remember(self, value: str):
+        """Record a spelling; the folded key if it is a new value, else None"""
+        value = value.strip() if value else ''
+        if not value:
+            return None
+        key = value.lower()
+        kept = self._spellings.get(key)
+        if kept is None:
+            self._spellings[key] = value
+            return key
+        if value < kept:
+            self._spellings[key] = value
+        return None
+
+    def _post(self, key: str) -> None:
+        for gram in _grams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def _containing(self, query: str, wanted: int) -> List[str]:
+        """The first ``wanted`` keys, alphabetically, that contain but do not start with ``query``"""
+        if len(query) <= GRAM:
+            candidates = self._postings.get(query, ())
+        else:
+            postings = []
+            for start in range(len(query) - GRAM + 1):
+                posting = self._postings.get(query[start:start + GRAM])
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+
+        if len(candidates) * 8 > len(self._keys):
+            # Most values qualify -- a one-letter query, say -- so walking the
+            # sorted keys stops sooner than sorting the candidates would
+            return list(islice(
+                (key for key in self._keys
+                 if key in candidates and query in key and not key.startswith(query)),
+                wanted
+            ))
+        return heapq.nsmallest(wanted, (
+            key for key in candidates if query in key and not key.startswith(query)
+        ))
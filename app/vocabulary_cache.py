@@ -0,0 +1,334 @@
+"""
+Location and Vendor Vocabulary Index
+
+Autocomplete asks for suggestions on every keystroke, and answering each one
+with a LIKE against every table that records the field made typing a shelf name
+cost a round of queries per character. So each process holds an index of the
+vocabulary -- every distinct value of every suggestion field, plus each
+sub-location under the location it was recorded with -- and answers from
+memory (see ``app.utils.autocomplete``).
+
+Keeping it current is done where the values are written. A listener on every
+ORM session notices new, changed and deleted items, products and purchases,
+bumps the ``vocabulary`` row in cache_versions inside the same transaction, and
+after the commit adds the new values to this process's index in place. Other
+processes notice the bumped version within VERSION_CHECK_INTERVAL seconds and
+rebuild. So does this one when a write could have removed a value -- an edit or
+a delete -- because a value's last use is not something the index can tell.
+
+Writers that bypass the ORM's unit of work (``Query.update``, raw SQL) must call
+``bump_vocabulary_version`` before committing and ``invalidate_vocabulary_index``
+after, as taxonomy writers do for theirs.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, attributes, sessionmaker
+
+from .database import InventoryItem, Product, Purchase
+from .taxonomy_cache import bump_cache_version, read_cache_version
+from .utils.autocomplete import AutocompleteIndex
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = 'vocabulary'
+
+# How stale another process's write may be before this one notices it
+VERSION_CHECK_INTERVAL = 2.0
+
+# Whitelist of fields exposed for value-suggestion autocomplete.
+#
+# Keys are the public field names accepted in API paths; values are the
+# ``(model, value column, location column)`` sources that contribute. The
+# location column is only consulted for ``sub_location``, where a suggestion is
+# scoped to the location already typed -- and each source is scoped against its
+# own location column, never the other's.
+#
+# ``thread_size`` and ``purchase_location`` stay single-source because nothing in
+# the catalog records either. Adding a source is a line in this table.
+FIELD_SUGGESTION_COLUMNS = {
+    'thread_size': (
+        (InventoryItem, 'thread_size', None),
+    ),
+    'purchase_location': (
+        (InventoryItem, 'purchase_location', None),
+    ),
+    'vendor': (
+        (InventoryItem, 'vendor', None),
+        (Purchase, 'vendor', None),
+    ),
+    'location': (
+        (InventoryItem, 'location', None),
+        (Product, 'location', None),
+    ),
+    'sub_location': (
+        (InventoryItem, 'sub_location', 'location'),
+        (Product, 'sub_location', 'location'),
+    ),
+}
+
+# The same table turned around: what each model contributes
+_TRACKED_COLUMNS: Dict[type, List[tuple]] = {}
+for _field, _sources in FIELD_SUGGESTION_COLUMNS.items():
+    for _model, _column, _location_column in _sources:
+        _TRACKED_COLUMNS.setdefault(_model, []).append((_field, _column, _location_column))
+
+
+def bump_vocabulary_version(session) -> None:
+    """Call before committing a write to a vocabulary column the ORM cannot see"""
+    bump_cache_version(session, CACHE_NAME)
+
+
+def _location_key(location) -> Optional[str]:
+    return location.lower() if location else None
+
+
+class VocabularyIndex:
+    """Every suggestion field's values, and each sub-location by its location"""
+
+    def __init__(self, version: Optional[int]):
+        self.version = version
+        self._values: Dict[str, AutocompleteIndex] = {
+            field: AutocompleteIndex() for field in FIELD_SUGGESTION_COLUMNS
+        }
+        self._scoped: Dict[str, Dict[str, AutocompleteIndex]] = {}
+
+    @classmethod
+    def load(cls, session, version: Optional[int]) -> 'VocabularyIndex':
+        """Build from the distinct values each source records"""
+        index = cls(version)
+        for field, sources in FIELD_SUGGESTION_COLUMNS.items():
+            values = []
+            scoped: Dict[str, list] = {}
+            for model, column_name, location_column_name in sources:
+                column = getattr(model, column_name)
+                columns = [column]
+                if location_column_name:
+                    columns.append(getattr(model, location_column_name))
+                rows = session.query(*columns).filter(
+                    column.isnot(None),
+                    func.trim(column) != '',
+                ).distinct()
+                for row in rows:
+                    values.append(row[0])
+                    location = _location_key(row[1]) if location_column_name else None
+                    if location is not None:
+                        scoped.setdefault(location, []).append(row[0])
+
+            index._values[field] = AutocompleteIndex(values)
+            if scoped:
+                index._scoped[field] = {
+                    location: AutocompleteIndex(names) for location, names in scoped.items()
+                }
+        return index
+
+    def add(self, field: str, value: str, location: Optional[str] = None) -> None:
+        self._values[field].add(value)
+        location = _location_key(location)
+        if location is not None:
+            scoped = self._scoped.setdefault(field, {})
+            if location not in scoped:
+                scoped[location] = AutocompleteIndex()
+            scoped[location].add(value)
+
+    def suggest(self, field: str, query: Optional[str], limit: int,
+                location: Optional[str] = None) -> List[str]:
+        """Ranked suggestions for one field, scoped to a location if it has one"""
+        if location and field in self._scoped:
+            index = self._scoped[field].get(_location_key(location))
+            return index.suggest(query, limit) if index is not None else []
+        return self._values[field].suggest(query, limit)
+
+
+class _VocabularyCache:
+    """The current index for one database, and when it was last checked"""
+
+    def __init__(self, engine):
+        self.Session = sessionmaker(bind=engine)
+        self.index: Optional[VocabularyIndex] = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def suggest(self, field: str, query: Optional[str], limit: int,
+                location: Optional[str] = None) -> List[str]:
+        with self.lock:
+            return self._current().suggest(field, query, limit, location)
+
+    def _current(self) -> VocabularyIndex:
+        """The index, reloaded first if it is missing or stale; call with the lock held"""
+        now = time.monotonic()
+        index = self.index
+        if index is not None and index.version is not None and now - self.checked_at < VERSION_CHECK_INTERVAL:
+            return index
+
+        session = self.Session()
+        try:
+            try:
+                version = read_cache_version(session, CACHE_NAME)
+            except Exception as e:
+                # No cache_versions table: still correct, just uncached
+                logger.warning(f"Vocabulary cache version unavailable, not caching: {e}")
+                session.rollback()
+                version = None
+
+            if self.index is None or version is None or self.index.version != version:
+                started = time.monotonic()
+                self.index = VocabularyIndex.load(session, version)
+                logger.info(
+                    f"Loaded vocabulary index v{version} in {(time.monotonic() - started) * 1000:.1f}ms"
+                )
+            self.checked_at = time.monotonic()
+            return self.index
+        finally:
+            session.close()
+
+    def apply(self, writes: '_PendingWrites') -> None:
+        """Fold a committed transaction's writes in, or drop the index if that cannot be done exactly"""
+        with self.lock:
+            index = self.index
+            if index is None:
+                return
+            if writes.rebuild or writes.version_before is None or index.version != writes.version_before:
+                # Something was removed, or another process wrote in between
+                self.index = None
+                return
+            for field, value, location in writes.added:
+                index.add(field, value, location)
+            index.version = writes.version_after
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.index = None
+
+
+# One cache per engine, so separate databases -- each test's, say -- never
+# share an index
+_caches: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _cache_for(engine) -> _VocabularyCache:
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = _VocabularyCache(engine)
+        return cache
+
+
+def suggest_vocabulary(engine, field: str, query: Optional[str], limit: int,
+                       location: Optional[str] = None) -> List[str]:
+    """Suggestions for a field from this process's index of engine's database"""
+    return _cache_for(engine).suggest(field, query, limit, location)
+
+
+def invalidate_vocabulary_index(engine) -> None:
+    """Drop this process's index; call after committing a write bumped by hand"""
+    _cache_for(engine).invalidate()
+
+
+# -- Write tracking ----------------------------------------------------------
+
+_SESSION_KEY = 'vocabulary_writes'
+
+
+class _PendingWrites:
+    """A transaction's vocabulary changes, waiting on its commit"""
+
+    def __init__(self):
+        self.added: List[tuple] = []
+        self.rebuild = False
+        self.version_before: Optional[int] = None
+        self.version_after: Optional[int] = None
+
+
+def _present(value) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _changes(session):
+    """What this flush adds to the vocabulary, and whether it may remove any"""
+    added = []
+    removes = False
+
+    for obj in session.new:
+        for field, column, location_column in _TRACKED_COLUMNS.get(type(obj), ()):
+            value = getattr(obj, column)
+            if _present(value):
+                location = getattr(obj, location_column) if location_column else None
+                added.append((field, value, location))
+
+    for obj in session.dirty:
+        for field, column, location_column in _TRACKED_COLUMNS.get(type(obj), ()):
+            history = attributes.get_history(obj, column, passive=attributes.PASSIVE_NO_INITIALIZE)
+            moved = bool(location_column) and attributes.get_history(
+                obj, location_column, passive=attributes.PASSIVE_NO_INITIALIZE
+            ).has_changes()
+            if not history.has_changes() and not moved:
+                continue
+            if any(_present(old) for old in history.deleted) or moved:
+                removes = True
+            value = getattr(obj, column)
+            if _present(value):
+                location = getattr(obj, location_column) if location_column else None
+                added.append((field, value, location))
+
+    for obj in session.deleted:
+        if type(obj) in _TRACKED_COLUMNS:
+            removes = True
+
+    return added, removes
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_vocabulary_writes(session, flush_context, instances):
+    added, removes = _changes(session)
+    if not added and not removes:
+        return
+
+    writes = session.info.get(_SESSION_KEY)
+    if writes is None:
+        writes = session.info[_SESSION_KEY] = _PendingWrites()
+    writes.added.extend(added)
+    writes.rebuild = writes.rebuild or removes
+
+    try:
+        bump_vocabulary_version(session)
+        # The row is locked by the bump until this transaction ends, so the
+        # version read back is this transaction's own
+        version = read_cache_version(session, CACHE_NAME)
+    except Exception as e:
+        # No cache_versions table: the write must still succeed. Other
+        # processes cannot be told; this one drops its index after commit.
+        logger.warning(f"Vocabulary cache version unavailable, not bumping: {e}")
+        writes.rebuild = True
+        return
+    if writes.version_before is None:
+        writes.version_before = version - 1
+    writes.version_after = version
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_vocabulary_writes(session):
+    writes = session.info.pop(_SESSION_KEY, None)
+    if writes is None:
+        return
+    cache = _caches.get(session.get_bind())
+    if cache is not None:
+        cache.apply(writes)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_vocabulary_writes(session, previous_transaction):
+    writes = session.info.get(_SESSION_KEY)
+    if writes is None:
+        return
+    if session.in_transaction():
+        # A savepoint's writes were undone; which ones is not recorded
+        writes.rebuild = True
+    else:
+        session.info.pop(_SESSION_KEY, None)
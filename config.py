@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -22,6 +23,32 @@ class Config:
     GOOGLE_TOKEN_FILE = os.environ.get('GOOGLE_TOKEN_FILE') or os.path.join(basedir, 'credentials', 'token.json')
     GOOGLE_SHEET_ID = os.environ.get('GOOGLE_SHEET_ID')
     
+    # Photo and attachment bytes go to this directory (a persistent volume in
+    # Docker) instead of the photos table. Unset keeps them in the database.
+    PHOTO_BLOB_DIR = os.environ.get('PHOTO_BLOB_DIR')
+
+    # Render uploaded photos' thumbnail and medium sizes on a background
+    # thread (queued in the photo_jobs table) rather than in the upload request
+    PHOTO_JOBS_IN_BACKGROUND = os.environ.get('PHOTO_JOBS_IN_BACKGROUND', 'True').lower() in ['true', '1', 'yes']
+
+    # Print labels on a background thread (queued in the label_print_jobs
+    # table) rather than in the request that asks for them
+    LABEL_JOBS_IN_BACKGROUND = os.environ.get('LABEL_JOBS_IN_BACKGROUND', 'True').lower() in ['true', '1', 'yes']
+
+    # Rendered label images are kept for reprints and previews: this many in
+    # each process, and in this directory for all of them. An empty directory
+    # keeps them in memory only; anything in it can be deleted at any time.
+    LABEL_CACHE_SIZE = int(os.environ.get('LABEL_CACHE_SIZE', 256))
+    LABEL_CACHE_DIR = os.environ.get(
+        'LABEL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'workshop-inventory-labels')
+    )
+
+    # Count and time each request's SQL: a Server-Timing header and a
+    # performance log line per request, and a warning for any statement sent
+    # this many times in one request (a probable N+1; 0 turns it off)
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'True').lower() in ['true', '1', 'yes']
+    SQL_REPEAT_WARNING = int(os.environ.get('SQL_REPEAT_WARNING', 10))
+
     # Application Configuration
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 'yes']
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -53,6 +80,12 @@ class TestConfig(Config):
     
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
+
+    # Render photo sizes in the request, so tests see them at once
+    PHOTO_JOBS_IN_BACKGROUND = False
+
+    # Print labels in the request, so tests see the outcome at once
+    LABEL_JOBS_IN_BACKGROUND = False
     
     # Google Sheets API Configuration (legacy, for export functionality)
     GOOGLE_CREDENTIALS_FILE = os.environ.get('GOOGLE_CREDENTIALS_FILE') or os.path.join(basedir, 'credentials', 'credentials.json')
@@ -128,7 +128,6 @@ def regenerate_pdf_thumbnails(dry_run):
     
     try:
         from app.photo_service import PhotoService
-        from app.database import ItemPhoto
         
         # Initialize PhotoService
         with PhotoService() as photo_service:
@@ -137,23 +136,15 @@ def regenerate_pdf_thumbnails(dry_run):
                 click.echo()
                 
                 # Find PDFs that need thumbnail regeneration
-                pdf_photos = photo_service.session.query(ItemPhoto).filter(
-                    ItemPhoto.content_type == 'application/pdf'
-                ).all()
+                needs_update = photo_service.find_pdfs_needing_thumbnails()
                 
-                needs_update = []
-                for photo in pdf_photos:
-                    if photo.thumbnail_data and photo.thumbnail_data.startswith(b'%PDF'):
-                        needs_update.append(photo)
-                
-                click.echo(f"Found {len(pdf_photos)} total PDF photos")
                 click.echo(f"Found {len(needs_update)} PDF photos that need thumbnail regeneration")
                 click.echo()
                 
                 if needs_update:
                     click.echo("Photos that would be processed:")
                     for photo in needs_update[:10]:  # Show first 10
-                        click.echo(f"  - {photo.filename} (ID: {photo.id}, JA ID: {photo.ja_id})")
+                        click.echo(f"  - {photo.filename} (ID: {photo.id})")
                     if len(needs_update) > 10:
                         click.echo(f"  ... and {len(needs_update) - 10} more")
                     click.echo()
@@ -165,6 +156,7 @@ def regenerate_pdf_thumbnails(dry_run):
                 click.echo("PROCESSING MODE - Making changes")
                 click.echo()
                 
+                # No job queue here, so the queued jobs run before this returns
                 updated_count = photo_service.regenerate_pdf_thumbnails()
                 
                 click.echo()
@@ -183,6 +175,94 @@ def regenerate_pdf_thumbnails(dry_run):
         sys.exit(1)
 
 
+@photos.command()
+@click.option('--batch-size', default=50, show_default=True,
+              help='Photos moved and committed per transaction')
+@click.option('--to-database', is_flag=True,
+              help='Move bytes from the blob store back into the photos table')
+@click.option('--dry-run', is_flag=True, help='Show how many photos would move without moving any')
+def migrate_blobs(batch_size, to_database, dry_run):
+    """Move photo bytes out of the photos table into PHOTO_BLOB_DIR
+
+    Safe to interrupt and re-run: each batch is committed on its own and
+    photos already moved are skipped.
+    """
+    from datetime import datetime
+
+    if not AppConfig.PHOTO_BLOB_DIR:
+        click.echo("Error: PHOTO_BLOB_DIR is not set")
+        sys.exit(1)
+
+    direction = "blob store -> database" if to_database else "database -> blob store"
+    click.echo(f"Photo Blob Migration ({direction})")
+    click.echo("=" * 40)
+    click.echo(f"Blob store: {AppConfig.PHOTO_BLOB_DIR}")
+    click.echo(f"Started at: {datetime.now()}")
+    click.echo()
+
+    try:
+        from app.photo_service import PhotoService
+
+        with PhotoService() as photo_service:
+            if to_database:
+                pending = photo_service.count_photos_in_store()
+            else:
+                pending = photo_service.count_photos_in_database()
+            click.echo(f"Photos to move: {pending}")
+
+            if dry_run:
+                click.echo("DRY RUN MODE - No changes made")
+            elif pending:
+                if to_database:
+                    moved = photo_service.move_blobs_to_database(batch_size=batch_size)
+                else:
+                    moved = photo_service.move_blobs_to_store(batch_size=batch_size)
+                click.echo(f"Moved {moved} photos")
+
+        click.echo()
+        click.echo(f"Completed at: {datetime.now()}")
+
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+
+
+@photos.command()
+@click.option('--retry-failed', is_flag=True,
+              help='Requeue jobs that used up their attempts before running')
+def run_jobs(retry_failed):
+    """Run queued photo jobs (thumbnail and medium rendering) now
+
+    The web processes run these in the background; this drains the queue
+    without them, e.g. before a downgrade or after fixing whatever made
+    jobs fail.
+    """
+    from datetime import datetime
+
+    click.echo("Photo Jobs")
+    click.echo("=" * 40)
+    click.echo(f"Started at: {datetime.now()}")
+    click.echo()
+
+    try:
+        from app.photo_service import PhotoService
+
+        with PhotoService() as photo_service:
+            if retry_failed:
+                click.echo(f"Requeued {photo_service.retry_failed_jobs()} failed jobs")
+
+            click.echo(f"Ran {photo_service.run_pending_jobs()} jobs")
+            for status, count in photo_service.count_jobs().items():
+                click.echo(f"  {status}: {count}")
+
+        click.echo()
+        click.echo(f"Completed at: {datetime.now()}")
+
+    except Exception as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+
+
 @cli.group()
 def audit():
     """Data integrity audit commands"""
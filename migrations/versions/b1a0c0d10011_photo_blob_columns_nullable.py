@@ -0,0 +1,64 @@
+"""make photos data columns nullable for the blob store
+
+Revision ID: b1a0c0d10011
+Revises: b1a0c0d10010
+Create Date: 2026-10-16 09:00:00.000000
+
+Photo bytes can now live in a content-addressed blob store on disk
+(``PHOTO_BLOB_DIR``), keyed by ``photos.sha256_hash``, with the ``photos`` row
+keeping only metadata. A row whose bytes have moved out has NULL in all three
+data columns, so the columns must accept NULL.
+
+**Nothing is moved by this migration.** Existing rows keep their bytes and are
+served from the database exactly as before. Moving them is a separate,
+batched, resumable step -- ``manage.py photos migrate-blobs`` -- because
+copying every photo ever uploaded inside one DDL migration would hold the
+table for as long as the copy takes, and fail as a whole at the first bad row.
+
+The reverse restores NOT NULL, which is only possible once every row has its
+bytes back. It therefore refuses while any row is empty, and says which
+command puts the bytes back (``manage.py photos migrate-blobs --to-database``)
+rather than leaving the operator to discover it from a constraint error.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10011'
+down_revision: Union[str, None] = 'b1a0c0d10010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('photos', 'thumbnail_data',
+                    existing_type=sa.LargeBinary(), nullable=True)
+    op.alter_column('photos', 'medium_data',
+                    existing_type=mysql.MEDIUMBLOB(), nullable=True)
+    op.alter_column('photos', 'original_data',
+                    existing_type=mysql.MEDIUMBLOB(), nullable=True)
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    in_store = connection.execute(sa.text(
+        "SELECT COUNT(*) FROM photos WHERE original_data IS NULL"
+    )).scalar()
+    if in_store:
+        raise RuntimeError(
+            f"{in_store} photos have their bytes in the blob store. Run "
+            f"'python manage.py photos migrate-blobs --to-database' before "
+            f"downgrading."
+        )
+
+    op.alter_column('photos', 'thumbnail_data',
+                    existing_type=sa.LargeBinary(), nullable=False)
+    op.alter_column('photos', 'medium_data',
+                    existing_type=mysql.MEDIUMBLOB(), nullable=False)
+    op.alter_column('photos', 'original_data',
+                    existing_type=mysql.MEDIUMBLOB(), nullable=False)
@@ -0,0 +1,75 @@
+"""add photo_jobs table
+
+Revision ID: b1a0c0d10012
+Revises: b1a0c0d10011
+Create Date: 2026-10-16 12:00:00.000000
+
+Rendering a photo's thumbnail and medium sizes -- a Pillow LANCZOS resize, or
+PyMuPDF rasterizing a PDF's first page -- moves out of the upload request. The
+upload stores the original and adds a row here; a worker thread in each web
+process picks rows up and renders the sizes.
+
+The queue is a table rather than memory so that work queued just before a
+restart or deploy is still there afterwards. ``(status, id)`` is the worker's
+"oldest pending job" lookup.
+
+Nothing existing is queued: every photo uploaded so far already has its sizes.
+The reverse refuses while any job is unfinished, since dropping the table would
+leave those photos with no sizes and nothing to render them; ``manage.py photos
+run-jobs`` finishes them first.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10012'
+down_revision: Union[str, None] = 'b1a0c0d10011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'photo_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('photo_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'failed')",
+            name='ck_photo_job_valid_status'
+        ),
+        sa.ForeignKeyConstraint(
+            ['photo_id'], ['photos.id'],
+            name='fk_photo_jobs_photo_id', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_photo_jobs_photo_id'), 'photo_jobs', ['photo_id'], unique=False)
+    op.create_index('ix_photo_jobs_status_id', 'photo_jobs', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    unfinished = connection.execute(sa.text(
+        "SELECT COUNT(*) FROM photo_jobs WHERE status IN ('pending', 'running')"
+    )).scalar()
+    if unfinished:
+        raise RuntimeError(
+            f"{unfinished} photo jobs are unfinished. Run "
+            f"'python manage.py photos run-jobs' before downgrading."
+        )
+
+    # The foreign key first -- it holds its backing index open.
+    op.drop_constraint('fk_photo_jobs_photo_id', 'photo_jobs', type_='foreignkey')
+    op.drop_index('ix_photo_jobs_status_id', table_name='photo_jobs')
+    op.drop_index(op.f('ix_photo_jobs_photo_id'), table_name='photo_jobs')
+    op.drop_table('photo_jobs')
@@ -0,0 +1,46 @@
+"""add sheet_sync_manifests table
+
+Revision ID: b1a0c0d10013
+Revises: b1a0c0d10012
+Create Date: 2026-10-16 14:00:00.000000
+
+The Google Sheets export stops clearing and rewriting each sheet on every
+upload. A row here records, per sheet, the key and a digest of every row the
+last upload wrote, and the next upload sends only the rows that differ from it.
+
+Nothing is backfilled: a sheet with no row here gets one full rewrite, which
+records it. For the same reason the reverse is safe to run at any time -- the
+next upload after it is simply a full one.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10013'
+down_revision: Union[str, None] = 'b1a0c0d10012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sheet_sync_manifests',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('spreadsheet_id', sa.String(length=100), nullable=False),
+        sa.Column('sheet_name', sa.String(length=100), nullable=False),
+        sa.Column('headers_hash', sa.String(length=64), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('manifest', sa.Text().with_variant(mysql.MEDIUMTEXT(), 'mysql'), nullable=False),
+        sa.Column('synced_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('spreadsheet_id', 'sheet_name', name='uq_sheet_sync_manifest_sheet'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sheet_sync_manifests')
@@ -0,0 +1,41 @@
+"""add cache_versions table
+
+Revision ID: b1a0c0d10014
+Revises: b1a0c0d10013
+Create Date: 2026-10-16 15:00:00.000000
+
+Each web process keeps a snapshot of the material taxonomy in memory instead of
+querying it for every validation, suggestion and hierarchy request. The
+taxonomy changes rarely; when it does, the write bumps its row here in the same
+transaction, and every process sees the new number and reloads.
+
+The ``material_taxonomy`` row is created here so that the bump is always an
+UPDATE. Dropping the table is safe: the processes simply stop caching until it
+is back.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10014'
+down_revision: Union[str, None] = 'b1a0c0d10013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(cache_versions, [{'name': 'material_taxonomy', 'version': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
@@ -0,0 +1,38 @@
+"""seed vocabulary cache version
+
+Revision ID: b1a0c0d10015
+Revises: b1a0c0d10014
+Create Date: 2026-10-16 16:00:00.000000
+
+Location and vendor autocomplete is answered from an in-memory index of the
+vocabulary in each process. Writes to items, products and purchases bump the
+``vocabulary`` row in cache_versions so other processes rebuild theirs.
+
+The row is created here so that the bump is always an UPDATE; two first writes
+racing to INSERT it would otherwise collide on the primary key.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10015'
+down_revision: Union[str, None] = 'b1a0c0d10014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    cache_versions = sa.table(
+        'cache_versions',
+        sa.column('name', sa.String),
+        sa.column('version', sa.Integer),
+    )
+    op.bulk_insert(cache_versions, [{'name': 'vocabulary', 'version': 0}])
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM cache_versions WHERE name = 'vocabulary'")
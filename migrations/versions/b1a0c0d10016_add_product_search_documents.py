@@ -0,0 +1,99 @@
+"""add product search documents
+
+Revision ID: b1a0c0d10016
+Revises: b1a0c0d10015
+Create Date: 2026-10-16 17:00:00.000000
+
+Catalog search ORed a leading-wildcard LIKE over products, specifications and
+identifiers, so every search scanned all three. Each product's searchable text
+is now flattened into one ``product_search_documents`` row under an InnoDB
+FULLTEXT index, and searched by word prefix.
+
+The backfill runs as a Python loop over ``op.get_bind()``, as b1a0c0d10007's
+does, and builds each body with the same rule ``app.catalog_search`` uses --
+copied here rather than imported, because a migration must keep meaning what it
+meant when it was written. After this, the application keeps the rows current.
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10016'
+down_revision: Union[str, None] = 'b1a0c0d10015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _words(value):
+    return _WORD.findall(value.lower()) if value else []
+
+
+def upgrade() -> None:
+    op.create_table(
+        'product_search_documents',
+        sa.Column('product_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('body', sa.Text().with_variant(MEDIUMTEXT, 'mysql'), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['product_id'], ['products.id'],
+            name='fk_product_search_documents_product_id', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('product_id'),
+    )
+
+    bind = op.get_bind()
+    products = bind.execute(sa.text(
+        "SELECT id, description, manufacturer, manufacturer_part_number, notes FROM products"
+    )).fetchall()
+    identifiers: dict = {}
+    for product_id, value in bind.execute(sa.text(
+        "SELECT product_id, value FROM product_identifiers ORDER BY id"
+    )):
+        identifiers.setdefault(product_id, []).append(value)
+    specifications: dict = {}
+    for product_id, name, value in bind.execute(sa.text(
+        "SELECT product_id, name, value FROM product_specifications "
+        "ORDER BY product_id, display_order, id"
+    )):
+        specifications.setdefault(product_id, []).append((name, value))
+
+    insert = sa.text(
+        "INSERT INTO product_search_documents (product_id, body) VALUES (:product_id, :body)"
+    )
+    for product_id, *fields in products:
+        parts = []
+        for value in fields:
+            parts.extend(_words(value))
+        for value in identifiers.get(product_id, ()):
+            parts.extend(_words(value))
+        for name, value in specifications.get(product_id, ()):
+            parts.extend(_words(name))
+            parts.extend(_words(value))
+        bind.execute(insert, {'product_id': product_id, 'body': ' '.join(parts)})
+
+    print(f"Indexed {len(products)} product(s) for search")
+
+    # Built after the backfill: one index build rather than a row at a time
+    if bind.dialect.name == 'mysql':
+        op.create_index(
+            'ft_product_search_documents_body', 'product_search_documents', ['body'],
+            unique=False, mysql_prefix='FULLTEXT'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ft_product_search_documents_body', table_name='product_search_documents')
+    op.drop_constraint(
+        'fk_product_search_documents_product_id', 'product_search_documents',
+        type_='foreignkey'
+    )
+    op.drop_table('product_search_documents')
@@ -0,0 +1,97 @@
+"""add inventory search documents
+
+Revision ID: b1a0c0d10017
+Revises: b1a0c0d10016
+Create Date: 2026-10-16 18:00:00.000000
+
+The advanced search's new ``q`` keywords are answered from one
+``inventory_search_documents`` row per ``inventory_items`` row, history rows
+included, under an InnoDB FULLTEXT index -- rather than a leading-wildcard LIKE
+over every row and every text column.
+
+Backfilled with the same word rule as ``app.search_index``, copied rather than
+imported for the reason b1a0c0d10016 gives, in batches so a large history does
+not have to fit in memory at once.
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10017'
+down_revision: Union[str, None] = 'b1a0c0d10016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_WORD = re.compile(r'[^\W_]+')
+
+# In the order app.inventory_search stores their words
+_COLUMNS = (
+    'ja_id', 'material', 'item_type', 'shape', 'location', 'sub_location',
+    'thread_size', 'vendor', 'vendor_part', 'purchase_location', 'notes',
+)
+
+BATCH_SIZE = 1000
+
+
+def _body(values):
+    parts = []
+    for value in values:
+        if value:
+            parts.extend(_WORD.findall(str(value).lower()))
+    return ' '.join(parts)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'inventory_search_documents',
+        sa.Column('item_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['item_id'], ['inventory_items.id'],
+            name='fk_inventory_search_documents_item_id', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('item_id'),
+    )
+
+    bind = op.get_bind()
+    select_batch = sa.text(
+        f"SELECT id, {', '.join(_COLUMNS)} FROM inventory_items "
+        "WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    insert = sa.text(
+        "INSERT INTO inventory_search_documents (item_id, body) VALUES (:item_id, :body)"
+    )
+    indexed = 0
+    after = 0
+    while True:
+        rows = bind.execute(select_batch, {'after': after, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(insert, [{'item_id': row[0], 'body': _body(row[1:])} for row in rows])
+        indexed += len(rows)
+        after = rows[-1][0]
+
+    print(f"Indexed {indexed} inventory row(s) for search")
+
+    # Built after the backfill: one index build rather than a row at a time
+    if bind.dialect.name == 'mysql':
+        op.create_index(
+            'ft_inventory_search_documents_body', 'inventory_search_documents', ['body'],
+            unique=False, mysql_prefix='FULLTEXT'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ft_inventory_search_documents_body', table_name='inventory_search_documents')
+    op.drop_constraint(
+        'fk_inventory_search_documents_item_id', 'inventory_search_documents',
+        type_='foreignkey'
+    )
+    op.drop_table('inventory_search_documents')
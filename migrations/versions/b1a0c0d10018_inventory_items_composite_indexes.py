@@ -0,0 +1,56 @@
+"""inventory_items composite indexes
+
+Revision ID: b1a0c0d10018
+Revises: b1a0c0d10017
+Create Date: 2026-10-16 20:00:00.000000
+
+``inventory_items`` had one index on ``ja_id`` and one on ``active``, and every
+hot query needs both: lists and searches filter ``active`` and order by
+``ja_id``, the next-JA-ID maximum reads the JA IDs of active rows, and the
+canonical-row lookup behind ``get_canonical_item`` and ``update_item`` orders
+one JA ID's rows by ``active, date_added, id``. With single-column indexes the
+database picks one, then reads and sorts the rows the other would have ruled
+out. The dimension ranges of the advanced search had no index at all.
+
+The new indexes lead with the equality each query has and end with what it
+orders or ranges by. ``(active, ja_id)`` and ``(ja_id, active, date_added,
+id)`` begin with the old single columns, so the old indexes are dropped rather
+than maintained twice; the reverse restores them.
+
+``tests/unit/test_inventory_query_plans.py`` EXPLAINs the queries against these.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10018'
+down_revision: Union[str, None] = 'b1a0c0d10017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = (
+    ('ix_inventory_items_active_ja_id', ['active', 'ja_id']),
+    ('ix_inventory_items_ja_id_canonical', ['ja_id', 'active', 'date_added', 'id']),
+    ('ix_inventory_items_active_material_length', ['active', 'material', 'length']),
+    ('ix_inventory_items_active_width', ['active', 'width']),
+    ('ix_inventory_items_active_thickness', ['active', 'thickness']),
+)
+
+
+def upgrade() -> None:
+    for name, columns in _INDEXES:
+        op.create_index(name, 'inventory_items', columns, unique=False)
+    op.drop_index('ix_inventory_items_ja_id', table_name='inventory_items')
+    op.drop_index('ix_inventory_items_active', table_name='inventory_items')
+
+
+def downgrade() -> None:
+    op.create_index('ix_inventory_items_active', 'inventory_items', ['active'], unique=False)
+    op.create_index('ix_inventory_items_ja_id', 'inventory_items', ['ja_id'], unique=False)
+    for name, _columns in reversed(_INDEXES):
+        op.drop_index(name, table_name='inventory_items')
@@ -0,0 +1,67 @@
+"""add inventory current
+
+Revision ID: b1a0c0d10019
+Revises: b1a0c0d10018
+Create Date: 2026-10-16 21:00:00.000000
+
+Every shortening leaves an inactive row behind in ``inventory_items``, so the
+list, its searches and counts, and the next-JA-ID maximum skip over more
+history rows the longer the inventory is used. ``inventory_current`` holds one
+row per JA ID with an active row, pointing at it, and those reads walk it
+instead (app/inventory_current.py). ``inventory_items`` keeps every row, active
+and historical, and stays the table every writer and every other reader uses.
+
+Backfilled with the rule app.inventory_current applies: of a JA ID's active
+rows, the most recently added, id breaking ties.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10019'
+down_revision: Union[str, None] = 'b1a0c0d10018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.create_table(
+        'inventory_current',
+        sa.Column('ja_id', sa.String(length=10), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['item_id'], ['inventory_items.id'],
+            name='fk_inventory_current_item_id', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('ja_id'),
+        sa.UniqueConstraint('item_id', name='uq_inventory_current_item_id'),
+        sqlite_with_rowid=False,
+    )
+
+    bind = op.get_bind()
+    current = {}
+    rows = bind.execute(sa.text(
+        "SELECT ja_id, id FROM inventory_items WHERE active = 1 "
+        "ORDER BY ja_id, date_added DESC, id DESC"
+    ))
+    for ja_id, item_id in rows:
+        current.setdefault(ja_id, item_id)
+
+    insert = sa.text("INSERT INTO inventory_current (ja_id, item_id) VALUES (:ja_id, :item_id)")
+    entries = [{'ja_id': ja_id, 'item_id': item_id} for ja_id, item_id in current.items()]
+    for start in range(0, len(entries), BATCH_SIZE):
+        bind.execute(insert, entries[start:start + BATCH_SIZE])
+
+    print(f"Projected {len(entries)} current inventory item(s)")
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_inventory_current_item_id', 'inventory_current', type_='foreignkey')
+    op.drop_table('inventory_current')
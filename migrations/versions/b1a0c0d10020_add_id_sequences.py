@@ -0,0 +1,53 @@
+"""add id sequences
+
+Revision ID: b1a0c0d10020
+Revises: b1a0c0d10019
+Create Date: 2026-10-16 22:00:00.000000
+
+New JA IDs were the largest canonical JA ID plus one, read with an aggregate
+whenever the add form opened or a batch was created, so two clients asking
+together were given the same number. ``id_sequences`` holds the last number
+handed out, and allocating increments its ``ja_id`` row under the row's lock
+(app/ja_id_sequence.py).
+
+Seeded from every row of ``inventory_items``, inactive history included, so
+no number that was ever used -- even by an item since deactivated -- is
+handed out again.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10020'
+down_revision: Union[str, None] = 'b1a0c0d10019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'id_sequences',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+    bind = op.get_bind()
+    last_value = bind.execute(sa.text(
+        "SELECT MAX(CAST(SUBSTR(ja_id, 3) AS UNSIGNED)) FROM inventory_items "
+        "WHERE ja_id REGEXP '^JA[0-9]{6}$'"
+    )).scalar() or 0
+    bind.execute(
+        sa.text("INSERT INTO id_sequences (name, last_value) VALUES ('ja_id', :last_value)"),
+        {'last_value': int(last_value)}
+    )
+
+    print(f"JA ID sequence starts after JA{int(last_value):06d}")
+
+
+def downgrade() -> None:
+    op.drop_table('id_sequences')
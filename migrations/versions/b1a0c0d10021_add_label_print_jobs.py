@@ -0,0 +1,63 @@
+"""add label_print_jobs table
+
+Revision ID: b1a0c0d10021
+Revises: b1a0c0d10020
+Create Date: 2026-10-16 23:00:00.000000
+
+Printing a label moves out of the request that asks for it. The request adds a
+row here and returns the job's id; a worker thread in each web process prints
+it, recording progress as each item goes to the printer, and the client polls
+the job for that progress (app/label_jobs.py).
+
+As with ``photo_jobs`` the queue is a table so that jobs queued just before a
+restart are still printed afterwards, and ``(status, id)`` is the worker's
+"oldest pending job" lookup. Nothing existing is queued.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10021'
+down_revision: Union[str, None] = 'b1a0c0d10020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'label_print_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('label_type', sa.String(length=50), nullable=False),
+        sa.Column('label_count', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('items', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('printed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failures', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'failed')",
+            name='ck_label_print_job_valid_status'
+        ),
+        sa.CheckConstraint(
+            "kind IN ('inventory', 'product')",
+            name='ck_label_print_job_valid_kind'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_label_print_jobs_status_id', 'label_print_jobs', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    # Unlike photo jobs, an unprinted label job leaves nothing inconsistent
+    # behind; it is simply never printed
+    op.drop_index('ix_label_print_jobs_status_id', table_name='label_print_jobs')
+    op.drop_table('label_print_jobs')
@@ -0,0 +1,31 @@
+"""add label_print_jobs.updated_at
+
+Revision ID: b1a0c0d10022
+Revises: b1a0c0d10021
+Create Date: 2026-10-17 10:00:00.000000
+
+A running label job was judged abandoned ten minutes after it started, so a
+large batch still printing in one process was failed by the other. The worker
+now sets ``updated_at`` as each item prints, and staleness is judged from that
+instead. Existing rows are left NULL and fall back to ``started_at``.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0c0d10022'
+down_revision: Union[str, None] = 'b1a0c0d10021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('label_print_jobs', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('label_print_jobs', 'updated_at')
@@ -18,6 +18,7 @@ warnings.filterwarnings("ignore", message=".*Deprecated API features detected.*"
 import sqlalchemy.exc
 warnings.filterwarnings("ignore", category=sqlalchemy.exc.SAWarning)
 from app import create_app
+from app.query_stats import record_request_queries
 # InMemoryStorage removed - E2E tests now use MariaDB with SQLite backend
 from app.models import ItemType, ItemShape, Dimensions, Thread, ThreadSeries, ThreadHandedness
 from app.database import InventoryItem
@@ -79,6 +80,25 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def query_budget(app, client):
+    """Request an endpoint and fail if it sends more than a budget of SQL statements
+
+    Usage: ``response = query_budget('/api/inventory/list', 5)``; any other
+    keyword arguments (``method``, ``json``, ...) go to ``client.open``.
+    """
+    def request_within(path, budget, **kwargs):
+        with record_request_queries(app) as recorded:
+            response = client.open(path, **kwargs)
+        statements = [statement for stats in recorded for statement in stats.statements.elements()]
+        assert len(statements) <= budget, (
+            f"{path} sent {len(statements)} SQL statements, budget {budget}:\n"
+            + '\n'.join(statements)
+        )
+        return response
+    return request_within
+
+
 @pytest.fixture
 def runner(app):
     """Create Flask CLI runner"""
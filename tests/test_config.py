@@ -16,6 +16,8 @@ class TestConfig(Config):
     TESTING = True
     DEBUG = True
     WTF_CSRF_ENABLED = False  # Disable CSRF for easier testing
+    PHOTO_JOBS_IN_BACKGROUND = False  # Render photo sizes in the request
+    LABEL_JOBS_IN_BACKGROUND = False  # Print labels in the request
     
     # Use different secret key for testing
     SECRET_KEY = 'test-secret-key-not-for-production'
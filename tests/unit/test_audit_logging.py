@@ -731,4 +731,93 @@ class TestAuditLogReconstructionScenarios:
         # Verify the result contains None for original_thread
         assert result['original_thread'] is None
         assert result['ja_id'] == 'JA000124'
-        assert result['material'] == 'Aluminum'
\ No newline at end of file
+        assert result['material'] == 'Aluminum'
+
+class TestQueuedLogging:
+    """Audit payloads built only when logged, and written off the request thread"""
+
+    @pytest.mark.unit
+    def test_payload_functions_are_not_called_when_disabled(self):
+        logger = logging.getLogger('test_audit_disabled')
+        logger.setLevel(logging.WARNING)
+        build = MagicMock(return_value={'ja_id': 'JA000001'})
+
+        log_audit_operation('edit_item', 'success', item_id='JA000001',
+                            item_before=build, logger_name='test_audit_disabled')
+
+        build.assert_not_called()
+
+    @pytest.mark.unit
+    def test_payload_functions_are_called_when_enabled(self, app):
+        from app.logging_config import JSONFormatter
+
+        output = StringIO()
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(JSONFormatter())
+        logger = logging.getLogger('inventory')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            with app.test_request_context('/test', method='POST'):
+                log_audit_operation('edit_item', 'success', item_id='JA000001',
+                                    item_before=lambda: {'ja_id': 'JA000001', 'length': '12'})
+                log_audit_batch_operation('add_items', 'success',
+                                          batch_data=lambda: {'bulk_total': 2},
+                                          results=lambda: {'successful_count': 2})
+        finally:
+            logger.removeHandler(handler)
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines() if line]
+        assert lines[0]['audit_data']['item_before'] == {'ja_id': 'JA000001', 'length': '12'}
+        assert lines[1]['audit_data']['batch_input'] == {'bulk_total': 2}
+        assert 'processed=2' in lines[1]['message']
+
+    @pytest.mark.unit
+    def test_queued_handler_writes_on_its_thread_and_drains_on_stop(self):
+        import threading
+        from app.logging_config import QueuedHandler, JSONFormatter
+
+        written = []
+
+        class Recorder(logging.Handler):
+            def emit(self, record):
+                written.append((threading.current_thread(), self.format(record)))
+
+        target = Recorder()
+        target.setFormatter(JSONFormatter())
+        front = QueuedHandler(target)
+        logger = logging.getLogger('test_queued_handler')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(front)
+        front.start()
+        try:
+            args = {'count': 1}
+            logger.info('count is %(count)s', args)
+            args['count'] = 2
+            try:
+                raise ValueError('boom')
+            except ValueError:
+                logger.exception('failed')
+        finally:
+            front.stop()
+            logger.removeHandler(front)
+
+        assert [thread is threading.current_thread() for thread, _ in written] == [False, False]
+        first, second = (json.loads(line) for _, line in written)
+        # The message is fixed when logged, not when written
+        assert first['message'] == 'count is 1'
+        # The traceback stays in its own field
+        assert second['message'] == 'failed'
+        assert 'ValueError: boom' in second['exception']
+
+    @pytest.mark.unit
+    def test_queued_handler_writes_inline_once_stopped(self):
+        target = MagicMock(spec=logging.Handler)
+        target.level = logging.NOTSET
+        from app.logging_config import QueuedHandler
+        front = QueuedHandler(target)
+
+        front.handle(logging.LogRecord('x', logging.INFO, __file__, 1, 'after shutdown', None, None))
+
+        target.handle.assert_called_once()
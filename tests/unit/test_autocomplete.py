@@ -0,0 +1,85 @@
+"""
+Unit tests for the in-memory autocomplete index.
+"""
+
+import random
+import string
+
+import pytest
+
+from app.utils.autocomplete import AutocompleteIndex
+
+
+def _ranked_by_scanning(values, query, limit):
+    """The ranking the index replaces, done the slow way"""
+    kept = {}
+    for value in sorted((v.strip() for v in values if v.strip()), key=lambda v: (v.lower(), v)):
+        kept.setdefault(value.lower(), value)
+    q = query.strip().lower()
+    if not q:
+        return [kept[k] for k in sorted(kept)][:limit]
+    ranked = sorted(
+        (k for k in kept if q in k),
+        key=lambda k: (0 if k == q else 1 if k.startswith(q) else 2, k)
+    )
+    return [kept[k] for k in ranked][:limit]
+
+
+class TestAutocompleteIndex:
+    """Tests for AutocompleteIndex"""
+
+    @pytest.mark.unit
+    def test_exact_then_prefix_then_substring(self):
+        index = AutocompleteIndex(['Acme Steel Inc', 'Steel Supply', 'Steel', 'Grainger'])
+
+        assert index.suggest('steel', 10) == ['Steel', 'Steel Supply', 'Acme Steel Inc']
+        assert index.suggest('STEEL', 2) == ['Steel', 'Steel Supply']
+
+    @pytest.mark.unit
+    def test_empty_query_is_alphabetical_without_regard_to_case(self):
+        index = AutocompleteIndex(['banana', 'Apple', 'cherry'])
+
+        assert index.suggest('', 10) == ['Apple', 'banana', 'cherry']
+        assert index.suggest(None, 2) == ['Apple', 'banana']
+
+    @pytest.mark.unit
+    def test_spellings_differing_in_case_are_one_value(self):
+        index = AutocompleteIndex(['amazon', 'Amazon', ' AMAZON '])
+
+        assert len(index) == 1
+        # The first spelling in sort order, whichever arrived first
+        assert index.values() == ['AMAZON']
+        index.add('Amazon')
+        assert index.values() == ['AMAZON']
+
+    @pytest.mark.unit
+    def test_blank_values_are_ignored(self):
+        index = AutocompleteIndex(['', '   ', None, 'Shelf A'])
+
+        assert index.values() == ['Shelf A']
+
+    @pytest.mark.unit
+    def test_added_values_are_found_by_prefix_and_substring(self):
+        index = AutocompleteIndex(['Shelf A'])
+
+        index.add('Rack 3 Bin 7')
+
+        assert index.suggest('rack', 10) == ['Rack 3 Bin 7']
+        assert index.suggest('bin 7', 10) == ['Rack 3 Bin 7']
+        assert 'rack 3 bin 7' in index
+
+    @pytest.mark.unit
+    def test_matches_a_scan_for_random_queries(self):
+        rng = random.Random(42)
+        alphabet = string.ascii_letters[:8] + ' -'
+        values = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 12))) for _ in range(400)]
+        index = AutocompleteIndex(values[:300])
+        for value in values[300:]:
+            index.add(value)
+
+        for _ in range(500):
+            source = rng.choice(values)
+            start = rng.randrange(len(source))
+            query = source[start:start + rng.randint(0, 6)]
+            limit = rng.randint(1, 30)
+            assert index.suggest(query, limit) == _ranked_by_scanning(values, query, limit), query
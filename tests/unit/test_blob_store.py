@@ -0,0 +1,117 @@
+"""
+Unit tests for the content-addressed blob store.
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from app.blob_store import LocalBlobStore, get_blob_store
+
+
+DIGEST = hashlib.sha256(b'original bytes').hexdigest()
+
+
+class TestLocalBlobStore:
+    """Tests for LocalBlobStore"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return LocalBlobStore(str(tmp_path))
+
+    @pytest.mark.unit
+    def test_put_then_get_round_trips(self, store):
+        """Each variant is stored and read back separately"""
+        store.put(DIGEST, 'original', b'original bytes')
+        store.put(DIGEST, 'thumbnail', b'small')
+
+        assert store.get(DIGEST, 'original') == b'original bytes'
+        assert store.get(DIGEST, 'thumbnail') == b'small'
+        assert store.get(DIGEST, 'medium') is None
+
+    @pytest.mark.unit
+    def test_files_are_fanned_out_by_hash(self, store, tmp_path):
+        """Files sit two directory levels down, named by hash and variant"""
+        store.put(DIGEST, 'original', b'original bytes')
+
+        expected = tmp_path / DIGEST[:2] / DIGEST[2:4] / f'{DIGEST}-original'
+        assert store.local_path(DIGEST, 'original') == str(expected)
+        assert expected.read_bytes() == b'original bytes'
+
+    @pytest.mark.unit
+    def test_put_of_existing_blob_keeps_the_file(self, store):
+        """Content-addressed: a second put of the same key does not rewrite it"""
+        store.put(DIGEST, 'original', b'original bytes')
+        path = store.local_path(DIGEST, 'original')
+        mtime = os.stat(path).st_mtime_ns
+
+        store.put(DIGEST, 'original', b'original bytes')
+
+        assert os.stat(path).st_mtime_ns == mtime
+
+    @pytest.mark.unit
+    def test_no_temporary_files_are_left_behind(self, store, tmp_path):
+        """The write-then-rename leaves only the finished file"""
+        store.put(DIGEST, 'original', b'original bytes')
+
+        directory = tmp_path / DIGEST[:2] / DIGEST[2:4]
+        assert os.listdir(directory) == [f'{DIGEST}-original']
+
+    @pytest.mark.unit
+    def test_delete_removes_every_variant(self, store):
+        """Delete takes all sizes and tolerates missing ones"""
+        store.put(DIGEST, 'original', b'original bytes')
+        store.put(DIGEST, 'medium', b'medium')
+
+        store.delete(DIGEST)
+        store.delete(DIGEST)
+
+        assert store.local_path(DIGEST, 'original') is None
+        assert store.local_path(DIGEST, 'medium') is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('key', ['../../etc/passwd', 'ABC', '', None])
+    def test_keys_must_be_sha256_digests(self, store, key):
+        """Nothing but a hex digest can name a file"""
+        with pytest.raises(ValueError):
+            store.put(key, 'original', b'x')
+
+    @pytest.mark.unit
+    def test_unknown_variant_is_rejected(self, store):
+        with pytest.raises(ValueError):
+            store.get(DIGEST, 'huge')
+
+    @pytest.mark.unit
+    def test_lock_excludes_other_holders(self, store):
+        """A second holder of a blob's lock waits for the first to let go"""
+        import threading
+        entered = threading.Event()
+
+        def take_lock():
+            with store.lock(DIGEST):
+                entered.set()
+
+        with store.lock(DIGEST):
+            thread = threading.Thread(target=take_lock)
+            thread.start()
+            assert not entered.wait(0.2)
+        thread.join(5)
+
+        assert entered.is_set()
+
+
+class TestGetBlobStore:
+    """Tests for get_blob_store configuration"""
+
+    @pytest.mark.unit
+    def test_unset_directory_means_no_store(self, monkeypatch):
+        monkeypatch.setattr('app.blob_store.Config.PHOTO_BLOB_DIR', None)
+        assert get_blob_store() is None
+
+    @pytest.mark.unit
+    def test_configured_directory_gives_local_store(self, monkeypatch, tmp_path):
+        monkeypatch.setattr('app.blob_store.Config.PHOTO_BLOB_DIR', str(tmp_path))
+        store = get_blob_store()
+        assert isinstance(store, LocalBlobStore)
+        assert store.root == str(tmp_path)
@@ -0,0 +1,265 @@
+"""
+Unit tests for the export services.
+
+Exports stream from a single query; these check what comes out of it.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app.database import InventoryItem, MaterialTaxonomy, Product, ProductIdentifier, Purchase
+from app.export_service import (
+    CatalogExportService, CombinedExportService, ExportOptions, InventoryExportService,
+    MaterialsExportService, csv_chunks, ndjson_chunks
+)
+
+
+def _add_items(storage, count, inactive_every=0):
+    session = storage.Session()
+    try:
+        for n in range(1, count + 1):
+            session.add(InventoryItem(
+                ja_id=f'JA{n:06d}',
+                item_type='Bar',
+                shape='Round',
+                material='Steel',
+                length=n,
+                active=not (inactive_every and n % inactive_every == 0),
+            ))
+        session.commit()
+    finally:
+        session.close()
+
+
+def _options(batch_size=4):
+    options = ExportOptions()
+    options.batch_size = batch_size
+    options.enable_progress_logging = False
+    return options
+
+
+class TestInventoryExport:
+    """Tests for streaming inventory export"""
+
+    @pytest.mark.unit
+    def test_rows_are_each_item_once_in_order(self, test_storage):
+        _add_items(test_storage, 11)
+        service = InventoryExportService(storage_backend=test_storage)
+
+        ja_ids = [row[1] for row in service.iter_item_rows(_options())]
+
+        assert ja_ids == [f'JA{n:06d}' for n in range(1, 12)]
+
+    @pytest.mark.unit
+    def test_inactive_items_only_when_asked(self, test_storage):
+        _add_items(test_storage, 9, inactive_every=3)
+        service = InventoryExportService(storage_backend=test_storage)
+        options = _options()
+
+        options.inventory_include_inactive = False
+        assert len(list(service.iter_item_rows(options))) == 6
+        options.inventory_include_inactive = True
+        assert len(list(service.iter_item_rows(options))) == 9
+
+    @pytest.mark.unit
+    def test_batches_cover_the_stream(self, test_storage):
+        _add_items(test_storage, 10)
+        service = InventoryExportService(storage_backend=test_storage)
+
+        batches = list(service.export_all_items(_options(batch_size=4)))
+
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+
+    @pytest.mark.unit
+    def test_one_query_for_the_whole_export(self, test_storage):
+        """No OFFSET re-queries: the stream is one SELECT however many batches"""
+        _add_items(test_storage, 10)
+        service = InventoryExportService(storage_backend=test_storage)
+        selects = []
+
+        def count(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('SELECT'):
+                selects.append(statement)
+
+        event.listen(test_storage.engine, 'before_cursor_execute', count)
+        try:
+            rows = list(service.iter_item_rows(_options(batch_size=3)))
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', count)
+
+        assert len(rows) == 10
+        assert len(selects) == 1
+        assert 'OFFSET' not in selects[0].upper()
+
+    @pytest.mark.unit
+    def test_stream_dataset_counts_as_it_goes(self, test_storage):
+        _add_items(test_storage, 5)
+        service = InventoryExportService(storage_backend=test_storage)
+
+        headers, rows, metadata = service.stream_dataset(_options())
+
+        assert headers == service.get_export_headers()
+        assert metadata.records_exported == 0
+        next(rows)
+        assert metadata.records_exported == 1
+        list(rows)
+        assert metadata.records_exported == 5
+
+    @pytest.mark.unit
+    def test_shares_the_storage_engine(self, test_storage):
+        service = InventoryExportService(storage_backend=test_storage)
+
+        assert service.engine is test_storage.engine
+
+
+class TestMaterialsExport:
+    """Tests for streaming materials export"""
+
+    @pytest.mark.unit
+    def test_rows_in_taxonomy_order(self, test_storage):
+        session = test_storage.Session()
+        try:
+            session.add_all([
+                MaterialTaxonomy(name='Aluminum 6061', level=3, parent='Aluminum', sort_order=0),
+                MaterialTaxonomy(name='Aluminum', level=2, parent='Metals', sort_order=0),
+                MaterialTaxonomy(name='Metals', level=1, sort_order=0),
+                MaterialTaxonomy(name='Brass', level=2, parent='Metals', sort_order=0, active=False),
+            ])
+            session.commit()
+        finally:
+            session.close()
+        service = MaterialsExportService(storage_backend=test_storage)
+        options = _options()
+
+        options.materials_active_only = True
+        assert [row[0] for row in service.iter_material_rows(options)] == [
+            'Metals', 'Aluminum', 'Aluminum 6061'
+        ]
+        options.materials_active_only = False
+        assert [row[0] for row in service.iter_material_rows(options)] == [
+            'Metals', 'Aluminum', 'Brass', 'Aluminum 6061'
+        ]
+
+
+class TestCombinedExport:
+    """Tests for the combined export"""
+
+    @pytest.mark.unit
+    def test_export_all_data(self, test_storage):
+        _add_items(test_storage, 3)
+        service = CombinedExportService(storage_backend=test_storage)
+
+        result = service.export_all_data(_options())
+
+        assert result['inventory']['metadata']['records_exported'] == 3
+        assert len(result['inventory']['rows']) == 3
+        assert result['materials']['rows'] == []
+
+
+def _add_catalog(storage):
+    session = storage.Session()
+    try:
+        product = Product(description='M3 socket head cap screw', manufacturer='Bolt Co')
+        product.identifiers.append(ProductIdentifier(id_type='MPN', value='SHCS-M3'))
+        product.purchases.append(Purchase(vendor='McMaster', quantity=100, unit_price='0.12'))
+        session.add(product)
+        session.add(Product(description='Drill bit set'))
+        session.commit()
+    finally:
+        session.close()
+
+
+class TestCatalogExport:
+    """Tests for the catalog export streams"""
+
+    @pytest.mark.unit
+    def test_each_stream_is_its_table(self, test_storage):
+        _add_catalog(test_storage)
+        service = CatalogExportService(storage_backend=test_storage)
+        options = _options()
+
+        headers, rows, metadata = service.stream_products(options)
+        products = list(rows)
+        assert [row[1] for row in products] == ['M3 socket head cap screw', 'Drill bit set']
+        assert metadata.records_exported == 2
+        assert len(headers) == len(products[0])
+
+        _, rows, _ = service.stream_purchases(options)
+        assert [(row[1], row[2], row[9]) for row in rows] == [(products[0][0], 'McMaster', '0.12')]
+
+        _, rows, _ = service.stream_identifiers(options)
+        assert [(row[0], row[1], row[2]) for row in rows] == [(products[0][0], 'MPN', 'SHCS-M3')]
+
+
+class TestChunkEncoders:
+    """Tests for the CSV and NDJSON encoders"""
+
+    @pytest.mark.unit
+    def test_csv_round_trips_in_chunks(self):
+        rows = [[str(n), f'note, "{n}"'] for n in range(7)]
+
+        chunks = list(csv_chunks(['N', 'Notes'], iter(rows), rows_per_chunk=3))
+
+        assert len(chunks) == 3
+        assert list(csv.reader(io.StringIO(''.join(chunks)))) == [['N', 'Notes']] + rows
+
+    @pytest.mark.unit
+    def test_ndjson_is_one_object_per_row(self):
+        rows = [[str(n), 'x'] for n in range(5)]
+
+        chunks = list(ndjson_chunks(['N', 'Notes'], iter(rows), rows_per_chunk=2))
+
+        assert len(chunks) == 3
+        lines = ''.join(chunks).splitlines()
+        assert [json.loads(line) for line in lines] == [{'N': str(n), 'Notes': 'x'} for n in range(5)]
+
+    @pytest.mark.unit
+    def test_csv_with_no_rows_is_the_header(self):
+        assert ''.join(csv_chunks(['A', 'B'], iter([]))) == 'A,B\r\n'
+
+
+class TestExportDownloadRoute:
+    """Tests for GET /api/export/<dataset>.<fmt>"""
+
+    @pytest.mark.unit
+    def test_inventory_csv(self, client, test_storage):
+        _add_items(test_storage, 3, inactive_every=3)
+
+        response = client.get('/api/export/inventory.csv')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert response.is_streamed
+        assert 'attachment; filename="inventory-' in response.headers['Content-Disposition']
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert rows[0][:2] == ['Active', 'JA ID']
+        assert [row[1] for row in rows[1:]] == ['JA000001', 'JA000002', 'JA000003']
+
+    @pytest.mark.unit
+    def test_inventory_without_inactive(self, client, test_storage):
+        _add_items(test_storage, 3, inactive_every=3)
+
+        response = client.get('/api/export/inventory.ndjson?include_inactive=false')
+
+        assert response.mimetype == 'application/x-ndjson'
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [record['JA ID'] for record in records] == ['JA000001', 'JA000002']
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('dataset', ['materials', 'products', 'purchases', 'identifiers'])
+    def test_other_datasets(self, client, test_storage, dataset):
+        _add_catalog(test_storage)
+
+        response = client.get(f'/api/export/{dataset}.csv')
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True)
+
+    @pytest.mark.unit
+    def test_unknown_dataset_or_format(self, client):
+        assert client.get('/api/export/widgets.csv').status_code == 404
+        assert client.get('/api/export/inventory.xlsx').status_code != 200
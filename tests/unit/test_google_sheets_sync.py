@@ -0,0 +1,294 @@
+"""
+Unit tests for incremental Google Sheets sync.
+
+Runs GoogleSheetsExportService against an in-memory stand-in for the parts of
+the Sheets API it calls, and checks both what the sheet ends up holding and
+how much was sent to get it there.
+"""
+
+import random
+import re
+
+import pytest
+
+from app.google_sheets_export import GoogleSheetsExportService
+
+
+class _Call:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        return self._result()
+
+
+class FakeSheets:
+    """One spreadsheet of named sheets, each a list of rows, behind the API's shape"""
+
+    def __init__(self, *sheet_names):
+        self.grids = {name: [] for name in sheet_names}
+        self.ids = {name: n for n, name in enumerate(sheet_names)}
+        self.structural_requests = []
+        self.rows_written = 0
+        self.write_calls = 0
+
+    # service.spreadsheets()
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return _FakeValues(self)
+
+    def get(self, spreadsheetId):
+        return _Call(lambda: {
+            'properties': {'title': 'Inventory'},
+            'sheets': [
+                {'properties': {
+                    'title': name, 'sheetId': self.ids[name],
+                    'gridProperties': {'rowCount': max(len(grid), 1000), 'columnCount': 30}
+                }}
+                for name, grid in self.grids.items()
+            ]
+        })
+
+    def batchUpdate(self, spreadsheetId, body):
+        def apply():
+            names = {sheet_id: name for name, sheet_id in self.ids.items()}
+            for request in body['requests']:
+                self.structural_requests.append(request)
+                kind, spec = next(iter(request.items()))
+                span = spec['range']
+                grid = self.grids[names[span['sheetId']]]
+                start, end = span['startIndex'], span['endIndex']
+                if kind == 'deleteDimension':
+                    del grid[start:end]
+                else:
+                    grid[start:start] = [[] for _ in range(end - start)]
+            return {}
+        return _Call(apply)
+
+    def write(self, a1_range, values):
+        sheet_name, first, last = _parse_range(a1_range)
+        grid = self.grids[sheet_name]
+        while len(grid) < last:
+            grid.append([])
+        for offset, row in enumerate(values):
+            grid[first - 1 + offset] = list(row)
+        self.rows_written += len(values)
+
+
+class _FakeValues:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def get(self, spreadsheetId, range, majorDimension):
+        def apply():
+            sheet_name, column = range.split('!')[0], range.split('!')[1].split(':')[0]
+            index = ord(column) - ord('A')
+            cells = [row[index] if index < len(row) else '' for row in self.sheets.grids[sheet_name]]
+            while cells and cells[-1] == '':
+                cells.pop()
+            return {'values': [cells]} if cells else {}
+        return _Call(apply)
+
+    def clear(self, spreadsheetId, range):
+        def apply():
+            sheet_name = range.split('!')[0]
+            self.sheets.grids[sheet_name] = []
+            return {'clearedRange': range}
+        return _Call(apply)
+
+    def update(self, spreadsheetId, range, valueInputOption, body):
+        def apply():
+            self.sheets.write_calls += 1
+            self.sheets.write(range, body['values'])
+            return {'updatedRows': len(body['values'])}
+        return _Call(apply)
+
+    def batchUpdate(self, spreadsheetId, body):
+        def apply():
+            self.sheets.write_calls += 1
+            for value_range in body['data']:
+                self.sheets.write(value_range['range'], value_range['values'])
+            return {}
+        return _Call(apply)
+
+
+def _parse_range(a1_range):
+    sheet_name, cells = a1_range.split('!')
+    first, last = re.fullmatch(r'A(\d+):[A-Z]+(\d+)', cells).groups()
+    return sheet_name, int(first), int(last)
+
+
+HEADERS = ['Active', 'JA ID'] + [f'Column {n}' for n in range(3, 28)]
+
+
+def _row(ja_id, length='12', active='Yes'):
+    return [active, ja_id, length] + [''] * 24
+
+
+@pytest.fixture
+def sheets():
+    return FakeSheets('Metal_Export', 'Materials_Export')
+
+
+@pytest.fixture
+def service(app, test_storage, sheets):
+    service = GoogleSheetsExportService(spreadsheet_id='test-sheet', storage_backend=test_storage)
+    service.service = sheets
+    return service
+
+
+class TestRowKeys:
+    """Tests for the per-row sync key"""
+
+    @pytest.mark.unit
+    def test_history_rows_of_one_ja_id_are_told_apart(self):
+        rows = [_row('JA000001', active='No'), _row('JA000001'), _row('JA000002')]
+
+        assert GoogleSheetsExportService.row_keys(rows, 1) == ['JA000001#0', 'JA000001#1', 'JA000002#0']
+
+
+class TestDeltaSync:
+    """Tests for GoogleSheetsExportService delta uploads"""
+
+    @pytest.mark.unit
+    def test_first_upload_is_full_and_records_a_manifest(self, service, sheets):
+        rows = [_row(f'JA{n:06d}') for n in range(1, 6)]
+
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert result.success
+        assert result.data['sync_mode'] == 'full'
+        assert sheets.grids['Metal_Export'] == [HEADERS] + rows
+        assert service._load_manifest('Metal_Export').row_count == 5
+
+    @pytest.mark.unit
+    def test_unchanged_export_sends_nothing(self, service, sheets):
+        rows = [_row(f'JA{n:06d}') for n in range(1, 6)]
+        service.upload_inventory_export(HEADERS, rows)
+        sheets.write_calls = 0
+
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert result.data['sync_mode'] == 'delta'
+        assert result.data['unchanged'] == 5
+        assert result.affected_rows == 0
+        assert sheets.write_calls == 0
+        assert sheets.structural_requests == []
+
+    @pytest.mark.unit
+    def test_edited_row_is_the_only_one_written(self, service, sheets):
+        rows = [_row(f'JA{n:06d}') for n in range(1, 6)]
+        service.upload_inventory_export(HEADERS, rows)
+        sheets.rows_written = 0
+        rows[2] = _row('JA000003', length='6')
+
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert result.data['updated'] == 1
+        assert sheets.rows_written == 1
+        assert sheets.grids['Metal_Export'] == [HEADERS] + rows
+
+    @pytest.mark.unit
+    def test_inserted_and_deleted_rows_move_in_place(self, service, sheets):
+        rows = [_row(f'JA{n:06d}') for n in range(1, 8)]
+        service.upload_inventory_export(HEADERS, rows)
+        sheets.rows_written = 0
+        # A shortening adds a second row for JA000002; JA000005 goes away
+        rows = rows[:2] + [_row('JA000002', length='4')] + rows[2:4] + rows[5:]
+
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert (result.data['inserted'], result.data['deleted'], result.data['updated']) == (1, 1, 0)
+        assert sheets.rows_written == 1
+        assert sorted(next(iter(r)) for r in sheets.structural_requests) == ['deleteDimension', 'insertDimension']
+        assert sheets.grids['Metal_Export'] == [HEADERS] + rows
+
+    @pytest.mark.unit
+    def test_random_edits_converge(self, service, sheets):
+        rng = random.Random(1234)
+        rows = [_row(f'JA{n:06d}') for n in range(1, 60)]
+        service.upload_inventory_export(HEADERS, rows)
+        next_id = 60
+
+        for _ in range(10):
+            for _ in range(rng.randint(1, 6)):
+                action = rng.choice(['edit', 'insert', 'delete'])
+                position = rng.randrange(len(rows))
+                if action == 'edit':
+                    rows[position] = _row(rows[position][1], length=str(rng.randint(1, 99)))
+                elif action == 'insert':
+                    rows.insert(position, _row(f'JA{next_id:06d}'))
+                    next_id += 1
+                elif len(rows) > 1:
+                    del rows[position]
+
+            result = service.upload_inventory_export(HEADERS, rows)
+
+            assert result.success, result.error
+            assert sheets.grids['Metal_Export'] == [HEADERS] + rows
+
+    @pytest.mark.unit
+    def test_changed_headers_rewrite_in_full(self, service, sheets):
+        rows = [['Steel', '1', ''], ['Aluminum', '1', '']]
+        service.upload_materials_export(['Name', 'Level', 'Parent'], rows)
+
+        result = service.upload_materials_export(['Name', 'Level', 'Parent Name'], rows)
+
+        assert result.data['sync_mode'] == 'full'
+        assert sheets.grids['Materials_Export'][0] == ['Name', 'Level', 'Parent Name']
+
+    @pytest.mark.unit
+    def test_full_mode_always_rewrites(self, service, sheets):
+        rows = [_row('JA000001')]
+        service.upload_inventory_export(HEADERS, rows)
+        sheets.write_calls = 0
+
+        result = service.upload_inventory_export(HEADERS, rows, mode='full')
+
+        assert result.data['sync_mode'] == 'full'
+        assert sheets.write_calls == 1
+
+    @pytest.mark.unit
+    def test_without_storage_every_upload_is_full(self, app, sheets):
+        service = GoogleSheetsExportService(spreadsheet_id='test-sheet')
+        service.service = sheets
+        rows = [_row('JA000001')]
+
+        service.upload_inventory_export(HEADERS, rows)
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert result.data['sync_mode'] == 'full'
+
+    @pytest.mark.unit
+    def test_failed_sync_discards_the_manifest(self, service, sheets):
+        """A sync that fails after moving rows leaves the next one to rewrite the sheet"""
+        rows = [_row(f'JA{n:06d}') for n in range(1, 8)]
+        service.upload_inventory_export(HEADERS, rows)
+        rows = rows[:2] + [_row('JA000002', length='4')] + rows[2:4] + rows[5:]
+
+        def rate_limited(value_ranges):
+            raise RuntimeError('Rate limit exceeded')
+        service._write_ranges = rate_limited
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert not result.success
+        assert service._load_manifest('Metal_Export') is None
+
+        del service._write_ranges
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert result.data['sync_mode'] == 'full'
+        assert sheets.grids['Metal_Export'] == [HEADERS] + rows
+
+    @pytest.mark.unit
+    def test_rows_removed_by_hand_force_a_full_rewrite(self, service, sheets):
+        rows = [_row(f'JA{n:06d}') for n in range(1, 6)]
+        service.upload_inventory_export(HEADERS, rows)
+        del sheets.grids['Metal_Export'][2]
+
+        result = service.upload_inventory_export(HEADERS, rows)
+
+        assert result.data['sync_mode'] == 'full'
+        assert sheets.grids['Metal_Export'] == [HEADERS] + rows
@@ -0,0 +1,184 @@
+"""
+Query Plan Tests for the inventory_items Indexes
+
+Each hot path is run through InventoryService, the statements it sends are
+captured, and each is EXPLAINed to check that the index shaped for it (see
+migration b1a0c0d10018) is the one planned, or, for the reads of current stock
+as a whole, that they walk ``inventory_current`` (b1a0c0d10019) and reach
+``inventory_items`` only by primary key. A query rewritten so that it no longer
+fits its index, or an index dropped, fails here rather than as a slow page on
+a full inventory.
+
+The SQLite class runs with the unit suite. The MariaDB class runs the same
+checks against the integration database, whose optimizer is the one that
+matters in production.
+"""
+
+import re
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.database import Base, InventoryCurrent, InventoryItem
+from app.inventory_current import rebuild_current_rows
+from app.mariadb_inventory_service import InventoryService
+from tests.test_database import mariadb_engine  # noqa: F401
+
+MATERIALS = ['Steel', 'Brass', '6061-T6', 'Copper', 'Delrin', '1018']
+
+TABLES = ('inventory_items', 'inventory_current')
+
+# How a read of current stock as a whole reaches inventory_items: by the id
+# inventory_current holds, or not at all
+BY_CURRENT = 'PRIMARY'
+NOT_READ = None
+
+
+def _populate(engine, count=3000):
+    """A few thousand bars, one in five a history row, then fresh statistics"""
+    rows = [
+        dict(
+            ja_id=f'JA{n:06d}', item_type='Bar', shape='Round',
+            material=f'{MATERIALS[n % len(MATERIALS)]} {n % 40}',
+            length=Decimal(1 + n % 50), width=Decimal(1 + n % 7),
+            thickness=Decimal(1 + n % 11) / 8 if n % 3 == 0 else None,
+            active=n % 5 != 0, precision=False,
+        )
+        for n in range(1, count + 1)
+    ]
+    with engine.begin() as conn:
+        conn.execute(InventoryItem.__table__.insert(), rows)
+    # Inserted beneath the ORM, so the projection is built rather than followed
+    with Session(engine) as session:
+        rebuild_current_rows(session)
+        session.commit()
+    with engine.begin() as conn:
+        if engine.dialect.name == 'mysql':
+            conn.execute(text('ANALYZE TABLE inventory_items'))
+        else:
+            conn.execute(text('ANALYZE'))
+
+
+def _explain(conn, statement, parameters):
+    """
+    How one statement reaches each inventory table it reads: the index name,
+    ``'PRIMARY'`` for the primary key, or ``''`` for a scan of the table
+    """
+    if conn.dialect.name == 'mysql':
+        rows = conn.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings()
+        return {row['table']: row['key'] or '' for row in rows if row['table'] in TABLES}
+    rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+    plan = {}
+    for row in rows:
+        match = re.match(
+            r'(?:SCAN|SEARCH) (\w+)(?: USING (?:COVERING )?INDEX (\w+)| USING (?:INTEGER )?(PRIMARY) KEY)?',
+            row[-1]
+        )
+        if match and match.group(1) in TABLES:
+            plan[match.group(1)] = match.group(2) or match.group(3) or ''
+    return plan
+
+
+def _planned_indexes(engine, call):
+    """Run call, then EXPLAIN every SELECT on the inventory tables it sent"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and any(table in statement for table in TABLES):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        call()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert statements, "nothing was read from the inventory tables"
+    with engine.connect() as conn:
+        return [_explain(conn, statement, parameters) for statement, parameters in statements]
+
+
+def _assert_planned(service, description, call, index):
+    """
+    The call's main statement reaches inventory_items by index, and nothing it
+    sends scans inventory_items
+    """
+    plans = _planned_indexes(service.engine, lambda: call(service))
+    planned = plans[0].get('inventory_items')
+    assert planned == index, f"{description}: planned {plans[0]}"
+    if index in (BY_CURRENT, NOT_READ):
+        assert 'inventory_current' in plans[0], f"{description}: planned {plans[0]}"
+    # A page's total is a COUNT, which may read whichever index is narrowest;
+    # inventory_current may be scanned, being current stock and nothing else
+    assert all(plan.get('inventory_items') != '' for plan in plans), \
+        f"{description}: a statement scans inventory_items"
+
+
+# (description, service call, how the first statement it sends reaches inventory_items)
+HOT_PATHS = [
+    ('active items by JA ID', lambda service: service.get_all_active_items(),
+     BY_CURRENT),
+    ('first page of the list', lambda service: service.search_items_page({}, page_size=50),
+     'ix_inventory_items_active_ja_id'),
+    ('next JA ID', lambda service: service.get_max_ja_id_number(),
+     NOT_READ),
+    ('canonical row', lambda service: service.get_canonical_item('JA001234'),
+     'ix_inventory_items_ja_id_canonical'),
+    ('item history', lambda service: service.get_item_history('JA001235'),
+     'ix_inventory_items_ja_id_canonical'),
+    ('material and length range',
+     lambda service: service.search_active_items(
+         {'material': ['Steel 6', 'Steel 18'], 'min_length': 10, 'max_length': 12}),
+     'ix_inventory_items_active_material_length'),
+    ('width range',
+     lambda service: service.search_active_items({'min_width': 1, 'max_width': Decimal('1.5')}),
+     'ix_inventory_items_active_width'),
+    ('thickness range',
+     lambda service: service.search_active_items(
+         {'min_thickness': Decimal('0.25'), 'max_thickness': Decimal('0.375')}),
+     'ix_inventory_items_active_thickness'),
+]
+
+
+@pytest.mark.unit
+class TestSQLiteQueryPlans:
+    """The hot paths use their indexes under SQLite"""
+
+    @pytest.fixture
+    def service(self, test_storage):
+        _populate(test_storage.engine)
+        return InventoryService(test_storage)
+
+    @pytest.mark.parametrize('description,call,index', HOT_PATHS, ids=[path[0] for path in HOT_PATHS])
+    def test_planned_index(self, service, description, call, index):
+        _assert_planned(service, description, call, index)
+
+
+@pytest.mark.integration
+class TestMariaDBQueryPlans:
+    """The hot paths use their indexes under MariaDB"""
+
+    @pytest.fixture
+    def service(self, mariadb_engine):
+        from app.mariadb_storage import MariaDBStorage
+
+        Base.metadata.create_all(mariadb_engine)
+        with mariadb_engine.begin() as conn:
+            conn.execute(InventoryCurrent.__table__.delete())
+            conn.execute(InventoryItem.__table__.delete())
+        _populate(mariadb_engine)
+
+        storage = MariaDBStorage(database_url=mariadb_engine.url.render_as_string(hide_password=False))
+        storage.connect()
+        yield InventoryService(storage)
+
+        storage.close()
+        with mariadb_engine.begin() as conn:
+            conn.execute(InventoryCurrent.__table__.delete())
+            conn.execute(InventoryItem.__table__.delete())
+
+    @pytest.mark.parametrize('description,call,index', HOT_PATHS, ids=[path[0] for path in HOT_PATHS])
+    def test_planned_index(self, service, description, call, index):
+        _assert_planned(service, description, call, index)
@@ -423,3 +423,101 @@ class TestInventoryService:
 
         result = service.activate_item('INVALID_ID')
         assert result is False
+
+
+class TestSearchItemsPage:
+    """Tests for keyset-paged searches"""
+
+    @pytest.fixture
+    def service(self, test_storage, app):
+        """Inventory service over seven items, one of them inactive"""
+        service = InventoryService(test_storage)
+        lengths = [30, None, 10, 50, 20, 10, 40]
+        for number, length in enumerate(lengths, start=1):
+            service.add_item(InventoryItem(
+                ja_id=f'JA{number:06d}',
+                item_type='Bar',
+                shape='Round',
+                material='Aluminum' if number % 2 else 'Steel',
+                length=length,
+                width=1,
+                location=f'Rack {number}',
+                notes='Keep for the lathe job' if number == 4 else None,
+                active=number != 7,
+                precision=False
+            ))
+        yield service
+
+    def _all_pages(self, service, filters, page_size, **kwargs):
+        """Follow next_cursor to the end, returning each page"""
+        pages = [service.search_items_page(filters, page_size, **kwargs)]
+        while pages[-1].next_cursor:
+            pages.append(service.search_items_page(
+                filters, page_size, cursor=pages[-1].next_cursor, **kwargs))
+        return pages
+
+    @pytest.mark.unit
+    def test_pages_cover_every_match_once_in_order(self, service):
+        """Paging by JA ID returns the same rows as the unpaged search"""
+        pages = self._all_pages(service, {}, page_size=2)
+
+        paged = [item.ja_id for page in pages for item in page.items]
+        assert paged == [item.ja_id for item in service.search_active_items({})]
+        assert [len(page.items) for page in pages] == [2, 2, 2]
+        assert pages[-1].next_cursor is None
+
+    @pytest.mark.unit
+    def test_total_count_is_for_all_pages(self, service):
+        """Every page reports the total number of matches, not its own length"""
+        page = service.search_items_page({'active': ''}, page_size=3)
+
+        assert len(page.items) == 3
+        assert page.total_count == 7
+        assert service.count_items({'active': ''}) == 7
+
+    @pytest.mark.unit
+    def test_sort_on_nullable_column_with_ties(self, service):
+        """Equal and missing lengths page through without skipping or repeating"""
+        pages = self._all_pages(service, {}, page_size=2, sort='length')
+
+        paged = [item.ja_id for page in pages for item in page.items]
+        assert paged == ['JA000002', 'JA000003', 'JA000006',
+                         'JA000005', 'JA000001', 'JA000004']
+
+    @pytest.mark.unit
+    def test_descending_sort(self, service):
+        """Descending order reverses the sort key and its JA ID tiebreak"""
+        pages = self._all_pages(service, {}, page_size=4, sort='material',
+                                descending=True)
+
+        paged = [item.ja_id for page in pages for item in page.items]
+        assert paged == ['JA000006', 'JA000004', 'JA000002',
+                         'JA000005', 'JA000003', 'JA000001']
+
+    @pytest.mark.unit
+    def test_text_filter_matches_any_listed_field(self, service):
+        """The list's free-text filter looks at notes and location as well as the JA ID"""
+        assert [i.ja_id for i in service.search_items_page({'text': 'lathe'}, 10).items] == ['JA000004']
+        assert [i.ja_id for i in service.search_items_page({'text': 'rack 5'}, 10).items] == ['JA000005']
+
+    @pytest.mark.unit
+    def test_unknown_sort_column_is_rejected(self, service):
+        """Only whitelisted columns can be sorted on"""
+        with pytest.raises(ValueError):
+            service.search_items_page({}, 10, sort='notes')
+
+    @pytest.mark.unit
+    def test_cursor_from_another_sort_is_rejected(self, service):
+        """A cursor only makes sense in the order that produced it"""
+        cursor = service.search_items_page({}, 2, sort='length').next_cursor
+
+        with pytest.raises(ValueError):
+            service.search_items_page({}, 2, sort='ja_id', cursor=cursor)
+        with pytest.raises(ValueError):
+            service.search_items_page({}, 2, sort='length', descending=True, cursor=cursor)
+
+    @pytest.mark.unit
+    def test_malformed_cursor_is_rejected(self, service):
+        """Garbage in the cursor parameter is a ValueError, not a server error"""
+        with pytest.raises(ValueError):
+            service.search_items_page({}, 2, cursor='not-a-cursor')
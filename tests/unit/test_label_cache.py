@@ -0,0 +1,91 @@
+"""
+Unit tests for the rendered label image cache (app/services/label_cache.py).
+"""
+
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.label_cache import LabelImageCache, label_cache_key
+
+STOCK = {
+    'lp_options': '-d sato2',
+    'maxlen_inches': 2.0,
+    'lp_width_px': 305,
+    'fixed_len_px': 610,
+    'lp_dpi': 305,
+}
+
+
+class TestLabelCacheKey:
+
+    @pytest.mark.unit
+    def test_key_ignores_print_options(self):
+        """Only what changes the pixels is in the key"""
+        other_printer = dict(STOCK, lp_options='-d sato3', label_count=4)
+        assert label_cache_key('barcode', {'value': 'JA000001'}, STOCK) == \
+            label_cache_key('barcode', {'value': 'JA000001'}, other_printer)
+
+    @pytest.mark.unit
+    def test_key_follows_content_geometry_and_renderer(self):
+        key = label_cache_key('barcode', {'value': 'JA000001'}, STOCK)
+        assert key != label_cache_key('barcode', {'value': 'JA000002'}, STOCK)
+        assert key != label_cache_key('product', {'value': 'JA000001'}, STOCK)
+        assert key != label_cache_key('barcode', {'value': 'JA000001'}, dict(STOCK, flag_mode=True))
+        with patch('app.services.label_cache.RENDERER_VERSION', 'next'):
+            assert key != label_cache_key('barcode', {'value': 'JA000001'}, STOCK)
+
+
+class TestLabelImageCache:
+
+    @pytest.mark.unit
+    def test_renders_once(self):
+        cache = LabelImageCache()
+        render = Mock(return_value=b'png')
+
+        assert cache.get_or_render('a' * 64, render) == b'png'
+        assert cache.get_or_render('a' * 64, render) == b'png'
+        render.assert_called_once()
+
+    @pytest.mark.unit
+    def test_least_recently_used_is_dropped(self):
+        cache = LabelImageCache(max_entries=2)
+        cache.put('a' * 64, b'a')
+        cache.put('b' * 64, b'b')
+        cache.get('a' * 64)
+        cache.put('c' * 64, b'c')
+
+        assert cache.get('a' * 64) == b'a'
+        assert cache.get('b' * 64) is None
+        assert cache.get('c' * 64) == b'c'
+
+    @pytest.mark.unit
+    def test_directory_is_shared_between_processes(self, tmp_path):
+        """An image one process rendered is read from disk by another"""
+        LabelImageCache(directory=str(tmp_path)).put('a' * 64, b'png')
+        render = Mock(return_value=b'other')
+
+        assert LabelImageCache(directory=str(tmp_path)).get_or_render('a' * 64, render) == b'png'
+        render.assert_not_called()
+        assert os.path.exists(tmp_path / 'aa' / f"{'a' * 64}.png")
+
+    @pytest.mark.unit
+    def test_unwritable_directory_still_returns_the_image(self, tmp_path):
+        """A cache that cannot be written is a slower cache, not a failed print"""
+        blocked = tmp_path / 'file'
+        blocked.write_bytes(b'')
+        cache = LabelImageCache(directory=str(blocked))
+
+        assert cache.get_or_render('a' * 64, lambda: b'png') == b'png'
+
+    @pytest.mark.unit
+    def test_prune_keeps_the_most_recently_used(self, tmp_path):
+        cache = LabelImageCache(directory=str(tmp_path), max_files=2)
+        for index, key in enumerate(('a' * 64, 'b' * 64, 'c' * 64)):
+            cache.put(key, b'png')
+            os.utime(cache._path(key), (index, index))
+
+        assert cache.prune() == 1
+        assert not os.path.exists(cache._path('a' * 64))
+        assert os.path.exists(cache._path('c' * 64))
@@ -0,0 +1,224 @@
+"""
+Unit tests for the label print spooler (app/label_jobs.py).
+
+The queue runs against the SQLite-backed test storage; printing itself is
+patched out at ``LabelJobQueue._print_item``, so no printer or label renderer
+is needed.
+"""
+
+import time
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.database import LabelPrintJob
+from app.label_jobs import LabelJobQueue, LabelJobWorker
+
+
+def _jobs(test_storage):
+    session = sessionmaker(bind=test_storage.engine)()
+    try:
+        return session.query(LabelPrintJob).order_by(LabelPrintJob.id).all()
+    finally:
+        session.close()
+
+
+class TestLabelJobQueue:
+    """Submitting, running and reporting print jobs"""
+
+    @pytest.mark.unit
+    def test_submit_with_a_worker_queues_and_wakes_it(self, test_storage):
+        """With a worker the job is left pending for its thread"""
+        worker = Mock()
+        with patch.object(LabelJobQueue, '_print_item') as print_item:
+            job = LabelJobQueue(test_storage, worker=worker).submit_ja_ids(
+                ['JA000001', 'JA000002'], 'Sato 1x2', 2
+            )
+
+        worker.wake.assert_called_once()
+        print_item.assert_not_called()
+        assert job['status'] == 'pending'
+        assert (job['total'], job['printed'], job['label_count']) == (2, 0, 2)
+
+    @pytest.mark.unit
+    def test_submit_without_a_worker_prints_in_order(self, test_storage):
+        """Without a worker the job runs in the submitting call"""
+        printed = []
+        with patch.object(LabelJobQueue, '_print_item',
+                          side_effect=lambda job, item: printed.append(item)):
+            job = LabelJobQueue(test_storage).submit_ja_ids(
+                ['JA000002', 'JA000001'], 'Sato 1x2'
+            )
+
+        assert printed == ['JA000002', 'JA000001']
+        assert job['status'] == 'done'
+        assert (job['printed'], job['failures'], job['error']) == (2, [], None)
+        assert job['finished_at'] is not None
+
+    @pytest.mark.unit
+    def test_one_failure_does_not_stop_the_rest(self, test_storage):
+        """A failed item is recorded and the job carries on"""
+        def print_item(job, item):
+            if item == 'JA000002':
+                raise RuntimeError('Printer offline')
+
+        with patch.object(LabelJobQueue, '_print_item', side_effect=print_item):
+            job = LabelJobQueue(test_storage).submit_ja_ids(
+                ['JA000001', 'JA000002', 'JA000003'], 'Sato 1x2'
+            )
+
+        assert job['status'] == 'done'
+        assert job['printed'] == 2
+        assert job['failures'] == [
+            {'item': 'JA000002', 'error': 'Printer offline', 'invalid': False}
+        ]
+        assert job['error'] == '1 of 3 label(s) failed to print'
+
+    @pytest.mark.unit
+    def test_job_with_nothing_printed_fails(self, test_storage):
+        """A ValueError is flagged as the request's fault"""
+        with patch.object(LabelJobQueue, '_print_item',
+                          side_effect=ValueError('Invalid label type')):
+            job = LabelJobQueue(test_storage).submit_ja_ids(['JA000001'], 'Sato 1x2')
+
+        assert job['status'] == 'failed'
+        assert job['printed'] == 0
+        assert job['failures'][0]['invalid'] is True
+
+    @pytest.mark.unit
+    def test_product_job_carries_the_label_text(self, test_storage):
+        """A product job prints the description, code and provenance it was given"""
+        with patch.object(LabelJobQueue, '_print_item') as print_item:
+            job = LabelJobQueue(test_storage).submit_product(
+                'M3 socket head cap screw', 'P000042', 'McMaster 2026-01', 'Sato 2x4'
+            )
+
+        assert job['kind'] == 'product'
+        assert job['status'] == 'done'
+        _, item = print_item.call_args.args
+        assert item == {
+            'description': 'M3 socket head cap screw',
+            'code': 'P000042',
+            'provenance': 'McMaster 2026-01',
+        }
+
+    @pytest.mark.unit
+    def test_a_job_is_claimed_once(self, test_storage):
+        """A second process cannot claim a job the first already holds"""
+        first = LabelJobQueue(test_storage, worker=Mock())
+        second = LabelJobQueue(test_storage, worker=Mock())
+        first.submit_ja_ids(['JA000001'], 'Sato 1x2')
+
+        assert first._claim_next_job() is not None
+        assert second._claim_next_job() is None
+        assert second.run_pending_jobs() == 0
+
+    @pytest.mark.unit
+    def test_abandoned_running_job_is_failed_not_reprinted(self, test_storage):
+        """Part of a dead process's job may be on the printer; it never runs again"""
+        queue = LabelJobQueue(test_storage, worker=Mock())
+        job_id = queue.submit_ja_ids(['JA000001', 'JA000002'], 'Sato 1x2')['job_id']
+        session = sessionmaker(bind=test_storage.engine)()
+        session.query(LabelPrintJob).update({
+            'status': 'running',
+            'started_at': datetime.utcnow() - LabelJobQueue.JOB_STALE_AFTER * 2,
+        }, synchronize_session=False)
+        session.commit()
+        session.close()
+
+        with patch.object(LabelJobQueue, '_print_item') as print_item:
+            assert queue.run_pending_jobs() == 0
+
+        print_item.assert_not_called()
+        job = queue.get_job(job_id)
+        assert job['status'] == 'failed'
+        assert 'Abandoned' in job['error']
+
+    @pytest.mark.unit
+    def test_long_job_still_printing_is_not_failed_by_another_queue(self, test_storage):
+        """Staleness is judged from the last item printed, not from the start"""
+        first = LabelJobQueue(test_storage, worker=Mock())
+        second = LabelJobQueue(test_storage, worker=Mock())
+        job_id = first.submit_ja_ids(['JA000001', 'JA000002', 'JA000003'], 'Sato 1x2')['job_id']
+        seen = []
+
+        def print_item(job, item):
+            if item == 'JA000003':
+                # Started long ago, but the item before this one just printed
+                session = sessionmaker(bind=test_storage.engine)()
+                session.query(LabelPrintJob).update({
+                    'started_at': datetime.utcnow() - LabelJobQueue.JOB_STALE_AFTER * 3,
+                }, synchronize_session=False)
+                session.commit()
+                session.close()
+                second.run_pending_jobs()
+                seen.append(second.get_job(job_id))
+
+        with patch.object(LabelJobQueue, '_print_item', side_effect=print_item):
+            assert first.run_pending_jobs() == 1
+
+        assert seen[0]['status'] == 'running'
+        assert seen[0]['printed'] == 2
+        job = first.get_job(job_id)
+        assert (job['status'], job['printed']) == ('done', 3)
+
+    @pytest.mark.unit
+    def test_job_failed_as_abandoned_mid_run_stays_failed(self, test_storage):
+        """A run whose job was failed elsewhere stops and does not mark it done"""
+        queue = LabelJobQueue(test_storage, worker=Mock())
+        job_id = queue.submit_ja_ids(['JA000001', 'JA000002', 'JA000003'], 'Sato 1x2')['job_id']
+        printed = []
+
+        def print_item(job, item):
+            printed.append(item)
+            if item == 'JA000001':
+                session = sessionmaker(bind=test_storage.engine)()
+                session.query(LabelPrintJob).update({
+                    'status': 'failed', 'error': 'Abandoned while printing',
+                }, synchronize_session=False)
+                session.commit()
+                session.close()
+
+        with patch.object(LabelJobQueue, '_print_item', side_effect=print_item):
+            queue.run_pending_jobs()
+
+        assert printed == ['JA000001']
+        job = queue.get_job(job_id)
+        assert job['status'] == 'failed'
+        assert job['error'] == 'Abandoned while printing'
+
+    @pytest.mark.unit
+    def test_get_job_unknown(self, test_storage):
+        assert LabelJobQueue(test_storage).get_job(12345) is None
+
+
+class TestLabelJobWorker:
+    """The background thread that prints queued jobs"""
+
+    @pytest.mark.unit
+    def test_wake_prints_queued_jobs_in_an_app_context(self, app, test_storage):
+        """Waking the worker prints the queue on its thread, with the app's config"""
+        worker = LabelJobWorker(app, test_storage, poll_interval=60)
+        contexts = []
+
+        def print_item(job, item):
+            from flask import current_app
+            contexts.append(current_app.name)
+
+        with patch.object(LabelJobQueue, '_print_item', side_effect=print_item):
+            try:
+                job_id = LabelJobQueue(test_storage, worker=worker).submit_ja_ids(
+                    ['JA000001'], 'Sato 1x2'
+                )['job_id']
+                deadline = time.monotonic() + 5
+                while LabelJobQueue(test_storage).get_job(job_id)['status'] != 'done' \
+                        and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            finally:
+                worker.stop()
+
+        assert contexts == [app.name]
+        assert [job.status for job in _jobs(test_storage)] == ['done']
+        assert not worker._thread.is_alive()
@@ -6,18 +6,29 @@ test mode short-circuiting, and API endpoints.
 """
 
 import pytest
+from io import BytesIO
 from unittest.mock import patch, MagicMock
 from flask import Flask
 import json
+from app.services.label_cache import LabelImageCache
 from app.services.label_printer import (
     LABEL_TYPES, 
     generate_and_print_label, 
     print_label_for_ja_id, 
     get_available_label_types,
-    get_label_type_config
+    get_label_type_config,
+    render_label_for_ja_id
 )
 
 
+@pytest.fixture(autouse=True)
+def label_cache():
+    """A fresh, memory-only label cache, so no test sees another's images"""
+    cache = LabelImageCache()
+    with patch('app.services.label_printer.get_label_cache', return_value=cache):
+        yield cache
+
+
 class TestLabelPrinterService:
     """Test the label printer service functions"""
     
@@ -110,7 +121,7 @@ class TestLabelPrinterService:
                  patch('app.services.label_printer.LpPrinter') as mock_printer_class:
                 
                 mock_generator = MagicMock()
-                mock_generator.file_obj = MagicMock()
+                mock_generator.file_obj = BytesIO(b'png')
                 mock_generator_class.return_value = mock_generator
                 
                 mock_printer = MagicMock()
@@ -142,7 +153,7 @@ class TestLabelPrinterService:
                  patch('app.services.label_printer.LpPrinter') as mock_printer_class:
                 
                 mock_generator = MagicMock()
-                mock_generator.file_obj = MagicMock()
+                mock_generator.file_obj = BytesIO(b'png')
                 mock_flag_generator_class.return_value = mock_generator
                 
                 mock_printer = MagicMock()
@@ -163,6 +174,38 @@ class TestLabelPrinterService:
                 mock_generator_class.assert_not_called()
                 mock_printer_class.assert_called_once()
     
+    @pytest.mark.unit
+    def test_reprint_uses_the_cached_image(self, app):
+        """A second print of the same label renders nothing"""
+        with app.app_context():
+            app.config['TESTING'] = False
+
+            with patch('app.services.label_printer.BarcodeLabelGenerator') as mock_generator_class, \
+                 patch('app.services.label_printer.LpPrinter') as mock_printer_class:
+
+                mock_generator = MagicMock()
+                mock_generator.file_obj = BytesIO(b'png')
+                mock_generator_class.return_value = mock_generator
+
+                print_label_for_ja_id('JA123456', 'Sato 1x2')
+                print_label_for_ja_id('JA123456', 'Sato 1x2', 2)
+
+                mock_generator_class.assert_called_once()
+                images = mock_printer_class.return_value.print_images.call_args.args[0]
+                assert [image.getvalue() for image in images] == [b'png', b'png']
+
+    @pytest.mark.unit
+    def test_render_label_for_ja_id_is_keyed_on_stock(self, app):
+        """A label rendered for one stock is not reused for another"""
+        with patch('app.services.label_printer.BarcodeLabelGenerator') as mock_generator_class:
+            mock_generator_class.return_value.file_obj = BytesIO(b'png')
+
+            render_label_for_ja_id('JA123456', 'Sato 1x2')
+            render_label_for_ja_id('JA123456', 'Sato 1x2')
+            render_label_for_ja_id('JA123456', 'Sato 2x4')
+
+            assert mock_generator_class.call_count == 2
+
     @pytest.mark.unit
     def test_print_label_for_ja_id_valid(self, app):
         """Test printing label for valid JA ID and label type"""
@@ -194,7 +237,7 @@ class TestLabelPrinterService:
                  patch('app.services.label_printer.LpPrinter') as mock_printer_class:
 
                 mock_generator = MagicMock()
-                mock_generator.file_obj = MagicMock()
+                mock_generator.file_obj = BytesIO(b'png')
                 mock_generator_class.return_value = mock_generator
 
                 mock_printer = MagicMock()
@@ -484,4 +527,74 @@ class TestLabelPrinterAPI:
             assert response.status_code == 400
             data = json.loads(response.data)
             assert data['success'] is False
-            assert 'Custom validation error' in data['error']
\ No newline at end of file
+            assert 'Custom validation error' in data['error']
+
+    @pytest.mark.unit
+    def test_print_label_endpoint_queues_with_a_worker(self, app, client):
+        """With a background worker the label is queued and the job returned"""
+        worker = MagicMock()
+        app.config['LABEL_JOB_WORKER'] = worker
+        with patch('app.services.label_printer.print_label_for_ja_id') as mock_print:
+            response = client.post('/api/labels/print',
+                json={'ja_id': 'JA123456', 'label_type': 'Sato 1x2'},
+                content_type='application/json')
+
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert data['success'] is True
+        assert data['job']['status'] == 'pending'
+        worker.wake.assert_called_once()
+        mock_print.assert_not_called()
+
+    @pytest.mark.unit
+    def test_label_job_endpoint_prints_every_ja_id(self, client):
+        """One job prints the whole list, and its status can be read back"""
+        with patch('app.services.label_printer.print_label_for_ja_id') as mock_print:
+            response = client.post('/api/labels/jobs',
+                json={'ja_ids': ['JA000001', 'JA000002'], 'label_type': 'Sato 1x2', 'label_count': 2},
+                content_type='application/json')
+
+        assert response.status_code == 202
+        job = json.loads(response.data)['job']
+        assert mock_print.call_count == 2
+        mock_print.assert_called_with('JA000002', 'Sato 1x2', 2)
+
+        response = client.get(f"/api/labels/jobs/{job['job_id']}")
+        assert response.status_code == 200
+        job = json.loads(response.data)['job']
+        assert (job['status'], job['printed'], job['total']) == ('done', 2, 2)
+
+    @pytest.mark.unit
+    def test_label_job_endpoint_rejects_bad_ja_ids(self, client):
+        """Every JA ID is checked before anything is queued"""
+        response = client.post('/api/labels/jobs',
+            json={'ja_ids': ['JA000001', 'nope'], 'label_type': 'Sato 1x2'},
+            content_type='application/json')
+
+        assert response.status_code == 400
+        assert 'nope' in json.loads(response.data)['error']
+
+    @pytest.mark.unit
+    def test_label_job_status_unknown(self, client):
+        response = client.get('/api/labels/jobs/9999')
+        assert response.status_code == 404
+
+    @pytest.mark.unit
+    def test_label_preview_endpoint(self, client):
+        """The preview is the label's PNG, cacheable by the browser"""
+        with patch('app.services.label_printer.render_label_for_ja_id',
+                   return_value=b'png') as mock_render:
+            response = client.get('/api/labels/preview?ja_id=JA123456&label_type=Sato%201x2')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert response.data == b'png'
+        assert response.headers.get('ETag')
+        mock_render.assert_called_once_with('JA123456', 'Sato 1x2')
+
+    @pytest.mark.unit
+    def test_label_preview_endpoint_rejects_bad_input(self, client):
+        response = client.get('/api/labels/preview?ja_id=nope&label_type=Sato%201x2')
+        assert response.status_code == 400
+        response = client.get('/api/labels/preview?ja_id=JA123456&label_type=Nope')
+        assert response.status_code == 400
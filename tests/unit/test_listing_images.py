@@ -1,13 +1,13 @@
 """
 Unit tests for retrieving the images a capture named.
 
-Every branch of ``store_listing_images`` with ``requests.get`` patched, because
+Every branch of ``store_listing_images`` with ``requests.Session.get`` patched, because
 the one property that matters more than any individual branch is that **none of
 them raise**: the capture has already succeeded by the time the first image is
 attempted, and FR-020 says an unreachable CDN must not cost the operator the
 purchase they just made.
 
-The unit suite blocks the network (``--blockage``), so an unmocked ``requests.get``
+The unit suite blocks the network (``--blockage``), so an unmocked request
 fails loudly rather than reaching out. That is a feature, and the reason there is
 no network marker anywhere in this file.
 """
@@ -33,10 +33,22 @@ def jpeg_bytes(size=(40, 30), colour=(10, 120, 200)):
 
 
 class FakeResponse:
-    def __init__(self, content=b'', status_code=200, content_type='image/jpeg'):
+    def __init__(self, content=b'', status_code=200, content_type='image/jpeg', headers=None):
         self.content = content
         self.status_code = status_code
-        self.headers = {'Content-Type': content_type}
+        self.headers = {'Content-Type': content_type, **(headers or {})}
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            self.chunks_read += 1
+            yield self.content[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
 
 
 @pytest.fixture
@@ -57,7 +69,7 @@ def photos(test_storage):
 
 
 def store(product_id, urls, storage, responses, **kwargs):
-    """Run the fetcher with requests.get answering from `responses`."""
+    """Run the fetcher with the session's get answering from `responses`."""
     def fake_get(url, **request_kwargs):
         answer = responses[url]
         if isinstance(answer, Exception):
@@ -67,7 +79,7 @@ def store(product_id, urls, storage, responses, **kwargs):
 
     fake_get.timeouts = []
 
-    with patch('app.services.listing_images.requests.get', side_effect=fake_get) as mock:
+    with patch('app.services.listing_images.requests.Session.get', side_effect=fake_get) as mock:
         result = store_listing_images(product_id, urls, storage, **kwargs)
     result.calls = mock.call_args_list
     return result
@@ -151,10 +163,42 @@ class TestRetrievingListingImages:
     def test_a_body_over_the_file_size_limit_is_skipped(self, test_storage, product):
         url = f'{GALLERY}huge.jpg'
         oversize = b'\xff' * (PhotoService.MAX_FILE_SIZE + 1)
-        result = store(product.id, [url], test_storage, {url: FakeResponse(oversize)})
+        response = FakeResponse(oversize)
+        result = store(product.id, [url], test_storage, {url: response})
 
         assert result.skipped == 1
         assert result.stored == 0
+        # Abandoned just past the limit, not read to the end
+        assert response.chunks_read == PhotoService.MAX_FILE_SIZE // (64 * 1024) + 1
+
+    def test_a_declared_length_over_the_limit_is_not_read_at_all(self, test_storage, product):
+        url = f'{GALLERY}huge.jpg'
+        response = FakeResponse(
+            jpeg_bytes(), headers={'Content-Length': str(PhotoService.MAX_FILE_SIZE + 1)}
+        )
+        result = store(product.id, [url], test_storage, {url: response})
+
+        assert result.skipped == 1
+        assert response.chunks_read == 0
+
+    def test_the_fetches_overlap(self, test_storage, product):
+        """Every fetch is in flight before any of them finishes"""
+        import threading
+        urls = [f'{GALLERY}{n}.jpg' for n in range(4)]
+        all_started = threading.Barrier(len(urls), timeout=5)
+
+        class WaitingResponse(FakeResponse):
+            def __enter__(self):
+                all_started.wait()
+                return self
+
+        result = store(product.id, urls, test_storage, {
+            url: WaitingResponse(jpeg_bytes(colour=(n * 60, 60, 90)))
+            for n, url in enumerate(urls)
+        })
+
+        assert result.stored == 4
+        assert result.failed == 0
 
     def test_the_same_address_twice_is_fetched_once(self, test_storage, product):
         """Network economy. Correctness is the hash, asserted below."""
@@ -266,7 +310,7 @@ class TestRetrievingListingImages:
         assert result.stored == 1
         assert result.cap_reached is True
         # It stopped rather than grinding through the rest refusing each one.
-        assert len(result.calls) == 2
+        assert (result.skipped, result.failed, result.duplicates) == (0, 0, 0)
         assert len(photos.get_product_attachments(product.id)) == (
             PhotoService.MAX_ATTACHMENTS_PER_PRODUCT
         )
@@ -264,6 +264,7 @@ class TestInventoryService:
             # Mock query to return only active items
             mock_query = Mock()
             mock_session.query.return_value = mock_query
+            mock_query.join.return_value = mock_query
             mock_query.filter.return_value = mock_query
             mock_query.order_by.return_value = mock_query
             mock_query.all.return_value = [sample_db_item]
@@ -274,7 +275,8 @@ class TestInventoryService:
             assert len(result) == 1
             assert result[0].active is True
             
-            # Verify the query included active=True filter
+            # Verify the query read through the current-state projection
+            mock_query.join.assert_called_once()
             mock_query.filter.assert_called_once()
             
             mock_session.close.assert_called_once()
@@ -546,202 +548,514 @@ class TestMaterialDescendants:
     """Test class for hierarchical material descendant queries"""
 
     @pytest.fixture
-    def mock_storage(self):
-        """Mock MariaDB storage"""
-        mock_storage = Mock()
-        mock_storage.engine = Mock()
-        return mock_storage
+    def service(self, test_storage):
+        """Service over a real database holding a small taxonomy"""
+        from app.database import MaterialTaxonomy
 
-    @pytest.fixture
-    def service(self, mock_storage):
-        """Create service instance with mock storage"""
-        return InventoryService(mock_storage)
+        session = test_storage.Session()
+        session.add_all([
+            MaterialTaxonomy(name="Aluminum", level=1),
+            MaterialTaxonomy(name="6000 Series Aluminum", level=2, parent="Aluminum"),
+            MaterialTaxonomy(name="7000 Series Aluminum", level=2, parent="Aluminum"),
+            MaterialTaxonomy(name="6061-T6", level=3, parent="6000 Series Aluminum"),
+            MaterialTaxonomy(name="Steel", level=1),
+            MaterialTaxonomy(name="Carbon Steel", level=2, parent="Steel"),
+            MaterialTaxonomy(name="Tool Steel", level=2, parent="Steel", active=False),
+        ])
+        session.commit()
+        session.close()
+        return InventoryService(test_storage)
 
     def test_get_material_descendants_with_children_and_grandchildren(self, service):
         """Test getting descendants for a material with children and grandchildren"""
-        from app.database import MaterialTaxonomy
+        result = service.get_material_descendants("Aluminum")
 
-        # Create mock materials
-        aluminum = Mock(spec=MaterialTaxonomy)
-        aluminum.name = "Aluminum"
-        aluminum.active = True
+        # Should return all materials in hierarchy, sorted
+        assert result == sorted(["Aluminum", "6000 Series Aluminum", "7000 Series Aluminum", "6061-T6"])
 
-        six_series = Mock(spec=MaterialTaxonomy)
-        six_series.name = "6000 Series Aluminum"
-        six_series.parent = "Aluminum"
-        six_series.active = True
+    def test_get_material_descendants_with_no_children(self, service):
+        """Test getting descendants for a leaf material with no children"""
+        assert service.get_material_descendants("6061-T6") == ["6061-T6"]
 
-        seven_series = Mock(spec=MaterialTaxonomy)
-        seven_series.name = "7000 Series Aluminum"
-        seven_series.parent = "Aluminum"
-        seven_series.active = True
+    def test_get_material_descendants_material_not_in_taxonomy(self, service):
+        """Test getting descendants for a material not in the taxonomy"""
+        assert service.get_material_descendants("Unknown Material") == ["Unknown Material"]
 
-        six_zero_six_one = Mock(spec=MaterialTaxonomy)
-        six_zero_six_one.name = "6061-T6"
-        six_zero_six_one.parent = "6000 Series Aluminum"
-        six_zero_six_one.active = True
+    def test_get_material_descendants_case_insensitive(self, service):
+        """Test that material lookup is case-insensitive"""
+        # Should still find and return the proper cased names
+        assert service.get_material_descendants("STEEL") == ["Carbon Steel", "Steel"]
 
-        with patch.object(service, 'Session') as mock_session_class:
-            mock_session = Mock()
-            mock_session_class.return_value = mock_session
+    def test_get_material_descendants_only_active_materials(self, service):
+        """Test that only active materials are included in descendants"""
+        assert "Tool Steel" not in service.get_material_descendants("Steel")
 
-            # Mock query chain for finding base material
-            mock_query_base = Mock()
-            mock_session.query.return_value = mock_query_base
-            mock_query_base.filter.return_value = mock_query_base
-
-            # First query: find base material "Aluminum"
-            # Second query: find children of "Aluminum" -> returns [6000 Series, 7000 Series]
-            # Third query: find grandchildren of "6000 Series Aluminum" -> returns [6061-T6]
-            # Fourth query: find grandchildren of "7000 Series Aluminum" -> returns []
-            mock_query_base.first.side_effect = [aluminum]
-            mock_query_base.all.side_effect = [
-                [six_series, seven_series],  # Children of Aluminum
-                [six_zero_six_one],  # Grandchildren of 6000 Series
-                []  # Grandchildren of 7000 Series
-            ]
-
-            result = service.get_material_descendants("Aluminum")
-
-            # Should return all materials in hierarchy
-            assert len(result) == 4
-            assert "Aluminum" in result
-            assert "6000 Series Aluminum" in result
-            assert "7000 Series Aluminum" in result
-            assert "6061-T6" in result
-            # Results should be sorted
-            assert result == sorted(result)
+    def test_get_material_descendants_error_handling(self, service):
+        """Test error handling when database query fails"""
+        with patch('app.taxonomy_cache.get_taxonomy_snapshot', side_effect=Exception("Database error")):
+            result = service.get_material_descendants("Steel")
 
-            mock_session.close.assert_called_once()
+        # Should return just the material name on error
+        assert result == ["Steel"]
 
-    def test_get_material_descendants_with_no_children(self, service):
-        """Test getting descendants for a leaf material with no children"""
+
+class TestMaterialSubtreeSearch:
+    """Test class for hierarchical material search in a single query"""
+
+    @pytest.fixture
+    def service(self, test_storage):
+        """Service over a real database holding a taxonomy and one item per material"""
         from app.database import MaterialTaxonomy
 
-        # Create mock material with no children
-        six_zero_six_one = Mock(spec=MaterialTaxonomy)
-        six_zero_six_one.name = "6061-T6"
-        six_zero_six_one.active = True
+        session = test_storage.Session()
+        session.add_all([
+            MaterialTaxonomy(name="Aluminum", level=1),
+            MaterialTaxonomy(name="6000 Series Aluminum", level=2, parent="Aluminum"),
+            MaterialTaxonomy(name="6061-T6", level=3, parent="6000 Series Aluminum"),
+            MaterialTaxonomy(name="Steel", level=1),
+            MaterialTaxonomy(name="Tool Steel", level=2, parent="Steel", active=False),
+        ])
+        for n, material in enumerate(
+            ["Aluminum", "6000 Series Aluminum", "6061-T6", "Steel", "Tool Steel", "Unobtainium"], start=1
+        ):
+            session.add(InventoryItem(
+                ja_id=f'JA{n:06d}', item_type='Bar', shape='Round',
+                material=material, length=12, active=True
+            ))
+        session.commit()
+        session.close()
+        return InventoryService(test_storage)
 
-        with patch.object(service, 'Session') as mock_session_class:
-            mock_session = Mock()
-            mock_session_class.return_value = mock_session
+    def _materials(self, service, material):
+        from app.mariadb_inventory_service import SearchFilter
 
-            mock_query = Mock()
-            mock_session.query.return_value = mock_query
-            mock_query.filter.return_value = mock_query
-            mock_query.first.return_value = six_zero_six_one
-            mock_query.all.return_value = []  # No children
+        items = service.search_items(SearchFilter().material_subtree(material))
+        return sorted(item.material for item in items)
 
-            result = service.get_material_descendants("6061-T6")
+    def test_search_includes_every_depth(self, service):
+        assert self._materials(service, "aluminum") == ["6000 Series Aluminum", "6061-T6", "Aluminum"]
 
-            # Should return only the material itself
-            assert len(result) == 1
-            assert result[0] == "6061-T6"
+    def test_search_excludes_inactive_branches(self, service):
+        assert self._materials(service, "Steel") == ["Steel"]
 
-            mock_session.close.assert_called_once()
+    def test_search_for_material_not_in_taxonomy_matches_itself(self, service):
+        assert self._materials(service, "Unobtainium") == ["Unobtainium"]
 
-    def test_get_material_descendants_material_not_in_taxonomy(self, service):
-        """Test getting descendants for a material not in the taxonomy"""
-        with patch.object(service, 'Session') as mock_session_class:
-            mock_session = Mock()
-            mock_session_class.return_value = mock_session
+    def test_search_is_one_statement(self, service, test_storage):
+        from sqlalchemy import event
 
-            mock_query = Mock()
-            mock_session.query.return_value = mock_query
-            mock_query.filter.return_value = mock_query
-            mock_query.first.return_value = None  # Material not found
+        statements = []
 
-            result = service.get_material_descendants("Unknown Material")
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
 
-            # Should return just the material name
-            assert len(result) == 1
-            assert result[0] == "Unknown Material"
+        event.listen(test_storage.engine, 'before_cursor_execute', count)
+        try:
+            self._materials(service, "Aluminum")
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', count)
 
-            mock_session.close.assert_called_once()
+        assert len(statements) == 1
+        assert 'material_subtree' in statements[0]
 
-    def test_get_material_descendants_case_insensitive(self, service):
-        """Test that material lookup is case-insensitive"""
-        from app.database import MaterialTaxonomy
 
-        aluminum = Mock(spec=MaterialTaxonomy)
-        aluminum.name = "Aluminum"
-        aluminum.active = True
+class TestKeywordSearch:
+    """Test class for ranked keyword search over the inventory search index"""
 
-        with patch.object(service, 'Session') as mock_session_class:
-            mock_session = Mock()
-            mock_session_class.return_value = mock_session
+    @pytest.fixture
+    def service(self, test_storage):
+        """Service over a real database holding a few items with notes"""
+        service = InventoryService(test_storage)
+        for n, (material, location, vendor, notes) in enumerate([
+            ("Steel", "Rack A", "McMaster-Carr", "Drop from job 42, lathe stand rebuild"),
+            ("Aluminum", "Lathe Cabinet", "Online Metals", "Spare"),
+            ("Brass", "Rack B", "McMaster-Carr", None),
+        ], start=1):
+            assert service.add_item(InventoryItem(
+                ja_id=f'JA{n:06d}', item_type='Bar', shape='Round', material=material,
+                length=12, location=location, vendor=vendor, notes=notes, active=True
+            ))
+        return service
 
-            mock_query = Mock()
-            mock_session.query.return_value = mock_query
-            mock_query.filter.return_value = mock_query
-            mock_query.first.return_value = aluminum
-            mock_query.all.return_value = []  # No children
+    def _ja_ids(self, service, text, **filters):
+        return [item.ja_id for item in service.search_active_items({'q': text, **filters})]
 
-            # Search with different case
-            result = service.get_material_descendants("ALUMINUM")
+    def test_note_words_found_in_any_order(self, service):
+        assert self._ja_ids(service, "rebuild lathe") == ['JA000001']
 
-            # Should still find and return the proper cased name
-            assert len(result) == 1
-            assert result[0] == "Aluminum"
+    def test_matches_by_word_prefix(self, service):
+        assert sorted(self._ja_ids(service, "mcmaster")) == ['JA000001', 'JA000003']
+        assert self._ja_ids(service, "aster") == []
 
-            mock_session.close.assert_called_once()
+    def test_searches_vendor_and_location(self, service):
+        assert self._ja_ids(service, "online metals") == ['JA000002']
+        assert sorted(self._ja_ids(service, "rack mcmaster")) == ['JA000001', 'JA000003']
 
-    def test_get_material_descendants_only_active_materials(self, service):
-        """Test that only active materials are included in descendants"""
-        from app.database import MaterialTaxonomy
+    def test_short_words_and_stopwords_still_match(self, service):
+        assert self._ja_ids(service, "job 42") == ['JA000001']
+        assert self._ja_ids(service, "from") == ['JA000001']
 
-        steel = Mock(spec=MaterialTaxonomy)
-        steel.name = "Steel"
-        steel.active = True
+    def test_more_relevant_items_rank_first(self, service):
+        # "lathe" is both the location and a note word for one item, only in
+        # the notes of the other
+        assert self._ja_ids(service, "lathe") == ['JA000002', 'JA000001']
 
-        carbon_steel = Mock(spec=MaterialTaxonomy)
-        carbon_steel.name = "Carbon Steel"
-        carbon_steel.parent = "Steel"
-        carbon_steel.active = True
+    def test_combines_with_other_filters(self, service):
+        assert self._ja_ids(service, "mcmaster", material="Brass") == ['JA000003']
 
-        with patch.object(service, 'Session') as mock_session_class:
-            mock_session = Mock()
-            mock_session_class.return_value = mock_session
+    def test_edit_is_reflected(self, service):
+        item = service.get_item('JA000002')
+        item.notes = "Reserved for the vise jaws"
+        assert service.update_item(item)
 
-            mock_query = Mock()
-            mock_session.query.return_value = mock_query
-            mock_query.filter.return_value = mock_query
-            mock_query.first.return_value = steel
-            # Children query should only return active materials
-            mock_query.all.side_effect = [
-                [carbon_steel],  # Active children
-                []  # No grandchildren
-            ]
+        assert self._ja_ids(service, "vise jaws") == ['JA000002']
+        assert self._ja_ids(service, "spare") == []
 
-            result = service.get_material_descendants("Steel")
+    def test_shortened_item_stays_searchable(self, service):
+        assert service.shorten_item('JA000001', 6, notes="Cut for bracket")['success']
 
-            # All queries should filter for active == True
-            # Verify through the number of filter calls
-            assert mock_query.filter.called
+        assert self._ja_ids(service, "bracket") == ['JA000001']
+        assert self._ja_ids(service, "lathe stand") == ['JA000001']
+        # The history row is indexed too, but only shown when asked for
+        assert len(service.search_active_items({'q': "lathe stand", 'active': ''})) == 2
 
-            assert len(result) == 2
-            assert "Steel" in result
-            assert "Carbon Steel" in result
+    def test_deactivated_item_is_excluded_by_default(self, service):
+        assert service.deactivate_item('JA000002')
 
-            mock_session.close.assert_called_once()
+        assert self._ja_ids(service, "spare") == []
+        assert self._ja_ids(service, "spare", active=False) == ['JA000002']
 
-    def test_get_material_descendants_error_handling(self, service):
-        """Test error handling when database query fails"""
-        with patch.object(service, 'Session') as mock_session_class:
-            mock_session = Mock()
-            mock_session_class.return_value = mock_session
+    def test_query_without_words_matches_everything(self, service):
+        assert len(service.search_active_items({'q': " -- "})) == 3
 
-            # Simulate database error
-            mock_session.query.side_effect = Exception("Database error")
+    def test_search_reads_the_index(self, service, test_storage):
+        from sqlalchemy import event
 
-            result = service.get_material_descendants("Steel")
+        statements = []
 
-            # Should return just the material name on error
-            assert len(result) == 1
-            assert result[0] == "Steel"
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
 
-            mock_session.close.assert_called_once()
+        event.listen(test_storage.engine, 'before_cursor_execute', record)
+        try:
+            self._ja_ids(service, "lathe stand")
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', record)
+
+        assert len(statements) == 1
+        assert 'inventory_search_fts' in statements[0]
+        assert 'LIKE' not in statements[0].upper()
+
+
+class TestCurrentInventory:
+    """Test class for the inventory_current projection of active rows"""
+
+    @pytest.fixture
+    def service(self, test_storage):
+        """Service over a real database holding two items"""
+        service = InventoryService(test_storage)
+        for n in (1, 2):
+            assert service.add_item(InventoryItem(
+                ja_id=f'JA{n:06d}', item_type='Bar', shape='Round', material='Steel',
+                length=12, location='Rack A', active=True
+            ))
+        return service
+
+    def _current(self, test_storage):
+        from sqlalchemy.orm import Session
+        from app.database import InventoryCurrent
+
+        with Session(test_storage.engine) as session:
+            return {entry.ja_id: entry.item_id for entry in session.query(InventoryCurrent)}
+
+    def _active_ids(self, test_storage):
+        from sqlalchemy.orm import Session
+
+        with Session(test_storage.engine) as session:
+            return {item.ja_id: item.id for item in session.query(InventoryItem).filter(
+                InventoryItem.active == True
+            )}
+
+    def test_added_items_are_current(self, service, test_storage):
+        assert self._current(test_storage) == self._active_ids(test_storage)
+        assert len(self._current(test_storage)) == 2
+
+    def test_shortening_moves_current_to_the_new_row(self, service, test_storage):
+        before = self._current(test_storage)['JA000001']
+        assert service.shorten_item('JA000001', 6)['success']
+
+        current = self._current(test_storage)
+        assert current['JA000001'] != before
+        assert current == self._active_ids(test_storage)
+        assert [float(item.length) for item in service.get_all_active_items()] == [6.0, 12.0]
+        # History is still read from inventory_items
+        assert len(service.get_item_history('JA000001')) == 2
+
+    def test_deactivate_and_activate(self, service, test_storage):
+        assert service.deactivate_item('JA000002')
+        assert 'JA000002' not in self._current(test_storage)
+        assert [item.ja_id for item in service.get_all_active_items()] == ['JA000001']
+        assert service.count_items({}) == 1
+        assert [item.ja_id for item in service.search_active_items({'active': False})] == ['JA000002']
+
+        assert service.activate_item('JA000002')
+        assert self._current(test_storage) == self._active_ids(test_storage)
+        assert service.count_items({}) == 2
+
+    def test_rolled_back_change_leaves_projection_alone(self, service, test_storage):
+        from sqlalchemy.orm import Session
+
+        before = self._current(test_storage)
+        with Session(test_storage.engine) as session:
+            session.query(InventoryItem).filter(InventoryItem.ja_id == 'JA000001').one().active = False
+            session.flush()
+            session.rollback()
+            session.add(InventoryItem(
+                ja_id='JA000003', item_type='Bar', shape='Round', material='Brass',
+                length=3, active=True
+            ))
+            session.commit()
+
+        assert self._current(test_storage) == {**before, 'JA000003': self._active_ids(test_storage)['JA000003']}
+
+    def test_rebuild_matches_maintained_projection(self, service, test_storage):
+        from sqlalchemy import text
+        from sqlalchemy.orm import Session
+        from app.inventory_current import rebuild_current_rows
+
+        assert service.shorten_item('JA000001', 6)['success']
+        maintained = self._current(test_storage)
+        with test_storage.engine.begin() as conn:
+            conn.execute(text("DELETE FROM inventory_current WHERE ja_id = 'JA000002'"))
+            conn.execute(text("INSERT INTO inventory_current (ja_id, item_id) VALUES ('JA000009', 1)"))
+
+        with Session(test_storage.engine) as session:
+            assert rebuild_current_rows(session) == 2
+            session.commit()
+
+        assert self._current(test_storage) == maintained
+
+
+class TestAddItems:
+    """Test class for bulk creation in one transaction"""
+
+    @pytest.fixture
+    def service(self, test_storage):
+        """Service over a real database already holding JA000001-JA000002"""
+        service = InventoryService(test_storage)
+        for n in (1, 2):
+            assert service.add_item(InventoryItem(
+                ja_id=f'JA{n:06d}', item_type='Bar', shape='Round', material='Steel',
+                length=12, location='Rack A', active=True
+            ))
+        return service
+
+    def _template(self, **overrides):
+        values = dict(ja_id='JA999999', item_type='Bar', shape='Round', material='Brass',
+                      length=36, location='Rack B', notes='Drop from job 42', active=True)
+        values.update(overrides)
+        return InventoryItem(**values)
+
+    def _rows(self, test_storage, ja_id):
+        from sqlalchemy.orm import Session
+
+        with Session(test_storage.engine) as session:
+            return session.query(InventoryItem).filter(InventoryItem.ja_id == ja_id).count()
+
+    def test_creates_a_block_above_the_current_maximum(self, service):
+        assert service.add_items(self._template(), 3) == ['JA000003', 'JA000004', 'JA000005']
+
+        items = service.get_all_active_items()
+        assert [item.ja_id for item in items] == [f'JA{n:06d}' for n in range(1, 6)]
+        assert {item.material for item in items[2:]} == {'Brass'}
+        assert service.get_max_ja_id_number() == 5
+
+    def test_created_items_are_searchable(self, service):
+        service.add_items(self._template(), 2)
+        assert sorted(item.ja_id for item in service.search_active_items({'q': 'job 42'})) == [
+            'JA000003', 'JA000004']
+
+    def test_starts_no_lower_than_first_number(self, service):
+        assert service.add_items(self._template(), 2, first_number=10) == ['JA000010', 'JA000011']
+
+    def test_block_skips_numbers_already_allocated(self, service):
+        # Handed to a form that has not been saved yet
+        assert service.allocate_ja_ids(2) == ['JA000003', 'JA000004']
+        assert service.add_items(self._template(), 2) == ['JA000005', 'JA000006']
+
+    def test_block_starts_at_held_number(self, service):
+        held = service.reserve_ja_id()
+        assert service.add_items(self._template(), 3, first_number=3, held=held) == [
+            'JA000003', 'JA000004', 'JA000005']
+        assert service.allocate_ja_ids(1) == ['JA000006']
+
+    def test_held_number_is_not_reused_once_another_was_allocated(self, service):
+        held = service.reserve_ja_id()
+        service.allocate_ja_ids(1)
+        assert service.add_items(self._template(), 2, first_number=3, held=held) == [
+            'JA000005', 'JA000006']
+
+    def test_failure_creates_nothing(self, service, test_storage):
+        from app.exceptions import StorageError
+
+        with patch('app.mariadb_inventory_service.inventory_search.refresh_search_documents',
+                   side_effect=RuntimeError('boom')):
+            with pytest.raises(StorageError, match='boom'):
+                service.add_items(self._template(), 3)
+
+        assert self._rows(test_storage, 'JA000003') == 0
+        assert len(service.get_all_active_items()) == 2
+
+
+class TestJaIdSequence:
+    """Test class for allocating JA IDs from the JA ID sequence"""
+
+    @pytest.fixture
+    def service(self, test_storage):
+        """Service over a real database already holding JA000001-JA000002"""
+        service = InventoryService(test_storage)
+        for n in (1, 2):
+            assert service.add_item(self._item(f'JA{n:06d}'))
+        return service
+
+    def _item(self, ja_id, active=True):
+        return InventoryItem(ja_id=ja_id, item_type='Bar', shape='Round', material='Steel',
+                             length=12, location='Rack A', active=active)
+
+    def test_allocations_are_never_repeated(self, service):
+        assert service.allocate_ja_ids(1) == ['JA000003']
+        assert service.allocate_ja_ids(2) == ['JA000004', 'JA000005']
+        assert service.allocate_ja_ids(1) == ['JA000006']
+
+    def test_sequence_starts_above_inactive_history(self, service):
+        assert service.add_item(self._item('JA000009', active=False))
+        assert service.allocate_ja_ids(1) == ['JA000010']
+
+    def test_hand_chosen_ja_id_advances_the_sequence(self, service):
+        assert service.allocate_ja_ids(1) == ['JA000003']
+        assert service.add_item(self._item('JA000050'))
+        assert service.allocate_ja_ids(1) == ['JA000051']
+
+    def test_hand_chosen_ja_id_below_the_sequence_leaves_it(self, service):
+        assert service.allocate_ja_ids(1) == ['JA000003']
+        assert service.add_item(self._item('JA000004'))
+        assert service.allocate_ja_ids(1) == ['JA000005']
+
+    def test_renaming_to_a_higher_ja_id_advances_the_sequence(self, service, test_storage):
+        from sqlalchemy.orm import Session
+
+        service.allocate_ja_ids(1)
+        with Session(test_storage.engine) as session:
+            session.query(InventoryItem).filter(InventoryItem.ja_id == 'JA000002').one().ja_id = 'JA000070'
+            session.commit()
+        assert service.allocate_ja_ids(1) == ['JA000071']
+
+    def test_reserve_offers_the_held_id_again_while_nobody_else_was_given_one(self, service):
+        held = service.reserve_ja_id()
+        assert held == 'JA000003'
+        assert service.reserve_ja_id(held) == held
+
+        assert service.allocate_ja_ids(1) == ['JA000004']
+        assert service.reserve_ja_id(held) == 'JA000005'
+
+    def test_reserve_moves_on_once_the_held_id_is_used(self, service):
+        held = service.reserve_ja_id()
+        assert service.add_item(self._item(held))
+        assert service.reserve_ja_id(held) == 'JA000004'
+
+    def test_next_id_read_is_a_single_row(self, service, test_storage):
+        from sqlalchemy import event
+
+        service.allocate_ja_ids(1)
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(test_storage.engine, 'before_cursor_execute', listener)
+        try:
+            service.allocate_ja_ids(1)
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', listener)
+        assert not any('inventory_items' in statement for statement in statements)
+        assert any('id_sequences' in statement for statement in statements)
+
+
+class TestBatchUpdates:
+    """Test class for set-based batch moves and deactivations"""
+
+    @pytest.fixture
+    def service(self, test_storage):
+        """Service over a real database holding JA000001-JA000005 on Rack A"""
+        service = InventoryService(test_storage)
+        for n in range(1, 6):
+            assert service.add_item(InventoryItem(
+                ja_id=f'JA{n:06d}', item_type='Bar', shape='Round', material='Steel',
+                length=12, location='Rack A', sub_location=f'Bin {n}', active=True
+            ))
+        return service
+
+    def _statements(self, test_storage, call):
+        from sqlalchemy import event
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(test_storage.engine, 'before_cursor_execute', listener)
+        try:
+            result = call()
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', listener)
+        return result, statements
+
+    def test_move_is_one_update_per_destination(self, service, test_storage):
+        moves = {f'JA{n:06d}': {'location': 'Rack B', 'sub_location': None} for n in range(1, 5)}
+        moves['JA000005'] = {'location': 'Rack C', 'sub_location': 'Top'}
+
+        (before, missing), statements = self._statements(test_storage, lambda: service.move_items(moves))
+
+        assert missing == []
+        assert before['JA000001'] == {'location': 'Rack A', 'sub_location': 'Bin 1'}
+        assert len([s for s in statements if s.startswith('UPDATE inventory_items')]) == 2
+        assert [item.location for item in service.get_all_active_items()] == ['Rack B'] * 4 + ['Rack C']
+        assert service.get_active_item('JA000005').sub_location == 'Top'
+
+    def test_move_reports_missing_and_inactive_ids(self, service):
+        service.deactivate_item('JA000002')
+        before, missing = service.move_items({
+            'JA000001': {'location': 'Rack B'},
+            'JA000002': {'location': 'Rack B'},
+            'JA999999': {'location': 'Rack B'},
+        })
+        assert list(before) == ['JA000001']
+        assert missing == ['JA000002', 'JA999999']
+        assert service.get_canonical_item('JA000002').location == 'Rack A'
+
+    def test_move_is_searchable_and_suggested(self, service):
+        from app.vocabulary_cache import suggest_vocabulary
+
+        assert suggest_vocabulary(service.engine, 'location', 'Mez', 10) == []
+        service.move_items({'JA000003': {'location': 'Mezzanine'}})
+        assert [item.ja_id for item in service.search_active_items({'q': 'mezzanine'})] == ['JA000003']
+        assert suggest_vocabulary(service.engine, 'location', 'Mez', 10) == ['Mezzanine']
+
+    def test_move_rejects_other_columns(self, service):
+        with pytest.raises(ValueError, match='material'):
+            service.move_items({'JA000001': {'material': 'Brass'}})
+
+    def test_move_failure_moves_nothing(self, service):
+        from app.exceptions import StorageError
+
+        with patch('app.mariadb_inventory_service.inventory_search.refresh_search_documents',
+                   side_effect=RuntimeError('boom')):
+            with pytest.raises(StorageError, match='boom'):
+                service.move_items({'JA000001': {'location': 'Rack B'}})
+        assert service.get_active_item('JA000001').location == 'Rack A'
+
+    def test_deactivate_is_one_update(self, service, test_storage):
+        (count, failed), statements = self._statements(
+            test_storage, lambda: service.batch_deactivate_items(['JA000001', 'JA000003', 'JA999999']))
+
+        assert (count, failed) == (2, ['JA999999'])
+        assert len([s for s in statements if s.startswith('UPDATE inventory_items')]) == 1
+        assert [item.ja_id for item in service.get_all_active_items()] == ['JA000002', 'JA000004', 'JA000005']
+        assert service.count_items({}) == 3
 
 
 class TestGetMaxJaIdNumber:
@@ -776,7 +1090,7 @@ class TestGetMaxJaIdNumber:
     def _add_bypassing_check(self, test_storage, ja_id, active=True):
         """Insert a row of arbitrary shape, with SQLite CHECK constraints
         temporarily disabled so we can plant a value the schema would
-        otherwise refuse.
+        otherwise refuse, and project it as current when active.
         """
         from sqlalchemy import text
         with test_storage.engine.begin() as conn:
@@ -788,6 +1102,11 @@ class TestGetMaxJaIdNumber:
                 "VALUES (:ja_id, 'Bar', 'Round', 'Steel', 'Test', 1, 1, "
                 ":active, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
             ), {'ja_id': ja_id, 'active': 1 if active else 0})
+            if active:
+                conn.execute(text(
+                    "INSERT INTO inventory_current (ja_id, item_id) "
+                    "SELECT ja_id, id FROM inventory_items WHERE ja_id = :ja_id"
+                ), {'ja_id': ja_id})
             conn.execute(text('PRAGMA ignore_check_constraints = 0'))
 
     def test_empty_db_returns_zero(self, service):
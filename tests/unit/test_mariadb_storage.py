@@ -0,0 +1,140 @@
+"""
+Unit tests for the process-wide storage backend.
+
+One ``MariaDBStorage`` -- and so one engine and one connection pool -- is built
+by ``create_app`` and shared by every route and service. These tests pin that
+down, because the failure it replaces was silent: a fresh pool per request is
+slow, not wrong.
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import create_app
+from app.database import Base
+from app.mariadb_inventory_service import InventoryService
+from app.photo_service import PhotoService
+from tests.test_config import TestConfig
+
+
+@pytest.fixture
+def sqlite_url():
+    """A migrated, empty SQLite database that create_app can build its own backend on"""
+    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+    temp_db.close()
+    url = f'sqlite:///{temp_db.name}'
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    yield url
+
+    try:
+        os.unlink(temp_db.name)
+    except OSError:
+        pass
+
+
+class TestConnect:
+    """MariaDBStorage.connect builds its engine once"""
+
+    @pytest.mark.unit
+    def test_connect_is_idempotent(self, test_storage):
+        """A second connect keeps the engine rather than building another pool"""
+        engine = test_storage.engine
+
+        result = test_storage.connect()
+
+        assert result.success
+        assert test_storage.engine is engine
+
+    @pytest.mark.unit
+    def test_dispose_after_fork_keeps_the_engine_usable(self, test_storage):
+        """The child drops inherited connections and opens its own on next use"""
+        test_storage.dispose_after_fork()
+
+        assert test_storage.read_all('Materials').success
+
+
+class TestProcessStorageBackend:
+    """create_app owns one backend when none is injected"""
+
+    @pytest.fixture
+    def built_app(self, sqlite_url):
+        """An app that built its own storage backend"""
+        class OwnBackendConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = sqlite_url
+
+        with patch('app.atexit.register'), patch('app.os.register_at_fork'):
+            app = create_app(OwnBackendConfig)
+
+        yield app
+
+        app.config['STORAGE_BACKEND'].close()
+
+    @pytest.mark.unit
+    def test_backend_is_built_and_connected(self, built_app):
+        """The backend exists before the first request and points at the configured URL"""
+        storage = built_app.config['STORAGE_BACKEND']
+
+        assert storage._connected
+        assert str(storage.engine.url).startswith('sqlite:///')
+
+    @pytest.mark.unit
+    def test_services_share_the_backend_engine(self, built_app):
+        """Services borrow the one engine instead of building their own"""
+        storage = built_app.config['STORAGE_BACKEND']
+
+        assert InventoryService(storage).engine is storage.engine
+
+    @pytest.mark.unit
+    def test_requests_reuse_the_backend(self, built_app):
+        """Serving requests does not replace the backend or its engine"""
+        storage = built_app.config['STORAGE_BACKEND']
+        engine = storage.engine
+
+        client = built_app.test_client()
+        assert client.get('/api/materials/hierarchy').status_code == 200
+        assert client.get('/api/inventory/list').status_code == 200
+
+        assert built_app.config['STORAGE_BACKEND'] is storage
+        assert storage.engine is engine
+
+    @pytest.mark.unit
+    def test_fork_and_exit_hooks_are_registered(self, sqlite_url):
+        """The pool is reset in a forked child and closed at interpreter exit"""
+        class OwnBackendConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = sqlite_url
+
+        with patch('app.atexit.register') as at_exit, \
+                patch('app.os.register_at_fork') as at_fork:
+            app = create_app(OwnBackendConfig)
+        storage = app.config['STORAGE_BACKEND']
+
+        at_fork.assert_called_once_with(after_in_child=storage.dispose_after_fork)
+        at_exit.assert_called_once_with(storage.close)
+        storage.close()
+
+    @pytest.mark.unit
+    def test_injected_backend_is_used_as_is(self, test_storage):
+        """A test's injected backend is not replaced"""
+        app = create_app(TestConfig, storage_backend=test_storage)
+
+        assert app.config['STORAGE_BACKEND'] is test_storage
+
+
+class TestPhotoServiceClose:
+    """PhotoService leaves a borrowed engine alone"""
+
+    @pytest.mark.unit
+    def test_close_does_not_dispose_the_shared_engine(self, test_storage):
+        """Closing the service must not empty the pool every other service uses"""
+        with patch.object(test_storage.engine, 'dispose') as dispose:
+            with PhotoService(test_storage):
+                pass
+
+        dispose.assert_not_called()
@@ -287,12 +287,12 @@ class TestContentHashing:
 
         assert attachment.photo.sha256_hash is not None
 
-    def test_an_item_photo_is_deliberately_not_hashed(self, photos):
-        """Nothing deduplicates item photos, and no requirement asks for one.
+    def test_an_item_photo_is_hashed_too(self, photos):
+        """Nothing deduplicates item photos, but the hash is now their address.
 
-        upload_photo keeps its ``sha256_hash=None``. Asserted rather than
-        assumed, because "we did not change the other path" is exactly the kind
-        of claim that quietly stops being true.
+        Once photo bytes can live in the blob store, the hash is the only way
+        back to them, so upload_photo has to write it as well. It is over the
+        same bytes-as-received as an attachment's.
         """
         from app.database import InventoryItem
 
@@ -305,7 +305,7 @@ class TestContentHashing:
         association = photos.upload_photo(
             'JA000111', png_bytes(), 'photo.png', 'image/png'
         )
-        assert association.photo.sha256_hash is None
+        assert association.photo.sha256_hash == hashlib.sha256(png_bytes()).hexdigest()
 
 
 class TestAttachingOnlyWhatIsNew:
@@ -17,6 +17,7 @@ import pytest
 from PIL import Image
 
 from app.services.label_printer import LABEL_TYPES
+from app.services import product_label
 from app.services.product_label import compose_product_label, format_provenance
 
 CODE = 'WIT0123456789'
@@ -198,6 +199,40 @@ class TestProvenanceLine:
         assert format_provenance(purchase) == 'Amazon  $0.10'
 
 
+class TestFitting:
+    """Font sizing and truncation, measured rather than composed"""
+
+    def test_a_font_is_loaded_once_per_size(self):
+        assert product_label._font(20) is product_label._font(20)
+
+    def test_fit_font_picks_the_largest_size_that_fits(self):
+        font = product_label._fit_font('WIT0123456789', 400, 60, 10)
+        box = font.getbbox('WIT0123456789')
+        assert box[2] - box[0] <= 400 and box[3] <= 60
+
+        larger = product_label._font(font.size + 2)
+        box = larger.getbbox('WIT0123456789')
+        assert box[2] - box[0] > 400 or box[3] > 60
+
+    def test_fit_font_never_goes_below_the_minimum(self):
+        assert product_label._fit_font('x' * 500, 50, 10, 12).size == 12
+
+    def test_truncate_keeps_the_longest_prefix_that_fits(self):
+        font = product_label._font(20)
+        text = 'Stainless steel hex nut, M8 x 1.25, pack of fifty'
+        shortened = product_label._truncate(text, font, 200)
+
+        assert shortened.endswith(product_label.ELLIPSIS)
+        assert product_label._text_width(font, shortened) <= 200
+        kept = len(shortened) - 1
+        longer = text[:kept + 1].rstrip() + product_label.ELLIPSIS
+        assert product_label._text_width(font, longer) > 200
+
+    def test_truncate_leaves_text_that_fits(self):
+        font = product_label._font(20)
+        assert product_label._truncate('Hex nut', font, 400) == 'Hex nut'
+
+
 class _FakePurchase:
     """The three fields the provenance line reads, without a database"""
 
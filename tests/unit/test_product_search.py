@@ -175,12 +175,11 @@ class TestTextSearch:
 class TestNotesAreSearched:
     """009 FR-010 .. FR-014: the field the operator writes prose in is findable.
 
-    There is deliberately no case-insensitivity test here. SQLite's LIKE and
-    MariaDB's utf8mb4 _ci collation both fold ASCII case, so the two backends
-    agree and such a test would pass whether the query said `like` or `ilike` --
-    it would assert nothing about which. What guarantees 009 FR-012 is that
-    notes use the identical construct as the five clauses beside it, and the
-    test that shows it is test_a_term_in_one_description_and_another_note below.
+    There is deliberately no case-insensitivity test here: the search document
+    is lowercased along with the query, whichever field a word came from. What
+    guarantees 009 FR-012 is that notes are words of the same document as the
+    five fields beside them, and the test that shows it is
+    test_a_term_in_one_description_and_another_note below.
     """
 
     def test_a_phrase_held_only_in_notes_finds_the_product(self, catalog):
@@ -217,6 +216,65 @@ class TestNotesAreSearched:
         assert catalog.search_products(query='lathe stand', tag='surplus') == []
 
 
+class TestSearchIndex:
+    """The full-text document behind text search, and how it keeps up"""
+
+    def test_an_edited_description_is_searched_as_edited(self, catalog):
+        product = catalog.search_products(query='resistor')[0]
+
+        catalog.update_product(product.id, description='Metal film resistor, 10k')
+
+        assert descriptions(catalog.search_products(query='metal film')) == [
+            'Metal film resistor, 10k'
+        ]
+        assert catalog.search_products(query='carbon') == []
+
+    def test_merged_specifications_are_searched(self, catalog):
+        product = catalog.search_products(query='bolt')[0]
+
+        catalog.merge_specifications(product.id, [{'name': 'Thread pitch', 'value': '0.7 mm'}])
+
+        assert [p.id for p in catalog.search_products(query='pitch')] == [product.id]
+
+    def test_an_added_identifier_is_searched_and_a_removed_one_is_not(self, catalog):
+        product = catalog.search_products(query='bolt')[0]
+
+        identifier = catalog.add_identifier(product.id, 'MPN', 'DIN912-M4x20')
+        assert [p.id for p in catalog.search_products(query='DIN912')] == [product.id]
+
+        catalog.remove_identifier(product.id, identifier.id)
+        assert catalog.search_products(query='DIN912') == []
+
+    def test_words_match_by_prefix_not_anywhere(self, catalog):
+        """Token matching: the middle of a part number is not a word"""
+        assert catalog.search_products(query='JT10K0') == []
+
+    def test_short_words_are_matched_too(self, catalog):
+        """Below the FULLTEXT minimum word length, so matched another way"""
+        assert descriptions(catalog.search_products(query='M4')) == ['M4 hex bolt']
+        assert descriptions(catalog.search_products(query='m4 hex')) == ['M4 hex bolt']
+        assert catalog.search_products(query='m4 capacitor') == []
+
+    def test_the_better_match_comes_first(self, catalog):
+        """Named in its description and part number beats named once in notes"""
+        found = [p.description for p in catalog.search_products(query='LM358')]
+        assert found == ['LM358 op-amp', 'Ceramic capacitor, 100nF']
+
+    def test_the_mariadb_query_is_a_boolean_mode_match(self, catalog):
+        from sqlalchemy.dialects import mysql
+        from app import catalog_search
+
+        class MariaDBSession:
+            def get_bind(self):
+                return type('Engine', (), {'dialect': mysql.dialect()})()
+
+        matches = catalog_search.matching_products(MariaDBSession(), 'lathe stand m4')
+        sql = str(matches.compile(dialect=mysql.dialect(), compile_kwargs={'literal_binds': True}))
+        assert "MATCH (product_search_documents.body) AGAINST ('+lathe* +stand*' IN BOOLEAN MODE)" in sql
+        # The short word is a LIKE on a word start; the dialect doubles each %
+        assert "concat(' ', product_search_documents.body)) LIKE '%% m4%%'" in sql
+
+
 class TestStockFilter:
     """SC-007: 'none on hand' and 'not tracked' must stay tellable apart"""
 
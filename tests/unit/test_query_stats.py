@@ -0,0 +1,187 @@
+"""
+Tests for per-request SQL instrumentation (app/query_stats.py)
+"""
+
+import logging
+
+import pytest
+from flask import Response, g
+
+from app.database import InventoryItem
+from app.query_stats import QueryStats, _finish_request, record_request_queries
+
+
+def _add_items(storage, count):
+    session = storage.Session()
+    try:
+        for n in range(1, count + 1):
+            session.add(InventoryItem(
+                ja_id=f'JA{n:06d}', item_type='Bar', shape='Round',
+                material='Steel', length=n, active=True,
+            ))
+        session.commit()
+    finally:
+        session.close()
+
+
+class TestQueryStats:
+    """Tests for the per-request tally"""
+
+    @pytest.mark.unit
+    def test_record_counts_and_times(self):
+        stats = QueryStats()
+        stats.record('SELECT 1', 0.002)
+        stats.record('SELECT 1', 0.003)
+
+        assert stats.count == 2
+        assert stats.db_ms == pytest.approx(5.0)
+        assert stats.statements['SELECT 1'] == 2
+
+    @pytest.mark.unit
+    def test_repeated_lists_statements_at_or_over_the_threshold(self):
+        stats = QueryStats()
+        for _ in range(3):
+            stats.record('SELECT a WHERE id = ?', 0.001)
+        stats.record('SELECT b', 0.001)
+
+        assert stats.repeated(3) == [('SELECT a WHERE id = ?', 3)]
+        assert stats.repeated(4) == []
+        assert stats.repeated(0) == []
+
+    @pytest.mark.unit
+    def test_server_timing_format(self):
+        stats = QueryStats()
+        stats.record('SELECT 1', 0.0125)
+
+        header = stats.server_timing()
+
+        assert header.startswith('db;dur=12.5;desc="1 query", total;dur=')
+
+
+class TestRequestInstrumentation:
+    """Tests for the request hooks"""
+
+    @pytest.mark.unit
+    def test_response_carries_server_timing(self, client, test_storage):
+        _add_items(test_storage, 3)
+
+        response = client.get('/api/inventory/list')
+
+        assert response.status_code == 200
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('db;dur=')
+        assert 'total;dur=' in timing
+
+    @pytest.mark.unit
+    def test_counts_the_statements_the_engine_runs(self, app, client, test_storage):
+        from sqlalchemy import event
+        _add_items(test_storage, 3)
+        executed = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            executed.append(statement)
+
+        event.listen(test_storage.engine, 'before_cursor_execute', count)
+        try:
+            with record_request_queries(app) as recorded:
+                client.get('/api/inventory/list')
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', count)
+
+        assert len(recorded) == 1
+        assert recorded[0].count == len(executed) > 0
+        assert f'desc="{len(executed)} queries"' in recorded[0].server_timing()
+
+    @pytest.mark.unit
+    def test_statements_outside_a_request_are_not_counted(self, app, test_storage):
+        with record_request_queries(app) as recorded:
+            _add_items(test_storage, 2)
+
+        assert recorded == []
+
+    @pytest.mark.unit
+    def test_logs_query_count_per_request(self, client, caplog):
+        with caplog.at_level(logging.INFO, logger='performance'):
+            client.get('/api/inventory/list')
+
+        records = [r for r in caplog.records if getattr(r, 'operation', None) == 'request_queries']
+        assert len(records) == 1
+        assert records[0].endpoint == 'main.api_inventory_list'
+        assert records[0].db_queries > 0
+        assert records[0].db_ms >= 0
+
+    @pytest.mark.unit
+    def test_repeated_statement_is_logged_as_probable_n_plus_one(self, app, caplog):
+        app.config['SQL_REPEAT_WARNING'] = 3
+        with app.test_request_context('/api/inventory/list'):
+            g.query_stats = QueryStats()
+            for _ in range(4):
+                g.query_stats.record('SELECT * FROM photos WHERE item_id = ?', 0.001)
+            g.query_stats.record('SELECT * FROM inventory_items', 0.001)
+
+            with caplog.at_level(logging.INFO, logger='performance'):
+                _finish_request(Response())
+
+        warnings = [r for r in caplog.records if getattr(r, 'operation', None) == 'repeated_query']
+        assert len(warnings) == 1
+        assert warnings[0].levelno == logging.WARNING
+        assert 'sent 4 times' in warnings[0].getMessage()
+        assert 'FROM photos' in warnings[0].getMessage()
+
+    @pytest.mark.unit
+    def test_disabled_by_config(self, test_storage):
+        from app import create_app
+        from tests.test_config import TestConfig
+
+        class Uninstrumented(TestConfig):
+            SQL_INSTRUMENTATION = False
+
+        app = create_app(Uninstrumented, storage_backend=test_storage)
+        response = app.test_client().get('/api/inventory/list')
+
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response.headers
+
+
+class TestQueryBudgets:
+    """Endpoints whose statement count must not grow with the inventory"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize('path', [
+        '/api/inventory/list',
+        '/api/inventory/list?page_size=50',
+        '/api/inventory/next-ja-id',
+    ])
+    def test_query_count_independent_of_item_count(self, app, client, test_storage, path):
+        _add_items(test_storage, 3)
+        with record_request_queries(app) as few:
+            client.get(path)
+
+        session = test_storage.Session()
+        try:
+            for n in range(4, 41):
+                session.add(InventoryItem(
+                    ja_id=f'JA{n:06d}', item_type='Bar', shape='Round',
+                    material='Steel', length=n, active=True,
+                ))
+            session.commit()
+        finally:
+            session.close()
+        with record_request_queries(app) as many:
+            client.get(path)
+
+        assert many[0].count == few[0].count
+
+    @pytest.mark.unit
+    def test_inventory_list_within_budget(self, query_budget, test_storage):
+        _add_items(test_storage, 20)
+
+        response = query_budget('/api/inventory/list', 5)
+
+        assert response.status_code == 200
+        assert len(response.get_json()['items']) == 20
+
+    @pytest.mark.unit
+    def test_budget_failure_lists_the_statements(self, query_budget):
+        with pytest.raises(AssertionError, match='budget 0'):
+            query_budget('/api/inventory/list', 0)
@@ -286,6 +286,105 @@ class TestAPIConsistency:
         assert 'message' in data, "Error response missing 'message' field"
 
 
+@pytest.mark.unit
+class TestInventoryListPaging:
+    """Tests for keyset paging on /api/inventory/list and /api/inventory/search"""
+
+    @pytest.fixture
+    def five_items(self, test_storage):
+        """Five active bars, JA600001-JA600005, with every other one in Steel"""
+        from app.mariadb_inventory_service import InventoryService
+        from app.database import InventoryItem
+        from decimal import Decimal
+
+        service = InventoryService(test_storage)
+        for number in range(1, 6):
+            service.add_item(InventoryItem(
+                ja_id=f"JA60000{number}",
+                item_type='Bar',
+                shape='Round',
+                material='Steel' if number % 2 else 'Brass',
+                length=Decimal(str(number)),
+                width=Decimal('1'),
+                location='Rack A',
+                active=True,
+                precision=False,
+            ))
+        return service
+
+    def test_list_without_page_size_returns_everything(self, client, five_items):
+        """Existing callers that do not page still get every item"""
+        data = client.get('/api/inventory/list?status=active').get_json()
+
+        assert len(data['items']) == 5
+        assert data['total_count'] == 5
+        assert data['next_cursor'] is None
+
+    def test_list_pages_follow_the_cursor(self, client, five_items):
+        """Each page is bounded by page_size and the cursor leads to the next"""
+        first = client.get('/api/inventory/list?status=active&page_size=2').get_json()
+        assert [i['ja_id'] for i in first['items']] == ['JA600001', 'JA600002']
+        assert first['total_count'] == 5
+
+        second = client.get('/api/inventory/list', query_string={
+            'status': 'active', 'page_size': 2, 'cursor': first['next_cursor']}).get_json()
+        assert [i['ja_id'] for i in second['items']] == ['JA600003', 'JA600004']
+        assert second['total_count'] == 5
+
+    def test_list_filters_and_sorts_on_the_server(self, client, five_items):
+        """Material and sort order are applied before paging"""
+        data = client.get('/api/inventory/list', query_string={
+            'status': 'active', 'material': 'steel', 'sort': 'length',
+            'order': 'desc', 'page_size': 10}).get_json()
+
+        assert [i['ja_id'] for i in data['items']] == ['JA600005', 'JA600003', 'JA600001']
+        assert data['total_count'] == 3
+
+    def test_list_rejects_bad_paging_parameters(self, client, five_items):
+        """A bad page size, sort column or cursor is a 400, not a 500"""
+        for query in ('page_size=zero', 'page_size=0', 'page_size=2&sort=notes',
+                      'page_size=2&cursor=bogus'):
+            response = client.get(f'/api/inventory/list?{query}')
+            assert response.status_code == 400, query
+            assert response.get_json()['success'] is False
+
+    def test_page_size_is_capped(self, client, five_items):
+        """A caller cannot ask for an unbounded page"""
+        from app.main import routes
+
+        with patch.object(routes, '_MAX_INVENTORY_PAGE_SIZE', 2):
+            data = client.get('/api/inventory/list?page_size=1000').get_json()
+
+        assert len(data['items']) == 2
+        assert data['next_cursor'] is not None
+
+    def test_search_pages_follow_the_cursor(self, client, five_items):
+        """The advanced search endpoint pages the same way from its JSON body"""
+        first = client.post('/api/inventory/search', json={
+            'material': 'Brass', 'page_size': 1}).get_json()
+        assert [i['ja_id'] for i in first['items']] == ['JA600002']
+        assert first['total_count'] == 2
+
+        second = client.post('/api/inventory/search', json={
+            'material': 'Brass', 'page_size': 1, 'cursor': first['next_cursor']}).get_json()
+        assert [i['ja_id'] for i in second['items']] == ['JA600004']
+        assert second['next_cursor'] is None
+
+    def test_search_by_keywords(self, client, five_items):
+        """Keywords in q are matched against the search index and combine with filters"""
+        item = five_items.get_item('JA600003')
+        item.notes = 'Offcut from the lathe stand'
+        five_items.update_item(item)
+
+        data = client.post('/api/inventory/search', json={'q': 'lathe offcut'}).get_json()
+        assert [i['ja_id'] for i in data['items']] == ['JA600003']
+
+        data = client.post('/api/inventory/search', json={
+            'q': 'rack', 'material': 'Brass', 'page_size': 5}).get_json()
+        assert [i['ja_id'] for i in data['items']] == ['JA600002', 'JA600004']
+        assert data['total_count'] == 2
+
+
 @pytest.mark.unit
 class TestPhotoCopyAPI:
     """Test the POST /api/photos/copy endpoint for manual photo copying"""
@@ -529,6 +628,162 @@ class TestPhotoCopyAPI:
         assert 'warning' in data
 
 
+@pytest.mark.unit
+class TestPhotoDataRoute:
+    """Tests for GET /api/photos/<id> and /api/photos/<id>/download"""
+
+    @pytest.fixture
+    def jpeg(self):
+        import io
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 200), color='green').save(buffer, format='JPEG')
+        return buffer.getvalue()
+
+    @pytest.fixture
+    def blob_store(self, tmp_path):
+        """A blob store every PhotoService in the test will use"""
+        from app.blob_store import LocalBlobStore
+        store = LocalBlobStore(str(tmp_path / 'blobs'))
+        with patch('app.photo_service.get_blob_store', return_value=store):
+            yield store
+
+    def _upload(self, test_storage, jpeg):
+        """Add an item with one photo; returns (association ID, photo ID)"""
+        from decimal import Decimal
+        from app.database import InventoryItem
+        from app.mariadb_inventory_service import InventoryService
+        from app.photo_service import PhotoService
+
+        InventoryService(test_storage).add_item(InventoryItem(
+            ja_id='JA710001', item_type='Bar', shape='Round', material='Steel',
+            length=Decimal('6'), width=Decimal('1'), active=True, precision=False
+        ))
+        with PhotoService(test_storage) as photo_service:
+            association = photo_service.upload_photo('JA710001', jpeg, 'bar.jpg', 'image/jpeg')
+            return association.id, association.photo_id
+
+    def test_photo_is_served_from_the_blob_store(self, client, test_storage, blob_store, jpeg):
+        """Stored photos stream from disk with the right type"""
+        _, photo_id = self._upload(test_storage, jpeg)
+
+        response = client.get(f'/api/photos/{photo_id}?size=original')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'image/jpeg'
+        assert response.data == jpeg
+
+    def test_photo_in_the_database_is_still_served(self, client, test_storage, jpeg):
+        """Without a blob store the bytes come from the photos row"""
+        _, photo_id = self._upload(test_storage, jpeg)
+
+        response = client.get(f'/api/photos/{photo_id}')
+
+        assert response.status_code == 200
+        assert response.data == jpeg
+
+    def test_missing_photo_is_404(self, client):
+        assert client.get('/api/photos/9999').status_code == 404
+
+    def test_original_is_cacheable_by_hash(self, client, test_storage, jpeg):
+        """An original's ETag is its content hash; the response is immutable"""
+        import hashlib
+        _, photo_id = self._upload(test_storage, jpeg)
+
+        response = client.get(f'/api/photos/{photo_id}?size=original')
+
+        assert response.status_code == 200
+        assert response.get_etag() == (f'{hashlib.sha256(jpeg).hexdigest()}-original', False)
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 60 * 60
+
+    def test_rendered_size_is_revalidated(self, client, test_storage, jpeg):
+        """A thumbnail can be rendered again, so it is never cached as immutable"""
+        import hashlib
+        _, photo_id = self._upload(test_storage, jpeg)
+
+        response = client.get(f'/api/photos/{photo_id}?size=thumbnail')
+
+        assert response.status_code == 200
+        assert response.get_etag()[0].startswith(f'{hashlib.sha256(jpeg).hexdigest()}-thumbnail-')
+        assert response.cache_control.no_cache
+        assert not response.cache_control.immutable
+        assert response.cache_control.max_age is None
+
+    @pytest.mark.parametrize('use_store', [False, True])
+    def test_rendering_again_changes_the_etag(self, client, test_storage, jpeg, tmp_path, use_store):
+        """A re-rendered thumbnail is not answered with a 304 for the old copy"""
+        import os
+        from datetime import datetime, timedelta
+        from app.blob_store import LocalBlobStore
+        from app.database import Photo, PhotoJob
+        from app.photo_service import PhotoService
+        store = LocalBlobStore(str(tmp_path / 'blobs')) if use_store else None
+        with patch('app.photo_service.get_blob_store', return_value=store):
+            _, photo_id = self._upload(test_storage, jpeg)
+
+            with PhotoService(test_storage) as photo_service:
+                session = photo_service.session
+                photo = session.get(Photo, photo_id)
+                # Push the first render into the past, so the new one is later
+                photo.updated_at = datetime.utcnow() - timedelta(minutes=5)
+                if use_store:
+                    path = store.local_path(photo.sha256_hash, 'thumbnail')
+                    os.utime(path, ns=(0, 0))
+                session.add(PhotoJob(photo_id=photo_id))
+                session.commit()
+                old_etag = client.get(f'/api/photos/{photo_id}?size=thumbnail').get_etag()[0]
+                photo_service.run_pending_jobs()
+
+            response = client.get(f'/api/photos/{photo_id}?size=thumbnail',
+                                  headers={'If-None-Match': f'"{old_etag}"'})
+
+        assert response.status_code == 200
+        assert response.get_etag()[0] != old_etag
+
+    @pytest.mark.parametrize('use_store', [False, True])
+    def test_matching_etag_is_304(self, client, test_storage, jpeg, tmp_path, use_store):
+        """If-None-Match with the current ETag gets no body, from either source"""
+        from app.blob_store import LocalBlobStore
+        store = LocalBlobStore(str(tmp_path / 'blobs')) if use_store else None
+        with patch('app.photo_service.get_blob_store', return_value=store):
+            _, photo_id = self._upload(test_storage, jpeg)
+            etag = client.get(f'/api/photos/{photo_id}').get_etag()[0]
+
+            with patch('app.photo_service.PhotoService.get_photo_data') as get_data:
+                response = client.get(f'/api/photos/{photo_id}',
+                                      headers={'If-None-Match': f'"{etag}"'})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.get_etag()[0] == etag
+        get_data.assert_not_called()
+
+    def test_size_still_rendering_is_a_placeholder(self, client, test_storage, jpeg):
+        """A queued thumbnail is a 202 placeholder that is never cached"""
+        from app.photo_service import PhotoService
+        with patch.object(PhotoService, '_render_or_defer', lambda self, data, ct: (None, None, data)):
+            _, photo_id = self._upload(test_storage, jpeg)
+
+        response = client.get(f'/api/photos/{photo_id}?size=thumbnail')
+
+        assert response.status_code == 202
+        assert response.mimetype == 'image/svg+xml'
+        assert response.cache_control.no_store
+        assert client.get(f'/api/photos/{photo_id}?size=original').status_code == 200
+
+    def test_original_download_honours_range(self, client, test_storage, jpeg):
+        """A Range request gets 206 and just the bytes asked for"""
+        association_id, photo_id = self._upload(test_storage, jpeg)
+
+        response = client.get(f'/api/photos/{photo_id}/download',
+                              headers={'Range': 'bytes=0-99'})
+
+        assert response.status_code == 206
+        assert response.data == jpeg[:100]
+        assert response.headers['Content-Range'] == f'bytes 0-99/{len(jpeg)}'
+
+
 @pytest.mark.unit
 class TestBatchMoveAPIWithSubLocation:
     """Test the POST /api/inventory/batch-move endpoint with sub-location support"""
@@ -1617,37 +1872,34 @@ class TestApiCreateItems:
         assert item.thread_handedness == 'RH'
         assert item.thread_size == '1/4-20'
 
-    def test_partial_failure_returns_207(self, client, app, monkeypatch):
-        from app.main.routes import _create_single_item as real_create
+    def test_bulk_is_one_insert(self, client, app, test_storage):
+        from sqlalchemy import event
 
-        call_count = {'n': 0}
+        inserts = []
 
-        def flaky_create(service, form_data, bulk_context=None):
-            call_count['n'] += 1
-            # Fail the second item only (persistence-style error)
-            if call_count['n'] == 2:
-                return (False, form_data.get('ja_id'), 'simulated failure', 'error')
-            return real_create(service, form_data, bulk_context)
+        def record(conn, cursor, statement, *args):
+            if statement.startswith('INSERT INTO inventory_items'):
+                inserts.append(statement)
 
-        monkeypatch.setattr('app.main.routes._create_single_item', flaky_create)
+        event.listen(test_storage.engine, 'before_cursor_execute', record)
+        try:
+            response = client.post('/api/inventory/items',
+                                   json=self._minimum_payload(quantity_to_create=5, active=True))
+        finally:
+            event.remove(test_storage.engine, 'before_cursor_execute', record)
 
-        payload = self._minimum_payload(quantity_to_create=3)
-        response = client.post('/api/inventory/items', json=payload)
-        assert response.status_code == 207
-        data = response.get_json()
-        assert data['success'] is False
-        assert len(data['created_ja_ids']) == 2
-        assert len(data['errors']) == 1
-        assert data['errors'][0]['message'] == 'simulated failure'
-        # Bulk error indices are 1-based, matching the bulk_context.index
-        # passed to the audit logger.
-        assert data['errors'][0]['index'] == 2
+        assert response.status_code == 200
+        assert len(response.get_json()['created_ja_ids']) == 5
+        assert len(inserts) == 1
 
-    def test_complete_failure_returns_500(self, client, monkeypatch):
-        def always_fail(service, form_data, bulk_context=None):
-            return (False, form_data.get('ja_id'), 'simulated total failure', 'error')
+    def test_bulk_failure_creates_nothing(self, client, app, monkeypatch):
+        # A bulk request is one transaction: it succeeds or fails whole
+        from app.exceptions import StorageError
 
-        monkeypatch.setattr('app.main.routes._create_single_item', always_fail)
+        def fail(self, item, count, first_number=1, held=None):
+            raise StorageError('simulated total failure', operation='add_items')
+
+        monkeypatch.setattr('app.mariadb_inventory_service.InventoryService.add_items', fail)
 
         payload = self._minimum_payload(quantity_to_create=2)
         response = client.post('/api/inventory/items', json=payload)
@@ -1655,26 +1907,26 @@ class TestApiCreateItems:
         data = response.get_json()
         assert data['success'] is False
         assert data['created_ja_ids'] == []
-        assert len(data['errors']) == 2
-
-    def test_bulk_all_validation_failures_returns_400(self, client, monkeypatch):
-        # If every bulk attempt fails with a validation_error (e.g. a
-        # parse-time problem in the shared input data), the request as
-        # a whole is a 400, not a 500.
-        def always_fail(service, form_data, bulk_context=None):
-            return (False, form_data.get('ja_id'), 'invalid length: abc', 'validation_error')
+        assert len(data['errors']) == 1
+        assert 'simulated total failure' in data['error']
 
-        monkeypatch.setattr('app.main.routes._create_single_item', always_fail)
+        from app.main.routes import _get_inventory_service
+        with app.app_context():
+            assert _get_inventory_service().search_active_items({'active': ''}) == []
 
-        payload = self._minimum_payload(quantity_to_create=2)
+    def test_bulk_parse_failure_returns_400(self, client, app):
+        # Bulk items share their input, so an unparseable value is a
+        # request-level validation problem, found once
+        payload = self._minimum_payload(quantity_to_create=2, length='abc')
         response = client.post('/api/inventory/items', json=payload)
         assert response.status_code == 400
         data = response.get_json()
         assert data['success'] is False
         assert data['created_ja_ids'] == []
+        assert 'length' in data['error']
 
     def test_single_item_persistence_failure_returns_500(self, client, monkeypatch):
-        def always_fail(service, form_data, bulk_context=None):
+        def always_fail(service, form_data):
             return (False, form_data.get('ja_id'), 'boom', 'error')
 
         monkeypatch.setattr('app.main.routes._create_single_item', always_fail)
@@ -1878,50 +2130,15 @@ class TestFormAddItemRouteAfterRefactor:
         assert data['count'] == 2
         assert len(data['ja_ids']) == 2
 
-    def test_bulk_form_partial_failure_reports_count(
-            self, client, monkeypatch):
-        """A partly-successful bulk form submission states what it recorded.
-
-        FR-009 rests on `count` and `ja_ids` describing what actually reached
-        the database, not what was requested. The form branch builds its own
-        response separately from the JSON API branch covered by
-        TestApiCreateItems, so it needs its own coverage.
-
-        A partial failure is not reachable through the browser -- the server
-        allocates above the current maximum precisely to avoid collisions -- so
-        it is provoked here the same way the JSON API test does it.
-        """
-        from app.main.routes import _create_single_item as real_create
-
-        call_count = {'n': 0}
-
-        def flaky_create(service, form_data, bulk_context=None):
-            call_count['n'] += 1
-            if call_count['n'] == 2:
-                return (False, form_data.get('ja_id'),
-                        'simulated failure', 'error')
-            return real_create(service, form_data, bulk_context)
-
-        monkeypatch.setattr(
-            'app.main.routes._create_single_item', flaky_create)
-
-        form = self._minimum_form(quantity_to_create='3')
-        response = client.post('/inventory/add', data=form)
-
-        assert response.status_code == 500
-        data = response.get_json()
-        assert data['success'] is False
-        assert data['count'] == 2
-        assert len(data['ja_ids']) == 2
-
     def test_bulk_form_complete_failure_creates_nothing(
             self, client, app, monkeypatch):
         """When no item can be created the form says so and records none."""
-        def always_fail(service, form_data, bulk_context=None):
-            return (False, form_data.get('ja_id'),
-                    'simulated total failure', 'error')
+        from app.exceptions import StorageError
 
-        monkeypatch.setattr('app.main.routes._create_single_item', always_fail)
+        def fail(self, item, count, first_number=1, held=None):
+            raise StorageError('simulated total failure', operation='add_items')
+
+        monkeypatch.setattr('app.mariadb_inventory_service.InventoryService.add_items', fail)
 
         form = self._minimum_form(quantity_to_create='2')
         response = client.post('/inventory/add', data=form)
@@ -1936,6 +2153,30 @@ class TestFormAddItemRouteAfterRefactor:
             assert _get_inventory_service().get_all_items() == []
 
 
+    def _next_ja_id(self, client):
+        response = client.get('/api/inventory/next-ja-id')
+        assert response.status_code == 200
+        return response.get_json()['next_ja_id']
+
+    def test_next_ja_id_is_never_given_to_two_clients(self, app, client):
+        other = app.test_client()
+        assert self._next_ja_id(client) == 'JA000001'
+        assert self._next_ja_id(other) == 'JA000002'
+
+    def test_next_ja_id_is_offered_again_on_reload(self, client):
+        assert self._next_ja_id(client) == 'JA000001'
+        assert self._next_ja_id(client) == 'JA000001'
+
+        client.post('/inventory/add', data=self._minimum_form(ja_id='JA000001'))
+        assert self._next_ja_id(client) == 'JA000002'
+
+    def test_bulk_form_starts_at_the_offered_ja_id(self, client):
+        ja_id = self._next_ja_id(client)
+        response = client.post('/inventory/add', data=self._minimum_form(ja_id=ja_id, quantity_to_create='3'))
+        assert response.get_json()['ja_ids'] == ['JA000001', 'JA000002', 'JA000003']
+        assert self._next_ja_id(client) == 'JA000004'
+
+
 class TestFieldSuggestionsRoute:
     """Tests for GET /api/inventory/field-suggestions/<field>."""
 
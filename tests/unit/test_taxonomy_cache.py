@@ -0,0 +1,131 @@
+"""
+Unit tests for the material taxonomy snapshot cache.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app import taxonomy_cache
+from app.database import MaterialTaxonomy
+from app.mariadb_materials_admin_service import MariaDBMaterialsAdminService, TaxonomyAddRequest
+from app.taxonomy_cache import bump_taxonomy_version, get_taxonomy_snapshot
+
+
+@pytest.fixture
+def taxonomy(test_storage):
+    session = test_storage.Session()
+    session.add_all([
+        MaterialTaxonomy(name='Aluminum', level=1, sort_order=1),
+        MaterialTaxonomy(name='6061-T6', level=2, parent='Aluminum', aliases='6061, Al 6061'),
+        MaterialTaxonomy(name='Steel', level=1, sort_order=2),
+        MaterialTaxonomy(name='Stainless Steel', level=2, parent='Steel', aliases='SS'),
+        MaterialTaxonomy(name='Tool Steel', level=2, parent='Steel', active=False),
+    ])
+    session.commit()
+    session.close()
+    return test_storage
+
+
+class TestTaxonomySnapshot:
+    """Tests for what a snapshot answers"""
+
+    @pytest.mark.unit
+    def test_valid_materials_are_active_names_and_aliases(self, taxonomy):
+        snapshot = get_taxonomy_snapshot(taxonomy.engine)
+
+        assert snapshot.valid_materials == (
+            '6061', '6061-T6', 'Al 6061', 'Aluminum', 'SS', 'Stainless Steel', 'Steel'
+        )
+        assert snapshot.is_valid_material('stainless steel')
+        assert snapshot.is_valid_material('ss')
+        assert not snapshot.is_valid_material('Tool Steel')
+
+    @pytest.mark.unit
+    def test_suggest_ranks_exact_then_prefix_then_substring(self, taxonomy):
+        snapshot = get_taxonomy_snapshot(taxonomy.engine)
+
+        assert snapshot.suggest('steel', 10) == ['Steel', 'Stainless Steel']
+        assert snapshot.suggest('6061', 10) == ['6061', '6061-T6', 'Al 6061']
+        assert snapshot.suggest('6061', 2) == ['6061', '6061-T6']
+        assert snapshot.suggest('', 2) == ['6061', '6061-T6']
+
+    @pytest.mark.unit
+    def test_hierarchy_and_overview(self, taxonomy):
+        snapshot = get_taxonomy_snapshot(taxonomy.engine)
+
+        assert [c['name'] for c in snapshot.hierarchy['hierarchy']] == ['Aluminum', 'Steel']
+        overview = snapshot.taxonomy_overview(include_inactive=True)
+        steel = overview[1]
+        assert [m['name'] for m in steel['children']] == ['Stainless Steel', 'Tool Steel']
+
+        # Each caller gets its own copy
+        steel['children'].clear()
+        assert len(snapshot.taxonomy_overview(include_inactive=True)[1]['children']) == 2
+
+    @pytest.mark.unit
+    def test_reads_do_not_query(self, taxonomy):
+        get_taxonomy_snapshot(taxonomy.engine)
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(taxonomy.engine, 'before_cursor_execute', count)
+        try:
+            for _ in range(50):
+                snapshot = get_taxonomy_snapshot(taxonomy.engine)
+                snapshot.is_valid_material('Steel')
+                snapshot.descendants('Steel')
+                snapshot.suggest('st', 10)
+        finally:
+            event.remove(taxonomy.engine, 'before_cursor_execute', count)
+
+        assert statements == []
+
+
+class TestTaxonomyInvalidation:
+    """Tests for reloading after an edit"""
+
+    @pytest.mark.unit
+    def test_admin_add_is_seen_at_once(self, taxonomy):
+        assert not get_taxonomy_snapshot(taxonomy.engine).is_valid_material('Brass')
+
+        success, message = MariaDBMaterialsAdminService(taxonomy).add_taxonomy_entry(
+            TaxonomyAddRequest(name='Brass', level=1)
+        )
+
+        assert success, message
+        assert get_taxonomy_snapshot(taxonomy.engine).is_valid_material('Brass')
+
+    @pytest.mark.unit
+    def test_admin_status_change_is_seen_at_once(self, taxonomy):
+        MariaDBMaterialsAdminService(taxonomy).set_material_status('Stainless Steel', False)
+
+        snapshot = get_taxonomy_snapshot(taxonomy.engine)
+        assert not snapshot.is_valid_material('Stainless Steel')
+        assert snapshot.descendants('Steel') == ['Steel']
+
+    @pytest.mark.unit
+    def test_another_process_edit_is_seen_after_the_check_interval(self, taxonomy, monkeypatch):
+        before = get_taxonomy_snapshot(taxonomy.engine)
+
+        # Another worker's edit: the rows and the version change, but this
+        # process's snapshot is not told
+        session = taxonomy.Session()
+        session.add(MaterialTaxonomy(name='Copper', level=1))
+        bump_taxonomy_version(session)
+        session.commit()
+        session.close()
+
+        assert get_taxonomy_snapshot(taxonomy.engine) is before
+
+        monkeypatch.setattr(taxonomy_cache, 'VERSION_CHECK_INTERVAL', 0)
+        after = get_taxonomy_snapshot(taxonomy.engine)
+        assert after is not before
+        assert after.is_valid_material('Copper')
+
+    @pytest.mark.unit
+    def test_unchanged_version_keeps_the_snapshot(self, taxonomy, monkeypatch):
+        monkeypatch.setattr(taxonomy_cache, 'VERSION_CHECK_INTERVAL', 0)
+
+        assert get_taxonomy_snapshot(taxonomy.engine) is get_taxonomy_snapshot(taxonomy.engine)
@@ -7,13 +7,16 @@ ranking, LIKE-escaping, clamping and case-insensitive dedup behaviour is
 unchanged, so the tests are unchanged too, save for the call they make.
 
 The second class is what is new: the same field answered from both halves of the
-application at once.
+application at once. The third covers the in-memory index suggestions are
+answered from, and how it keeps up with writes.
 """
 
 import pytest
+from sqlalchemy import event
 
+from app import vocabulary_cache
 from app.catalog_service import CatalogService
-from app.database import InventoryItem
+from app.database import CacheVersion, InventoryItem
 from app.mariadb_inventory_service import InventoryService
 from app.services.vocabulary import VocabularyService
 
@@ -330,3 +333,113 @@ class TestVocabularyUnion:
         result = service.suggest('vendor', query='steel', limit=20)
         assert result[0] == 'Steel'
         assert result[1] == 'Acme Steel Inc'
+
+
+class TestVocabularyIndex:
+    """Suggestions come from memory and follow writes without a reload"""
+
+    @pytest.fixture
+    def items(self, test_storage, app):
+        # The row the migration seeds, so bumps are UPDATEs as in production
+        session = test_storage.Session()
+        session.add(CacheVersion(name=vocabulary_cache.CACHE_NAME, version=0))
+        session.commit()
+        session.close()
+        return InventoryService(test_storage)
+
+    @pytest.fixture
+    def service(self, test_storage, app):
+        return VocabularyService(test_storage)
+
+    @pytest.fixture
+    def statements(self, test_storage):
+        seen = []
+
+        def count(conn, cursor, statement, *args):
+            seen.append(statement)
+
+        event.listen(test_storage.engine, 'before_cursor_execute', count)
+        yield seen
+        event.remove(test_storage.engine, 'before_cursor_execute', count)
+
+    def _make_item(self, ja_id, **overrides):
+        defaults = dict(
+            item_type='Bar',
+            shape='Round',
+            material='Steel',
+            length=100,
+            width=10,
+            location='Shelf A',
+            active=True,
+            precision=False,
+        )
+        defaults.update(overrides)
+        return InventoryItem(ja_id=ja_id, **defaults)
+
+    @pytest.mark.unit
+    def test_keystrokes_do_not_query(self, service, items, statements):
+        items.add_item(self._make_item('JA000001', vendor='McMaster-Carr'))
+        service.suggest('vendor', query='m')
+        statements.clear()
+
+        for query in ('m', 'mc', 'mcm', 'mcma', 'mcmas'):
+            assert service.suggest('vendor', query=query) == ['McMaster-Carr']
+
+        assert statements == []
+
+    @pytest.mark.unit
+    def test_a_new_value_is_offered_without_a_reload(self, service, items, statements):
+        items.add_item(self._make_item('JA000001', location='Shelf A', sub_location='Top'))
+        service.suggest('location')
+
+        items.add_item(self._make_item('JA000002', location='Rack 3', sub_location='Bin 7'))
+        statements.clear()
+
+        assert service.suggest('location', query='rack') == ['Rack 3']
+        assert service.suggest('sub_location', location='Rack 3') == ['Bin 7']
+        assert statements == []
+
+    @pytest.mark.unit
+    def test_an_edited_away_value_is_withdrawn(self, service, items):
+        items.add_item(self._make_item('JA000001', vendor='Old Name'))
+        assert service.suggest('vendor') == ['Old Name']
+
+        item = items.get_item('JA000001')
+        item.vendor = 'New Name'
+        items.update_item(item)
+
+        assert service.suggest('vendor') == ['New Name']
+
+    @pytest.mark.unit
+    def test_a_rolled_back_value_is_not_offered(self, service, items, test_storage):
+        service.suggest('vendor')
+
+        session = test_storage.Session()
+        session.add(self._make_item('JA000001', vendor='Never Saved'))
+        session.flush()
+        session.rollback()
+        session.close()
+
+        assert service.suggest('vendor') == []
+
+    @pytest.mark.unit
+    def test_another_process_write_is_seen_after_the_check_interval(
+        self, service, items, test_storage, monkeypatch
+    ):
+        service.suggest('vendor')
+
+        # Another worker's write: the row and the version change, but this
+        # process's index is not told
+        session = test_storage.Session()
+        session.execute(InventoryItem.__table__.insert().values(
+            ja_id='JA000009', item_type='Bar', shape='Round', material='Steel',
+            location='Shelf A', vendor='Elsewhere', active=True, precision=False,
+        ))
+        vocabulary_cache.bump_vocabulary_version(session)
+        session.commit()
+        session.close()
+
+        assert service.suggest('vendor') == []
+
+        monkeypatch.setattr(vocabulary_cache, 'VERSION_CHECK_INTERVAL', 0)
+        assert service.suggest('vendor') == ['Elsewhere']